@@ -9,6 +9,9 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from sqlalchemy.schema import MetaData  # imported for typing hinting
 
 from src.auth.models import User
+from src.qr.models import QRCode  # noqa: F401, registers the table on the metadata
+from src.analytics.models import ScanEvent, ScanRollupHourly  # noqa: F401, registers the tables on the metadata
+from src.analytics.partitions import PARTITION_NAME_PATTERN
 from alembic import context
 
 # from src.database import Base
@@ -50,6 +53,16 @@ target_metadata: list[MetaData] = [User.metadata]
 config.set_main_option("sqlalchemy.url", DATABASE_URL)
 
 
+def include_name(name: str | None, type_: str, parent_names: dict) -> bool:
+    """
+    Leave the monthly partitions of the scan events out of autogenerate: they are created and dropped
+    by the partition maintenance rather than by migrations, and are not part of the metadata
+    """
+    if type_ == "table" and name is not None:
+        return PARTITION_NAME_PATTERN.fullmatch(name) is None
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -66,6 +79,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -75,7 +89,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
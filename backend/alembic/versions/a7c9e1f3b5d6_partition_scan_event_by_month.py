@@ -0,0 +1,111 @@
+"""Partition scan event table by month
+
+Revision ID: a7c9e1f3b5d6
+Revises: f6b8d0e2a4c5
+Create Date: 2026-10-18 18:12:40.271094
+
+"""
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from fastapi_users_db_sqlalchemy.generics import GUID
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c9e1f3b5d6"
+down_revision: Union[str, None] = "f6b8d0e2a4c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created after the current one, the partition maintenance takes over from there
+PARTITIONS_AHEAD = 3
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def rename_scan_event(suffix: str) -> None:
+    """Move the scan_event table, its primary key and identity sequence out of the way, dropping its indexes"""
+    op.drop_index("ix_scan_event_scanned_at", table_name="scan_event")
+    op.drop_index("ix_scan_event_qr_code_id_scanned_at", table_name="scan_event")
+    op.rename_table("scan_event", f"scan_event_{suffix}")
+    op.execute(
+        f"ALTER TABLE scan_event_{suffix} RENAME CONSTRAINT scan_event_pkey TO scan_event_{suffix}_pkey"
+    )
+    op.execute(f"ALTER SEQUENCE scan_event_id_seq RENAME TO scan_event_{suffix}_id_seq")
+
+
+def create_scan_event(primary_key: Sequence[str], **kwargs) -> None:
+    op.create_table(
+        "scan_event",
+        sa.Column("id", sa.BigInteger(), sa.Identity(always=False), nullable=False),
+        sa.Column("qr_code_id", GUID, nullable=False),  # type: ignore
+        sa.Column("scanned_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("user_agent", sa.String(length=512), nullable=True),
+        sa.PrimaryKeyConstraint(*primary_key),
+        **kwargs,
+    )
+    op.create_index(
+        "ix_scan_event_qr_code_id_scanned_at",
+        "scan_event",
+        ["qr_code_id", "scanned_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_scan_event_scanned_at",
+        "scan_event",
+        ["scanned_at"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"autosummarize": "on"},
+    )
+
+
+def copy_scan_events(source: str) -> None:
+    """Copy the scan events of a table into scan_event, keeping their ids, then drop the table"""
+    op.execute(
+        "INSERT INTO scan_event (id, qr_code_id, scanned_at, user_agent) OVERRIDING SYSTEM VALUE "
+        f"SELECT id, qr_code_id, scanned_at, user_agent FROM {source}"
+    )
+    op.execute(
+        "SELECT setval(pg_get_serial_sequence('scan_event', 'id'), "
+        "coalesce(max(id), 0) + 1, false) FROM scan_event"
+    )
+    op.drop_table(source)
+
+
+def upgrade() -> None:
+    rename_scan_event("unpartitioned")
+    create_scan_event(
+        ["id", "scanned_at"], postgresql_partition_by="RANGE (scanned_at)"
+    )
+
+    # Partitions for the months of the existing events, up to the months ahead of the current one
+    current_month = datetime.now(timezone.utc).date().replace(day=1)
+    oldest = op.get_bind().scalar(
+        sa.text("SELECT min(scanned_at) FROM scan_event_unpartitioned")
+    )
+    month = (
+        min(oldest.date().replace(day=1), current_month) if oldest else current_month
+    )
+    while month <= add_months(current_month, PARTITIONS_AHEAD):
+        end = add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE scan_event_{month.year:04d}_{month.month:02d} PARTITION OF scan_event "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{end.isoformat()} 00:00+00')"
+        )
+        month = end
+
+    copy_scan_events("scan_event_unpartitioned")
+
+
+def downgrade() -> None:
+    # Dropping the partitioned table drops its partitions, detached partitions are left as they are
+    rename_scan_event("partitioned")
+    create_scan_event(["id"])
+    copy_scan_events("scan_event_partitioned")
@@ -0,0 +1,57 @@
+"""Add case-insensitive unique index on user email
+
+Emails differing only by case must be merged or renamed before upgrading: they are reported, and the
+upgrade stopped, rather than picking which of the accounts to keep.
+
+Revision ID: b2d4f6a8c0e1
+Revises: 6639679fae8b
+Create Date: 2026-10-18 10:12:41.318520
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b2d4f6a8c0e1"
+down_revision: Union[str, None] = "6639679fae8b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Emails reported at most when stopping the upgrade
+REPORTED_DUPLICATES = 20
+
+
+def upgrade() -> None:
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                'SELECT lower(email) FROM "user" GROUP BY lower(email) HAVING count(*) > 1 '
+                "ORDER BY 1 LIMIT :limit"
+            ),
+            {"limit": REPORTED_DUPLICATES},
+        )
+        .scalars()
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Users share emails differing only by case, merge or rename them before upgrading: "
+            + ", ".join(duplicates)
+        )
+
+    op.create_index(
+        "ix_user_email_lower",
+        "user",
+        [sa.text("lower(email)")],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_email_lower", table_name="user")
@@ -0,0 +1,138 @@
+"""
+Benchmark of the asset downloads, /assets/{key}: a print resolution export downloaded whole, resumed after
+an interrupted download, and revalidated by a client or a CDN holding it.
+
+Requests are sent straight to the ASGI application, without a client or a server in between, so the
+times are those of the application itself:
+    - full: the whole asset, read from the file in chunks, for servers without the ASGI file extensions;
+      what a client retrying a download without ranges fetches again
+    - pathsend: the whole asset, its path handed over to the server, which sends the file itself
+    - resume: the end of the asset from where the download stopped, sliced from a memory mapping
+    - resume zerocopy: the same range, the file handed over to the server with its offset and count
+    - revalidate: a conditional request with the ETag of the asset, answered with a 304
+
+The asset is stored in a filesystem asset store in a temporary directory; its pages are in the page cache
+after the first run, as for the popular assets of a worker.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_asset_download
+    python -m benchmarks.bench_asset_download --size-mib 64 --resume-at 0.9 --repeat 20
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Any
+
+from src.assets.dependencies import get_asset_store
+from src.assets.stores import FilesystemAssetStore
+from src.main import app
+
+
+async def download(
+    path: str, headers: dict[str, str], extensions: dict[str, Any]
+) -> tuple[int, int]:
+    """Send a GET to the application, returning the status and the number of bytes of the body"""
+    status = 0
+    sent = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status, sent
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            sent += len(message.get("body", b""))
+        elif message["type"] == "http.response.zerocopysend":
+            sent += message.get("count", os.fstat(message["file"].fileno()).st_size)
+        elif message["type"] == "http.response.pathsend":
+            sent += os.stat(message["path"]).st_size
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")]
+        + [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+        "extensions": extensions,
+    }
+    await app(scope, receive, send)
+    return status, sent
+
+
+async def median_ms(
+    path: str,
+    headers: dict[str, str],
+    extensions: dict[str, Any],
+    repeat: int,
+) -> tuple[float, int, int]:
+    """Median time of repeat downloads in milliseconds, along with the status and the bytes sent"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status, sent = await download(path, headers, extensions)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000, status, sent
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mib", default=32, type=int)
+    parser.add_argument(
+        "--resume-at",
+        default=0.9,
+        type=float,
+        help="Share of the asset already downloaded",
+    )
+    parser.add_argument("--repeat", default=10, type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = FilesystemAssetStore(root)
+        app.dependency_overrides[get_asset_store] = lambda: store
+        asset = await store.put(
+            os.urandom(args.size_mib * 1024 * 1024), "application/pdf"
+        )
+        path = f"/assets/{asset.key}"
+        etag = f'"{asset.key.partition(".")[0]}"'
+        resume = {
+            "Range": f"bytes={int(asset.size * args.resume_at)}-",
+            "If-Range": etag,
+        }
+        zerocopy = {"http.response.zerocopysend": {}}
+
+        scenarios: dict[str, tuple[dict[str, str], dict[str, Any]]] = {
+            "full": ({}, {}),
+            "pathsend": ({}, {"http.response.pathsend": {}}),
+            "resume": (resume, {}),
+            "resume zerocopy": (resume, zerocopy),
+            "revalidate": ({"If-None-Match": etag}, {}),
+        }
+        print(
+            f"{'request':>16} | {'status':>6} {'MiB sent':>9} {'median ms':>10} {'MiB/s':>8}"
+        )
+        for name, (headers, extensions) in scenarios.items():
+            # Warms the page cache
+            await download(path, headers, extensions)
+            ms, status, sent = await median_ms(path, headers, extensions, args.repeat)
+            mib = sent / 1024 / 1024
+            rate = f"{mib / ms * 1000:>8.0f}" if sent else f"{'-':>8}"
+            print(f"{name:>16} | {status:>6} {mib:>9.2f} {ms:>10.2f} {rate}")
+        app.dependency_overrides = {}
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+"""
+Benchmark of the listing of a user's codes: keyset pagination against OFFSET pagination, page by page.
+
+A user owning a large number of codes is seeded, then pages deep into the listing are fetched both ways:
+    - offset: full QRCode entities, ORDER BY created_at DESC, id DESC with OFFSET (page - 1) * limit
+    - keyset: list_qr_codes, the columns of the list only, starting after the cursor of the previous page
+The cursor of every page is computed beforehand, the keyset latencies are those of a client following the
+next_cursor links. Keyset pages should cost the same from the first page to the last, offset pages grow
+with the rows skipped.
+
+Everything runs in a single transaction of the database configured by DEV_DATABASE_URL, which is rolled
+back at the end.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_code_listing
+    python -m benchmarks.bench_code_listing --codes 1000000 --pages 1 100 20000 --queries 50
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.bench_render_load import percentile
+from src.auth.models import User
+from src.database import database
+from src.qr.codes import ListCursor, list_qr_codes
+from src.qr.models import QRCode
+
+
+async def seed(session: AsyncSession, owner_id: uuid.UUID, codes: int) -> None:
+    """Insert codes for a user, one second apart, along with a few codes of other users"""
+    await session.execute(
+        text(
+            "INSERT INTO qr_code (id, owner_id, short_id, name, target_url, is_active, created_at) "
+            "SELECT gen_random_uuid(), CAST(:owner_id AS uuid), "
+            "'x' || lpad(to_hex(g), 15, '0'), 'Code ' || g, "
+            "'https://qrafty.app/bench/' || g, true, "
+            "now() - make_interval(secs => CAST(g AS float8)) "
+            "FROM generate_series(1, CAST(:codes AS bigint)) AS g"
+        ),
+        {"owner_id": owner_id, "codes": codes},
+    )
+    await session.execute(text("ANALYZE qr_code"))
+
+
+def offset_page(owner_id: uuid.UUID, page: int, limit: int):
+    """OFFSET query of a page of full code entities"""
+    return (
+        select(QRCode)
+        .where(QRCode.owner_id == owner_id)
+        .order_by(QRCode.created_at.desc(), QRCode.id.desc())
+        .offset((page - 1) * limit)
+        .limit(limit)
+    )
+
+
+async def page_cursor(
+    session: AsyncSession, owner_id: uuid.UUID, page: int, limit: int
+) -> ListCursor | None:
+    """Cursor of the page, the sort key of the last code of the previous page"""
+    if page == 1:
+        return None
+    row = (
+        await session.execute(
+            select(QRCode.created_at, QRCode.id)
+            .where(QRCode.owner_id == owner_id)
+            .order_by(QRCode.created_at.desc(), QRCode.id.desc())
+            .offset((page - 1) * limit - 1)
+            .limit(1)
+        )
+    ).one()
+    return ListCursor(*row)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--codes", default=300_000, type=int)
+    parser.add_argument("--limit", default=50, type=int)
+    parser.add_argument(
+        "--pages", default=[1, 10, 100, 1000, 5000], nargs="+", type=int
+    )
+    parser.add_argument("--queries", default=20, type=int)
+    args = parser.parse_args()
+
+    owner_id = uuid.uuid4()
+    name = f"bench-{owner_id.hex[:8]}"
+    async with database.session() as session:
+        await session.execute(
+            insert(User).values(
+                id=owner_id,
+                email=f"{name}@example.com",
+                username=name,
+                name="Bench User",
+                hashed_password="unused",
+            )
+        )
+        began = time.perf_counter()
+        await seed(session, owner_id, args.codes)
+        print(f"seeded {args.codes:,} codes: {time.perf_counter() - began:.1f} s")
+
+        print(f"\n{'page':>6} {'method':>7} {'p50 ms':>9} {'p99 ms':>9}")
+        for page in args.pages:
+            cursor = await page_cursor(session, owner_id, page, args.limit)
+            for method in ("offset", "keyset"):
+                latencies = []
+                for _ in range(args.queries + 1):
+                    start = time.perf_counter()
+                    if method == "offset":
+                        codes = (
+                            await session.scalars(
+                                offset_page(owner_id, page, args.limit)
+                            )
+                        ).all()
+                    else:
+                        codes = (
+                            await list_qr_codes(session, owner_id, args.limit, cursor)
+                        ).items
+                    latencies.append(time.perf_counter() - start)
+                    assert len(codes) == args.limit, len(codes)
+                    # Entities are loaded afresh on every run, rather than from the identity map
+                    session.expunge_all()
+                # The first run warms up the statement caches
+                latencies = latencies[1:]
+                print(
+                    f"{page:>6} {method:>7} {percentile(latencies, 50):>9.2f} "
+                    f"{percentile(latencies, 99):>9.2f}"
+                )
+
+        cursor = await page_cursor(session, owner_id, args.pages[-1], args.limit)
+        plan = await session.scalars(
+            text(
+                "EXPLAIN (ANALYZE, BUFFERS, COSTS OFF) "
+                "SELECT id, short_id, name, target_url, is_active, created_at FROM qr_code "
+                "WHERE owner_id = CAST(:owner_id AS uuid) "
+                "AND (created_at, id) < (CAST(:created_at AS timestamptz), CAST(:id AS uuid)) "
+                "ORDER BY created_at DESC, id DESC LIMIT :limit"
+            ),
+            {
+                "owner_id": owner_id,
+                "created_at": cursor.created_at if cursor else None,
+                "id": cursor.id if cursor else None,
+                "limit": args.limit + 1,
+            },
+        )
+        print(f"\nkeyset plan of page {args.pages[-1]}:")
+        for line in plan:
+            print(f"    {line}")
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
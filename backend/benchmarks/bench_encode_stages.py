@@ -0,0 +1,135 @@
+"""
+Benchmark of the two stages of a render: the encoding of the data into the module matrix, and its
+rasterization into each output format.
+
+Encode stage, for every version:
+    - stock: QRCode.make of the qrcode library, which scores the 8 masks module by module in Python
+    - layout: first encoding of a version, computing its function patterns and placement order
+    - codewords: bit stream, padding, Reed-Solomon error correction and interleaving, create_codewords
+    - masks: placement of the codewords and scoring of the 8 masks, mask_candidates + mask_penalties
+    - encode: whole encode stage with the layout already computed, the memo being cleared every run
+    - hit: encode stage answered by the memo, the payload having been rendered before
+
+Rasterize stage, from the memoized encoding: unpack is EncodedQR.matrix with the quiet zone, then
+render_png, render_svg and render_pdf at the given box size. Everything runs in this process alone, so
+the times are those of a single core, and of a single render process of the pool.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_encode_stages
+    python -m benchmarks.bench_encode_stages --versions 1 10 40 --error-correction H --repeat 20
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+import numpy as np
+import qrcode
+
+from src.qr.encoder import (
+    ERROR_CORRECTION_LEVELS,
+    create_codewords,
+    encode,
+    mask_candidates,
+    mask_penalties,
+    version_layout,
+)
+from src.qr.engine import render_pdf, render_png, render_svg
+from src.qr.schemas import ErrorCorrectionLevel
+
+
+def median_ms(func: Callable[[], object], repeat: int) -> float:
+    """Median wall time of repeat runs of the function, in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def stock_encode(data: str, level: int, version: int) -> None:
+    """Encode through the qrcode library"""
+    qr = qrcode.QRCode(version=version, error_correction=level)
+    qr.add_data(data)
+    qr.make(fit=False)
+
+
+def cold_encode(
+    data: str, error_correction: ErrorCorrectionLevel, version: int
+) -> None:
+    """Encode without the memo"""
+    encode.cache_clear()
+    encode(data, error_correction, version)
+
+
+def first_layout(version: int) -> None:
+    """Compute the layout of a version without its cache"""
+    version_layout.cache_clear()
+    version_layout(version)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--versions", default=[1, 5, 10, 20, 40], nargs="+", type=int)
+    parser.add_argument(
+        "--error-correction",
+        default=ErrorCorrectionLevel.M,
+        type=ErrorCorrectionLevel,
+        choices=list(ErrorCorrectionLevel),
+    )
+    parser.add_argument("--box-size", default=10, type=int)
+    parser.add_argument("--border", default=4, type=int)
+    parser.add_argument("--repeat", default=10, type=int)
+    parser.add_argument("--data", default="QRafty")
+    args = parser.parse_args()
+    level = ERROR_CORRECTION_LEVELS[args.error_correction]
+
+    print(
+        f"{'version':>7} | {'stock ms':>8} {'layout':>8} {'codewords':>9} {'masks':>8} "
+        f"{'encode':>8} {'speedup':>7} {'hit µs':>7} | {'unpack µs':>9} {'png ms':>7} "
+        f"{'svg ms':>7} {'pdf ms':>7}"
+    )
+    for version in args.versions:
+        # Every encoding is checked against the qrcode library before being timed
+        qr = qrcode.QRCode(version=version, error_correction=level, border=0)
+        qr.add_data(args.data)
+        qr.make(fit=False)
+        encoded = encode(args.data, args.error_correction, version)
+        assert np.array_equal(encoded.matrix(), np.array(qr.modules, dtype=bool))
+
+        stock = median_ms(lambda: stock_encode(args.data, level, version), args.repeat)
+        layout = median_ms(lambda: first_layout(version), args.repeat)
+        codewords = median_ms(
+            lambda: create_codewords(qr.data_list, version, level), args.repeat
+        )
+        cached_layout = version_layout(version)
+        words = create_codewords(qr.data_list, version, level)
+        masks = median_ms(
+            lambda: mask_penalties(mask_candidates(words, cached_layout)), args.repeat
+        )
+        cold = median_ms(
+            lambda: cold_encode(args.data, args.error_correction, version),
+            args.repeat,
+        )
+
+        encode(args.data, args.error_correction, version)
+        hit = median_ms(
+            lambda: encode(args.data, args.error_correction, version), args.repeat
+        )
+        unpack = median_ms(lambda: encoded.matrix(args.border), args.repeat)
+        matrix = encoded.matrix(args.border)
+        rasters = [
+            median_ms(lambda: render(matrix, args.box_size), args.repeat)
+            for render in (render_png, render_svg, render_pdf)
+        ]
+        print(
+            f"{version:>7} | {stock:>8.2f} {layout:>8.2f} {codewords:>9.2f} {masks:>8.2f} "
+            f"{cold:>8.2f} {stock / cold:>6.1f}x {hit * 1000:>7.1f} | {unpack * 1000:>9.1f} "
+            + " ".join(f"{raster:>7.2f}" for raster in rasters)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark of the encoding of large JSON responses: the default path of FastAPI against FastJSONResponse.
+
+Payloads of --rows rows each:
+    - users: a list of UserRead
+    - codes: a QRCodePage, as listed by GET /qr/codes
+    - scans: a ScanSeries, as returned by GET /analytics/codes/{qr_code_id}/scans
+    - scan rows: the ScanSeries built from the rows of the rollups then encoded, as the route does
+
+The default path is what FastAPI does with a model returned by a route with a response model: dump the
+model, validate the dump against the response model, serialize it and encode it with the json module.
+The fast path encodes the model straight to bytes, FastAPI skipping the validation of a response.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_json_responses
+    python -m benchmarks.bench_json_responses --rows 100000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.analytics.schemas import Granularity, ScanCount, ScanSeries
+from src.auth.schemas import UserRead
+from src.qr.schemas import QRCodeListItem, QRCodePage
+from src.responses import FastJSONResponse
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_payloads(rows: int) -> dict[str, tuple[Any, Any]]:
+    """Build the payloads, along with their response model"""
+    users = [
+        UserRead(
+            id=uuid.uuid4(),
+            email=f"user{index}@example.com",
+            is_active=True,
+            is_superuser=False,
+            is_verified=index % 2 == 0,
+            name=f"User {index}",
+            username=f"user{index}",
+        )
+        for index in range(rows)
+    ]
+    codes = QRCodePage(
+        items=[
+            QRCodeListItem(
+                id=uuid.uuid4(),
+                short_id=f"c{index}",
+                name=f"Code {index}",
+                target_url=f"https://example.com/landing/{index}?utm_source=qr",
+                is_active=True,
+                created_at=START + timedelta(seconds=index),
+            )
+            for index in range(rows)
+        ],
+        next_cursor="cursor",
+    )
+    scans = ScanSeries(
+        qr_code_id=uuid.uuid4(),
+        granularity=Granularity.HOUR,
+        start=START,
+        end=START + timedelta(hours=rows),
+        total=rows,
+        buckets=[
+            ScanCount(bucket=START + timedelta(hours=index), scans=index)
+            for index in range(rows)
+        ],
+    )
+    return {
+        "users": (list[UserRead], users),
+        "codes": (QRCodePage, codes),
+        "scans": (ScanSeries, scans),
+    }
+
+
+async def fastapi_path(response_model: Any, content: Any) -> bytes:
+    """Encode content as FastAPI does for a route with a response model"""
+    field = create_response_field("Response", response_model)
+    return JSONResponse(
+        await serialize_response(field=field, response_content=content)
+    ).body
+
+
+async def fast_path(response_model: Any, content: Any) -> bytes:
+    """Encode content with FastJSONResponse"""
+    return FastJSONResponse(content).body
+
+
+def scan_rows_path(
+    encode: Callable[[Any, Any], Awaitable[bytes]],
+    rows: list[tuple[datetime, int]],
+) -> Callable[[], Awaitable[bytes]]:
+    """Build a ScanSeries from the rows of the rollups, then encode it"""
+
+    async def run() -> bytes:
+        buckets = [ScanCount(bucket=bucket, scans=scans) for bucket, scans in rows]
+        series = ScanSeries(
+            qr_code_id=uuid.UUID(int=0),
+            granularity=Granularity.HOUR,
+            start=START,
+            end=START + timedelta(hours=len(rows)),
+            total=sum(bucket.scans for bucket in buckets),
+            buckets=buckets,
+        )
+        return await encode(ScanSeries, series)
+
+    return run
+
+
+async def best_time(run: Callable[[], Awaitable[bytes]], repeat: int) -> float:
+    """Best time of a few runs, in seconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default=10_000, type=int)
+    parser.add_argument("--repeat", default=5, type=int)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.rows)
+    rows = [(START + timedelta(hours=index), index) for index in range(args.rows)]
+    cases: list[
+        tuple[str, Callable[[], Awaitable[bytes]], Callable[[], Awaitable[bytes]]]
+    ] = [
+        (
+            name,
+            lambda model=model, content=content: fastapi_path(model, content),
+            lambda model=model, content=content: fast_path(model, content),
+        )
+        for name, (model, content) in payloads.items()
+    ]
+    cases.append(
+        (
+            "scan rows",
+            scan_rows_path(fastapi_path, rows),
+            scan_rows_path(fast_path, rows),
+        )
+    )
+
+    print(
+        f"{'payload':>10} {'rows':>7} {'KiB':>7} {'fastapi ms':>11} {'fast ms':>8} {'speedup':>8}"
+    )
+    for name, before, after in cases:
+        body = await after()
+        assert body == await before(), f"{name}: the bodies differ"
+        before_time = await best_time(before, args.repeat)
+        after_time = await best_time(after, args.repeat)
+        print(
+            f"{name:>10} {args.rows:>7} {len(body) / 1024:>7.0f} {before_time * 1000:>11.1f} "
+            f"{after_time * 1000:>8.1f} {before_time / after_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Benchmark of bearer token reads: the stock JWTStrategy against the caching strategy.
+
+The stock strategy decodes and verifies the token and loads its user from the database on every read,
+the caching strategy only does so on the first read of a token. A user is created in the database
+configured by DEV_DATABASE_URL and deleted at the end.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_jwt_cache
+    python -m benchmarks.bench_jwt_cache --reads 5000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi_users.authentication import JWTStrategy
+from sqlalchemy import delete, insert
+
+from src.auth.config import JWT_ALGORITHM, JWT_LIFETIME_SECONDS, SECRET_KEY
+from src.auth.dependencies import CustomSQLAlchemyUserDatabase, password_hashing
+from src.auth.jwt import jwt_strategy
+from src.auth.models import User
+from src.auth.service import UserManager
+from src.database import database
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reads", default=2000, type=int)
+    args = parser.parse_args()
+
+    user_id = uuid.uuid4()
+    name = f"bench-{user_id.hex[:8]}"
+    async with database.session() as session:
+        await session.execute(
+            insert(User).values(
+                id=user_id,
+                email=f"{name}@example.com",
+                username=name,
+                name="Bench User",
+                hashed_password="unused",
+            )
+        )
+        await session.commit()
+
+    stock_strategy = JWTStrategy(
+        secret=SECRET_KEY,
+        lifetime_seconds=JWT_LIFETIME_SECONDS,
+        algorithm=JWT_ALGORITHM,
+    )
+
+    try:
+        print(f"{'strategy':>10} {'reads/s':>10} {'us/read':>9}")
+        for label, strategy in [("stock", stock_strategy), ("caching", jwt_strategy)]:
+            async with database.session() as session:
+                user_manager = UserManager(
+                    CustomSQLAlchemyUserDatabase(session, User), password_hashing
+                )
+                user = await user_manager.get(user_id)
+                token = await strategy.write_token(user)
+
+                start = time.perf_counter()
+                for _ in range(args.reads):
+                    assert await strategy.read_token(token, user_manager) is not None
+                    # Every request has its own session, do not let the identity map serve the user
+                    session.expunge_all()
+                elapsed = time.perf_counter() - start
+
+            print(
+                f"{label:>10} {args.reads / elapsed:>10.0f} {elapsed / args.reads * 1e6:>9.1f}"
+            )
+    finally:
+        async with database.session() as session:
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Load benchmark of password hashing: login throughput and latency of the other endpoints during a login burst.
+
+A set of login clients continuously log in as seeded users while a probe client measures the latency of
+the root endpoint. The benchmark runs twice against the in-process application:
+    - inline: hashes run on the event loop, as the UserManager did before the hashing executor
+    - pool: hashes run in the thread pool of the password hashing executor
+
+The users are seeded in the database configured by DEV_DATABASE_URL and deleted at the end. Probes are
+issued at a fixed rate and their latency is measured from the time they were scheduled to start, so the
+time spent waiting for a blocked event loop is accounted for.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_login
+    python -m benchmarks.bench_login --duration 20 --login-clients 16
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections.abc import Callable
+from typing import ParamSpec, TypeVar
+
+from asgi_lifespan import LifespanManager
+from fastapi_users.password import PasswordHelper
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete, insert
+
+from benchmarks.bench_render_load import percentile, probe_client
+from src.auth.dependencies import get_password_hashing
+from src.auth.models import User
+from src.database import database
+from src.main import app
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+PASSWORD = "BenchPassword1!"
+
+
+class InlinePasswordHashing:
+    """Password hashing stand-in hashing on the event loop, reproducing the behaviour before the executor"""
+
+    async def run(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        return func(*args, **kwargs)
+
+
+async def login_client(
+    client: AsyncClient, stop: float, emails: list[str], offset: int
+) -> tuple[list[float], int]:
+    """Log in as the seeded users until the deadline, returning the latencies and the failed logins"""
+    latencies: list[float] = []
+    failures = 0
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        response = await client.post(
+            "/auth/login",
+            data={"username": emails[offset % len(emails)], "password": PASSWORD},
+        )
+        latencies.append(time.perf_counter() - start)
+        failures += response.status_code != 200
+        offset += 1
+    return latencies, failures
+
+
+async def run(mode: str, emails: list[str], args: argparse.Namespace) -> None:
+    """Run the login burst against the application with the given hashing mode and print the latencies"""
+    if mode == "inline":
+        app.dependency_overrides[get_password_hashing] = lambda: InlinePasswordHashing()
+
+    async with LifespanManager(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),  # type: ignore
+            base_url="http://bench",
+            timeout=None,
+        ) as client:
+            stop = time.perf_counter() + args.duration
+            logins = [
+                login_client(client, stop, emails, i) for i in range(args.login_clients)
+            ]
+            probe = probe_client(client, stop, "/", "", args.probe_interval)
+            *results, probe_latencies = await asyncio.gather(*logins, probe)
+
+    app.dependency_overrides = {}
+
+    login_latencies = [latency for latencies, _ in results for latency in latencies]
+    failures = sum(failed for _, failed in results)
+
+    print(
+        f"\n[{mode}] {len(login_latencies) / args.duration:.1f} logins/s, {failures} failed"
+    )
+    print(f"{'endpoint':>12} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, latencies in [
+        ("/auth/login", login_latencies),
+        ("/", probe_latencies),
+    ]:
+        print(
+            f"{endpoint:>12} {len(latencies):>6} {percentile(latencies, 50):>9.1f} "
+            f"{percentile(latencies, 99):>9.1f} {max(latencies) * 1000:>9.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", default=10.0, type=float)
+    parser.add_argument("--login-clients", default=8, type=int)
+    parser.add_argument("--users", default=50, type=int)
+    parser.add_argument("--probe-interval", default=0.1, type=float)
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    hashed_password = PasswordHelper().hash(PASSWORD)
+    users = [
+        {
+            "email": f"bench-{run_id}-{i}@example.com",
+            "username": f"bench-{run_id}-{i}",
+            "name": "Bench User",
+            "hashed_password": hashed_password,
+        }
+        for i in range(args.users)
+    ]
+    async with database.session() as session:
+        await session.execute(insert(User), users)
+        await session.commit()
+
+    try:
+        # Both runs share the event loop, the database engine pools connections bound to it
+        for mode in ("inline", "pool"):
+            await run(mode, [user["email"] for user in users], args)
+    finally:
+        async with database.session() as session:
+            await session.execute(
+                delete(User).where(User.email.like(f"bench-{run_id}-%"))
+            )
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
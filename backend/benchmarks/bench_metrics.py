@@ -0,0 +1,130 @@
+"""
+Overhead benchmark of the instrumentation: the stage spans, and the timing middleware in front of a route.
+
+Spans are measured in a tight loop against the same loop without a span, recording a "bench" stage.
+The middleware is measured on two applications, with requests sent straight to them, with and without
+the middleware:
+    - bare: an ASGI application answering an empty response, the cost of the middleware alone
+    - fastapi: a FastAPI application with a single JSON route, the cheapest realistic route
+The overhead is the difference of the mean latencies, to be compared with the latency of the routes of
+the application, from a few hundred microseconds up.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --requests 100000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from benchmarks.bench_render_load import percentile
+from src.metrics.config import HTTP_LATENCY_BUCKETS
+from src.metrics.dependencies import span
+from src.metrics.middleware import TimingMiddleware
+from src.metrics.registry import Histogram
+
+
+async def bare_app(scope: dict, receive, send) -> None:
+    """ASGI application answering an empty response"""
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def fastapi_app() -> FastAPI:
+    """FastAPI application with a single JSON route"""
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int) -> dict:
+        return {"item_id": item_id}
+
+    return app
+
+
+async def measure_requests(app, requests: int) -> list[float]:
+    """Send requests straight to an ASGI application, returning the latency of every request"""
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    latencies = []
+    for _ in range(requests):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/items/42",
+            "raw_path": b"/items/42",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        start = time.perf_counter()
+        await app(scope, receive, send)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def measure_spans(spans: int) -> tuple[float, float]:
+    """Time a loop with and without a span around its body, returning the mean time per iteration"""
+    start = time.perf_counter()
+    for _ in range(spans):
+        pass
+    bare = (time.perf_counter() - start) / spans
+
+    start = time.perf_counter()
+    for _ in range(spans):
+        with span("bench"):
+            pass
+    spanned = (time.perf_counter() - start) / spans
+    return bare, spanned
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", default=50_000, type=int)
+    parser.add_argument("--spans", default=1_000_000, type=int)
+    args = parser.parse_args()
+
+    bare, spanned = measure_spans(args.spans)
+    print(
+        f"span: {(spanned - bare) * 1e9:.0f} ns per span ({spanned * 1e9:.0f} ns with, "
+        f"{bare * 1e9:.0f} ns without)\n"
+    )
+
+    print(
+        f"{'app':>8} {'middleware':>10} {'requests':>9} {'p50 us':>8} {'p99 us':>8} "
+        f"{'mean us':>8} {'overhead us':>12}"
+    )
+    for label, app in (("bare", bare_app), ("fastapi", fastapi_app())):
+        histogram = Histogram(
+            "bench", "Bench", ("method", "route", "status"), HTTP_LATENCY_BUCKETS
+        )
+        means = []
+        for middleware, target in (
+            ("off", app),
+            ("on", TimingMiddleware(app, histogram)),
+        ):
+            await measure_requests(target, 1000)
+            latencies = await measure_requests(target, args.requests)
+            means.append(sum(latencies) / len(latencies))
+            print(
+                f"{label:>8} {middleware:>10} {len(latencies):>9} "
+                f"{percentile(latencies, 50) * 1000:>8.1f} "
+                f"{percentile(latencies, 99) * 1000:>8.1f} {means[-1] * 1e6:>8.1f} "
+                f"{(means[-1] - means[0]) * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""
+Benchmark of the batch endpoint: throughput and peak memory of the server for growing batches.
+
+Each batch size runs against a fresh uvicorn server, so that the peak resident set size (VmHWM) read
+from /proc once the archive is fully downloaded is the peak reached while serving that batch alone.
+With the archive streamed as it is rendered, the peak RSS should stay flat as the batch grows.
+The rows are generated and sent as a stream and the archive is counted rather than kept, so the client
+does not hold the batch in memory either. The rows are distinct short URLs, rendered as PNG.
+
+The server needs the database configured by DEV_DATABASE_URL to start, authentication is bypassed.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_qr_batch
+    python -m benchmarks.bench_qr_batch --rows 1000 10000 100000 --format csv
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator
+
+from fastapi import FastAPI
+from httpx import AsyncClient, TransportError
+
+
+def create_app() -> FastAPI:
+    """Application factory used by the benchmark server, letting every request through as an active user"""
+    from src.auth.router import current_active_user
+    from src.main import app
+
+    app.dependency_overrides[current_active_user] = lambda: None
+    return app
+
+
+async def generate_rows(rows: int, batch_format: str) -> AsyncIterator[bytes]:
+    """Generate the batch body in blocks of 1000 rows"""
+    if batch_format == "csv":
+        yield b"data,box_size\n"
+    for start in range(0, rows, 1000):
+        block = range(start, min(start + 1000, rows))
+        if batch_format == "csv":
+            yield "".join(f"https://qrafty.app/r/{i},4\n" for i in block).encode()
+        else:
+            yield "".join(
+                json.dumps({"data": f"https://qrafty.app/r/{i}", "box_size": 4}) + "\n"
+                for i in block
+            ).encode()
+
+
+def peak_rss_mib(pid: int) -> float:
+    """Return the peak resident set size of a process in MiB, as reported by /proc"""
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not found")
+
+
+async def run_batch(rows: int, batch_format: str) -> tuple[float, int, float]:
+    """Serve a single batch from a fresh server, returning the duration, archive size and peak RSS"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "--factory",
+            "benchmarks.bench_qr_batch:create_app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        env={**os.environ, "ENVIRONMENT": os.environ.get("ENVIRONMENT", "development")},
+    )
+    try:
+        async with AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", timeout=None
+        ) as client:
+            while True:
+                try:
+                    await client.get("/")
+                    break
+                except TransportError:
+                    if server.poll() is not None:
+                        raise RuntimeError("The benchmark server failed to start")
+                    await asyncio.sleep(0.1)
+
+            media_type = "text/csv" if batch_format == "csv" else "application/x-ndjson"
+            size = 0
+            start = time.perf_counter()
+            async with client.stream(
+                "POST",
+                "/qr/batch",
+                content=generate_rows(rows, batch_format),
+                headers={"Content-Type": media_type},
+            ) as response:
+                response.raise_for_status()
+                async for part in response.aiter_raw():
+                    size += len(part)
+            duration = time.perf_counter() - start
+
+        return duration, size, peak_rss_mib(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", default=[1000, 10000, 100000], nargs="+", type=int)
+    parser.add_argument("--format", default="ndjson", choices=["ndjson", "csv"])
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>8} {'seconds':>9} {'rows/s':>9} {'archive MiB':>12} {'peak RSS MiB':>13}"
+    )
+    for rows in args.rows:
+        duration, size, rss = await run_batch(rows, args.format)
+        print(
+            f"{rows:>8} {duration:>9.2f} {rows / duration:>9.0f} "
+            f"{size / 2**20:>12.1f} {rss:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
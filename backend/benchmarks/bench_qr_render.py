@@ -0,0 +1,137 @@
+"""
+Benchmark of the vectorized QR rendering engine against the stock qrcode.make path.
+
+For every version and box size, the same payload is rendered to PNG through:
+    - stock: qrcode.make(...).save(...), using the default image factory of the qrcode library
+    - engine: src.qr.engine.build_matrix + render_png
+
+Both paths encode the same data at the same version, the memo of the encoded matrices being cleared
+before every engine render. See bench_encode_stages for the encode stage itself. The rasterization is also timed on its own, from an already encoded code, since the
+encoding (mask pattern selection in particular) dominates the end to end time of large versions.
+The payload must fit in a version 1 code at error correction level M (14 bytes) to sweep every version.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_qr_render
+    python -m benchmarks.bench_qr_render --versions 1,10,40 --box-sizes 1,10 --repeat 20
+"""
+
+import argparse
+import io
+import statistics
+import time
+from collections.abc import Callable
+
+import qrcode
+
+from src.qr.encoder import ERROR_CORRECTION_LEVELS, encode
+from src.qr.engine import build_matrix, render_png
+from src.qr.schemas import ErrorCorrectionLevel
+
+
+def parse_int_list(value: str) -> list[int]:
+    """
+    Parse a comma separated list of integers and ranges, e.g. "1-5,10,40"
+
+    Args:
+        value (str): The list to parse
+
+    Returns:
+        list[int]: The parsed integers
+    """
+    result: list[int] = []
+    for part in value.split(","):
+        start, _, end = part.partition("-")
+        result.extend(range(int(start), int(end or start) + 1))
+    return result
+
+
+def timeit(func: Callable[[], object], repeat: int) -> float:
+    """
+    Run the function repeat times and return the median wall time in milliseconds
+
+    Args:
+        func (Callable[[], object]): The function to time
+        repeat (int): Number of runs
+
+    Returns:
+        float: Median duration of a run, in milliseconds
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def stock_render(data: str, version: int, box_size: int) -> bytes:
+    """Render a PNG through the stock qrcode.make path"""
+    buffer = io.BytesIO()
+    image = qrcode.make(
+        data,
+        version=version,
+        box_size=box_size,
+        error_correction=ERROR_CORRECTION_LEVELS[ErrorCorrectionLevel.M],
+    )
+    image.save(buffer)
+    return buffer.getvalue()
+
+
+def engine_render(data: str, version: int, box_size: int) -> bytes:
+    """Render a PNG through the vectorized engine, encoding the data again rather than hitting the memo"""
+    encode.cache_clear()
+    return render_png(build_matrix(data, version=version), box_size)
+
+
+def stock_rasterize(qr: qrcode.QRCode, box_size: int) -> bytes:
+    """Rasterize an already encoded code through the default image factory of the qrcode library"""
+    buffer = io.BytesIO()
+    qr.box_size = box_size
+    qr.make_image().save(buffer)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--versions", default="1-40", type=parse_int_list)
+    parser.add_argument("--box-sizes", default="1,4,10,20", type=parse_int_list)
+    parser.add_argument("--repeat", default=5, type=int)
+    parser.add_argument("--data", default="qrafty.app/r1")
+    args = parser.parse_args()
+
+    print(
+        f"{'version':>7} {'box':>4} | {'stock ms':>9} {'engine ms':>9} {'speedup':>7} "
+        f"| {'raster ms':>9} {'raster ms':>9} {'speedup':>7}"
+    )
+    speedups, raster_speedups = [], []
+    for version in args.versions:
+        qr = qrcode.QRCode(version=version)
+        qr.add_data(args.data)
+        qr.make(fit=False)
+        matrix = build_matrix(args.data, version=version)
+
+        for box_size in args.box_sizes:
+            stock = timeit(
+                lambda: stock_render(args.data, version, box_size), args.repeat
+            )
+            engine = timeit(
+                lambda: engine_render(args.data, version, box_size), args.repeat
+            )
+            stock_raster = timeit(lambda: stock_rasterize(qr, box_size), args.repeat)
+            engine_raster = timeit(lambda: render_png(matrix, box_size), args.repeat)
+
+            speedups.append(stock / engine)
+            raster_speedups.append(stock_raster / engine_raster)
+            print(
+                f"{version:>7} {box_size:>4} | {stock:>9.2f} {engine:>9.2f} {speedups[-1]:>6.1f}x "
+                f"| {stock_raster:>9.2f} {engine_raster:>9.2f} {raster_speedups[-1]:>6.1f}x"
+            )
+
+    print(
+        f"\ngeometric mean speedup: end to end {statistics.geometric_mean(speedups):.1f}x, "
+        f"rasterization {statistics.geometric_mean(raster_speedups):.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
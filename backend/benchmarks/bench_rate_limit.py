@@ -0,0 +1,134 @@
+"""
+Benchmark of the rate limit decisions: cost of a decision of the in-process backend as the number of
+buckets grows, and overhead of the rate limit middleware in front of a route.
+
+Decisions are taken for clients drawn at random among a number of keys, the cost should not depend on
+it. The middleware overhead is measured on a bare ASGI application answering an empty response, so that
+it is not lost among the cost of the route, with the requests sent straight to the application:
+    - no rule: the route has no rate limit, the middleware only looks it up
+    - per ip: the bucket of the client IP
+    - per user: the bucket of the user of the bearer token, verifying the signature of the token
+    - cached user: the same, the token being in the cache of verified tokens, as once authenticated
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_rate_limit
+    python -m benchmarks.bench_rate_limit --decisions 500000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+from fastapi_users.jwt import generate_jwt
+
+from benchmarks.bench_render_load import percentile
+from src.auth.config import SECRET_KEY
+from src.auth.jwt import jwt_strategy
+from src.ratelimit.backends import LocalRateLimitBackend
+from src.ratelimit.middleware import RateLimitMiddleware
+from src.ratelimit.schemas import RateLimitRule
+
+# Large enough for the buckets never to run out, only the cost of the decisions is measured
+RULE = RateLimitRule("bench", limit=10**9, period_seconds=60, per_user=True)
+
+
+async def bare_app(scope: dict, receive, send) -> None:
+    """ASGI application answering an empty response"""
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def measure_requests(
+    app, path: str, headers: list[tuple[bytes, bytes]], requests: int
+) -> list[float]:
+    """Send requests straight to an ASGI application, returning the latency of every request"""
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        pass
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+    }
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        await app(scope, receive, send)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--decisions", default=200_000, type=int)
+    parser.add_argument("--requests", default=50_000, type=int)
+    args = parser.parse_args()
+
+    print(f"{'keys':>8} {'decisions':>10} {'mean us':>8} {'decisions/s':>12}")
+    for keys in (1_000, 100_000, 1_000_000):
+        backend = LocalRateLimitBackend(max_keys=keys)
+        clients = [f"bench:ip:{index}" for index in range(keys)]
+        for client in clients:
+            await backend.acquire(client, RULE)
+        draws = random.choices(clients, k=args.decisions)
+
+        start = time.perf_counter()
+        for client in draws:
+            await backend.acquire(client, RULE)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{keys:>8} {args.decisions:>10} {elapsed / args.decisions * 1e6:>8.2f} "
+            f"{args.decisions / elapsed:>12,.0f}"
+        )
+
+    tokens = [
+        generate_jwt(
+            {"sub": str(uuid.uuid4()), "aud": jwt_strategy.token_audience},
+            SECRET_KEY,
+            3600,
+        )
+        for _ in range(2)
+    ]
+    jwt_strategy.cache.set(tokens[1], {"id": uuid.uuid4()}, time.time() + 3600)
+    middleware = RateLimitMiddleware(
+        bare_app,
+        backend=LocalRateLimitBackend(max_keys=100_000),
+        rules={
+            ("GET", "/ip"): RULE._replace(per_user=False),
+            ("GET", "/user"): RULE,
+        },
+    )
+    print(f"\n{'route':>11} {'requests':>9} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}")
+    for label, app, path, headers in [
+        ("bare", bare_app, "/", []),
+        ("no rule", middleware, "/", []),
+        ("per ip", middleware, "/ip", []),
+        *(
+            (
+                label,
+                middleware,
+                "/user",
+                [(b"authorization", f"Bearer {token}".encode())],
+            )
+            for label, token in zip(("per user", "cached user"), tokens)
+        ),
+    ]:
+        await measure_requests(app, path, headers, 1000)
+        latencies = await measure_requests(app, path, headers, args.requests)
+        print(
+            f"{label:>11} {len(latencies):>9} {percentile(latencies, 50) * 1000:>8.1f} "
+            f"{percentile(latencies, 99) * 1000:>8.1f} "
+            f"{sum(latencies) / len(latencies) * 1e6:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
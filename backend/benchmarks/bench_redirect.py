@@ -0,0 +1,132 @@
+"""
+Latency benchmark of the redirect endpoint, /r/{short_id}, with and without the redirect cache.
+
+Scans are sent straight to the ASGI application, without a client or a server in between, so the
+latencies are those of the application itself:
+    - cached: the target is answered from the redirect cache, as in steady state
+    - database: the cache is cleared before every scan, the target is looked up in the database
+    - not found: an unknown short id, answered from the cache once looked up
+
+A user and a code are created in the database configured by DEV_DATABASE_URL, and deleted at the end along
+with their scan events.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_redirect
+    python -m benchmarks.bench_redirect --scans 20000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from asgi_lifespan import LifespanManager
+from sqlalchemy import delete, insert
+
+from benchmarks.bench_render_load import percentile
+from src.analytics.models import ScanEvent
+from src.auth.models import User
+from src.database import database
+from src.main import app
+from src.qr.codes import create_qr_code, generate_short_id
+from src.qr.dependencies import redirect_cache
+from src.qr.schemas import QRCodeCreate
+
+
+async def scan(short_id: str) -> int:
+    """Send a scan of a short URL to the application, returning the status of the response"""
+    status = 0
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": f"/r/{short_id}",
+        "raw_path": f"/r/{short_id}".encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+async def measure(
+    short_id: str, scans: int, expected: int, clear_cache: bool
+) -> list[float]:
+    """Scan a short URL repeatedly, returning the latency of every scan"""
+    latencies = []
+    for _ in range(scans):
+        if clear_cache:
+            redirect_cache.clear()
+        start = time.perf_counter()
+        status = await scan(short_id)
+        latencies.append(time.perf_counter() - start)
+        assert status == expected, status
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scans", default=5000, type=int)
+    args = parser.parse_args()
+
+    user_id = uuid.uuid4()
+    name = f"bench-{user_id.hex[:8]}"
+    async with database.session() as session:
+        await session.execute(
+            insert(User).values(
+                id=user_id,
+                email=f"{name}@example.com",
+                username=name,
+                name="Bench User",
+                hashed_password="unused",
+            )
+        )
+        qr_code = await create_qr_code(
+            session,
+            user_id,
+            QRCodeCreate(target_url="https://qrafty.app/bench"),  # type: ignore
+        )
+
+    try:
+        async with LifespanManager(app):
+            print(
+                f"{'scan':>10} {'scans':>6} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}"
+            )
+            for label, short_id, expected, clear_cache in [
+                ("cached", qr_code.short_id, 307, False),
+                ("database", qr_code.short_id, 307, True),
+                ("not found", generate_short_id(), 404, False),
+            ]:
+                # Warm up the cache, and the code paths of the scan
+                await measure(short_id, 100, expected, clear_cache)
+                latencies = await measure(short_id, args.scans, expected, clear_cache)
+                print(
+                    f"{label:>10} {len(latencies):>6} {percentile(latencies, 50) * 1000:>8.0f} "
+                    f"{percentile(latencies, 99) * 1000:>8.0f} "
+                    f"{sum(latencies) / len(latencies) * 1e6:>8.0f}"
+                )
+    finally:
+        async with database.session() as session:
+            await session.execute(
+                delete(ScanEvent).where(ScanEvent.qr_code_id == qr_code.id)
+            )
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
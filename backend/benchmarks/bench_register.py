@@ -0,0 +1,167 @@
+"""
+Benchmark of user registration: the lookup-then-insert path against the single INSERT path.
+
+The lookup path is the UserManager.create implementation before the single INSERT: a username lookup,
+then BaseUserManager.create with its email lookup, INSERT, COMMIT and refresh. The single INSERT path
+is the current UserManager.create. Both run with a trivial password helper, so that the database round
+trips are measured rather than the password hashing.
+
+The number of database round trips per registration is counted as well (statements and COMMITs). Over a
+local socket a round trip costs little next to the ORM overhead, the throughput gap grows with the latency
+between the API and the database.
+
+The benchmark also races concurrent registrations of the same username: the lookup path lets several
+of them past the check, and they fail on the unique constraint instead of getting a 400.
+
+Users are created in the database configured by DEV_DATABASE_URL and deleted at the end.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_register
+    python -m benchmarks.bench_register --registrations 2000 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from fastapi_users import exceptions
+from fastapi_users.manager import BaseUserManager
+from sqlalchemy import delete, event
+from sqlalchemy.exc import IntegrityError
+
+from src.auth.dependencies import CustomSQLAlchemyUserDatabase, password_hashing
+from src.auth.models import User
+from src.auth.schemas import UserCreate
+from src.auth.service import UserManager
+from src.database import database
+
+
+class PlainPasswordHelper:
+    """Password helper stand-in with no hashing cost"""
+
+    def hash(self, password: str) -> str:
+        return password
+
+    def verify_and_update(self, plain: str, hashed: str) -> tuple[bool, None]:
+        return plain == hashed, None
+
+    def generate(self) -> str:
+        return uuid.uuid4().hex
+
+
+class LookupUserManager(UserManager):
+    """UserManager registering users the way it did before the single INSERT"""
+
+    async def create(
+        self,
+        user_create: UserCreate,
+        safe: bool = False,
+        request: Optional[Request] = None,
+    ) -> User:
+        if await self.user_db.get_by_username(user_create.username):  # type: ignore
+            raise HTTPException(status_code=400, detail="Username already exists")
+        return await BaseUserManager.create(self, user_create, safe, request)  # type: ignore
+
+
+async def register(manager_class: type[UserManager], run_id: str, name: str) -> str:
+    """Register a user with a fresh session, returning the outcome"""
+    async with database.session() as session:
+        manager = manager_class(
+            CustomSQLAlchemyUserDatabase(session, User),
+            password_hashing,
+            PlainPasswordHelper(),  # type: ignore
+        )
+        try:
+            await manager.create(
+                UserCreate(
+                    email=f"bench-{run_id}-{uuid.uuid4().hex[:8]}@example.com",
+                    password="BenchPassword1!",
+                    name="Bench User",
+                    username=name,
+                )
+            )
+            return "created"
+        except (HTTPException, exceptions.UserAlreadyExists):
+            return "rejected"
+        except IntegrityError:
+            return "integrity error"
+
+
+async def run(
+    label: str, manager_class: type[UserManager], args: argparse.Namespace
+) -> None:
+    """Measure the registration throughput of a path, then race registrations of one username"""
+    run_id = uuid.uuid4().hex[:8]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    round_trips = 0
+
+    def count_round_trip(*_: object) -> None:
+        nonlocal round_trips
+        round_trips += 1
+
+    async def bounded(name: str) -> str:
+        async with semaphore:
+            return await register(manager_class, run_id, name)
+
+    try:
+        event.listen(
+            database.engine.sync_engine, "before_cursor_execute", count_round_trip
+        )
+        event.listen(database.engine.sync_engine, "commit", count_round_trip)
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(bounded(f"b{run_id}{i}") for i in range(args.registrations))
+        )
+        elapsed = time.perf_counter() - start
+        event.remove(
+            database.engine.sync_engine, "before_cursor_execute", count_round_trip
+        )
+        event.remove(database.engine.sync_engine, "commit", count_round_trip)
+
+        outcomes = await asyncio.gather(
+            *(
+                register(manager_class, run_id, f"r{run_id}")
+                for _ in range(args.concurrency)
+            )
+        )
+    finally:
+        async with database.session() as session:
+            await session.execute(
+                delete(User).where(User.email.like(f"bench-{run_id}-%"))
+            )
+            await session.commit()
+
+    counts = {outcome: outcomes.count(outcome) for outcome in sorted(set(outcomes))}
+    print(
+        f"{label:>13} {args.registrations / elapsed:>10.0f} "
+        f"{elapsed / args.registrations * 1000:>8.2f} "
+        f"{round_trips / args.registrations:>11.1f}   {counts}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--registrations", default=1000, type=int)
+    parser.add_argument("--concurrency", default=8, type=int)
+    args = parser.parse_args()
+
+    password_hashing.start()
+    print(
+        f"{'path':>13} {'regs/s':>10} {'ms/reg':>8} {'trips/reg':>11}   same-username race"
+    )
+    try:
+        for label, manager_class in [
+            ("lookups", LookupUserManager),
+            ("single INSERT", UserManager),
+        ]:
+            await run(label, manager_class, args)
+    finally:
+        password_hashing.shutdown()
+        await database.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,160 @@
+"""
+Load benchmark of the QR render service: latency of the other endpoints while heavy renders run.
+
+A set of render clients continuously request large, uncached QR codes (version 40 at a high box size)
+while probe clients measure the latency of the root endpoint and of /auth/register. The benchmark runs
+twice against the in-process application:
+    - inline: renders run on the event loop, as every handler did before the render service
+    - pool: renders are dispatched to the process pool of the render service
+
+/auth/register writes to the database configured by DEV_DATABASE_URL, the users created by the benchmark
+are deleted at the end of each run. Use --skip-register to only probe the root endpoint.
+
+Probes are issued at a fixed rate and their latency is measured from the time they were scheduled to
+start, so the time spent waiting for a blocked event loop is accounted for (no coordinated omission).
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_render_load
+    python -m benchmarks.bench_render_load --duration 20 --render-clients 8 --box-size 30
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+import uuid
+
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete
+
+from src.auth.models import User
+from src.database import database
+from src.main import app
+from src.qr.dependencies import get_render_service
+from src.qr.schemas import QRRenderParams
+from src.qr.service import RenderedQR, render_qr
+
+
+class InlineRenderService:
+    """Render service stand-in rendering on the event loop, reproducing the behaviour before the process pool"""
+
+    async def render(self, params: QRRenderParams) -> RenderedQR:
+        return render_qr(params)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Return the q-th percentile of the samples (nearest rank), in milliseconds"""
+    ranked = sorted(samples)
+    return ranked[min(len(ranked) - 1, round(q / 100 * len(ranked)))] * 1000
+
+
+async def render_client(
+    client: AsyncClient, stop: float, box_size: int, counter: itertools.count
+) -> dict[int, int]:
+    """Request unique version 40 codes until the deadline, returning the count of each status code"""
+    statuses: dict[int, int] = {}
+    while time.perf_counter() < stop:
+        response = await client.get(
+            "/qr/render",
+            params={
+                "data": f"bench-{next(counter)}",
+                "version": 40,
+                "box_size": box_size,
+            },
+        )
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return statuses
+
+
+async def probe_client(
+    client: AsyncClient, stop: float, endpoint: str, run_id: str, interval: float
+) -> list[float]:
+    """Call an endpoint at a fixed rate until the deadline, returning the latency of every call"""
+    latencies: list[float] = []
+    start = time.perf_counter()
+    while start < stop:
+        await asyncio.sleep(max(0.0, start - time.perf_counter()))
+        if endpoint == "/auth/register":
+            name = f"b{uuid.uuid4().hex[:12]}"
+            await client.post(
+                endpoint,
+                json={
+                    "email": f"bench-{run_id}-{name}@example.com",
+                    "password": "BenchPassword1!",
+                    "name": "Bench User",
+                    "username": name,
+                },
+            )
+        else:
+            await client.get(endpoint)
+        latencies.append(time.perf_counter() - start)
+        start += interval
+    return latencies
+
+
+async def run(mode: str, args: argparse.Namespace) -> None:
+    """Run the load against the application with the given render mode and print the probe latencies"""
+    if mode == "inline":
+        app.dependency_overrides[get_render_service] = lambda: InlineRenderService()
+
+    run_id = uuid.uuid4().hex[:8]
+    endpoints = ["/"] if args.skip_register else ["/", "/auth/register"]
+    counter = itertools.count()
+
+    async with LifespanManager(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app),  # type: ignore
+            base_url="http://bench",
+            timeout=None,
+        ) as client:
+            stop = time.perf_counter() + args.duration
+            renders = [
+                render_client(client, stop, args.box_size, counter)
+                for _ in range(args.render_clients)
+            ]
+            probes = [
+                probe_client(client, stop, e, run_id, args.probe_interval)
+                for e in endpoints
+            ]
+            results = await asyncio.gather(*renders, *probes)
+
+    app.dependency_overrides = {}
+
+    if not args.skip_register:
+        async with database.session() as session:
+            await session.execute(
+                delete(User).where(User.email.like(f"bench-{run_id}-%"))
+            )
+            await session.commit()
+
+    statuses: dict[int, int] = {}
+    for result in results[: args.render_clients]:
+        for code, count in result.items():
+            statuses[code] = statuses.get(code, 0) + count
+
+    print(f"\n[{mode}] render responses: {statuses}")
+    print(f"{'endpoint':>16} {'calls':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, latencies in zip(endpoints, results[args.render_clients :]):
+        print(
+            f"{endpoint:>16} {len(latencies):>6} {percentile(latencies, 50):>9.1f} "
+            f"{percentile(latencies, 99):>9.1f} {max(latencies) * 1000:>9.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", default=10.0, type=float)
+    parser.add_argument("--render-clients", default=4, type=int)
+    parser.add_argument("--box-size", default=20, type=int)
+    parser.add_argument("--probe-interval", default=0.5, type=float)
+    parser.add_argument("--skip-register", action="store_true")
+    args = parser.parse_args()
+
+    # Both runs share the event loop, the database engine pools connections bound to it
+    for mode in ("inline", "pool"):
+        await run(mode, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
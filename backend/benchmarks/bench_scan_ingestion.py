@@ -0,0 +1,148 @@
+"""
+Benchmark of the scan event ingestion: redirect latency and write throughput, batched against row by row.
+
+Redirect latency is measured by sending scans straight to the ASGI application, with the redirect target
+cached, recording each scan either:
+    - queued: through the scan event queue, written in batches by its background task
+    - insert: with an INSERT and a commit before answering, as a synchronous recorder would
+
+Write throughput is measured by recording a number of events and waiting for them to be written, either
+through the scan event queue (COPY batches) or with one INSERT and commit per event.
+
+A user and a code are created in the database configured by DEV_DATABASE_URL, and deleted at the end along
+with their scan events.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_scan_ingestion
+    python -m benchmarks.bench_scan_ingestion --scans 10000 --events 200000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+
+from asgi_lifespan import LifespanManager
+from sqlalchemy import delete, insert
+
+from benchmarks.bench_redirect import measure
+from benchmarks.bench_render_load import percentile
+from src.analytics.dependencies import get_scan_event_queue, scan_events
+from src.analytics.ingestion import ScanEventQueue
+from src.analytics.models import ScanEvent
+from src.auth.models import User
+from src.database import database
+from src.main import app
+from src.qr.codes import create_qr_code
+from src.qr.schemas import QRCodeCreate
+
+
+class InsertRecorder:
+    """Records every scan with its own INSERT and commit, before the redirect is answered"""
+
+    async def record(self, qr_code_id: uuid.UUID, user_agent: str | None) -> bool:
+        async with database.session() as session:
+            await session.execute(
+                insert(ScanEvent).values(
+                    qr_code_id=qr_code_id,
+                    scanned_at=datetime.now(timezone.utc),
+                    user_agent=user_agent,
+                )
+            )
+            await session.commit()
+        return True
+
+
+async def write_throughput(
+    recorder: ScanEventQueue | InsertRecorder, events: int
+) -> float:
+    """Record a number of events and wait for them to be written, returning the events written per second"""
+    qr_code_id = uuid.uuid4()
+    start = time.perf_counter()
+    if isinstance(recorder, ScanEventQueue):
+        recorder.start()
+    for _ in range(events):
+        await recorder.record(qr_code_id, "bench")
+    if isinstance(recorder, ScanEventQueue):
+        await recorder.stop()
+        assert recorder.flushed == events, recorder.stats()
+    elapsed = time.perf_counter() - start
+
+    async with database.session() as session:
+        await session.execute(
+            delete(ScanEvent).where(ScanEvent.qr_code_id == qr_code_id)
+        )
+        await session.commit()
+    return events / elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scans", default=5000, type=int)
+    parser.add_argument("--events", default=50_000, type=int)
+    parser.add_argument("--batch-size", default=500, type=int)
+    args = parser.parse_args()
+
+    user_id = uuid.uuid4()
+    name = f"bench-{user_id.hex[:8]}"
+    async with database.session() as session:
+        await session.execute(
+            insert(User).values(
+                id=user_id,
+                email=f"{name}@example.com",
+                username=name,
+                name="Bench User",
+                hashed_password="unused",
+            )
+        )
+        qr_code = await create_qr_code(
+            session,
+            user_id,
+            QRCodeCreate(target_url="https://qrafty.app/bench"),  # type: ignore
+        )
+
+    try:
+        async with LifespanManager(app):
+            print(
+                f"{'record':>8} {'scans':>6} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}"
+            )
+            for label, recorder in [
+                ("queued", scan_events),
+                ("insert", InsertRecorder()),
+            ]:
+                app.dependency_overrides[get_scan_event_queue] = lambda: recorder
+                # Warm up the redirect cache, and the code paths of the scan
+                await measure(qr_code.short_id, 100, 307, False)
+                latencies = await measure(qr_code.short_id, args.scans, 307, False)
+                print(
+                    f"{label:>8} {len(latencies):>6} {percentile(latencies, 50) * 1000:>8.0f} "
+                    f"{percentile(latencies, 99) * 1000:>8.0f} "
+                    f"{sum(latencies) / len(latencies) * 1e6:>8.0f}"
+                )
+            app.dependency_overrides = {}
+
+        print(f"\n{'write':>8} {'events':>7} {'events/s':>9}")
+        queue = ScanEventQueue(
+            max_size=args.events,
+            batch_size=args.batch_size,
+            flush_interval_seconds=1.0,
+        )
+        for label, recorder, events in [
+            ("queued", queue, args.events),
+            # Row by row writes are two orders of magnitude slower, a sample is enough
+            ("insert", InsertRecorder(), min(args.events, 2000)),
+        ]:
+            throughput = await write_throughput(recorder, events)
+            print(f"{label:>8} {events:>7} {throughput:>9.0f}")
+    finally:
+        async with database.session() as session:
+            await session.execute(
+                delete(ScanEvent).where(ScanEvent.qr_code_id == qr_code.id)
+            )
+            await session.execute(delete(User).where(User.id == user_id))
+            await session.commit()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
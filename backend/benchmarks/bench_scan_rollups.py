@@ -0,0 +1,222 @@
+"""
+Benchmark of the scan analytics queries: GROUP BY over the raw scan events against the scan rollups.
+
+Synthetic scan events are seeded for a number of codes, evenly spread over a number of days in time order,
+then the rollups are refreshed: from scratch first, as a backfill, then incrementally from the watermark
+after another hour of scans. The latency of the analytics queries is then measured on both sides:
+    - code daily: scans of a code per day over the last 30 days
+    - code hourly: scans of a code per hour over the last 48 hours
+    - top codes: the 10 most scanned codes over the last 7 days
+
+Everything runs in a single transaction of the database configured by DEV_DATABASE_URL, which is rolled
+back at the end, along with the partitions created for the seeded months. Seeding the default 50M events takes a while and a few GB of disk.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_scan_rollups
+    python -m benchmarks.bench_scan_rollups --events 5000000 --codes 5000 --queries 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Select, desc, func, literal_column, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.bench_render_load import percentile
+from src.analytics.models import ScanEvent, ScanRollupDaily
+from src.analytics.partitions import add_months, create_partition, list_partitions
+from src.analytics.rollups import get_scan_counts, refresh_scan_rollups, truncate
+from src.analytics.schemas import Granularity
+from src.database import database
+
+# End of the seeded period, aligned on a day so that the windows of the queries are stable
+END = datetime(2026, 1, 1, tzinfo=timezone.utc)
+# Rows inserted per statement while seeding
+SEED_CHUNK = 1_000_000
+
+_UTC = literal_column("'UTC'")
+
+
+def code_id(index: int) -> uuid.UUID:
+    """ID of a synthetic code, matching the ones generated by the seeding statement"""
+    return uuid.UUID(int=index)
+
+
+async def seed(
+    session: AsyncSession, events: int, codes: int, start: datetime, end: datetime
+) -> None:
+    """Insert synthetic scan events, spread in time order between start and end and over the codes"""
+    span = (end - start).total_seconds()
+    for offset in range(0, events, SEED_CHUNK):
+        await session.execute(
+            text(
+                "INSERT INTO scan_event (qr_code_id, scanned_at, user_agent) "
+                "SELECT lpad(to_hex((g * 7919) % CAST(:codes AS bigint)), 32, '0')::uuid, "
+                "CAST(:start AS timestamptz) "
+                "+ make_interval(secs => g * CAST(:span AS float8) / :events), 'bench' "
+                "FROM generate_series(CAST(:first AS bigint), CAST(:last AS bigint)) AS g"
+            ),
+            {
+                "codes": codes,
+                "start": start,
+                "span": span,
+                "events": events,
+                "first": offset,
+                "last": min(offset + SEED_CHUNK, events) - 1,
+            },
+        )
+        print(f"seeded {min(offset + SEED_CHUNK, events):,} events", end="\r")
+    print()
+
+
+def raw_series(
+    granularity: Granularity, qr_code_id: uuid.UUID, since: datetime
+) -> Select:
+    """GROUP BY of the scan events of a code per bucket"""
+    bucket = func.date_trunc(granularity.value, ScanEvent.scanned_at, _UTC)
+    return (
+        select(bucket, func.count())
+        .where(ScanEvent.qr_code_id == qr_code_id, ScanEvent.scanned_at >= since)
+        .group_by(bucket)
+        .order_by(bucket)
+    )
+
+
+async def measure(query: Callable[[], Awaitable], runs: int) -> list[float]:
+    """Run a query repeatedly, returning the latency of every run"""
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await query()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", default=50_000_000, type=int)
+    parser.add_argument("--codes", default=10_000, type=int)
+    parser.add_argument("--days", default=90, type=int)
+    parser.add_argument("--queries", default=20, type=int)
+    args = parser.parse_args()
+
+    start = END - timedelta(days=args.days)
+    lateness = timedelta(minutes=5)
+    hourly_events = args.events // (args.days * 24)
+
+    async with database.session() as session:
+        month = start.date().replace(day=1)
+        while month <= END.date():
+            await create_partition(session, month)
+            month = add_months(month, 1)
+
+        began = time.perf_counter()
+        await seed(session, args.events, args.codes, start, END)
+        await session.execute(text("ANALYZE scan_event"))
+        # Summarize the BRIN page ranges, as autosummarize does in the background as they fill up
+        for name in (await list_partitions(session)).values():
+            await session.execute(
+                text(
+                    "SELECT brin_summarize_new_values(indexrelid) FROM pg_index "
+                    "JOIN pg_class ON pg_class.oid = indexrelid "
+                    "WHERE indrelid = CAST(:name AS regclass) AND relam = "
+                    "(SELECT oid FROM pg_am WHERE amname = 'brin')"
+                ),
+                {"name": name},
+            )
+        print(f"seeding: {time.perf_counter() - began:.1f} s")
+
+        began = time.perf_counter()
+        backfill = await refresh_scan_rollups(session, END, lateness)
+        print(f"backfill refresh: {time.perf_counter() - began:.1f} s, {backfill}")
+
+        # Statistics are kept up to date by autovacuum outside of the benchmark transaction
+        await session.execute(text("ANALYZE scan_rollup_hourly, scan_rollup_daily"))
+
+        await seed(session, hourly_events, args.codes, END, END + timedelta(hours=1))
+        began = time.perf_counter()
+        incremental = await refresh_scan_rollups(
+            session, END + timedelta(hours=1), lateness
+        )
+        print(
+            f"incremental refresh: {(time.perf_counter() - began) * 1000:.0f} ms, {incremental}"
+        )
+
+        def random_code() -> uuid.UUID:
+            return code_id(random.randrange(args.codes))
+
+        top_since = END - timedelta(days=7)
+        queries = {
+            "code daily": (
+                lambda: session.execute(
+                    raw_series(Granularity.DAY, random_code(), END - timedelta(days=30))
+                ),
+                lambda: get_scan_counts(
+                    session,
+                    random_code(),
+                    Granularity.DAY,
+                    END - timedelta(days=30),
+                    END,
+                ),
+            ),
+            "code hourly": (
+                lambda: session.execute(
+                    raw_series(
+                        Granularity.HOUR, random_code(), END - timedelta(hours=48)
+                    )
+                ),
+                lambda: get_scan_counts(
+                    session,
+                    random_code(),
+                    Granularity.HOUR,
+                    truncate(Granularity.HOUR, END - timedelta(hours=48)),
+                    END,
+                ),
+            ),
+            "top codes": (
+                lambda: session.execute(
+                    select(ScanEvent.qr_code_id, func.count().label("scans"))
+                    .where(ScanEvent.scanned_at >= top_since)
+                    .group_by(ScanEvent.qr_code_id)
+                    .order_by(desc("scans"))
+                    .limit(10)
+                ),
+                lambda: session.execute(
+                    select(
+                        ScanRollupDaily.qr_code_id,
+                        func.sum(ScanRollupDaily.scans).label("scans"),
+                    )
+                    .where(ScanRollupDaily.bucket >= top_since)
+                    .group_by(ScanRollupDaily.qr_code_id)
+                    .order_by(desc("scans"))
+                    .limit(10)
+                ),
+            ),
+        }
+
+        print(f"\n{'query':>12} {'source':>7} {'runs':>5} {'p50 ms':>9} {'p99 ms':>9}")
+        for label, (raw, rollup) in queries.items():
+            for source, query in (("raw", raw), ("rollup", rollup)):
+                # The top codes over the raw events take seconds, a few runs are enough
+                runs = (
+                    min(args.queries, 3)
+                    if (label, source) == ("top codes", "raw")
+                    else args.queries
+                )
+                await query()
+                latencies = await measure(query, runs)
+                print(
+                    f"{label:>12} {source:>7} {runs:>5} {percentile(latencies, 50):>9.2f} "
+                    f"{percentile(latencies, 99):>9.2f}"
+                )
+
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+"""
+Startup benchmark: import time of the entry points of the backend, measured with python -X importtime in
+fresh interpreters, against a regression budget.
+
+Entry points:
+    - web worker: src.main, imported by uvicorn before the lifespan runs
+    - render process: the modules a render pool process imports to run its first job
+    - migrations: the models and helpers imported by the Alembic env.py
+    - settings: src.config alone
+
+Each entry point is imported --runs times, the median of the total import time being compared with its
+budget, scaled by --budget-scale for slower or faster machines. Some modules must also stay out of an
+entry point altogether, such as the rendering engine out of the web worker, whose renders run in the
+render processes. The benchmark exits with status 1 when a budget is exceeded or a module leaks in, so
+that it can gate a CI job. Times include the overhead of -X importtime, and are only comparable between
+runs on the same machine.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 11 --top 20
+    python -m benchmarks.bench_startup --budget-scale 1.5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import NamedTuple
+
+
+class EntryPoint(NamedTuple):
+    """Code importing an entry point, its import time budget and the modules it must not import"""
+
+    name: str
+    code: str
+    budget_ms: float
+    forbidden: tuple[str, ...] = ()
+
+
+ENTRY_POINTS: tuple[EntryPoint, ...] = (
+    EntryPoint(
+        "web worker",
+        "import src.main",
+        budget_ms=1600,
+        # Rendering runs in the render processes, the database driver is loaded by the lifespan
+        forbidden=("numpy", "qrcode", "PIL", "asyncpg"),
+    ),
+    EntryPoint(
+        "render process",
+        "import src.qr.service, src.qr.engine",
+        budget_ms=450,
+        forbidden=("fastapi", "sqlalchemy", "asyncpg"),
+    ),
+    EntryPoint(
+        "migrations",
+        "import src.auth.models, src.qr.models, src.analytics.models, src.analytics.partitions",
+        budget_ms=1400,
+        forbidden=("asyncpg",),
+    ),
+    EntryPoint("settings", "import src.config", budget_ms=300),
+)
+
+
+class ImportProfile(NamedTuple):
+    """Import times of a fresh interpreter, from the output of -X importtime"""
+
+    total_us: int
+    # Self and cumulative import time of every module imported, in microseconds
+    modules: dict[str, tuple[int, int]]
+
+
+def parse_importtime(output: str) -> ImportProfile:
+    """
+    Parse the output of -X importtime
+
+    Args:
+        output (str): Standard error of the interpreter
+
+    Returns:
+        ImportProfile: The import times
+    """
+    total = 0
+    modules: dict[str, tuple[int, int]] = {}
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        # Nesting is shown by the indentation of the name, the top level imports add up to the total
+        if not name[1:].startswith(" "):
+            total += int(cumulative_us)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return ImportProfile(total, modules)
+
+
+def profile_imports(code: str) -> ImportProfile:
+    """
+    Run code in a fresh interpreter with -X importtime
+
+    Args:
+        code (str): Code importing the entry point
+
+    Returns:
+        ImportProfile: The import times
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", default=5, type=int)
+    parser.add_argument("--top", default=10, type=int)
+    parser.add_argument("--budget-scale", default=1.0, type=float)
+    args = parser.parse_args()
+
+    failures = []
+    print(
+        f"{'entry point':>15} {'median ms':>10} {'min ms':>8} {'budget ms':>10} {'modules':>8}"
+    )
+    for entry_point in ENTRY_POINTS:
+        profiles = [profile_imports(entry_point.code) for _ in range(args.runs)]
+        totals = [profile.total_us / 1000 for profile in profiles]
+        median = statistics.median(totals)
+        budget = entry_point.budget_ms * args.budget_scale
+        print(
+            f"{entry_point.name:>15} {median:>10.0f} {min(totals):>8.0f} {budget:>10.0f} "
+            f"{len(profiles[0].modules):>8}"
+        )
+
+        if median > budget:
+            failures.append(
+                f"{entry_point.name}: {median:.0f} ms over the budget of {budget:.0f} ms"
+            )
+        leaked = [
+            module
+            for module in entry_point.forbidden
+            if any(
+                name == module or name.startswith(f"{module}.")
+                for name in profiles[0].modules
+            )
+        ]
+        if leaked:
+            failures.append(f"{entry_point.name}: imports {', '.join(leaked)}")
+
+    web_worker = profile_imports(ENTRY_POINTS[0].code)
+    print(f"\nSlowest modules of the {ENTRY_POINTS[0].name}, by self time:")
+    print(f"{'self ms':>8} {'cumulative ms':>14}  module")
+    for name, (self_us, cumulative_us) in sorted(
+        web_worker.modules.items(), key=lambda item: item[1][0], reverse=True
+    )[: args.top]:
+        print(f"{self_us / 1000:>8.1f} {cumulative_us / 1000:>14.1f}  {name}")
+
+    if failures:
+        print("\nStartup regressions:\n    " + "\n    ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
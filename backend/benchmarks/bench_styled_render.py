@@ -0,0 +1,185 @@
+"""
+Benchmark of the styled renders: renders per second per core through the compiled style pipeline, against
+the styled image factories of the qrcode library.
+
+Styles rendered:
+    - plain: the 1-bit rasterization, for reference
+    - rounded: rounded modules and eyes
+    - dots: dot modules with circle eyes of another color
+    - gradient: rounded modules filled with a radial gradient
+    - logo: dot modules with a center logo
+    - full: rounded modules, circle eyes of another color, a diagonal gradient and a logo
+
+Every style is rendered to PNG and SVG in this process alone, so the renders per second are those of
+a single core, and of a single render process of the pool. The first render of a style compiles it and
+is reported apart from the median of the following renders; render is end to end, from the data, whose
+encoding is memoized after the first render, while raster starts from an encoded module matrix. The stock path is qrcode.make with the
+StyledPilImage factory and the closest module drawer and color mask, for the styles it supports.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_styled_render
+    python -m benchmarks.bench_styled_render --version 10 --box-size 8 --repeat 50
+"""
+
+import argparse
+import base64
+import io
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+import qrcode
+from PIL import Image
+from qrcode.image.styledpil import StyledPilImage
+from qrcode.image.styles.colormasks import RadialGradiantColorMask
+from qrcode.image.styles.moduledrawers import CircleModuleDrawer, RoundedModuleDrawer
+
+from src.qr import styles
+from src.qr.encoder import ERROR_CORRECTION_LEVELS
+from src.qr.engine import build_matrix
+from src.qr.schemas import ErrorCorrectionLevel, ImageFormat, QRRenderParams
+from src.qr.service import rasterize, render_qr
+
+
+def make_logo() -> bytes:
+    """Encode a 256 px PNG logo with a transparent background"""
+    image = Image.new("RGBA", (256, 256))
+    image.paste((230, 57, 70, 255), (32, 32, 224, 224))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+LOGO = make_logo()
+
+# Style parameters, along with the keyword arguments of the closest stock factory if any
+STYLES: dict[str, tuple[dict[str, Any], dict[str, Any] | None]] = {
+    "plain": ({}, {}),
+    "rounded": (
+        {"module_shape": "rounded", "eye_shape": "rounded"},
+        {"module_drawer": RoundedModuleDrawer()},
+    ),
+    "dots": (
+        {"module_shape": "dot", "eye_shape": "circle", "eye_color": "#E63946"},
+        {"module_drawer": CircleModuleDrawer()},
+    ),
+    "gradient": (
+        {"module_shape": "rounded", "gradient": "radial", "gradient_color": "#1D3557"},
+        {
+            "module_drawer": RoundedModuleDrawer(),
+            "color_mask": RadialGradiantColorMask(
+                center_color=(0, 0, 0), edge_color=(29, 53, 87)
+            ),
+        },
+    ),
+    "logo": (
+        {
+            "module_shape": "dot",
+            "error_correction": "H",
+            "logo": base64.b64encode(LOGO),
+        },
+        {
+            "module_drawer": CircleModuleDrawer(),
+            "embeded_image": Image.open(io.BytesIO(LOGO)),
+        },
+    ),
+    "full": (
+        {
+            "module_shape": "rounded",
+            "eye_shape": "circle",
+            "eye_color": "#E63946",
+            "gradient": "diagonal",
+            "gradient_color": "#1D3557",
+            "error_correction": "H",
+            "logo": base64.b64encode(LOGO),
+        },
+        None,
+    ),
+}
+
+
+def median_ms(func: Callable[[], object], repeat: int) -> float:
+    """Median wall time of repeat runs of the function, in milliseconds"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations) * 1000
+
+
+def clear_compiled_styles() -> None:
+    """Drop every compiled style and decoded logo of the process"""
+    for compiled in (
+        styles.compile_png_style,
+        styles.compile_svg_style,
+        styles.compile_palette,
+        styles.compile_canvas,
+        styles.compile_logo,
+        styles.open_logo,
+    ):
+        compiled.cache_clear()
+
+
+def stock_render(params: QRRenderParams, factory_kwargs: dict[str, Any]) -> bytes:
+    """Render a PNG with the styled image factory of the qrcode library"""
+    qr = qrcode.QRCode(
+        version=params.version,
+        error_correction=ERROR_CORRECTION_LEVELS[params.error_correction],
+        box_size=params.box_size,
+        border=params.border,
+    )
+    qr.add_data(params.data)
+    buffer = io.BytesIO()
+    qr.make_image(image_factory=StyledPilImage, **factory_kwargs).save(buffer)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--version", default=5, type=int)
+    parser.add_argument("--box-size", default=10, type=int)
+    parser.add_argument("--repeat", default=20, type=int)
+    parser.add_argument("--stock-repeat", default=3, type=int)
+    parser.add_argument("--data", default="https://qrafty.app/r/3kTq9ZpA")
+    args = parser.parse_args()
+
+    print(
+        f"{'style':>9} {'format':>6} | {'first ms':>10} {'render ms':>9} {'raster ms':>9} "
+        f"{'renders/s':>9} {'KiB':>6} | {'stock ms':>9} {'speedup':>7}"
+    )
+    for name, (style, factory_kwargs) in STYLES.items():
+        for image_format in (ImageFormat.PNG, ImageFormat.SVG):
+            params = QRRenderParams(
+                data=args.data,
+                version=args.version,
+                box_size=args.box_size,
+                format=image_format,
+                error_correction=style.get("error_correction", ErrorCorrectionLevel.M),
+                **{k: v for k, v in style.items() if k != "error_correction"},
+            )
+            matrix = build_matrix(
+                params.data, params.error_correction, params.version, params.border
+            )
+            clear_compiled_styles()
+            start = time.perf_counter()
+            content = render_qr(params).content
+            first = (time.perf_counter() - start) * 1000
+            render = median_ms(lambda: render_qr(params), args.repeat)
+            raster = median_ms(lambda: rasterize(matrix, params), args.repeat)
+
+            stock = ""
+            if factory_kwargs is not None and image_format is ImageFormat.PNG:
+                stock_ms = median_ms(
+                    lambda: stock_render(params, factory_kwargs), args.stock_repeat
+                )
+                stock = f"{stock_ms:>9.1f} {stock_ms / render:>6.1f}x"
+            print(
+                f"{name:>9} {image_format.value:>6} | {first:>10.1f} {render:>9.2f} "
+                f"{raster:>9.2f} {1000 / render:>9.0f} {len(content) / 1024:>6.1f} | {stock}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmark of the vector outputs: size, write time and parse time of the SVG documents by writer, and
+throughput of the PDF sheets.
+
+SVG writers:
+    - rects: one <rect> per dark module, the naive writer
+    - runs: a single path with one rectangle per horizontal run of dark modules
+    - outlines: a single path with one sub-path per outline of a region of dark modules, render_svg
+
+The parse time is that of xml.etree.ElementTree, standing for the work of the clients. Every writer is
+checked against the module matrix before being timed. The PDF columns are those of render_pdf, the same
+outlines drawn with PDF operators, deflated. Sheets are drawn in this process alone, page after page,
+so the codes per second are those of a single core, and of a single render process of the pool.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_vector_output
+    python -m benchmarks.bench_vector_output --versions 1 10 40 --sheet-codes 1000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import re
+import time
+import xml.etree.ElementTree as ET
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from src.qr.engine import build_matrix, horizontal_runs, render_pdf, render_svg
+from src.qr.schemas import PageSize, QRRenderParams
+from src.qr.service import render_sheet_batch
+from src.qr.sheets import SheetLayout, stream_pdf_sheet
+
+SVG_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+    'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+    '<rect width="{modules}" height="{modules}" fill="#FFFFFF"/>'
+)
+
+
+def rects_svg(matrix: np.ndarray, box_size: int) -> bytes:
+    """Write one square per dark module"""
+    modules = matrix.shape[0]
+    rows, columns = np.nonzero(matrix)
+    rects = "".join(
+        f'<rect x="{x}" y="{y}" width="1" height="1"/>'
+        for y, x in zip(rows.tolist(), columns.tolist())
+    )
+    header = SVG_HEADER.format(size=modules * box_size, modules=modules)
+    return f'{header}<g fill="#000000">{rects}</g></svg>'.encode()
+
+
+def runs_svg(matrix: np.ndarray, box_size: int) -> bytes:
+    """Write one rectangle per horizontal run of dark modules"""
+    modules = matrix.shape[0]
+    rows, starts, lengths = horizontal_runs(matrix)
+    path = "".join(
+        f"M{x} {y}h{n}v1h-{n}z"
+        for y, x, n in zip(rows.tolist(), starts.tolist(), lengths.tolist())
+    )
+    header = SVG_HEADER.format(size=modules * box_size, modules=modules)
+    return f'{header}<path fill="#000000" d="{path}"/></svg>'.encode()
+
+
+def outlines_svg(matrix: np.ndarray, box_size: int) -> bytes:
+    """Write the outlines of the regions of dark modules"""
+    return render_svg(matrix, box_size)
+
+
+WRITERS: dict[str, Callable[[np.ndarray, int], bytes]] = {
+    "rects": rects_svg,
+    "runs": runs_svg,
+    "outlines": outlines_svg,
+}
+
+
+def drawn_modules(document: bytes, modules: int) -> np.ndarray:
+    """
+    Rasterize the dark modules drawn by an SVG document of one of the writers, at one pixel per module,
+    filling the paths with the nonzero rule
+    """
+    root = ET.fromstring(document)
+    drawn = np.zeros((modules, modules), dtype=bool)
+    for rect in root.iter("{http://www.w3.org/2000/svg}rect"):
+        if rect.get("width") == "1":
+            drawn[int(rect.get("y")), int(rect.get("x"))] = True
+
+    winding = np.zeros((modules, modules + 1), dtype=int)
+    for path in root.iter("{http://www.w3.org/2000/svg}path"):
+        for subpath in path.get("d").split("z")[:-1]:
+            x, y, commands = re.fullmatch(r"M(\d+) (\d+)(.*)", subpath).groups()
+            x, y = int(x), int(y)
+            start = y
+            for command, length in re.findall(r"([hv])(-?\d+)", commands) + [
+                ("v", None)
+            ]:
+                length = start - y if length is None else int(length)
+                if command == "h":
+                    x += length
+                    continue
+                winding[min(y, y + length) : max(y, y + length), x] += (
+                    1 if length < 0 else -1
+                )
+                y += length
+    return drawn | (np.cumsum(winding, axis=1)[:, :modules] != 0)
+
+
+def best_ms(func: Callable[[], object], repeat: int) -> float:
+    """Best wall time of repeat runs of the function, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+class InlineRenderService:
+    """Render service running the jobs in this process, for the sheets"""
+
+    max_workers = 1
+
+    async def run(self, func: Callable, chunk: list, wait: bool = False) -> Any:
+        return func(chunk)
+
+
+async def draw_sheet(
+    rows: list[tuple[int, QRRenderParams]], layout: SheetLayout
+) -> int:
+    """Draw a sheet, returning its size in bytes"""
+    size = 0
+    async for part in stream_pdf_sheet(iter(rows), InlineRenderService(), layout):
+        size += len(part)
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--versions", default=[1, 5, 10, 20, 40], nargs="+", type=int)
+    parser.add_argument("--box-size", default=10, type=int)
+    parser.add_argument("--repeat", default=10, type=int)
+    parser.add_argument("--sheet-codes", default=500, type=int)
+    parser.add_argument("--data", default="QRafty")
+    args = parser.parse_args()
+
+    print(
+        f"{'version':>7} {'writer':>8} | {'KiB':>8} {'write ms':>9} {'parse ms':>9} "
+        f"| {'size':>6} {'write':>6} {'parse':>6} (vs rects)"
+    )
+    for version in args.versions:
+        matrix = build_matrix(args.data, "L", version, 4)
+        baseline = None
+        for name, writer in WRITERS.items():
+            document = writer(matrix, args.box_size)
+            assert np.array_equal(drawn_modules(document, matrix.shape[0]), matrix), (
+                name
+            )
+
+            write = best_ms(lambda: writer(matrix, args.box_size), args.repeat)
+            parse = best_ms(lambda: ET.fromstring(document), args.repeat)
+            baseline = baseline or (len(document), write, parse)
+            print(
+                f"{version:>7} {name:>8} | {len(document) / 1024:>8.1f} {write:>9.2f} "
+                f"{parse:>9.2f} | {baseline[0] / len(document):>5.1f}x "
+                f"{baseline[1] / write:>5.1f}x {baseline[2] / parse:>5.1f}x"
+            )
+
+        document = render_pdf(matrix, args.box_size)
+        write = best_ms(lambda: render_pdf(matrix, args.box_size), args.repeat)
+        print(
+            f"{version:>7} {'pdf':>8} | {len(document) / 1024:>8.1f} {write:>9.2f} "
+            f"{'':>9} | {baseline[0] / len(document):>5.1f}x"
+        )
+
+    print(f"\nPDF sheets of {args.sheet_codes} codes")
+    print(
+        f"{'page':>7} {'columns':>7} | {'pages':>5} {'KiB':>8} {'ms':>8} {'codes/s':>8}"
+    )
+    rows = [
+        (index, QRRenderParams(data=f"https://qrafty.app/r/{index:08d}"))
+        for index in range(1, args.sheet_codes + 1)
+    ]
+    render_sheet_batch(rows[:1])
+    for page_size, columns in (
+        (PageSize.A4, 3),
+        (PageSize.A4, 6),
+        (PageSize.LETTER, 8),
+    ):
+        layout = SheetLayout.of(page_size, columns)
+        start = time.perf_counter()
+        size = asyncio.run(draw_sheet(rows, layout))
+        elapsed = time.perf_counter() - start
+        pages = -(-args.sheet_codes // layout.per_page)
+        print(
+            f"{page_size.value:>7} {columns:>7} | {pages:>5} {size / 1024:>8.0f} "
+            f"{elapsed * 1000:>8.0f} {args.sheet_codes / elapsed:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Scan analytics specific configuration"""
+
+from src.analytics.schemas import (
+    ExpiredPartitionAction,
+    Granularity,
+    OverflowPolicy,
+)
+from src.config import settings
+
+# Scan events waiting to be written, beyond that the overflow policy applies
+SCAN_EVENT_QUEUE_MAX_SIZE: int = settings.SCAN_EVENT_QUEUE_MAX_SIZE
+# Scan events written per batch, a batch is also written once it waited for the flush interval
+SCAN_EVENT_BATCH_SIZE: int = settings.SCAN_EVENT_BATCH_SIZE
+SCAN_EVENT_FLUSH_INTERVAL_SECONDS: float = settings.SCAN_EVENT_FLUSH_INTERVAL_SECONDS
+# Whether scans are dropped or wait for room in the queue once it is full
+SCAN_EVENT_OVERFLOW_POLICY: OverflowPolicy = OverflowPolicy(
+    settings.SCAN_EVENT_OVERFLOW_POLICY
+)
+# User agents are truncated to the size of their column
+SCAN_EVENT_USER_AGENT_MAX_LENGTH: int = 512
+
+# Scan events are stored in monthly partitions, the partitions of the months which ended more than
+# SCAN_EVENT_RETENTION_MONTHS months ago are expired. The scan rollups are kept regardless
+SCAN_EVENT_RETENTION_MONTHS: int = settings.SCAN_EVENT_RETENTION_MONTHS
+# Partitions created ahead of the current month, so that the scans never miss one between two maintenances
+SCAN_EVENT_PARTITIONS_AHEAD: int = settings.SCAN_EVENT_PARTITIONS_AHEAD
+# Whether expired partitions are dropped, or detached to be archived and dropped by hand
+SCAN_EVENT_EXPIRED_PARTITIONS: ExpiredPartitionAction = ExpiredPartitionAction(
+    settings.SCAN_EVENT_EXPIRED_PARTITIONS
+)
+SCAN_EVENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = (
+    settings.SCAN_EVENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS
+)
+# Key of the Postgres advisory lock letting a single worker maintain the partitions at a time
+SCAN_EVENT_PARTITION_LOCK_KEY: int = 0x5CA1E7E1
+# Partition DDL locks the scan_event table, waiting longer for it would hold the scans back
+SCAN_EVENT_PARTITION_LOCK_TIMEOUT: str = "5s"
+
+# Seconds between two refreshes of the scan rollups, which is how far behind the analytics can be
+SCAN_ROLLUP_INTERVAL_SECONDS: float = settings.SCAN_ROLLUP_INTERVAL_SECONDS
+# Delay after which scans are expected to be written, the hours still within it are aggregated again on
+# every refresh, so that scans written late by the queue are not missed
+SCAN_ROLLUP_LATENESS_SECONDS: int = settings.SCAN_ROLLUP_LATENESS_SECONDS
+# Key of the Postgres advisory lock letting a single worker refresh the rollups at a time
+SCAN_ROLLUP_LOCK_KEY: int = 0x5CA11011
+# Largest number of buckets a scan series can span
+SCAN_SERIES_MAX_BUCKETS: int = 24 * 93
+# Span of a scan series when its start is not given, in buckets
+SCAN_SERIES_DEFAULT_BUCKETS: dict[Granularity, int] = {
+    Granularity.HOUR: 48,
+    Granularity.DAY: 30,
+}
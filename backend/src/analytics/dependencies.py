@@ -0,0 +1,46 @@
+"""Scan analytics specific dependencies"""
+
+from src.analytics.config import (
+    SCAN_EVENT_BATCH_SIZE,
+    SCAN_EVENT_FLUSH_INTERVAL_SECONDS,
+    SCAN_EVENT_OVERFLOW_POLICY,
+    SCAN_EVENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+    SCAN_EVENT_QUEUE_MAX_SIZE,
+    SCAN_ROLLUP_INTERVAL_SECONDS,
+)
+from src.analytics.ingestion import ScanEventQueue
+from src.analytics.jobs import PeriodicJob
+from src.analytics.partitions import maintain_scan_event_partitions
+from src.analytics.rollups import refresh_scan_rollups
+
+# Process wide queue of scan events, started and drained by the lifespan of the application
+scan_events = ScanEventQueue(
+    max_size=SCAN_EVENT_QUEUE_MAX_SIZE,
+    batch_size=SCAN_EVENT_BATCH_SIZE,
+    flush_interval_seconds=SCAN_EVENT_FLUSH_INTERVAL_SECONDS,
+    overflow_policy=SCAN_EVENT_OVERFLOW_POLICY,
+)
+
+
+async def get_scan_event_queue() -> ScanEventQueue:
+    """
+    Dependency that provides the process wide scan event queue
+
+    Returns:
+        ScanEventQueue: The scan event queue of the current worker
+    """
+    return scan_events
+
+
+# Process wide job refreshing the scan rollups, started and stopped by the lifespan of the application
+scan_rollups = PeriodicJob(
+    "scan rollups", refresh_scan_rollups, SCAN_ROLLUP_INTERVAL_SECONDS
+)
+
+# Process wide job maintaining the monthly partitions of the scan events, run by the lifespan of the
+# application on startup then periodically
+scan_event_partitions = PeriodicJob(
+    "scan event partitions",
+    maintain_scan_event_partitions,
+    SCAN_EVENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+)
@@ -0,0 +1,175 @@
+"""
+In-process ingestion of the scan events: scans are queued by the redirects and written to the database
+in batches by a background task, off the request path
+"""
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.config import SCAN_EVENT_USER_AGENT_MAX_LENGTH
+from src.analytics.models import ScanEvent
+from src.analytics.schemas import OverflowPolicy, ScanEventQueueStats
+from src.database import copy_records, database
+
+logger = logging.getLogger(__name__)
+
+# Columns filled by the queued events, in the order of their values
+SCAN_EVENT_COLUMNS = ("qr_code_id", "scanned_at", "user_agent")
+
+ScanEventRecord = tuple[uuid.UUID, datetime, str | None]
+
+# Queued after the last event on shutdown, so that the flush task drains the queue then stops
+_STOP = object()
+
+
+class ScanEventQueue:
+    """
+    Bounded queue of scan events, flushed to the scan_event table by a background task.
+
+    Events are written with COPY in batches of up to batch_size events, a batch being written as soon as
+    it is full or flush_interval_seconds after its first event, whichever comes first. Once max_size events
+    are waiting, the overflow policy either drops new events or makes the callers wait for room.
+    Stopping the queue writes the events still waiting before returning.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval_seconds: float,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP,
+        session_maker: Callable[
+            [], AbstractAsyncContextManager[AsyncSession]
+        ] = database.session,
+    ) -> None:
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.overflow_policy = overflow_policy
+        self.session_maker = session_maker
+        self.queued: int = 0
+        self.flushed: int = 0
+        self.dropped: int = 0
+        self.failed: int = 0
+        self.batches: int = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the background task flushing the queue"""
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_size)
+            self._task = asyncio.create_task(self._run(self._queue))
+
+    async def stop(self) -> None:
+        """Stop accepting events, and wait for the background task to flush the events still queued"""
+        if self._task is None or self._queue is None:
+            return
+
+        queue, task = self._queue, self._task
+        self._queue = None
+        # The stop marker may have to wait for room in a full queue, which the task keeps draining
+        await queue.put(_STOP)
+        await task
+        self._task = None
+
+    async def record(self, qr_code_id: uuid.UUID, user_agent: str | None) -> bool:
+        """
+        Queue the scan of a code, timestamped now
+
+        Args:
+            qr_code_id (uuid.UUID): ID of the scanned code
+            user_agent (str | None): User agent of the scan, truncated to the size of its column
+
+        Returns:
+            bool: Whether the event was queued, False if it was dropped as the queue was full
+
+        Raises:
+            RuntimeError: If the queue is not started
+        """
+        if self._queue is None:
+            raise RuntimeError("The scan event queue is not started")
+
+        event: ScanEventRecord = (
+            qr_code_id,
+            datetime.now(timezone.utc),
+            user_agent[:SCAN_EVENT_USER_AGENT_MAX_LENGTH] if user_agent else None,
+        )
+        if self.overflow_policy is OverflowPolicy.BLOCK:
+            await self._queue.put(event)
+        else:
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                return False
+
+        self.queued += 1
+        return True
+
+    def stats(self) -> ScanEventQueueStats:
+        """
+        Take a snapshot of the counters of the queue
+
+        Returns:
+            ScanEventQueueStats: Counters of the queue, and the number of events waiting to be written
+        """
+        return ScanEventQueueStats(
+            queued=self.queued,
+            flushed=self.flushed,
+            dropped=self.dropped,
+            failed=self.failed,
+            pending=self.queued - self.flushed - self.failed,
+            batches=self.batches,
+        )
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """Collect the events in batches and write them, until the stop marker is reached"""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            event = await queue.get()
+            if event is _STOP:
+                break
+
+            batch: list[ScanEventRecord] = [event]
+            deadline = loop.time() + self.flush_interval_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    event = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(queue.get(), timeout)
+                    except TimeoutError:
+                        break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[ScanEventRecord]) -> None:
+        """Write a batch of events with COPY, counting its events as failed if it cannot be written"""
+        try:
+            async with self.session_maker() as session:
+                await copy_records(
+                    session, ScanEvent.__tablename__, SCAN_EVENT_COLUMNS, batch
+                )
+                await session.commit()
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Could not write a batch of %d scan events", len(batch))
+        else:
+            self.flushed += len(batch)
+            self.batches += 1
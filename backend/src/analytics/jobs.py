@@ -0,0 +1,81 @@
+"""Periodic background jobs of the analytics, running a database task in a transaction of its own"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+from typing import Generic, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database import database
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PeriodicJob(Generic[T]):
+    """
+    Background task running a database task every interval_seconds, started and stopped by the lifespan
+    of the application. Every worker runs the job, the tasks are expected to take an advisory lock so
+    that a single worker runs them at a time, returning None when another worker holds it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        task: Callable[[AsyncSession], Awaitable[T | None]],
+        interval_seconds: float,
+        session_maker: Callable[
+            [], AbstractAsyncContextManager[AsyncSession]
+        ] = database.session,
+    ) -> None:
+        self.name = name
+        self.task = task
+        self.interval_seconds = interval_seconds
+        self.session_maker = session_maker
+        self.last_result: T | None = None
+        self.failures: int = 0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start the background task, whose first run comes after an interval"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background task, rolling back the run in progress if any"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run_once(self) -> T | None:
+        """
+        Run the task in a transaction of its own, logging the failures
+
+        Returns:
+            T | None: The result of the task, None if it failed or another worker was running it
+        """
+        try:
+            async with self.session_maker() as session:
+                result = await self.task(session)
+                await session.commit()
+        except Exception:
+            self.failures += 1
+            logger.exception("Could not run the %s job", self.name)
+            return None
+
+        if result is not None:
+            self.last_result = result
+            logger.info("Ran the %s job: %s", self.name, result)
+        return result
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.run_once()
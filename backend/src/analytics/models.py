@@ -0,0 +1,101 @@
+"""Database models associated with scan analytics"""
+
+import uuid
+from datetime import datetime
+
+from fastapi_users_db_sqlalchemy.generics import GUID
+from sqlalchemy import BigInteger, DateTime, Identity, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.analytics.config import SCAN_EVENT_USER_AGENT_MAX_LENGTH
+from src.database import Base
+
+
+class ScanEvent(Base):
+    """
+    Scan of a dynamic QR code, recorded when its short URL is redirected.
+
+    Events do not reference the qr_code table through a foreign key: they are written in batches off the
+    request path, and deleting a code does not have to delete its whole history.
+    The table is partitioned by month of scanned_at, the partitions being managed by
+    src.analytics.partitions. The primary key includes scanned_at, as partitioning requires.
+
+    Args:
+        Base (DeclarativeBase): Base class for all SQLAlchemy database models
+    """
+
+    __tablename__ = "scan_event"
+    __table_args__ = (
+        Index("ix_scan_event_qr_code_id_scanned_at", "qr_code_id", "scanned_at"),
+        # Events are appended in time order, a BRIN index finds the recent ones for the rollups
+        # at a fraction of the size and write cost of a B-tree. Page ranges are only summarized by
+        # vacuum by default, autosummarize has them summarized as soon as they are full
+        Index(
+            "ix_scan_event_scanned_at",
+            "scanned_at",
+            postgresql_using="brin",
+            postgresql_with={"autosummarize": "on"},
+        ),
+        {"postgresql_partition_by": "RANGE (scanned_at)"},
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    qr_code_id: Mapped[uuid.UUID] = mapped_column(GUID, nullable=False)
+    scanned_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True
+    )
+    user_agent: Mapped[str | None] = mapped_column(
+        String(SCAN_EVENT_USER_AGENT_MAX_LENGTH)
+    )
+
+
+class ScanRollupMixin:
+    """Columns shared by the rollup tables, which count the scans of every code per bucket of time"""
+
+    qr_code_id: Mapped[uuid.UUID] = mapped_column(GUID, primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    scans: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class ScanRollupHourly(ScanRollupMixin, Base):
+    """
+    Number of scans of a code per hour, aggregated from the scan events
+
+    Args:
+        ScanRollupMixin (ScanRollupMixin): Columns of the rollup tables
+        Base (DeclarativeBase): Base class for all SQLAlchemy database models
+    """
+
+    __tablename__ = "scan_rollup_hourly"
+    # The daily rollup is refreshed from the hourly buckets of the refreshed days, of every code
+    __table_args__ = (Index("ix_scan_rollup_hourly_bucket", "bucket"),)
+
+
+class ScanRollupDaily(ScanRollupMixin, Base):
+    """
+    Number of scans of a code per day in UTC, aggregated from the hourly rollup
+
+    Args:
+        ScanRollupMixin (ScanRollupMixin): Columns of the rollup tables
+        Base (DeclarativeBase): Base class for all SQLAlchemy database models
+    """
+
+    __tablename__ = "scan_rollup_daily"
+
+
+class ScanRollupWatermark(Base):
+    """
+    Progress of the refreshes of the scan rollups: the hours before the watermark are final,
+    the following ones are aggregated again on the next refresh
+
+    Args:
+        Base (DeclarativeBase): Base class for all SQLAlchemy database models
+    """
+
+    __tablename__ = "scan_rollup_watermark"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
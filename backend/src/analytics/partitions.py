@@ -0,0 +1,166 @@
+"""
+Monthly partitions of the scan events: partitions are created ahead of time, and the partitions past the
+retention are detached or dropped, which is instantaneous next to deleting their rows and leaves no bloat
+for vacuum to clean up
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.config import (
+    SCAN_EVENT_EXPIRED_PARTITIONS,
+    SCAN_EVENT_PARTITION_LOCK_KEY,
+    SCAN_EVENT_PARTITION_LOCK_TIMEOUT,
+    SCAN_EVENT_PARTITIONS_AHEAD,
+    SCAN_EVENT_RETENTION_MONTHS,
+)
+from src.analytics.models import ScanEvent
+from src.analytics.schemas import ExpiredPartitionAction, PartitionMaintenance
+
+# Names of the monthly partitions, such as scan_event_2026_10. Detached partitions keep their name
+PARTITION_NAME_PATTERN = re.compile(rf"{ScanEvent.__tablename__}_(\d{{4}})_(\d{{2}})")
+
+
+def add_months(month: date, months: int) -> date:
+    """
+    Move the first day of a month by a number of months
+
+    Args:
+        month (date): First day of a month
+        months (int): Number of months, negative to move back
+
+    Returns:
+        date: First day of the resulting month
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """
+    Name of the partition holding the scan events of a month
+
+    Args:
+        month (date): First day of the month
+
+    Returns:
+        str: Name of the partition
+    """
+    return f"{ScanEvent.__tablename__}_{month.year:04d}_{month.month:02d}"
+
+
+async def list_partitions(session: AsyncSession) -> dict[date, str]:
+    """
+    List the monthly partitions attached to the scan_event table
+
+    Args:
+        session (AsyncSession): Database session
+
+    Returns:
+        dict[date, str]: Name of the partitions by the first day of their month
+    """
+    result = await session.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+        ),
+        {"table": ScanEvent.__tablename__},
+    )
+    partitions = {}
+    for name in result:
+        match = PARTITION_NAME_PATTERN.fullmatch(name)
+        if match is not None:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+async def create_partition(session: AsyncSession, month: date) -> str:
+    """
+    Create the partition of a month, unless it already exists
+
+    Args:
+        session (AsyncSession): Database session
+        month (date): First day of the month
+
+    Returns:
+        str: Name of the partition
+    """
+    name = partition_name(month)
+    start, end = (
+        datetime(day.year, day.month, 1, tzinfo=timezone.utc).isoformat()
+        for day in (month, add_months(month, 1))
+    )
+    # DDL does not take bound parameters, the name and the bounds are derived from the month
+    await session.execute(
+        text(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {ScanEvent.__tablename__} '
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    )
+    return name
+
+
+async def maintain_scan_event_partitions(
+    session: AsyncSession,
+    today: date | None = None,
+    months_ahead: int = SCAN_EVENT_PARTITIONS_AHEAD,
+    retention_months: int = SCAN_EVENT_RETENTION_MONTHS,
+    expired_action: ExpiredPartitionAction = SCAN_EVENT_EXPIRED_PARTITIONS,
+) -> PartitionMaintenance | None:
+    """
+    Create the partitions of the current month and of the months_ahead following ones, then detach or drop
+    the partitions of the months which ended more than retention_months months ago, within the transaction
+    of the session.
+
+    Partition DDL locks the scan_event table, so the locks are only waited for up to
+    SCAN_EVENT_PARTITION_LOCK_TIMEOUT, the maintenance failing rather than holding the scans back.
+    A transaction level advisory lock lets a single worker maintain the partitions at a time, the others
+    skip the maintenance.
+
+    Args:
+        session (AsyncSession): Database session, committed by the caller
+        today (date | None, optional): Current day. Defaults to None, for the current day in UTC.
+        months_ahead (int, optional): Partitions to create after the current month. Defaults to SCAN_EVENT_PARTITIONS_AHEAD.
+        retention_months (int, optional): Months of scans to keep before the current month. Defaults to SCAN_EVENT_RETENTION_MONTHS.
+        expired_action (ExpiredPartitionAction, optional): What to do with the expired partitions. Defaults to SCAN_EVENT_EXPIRED_PARTITIONS.
+
+    Returns:
+        PartitionMaintenance | None: The partitions created, detached and dropped, None if another maintenance is in progress
+    """
+    locked = await session.scalar(
+        select(func.pg_try_advisory_xact_lock(SCAN_EVENT_PARTITION_LOCK_KEY))
+    )
+    if not locked:
+        return None
+    await session.execute(
+        text(f"SET LOCAL lock_timeout = '{SCAN_EVENT_PARTITION_LOCK_TIMEOUT}'")
+    )
+
+    today = today or datetime.now(timezone.utc).date()
+    current_month = today.replace(day=1)
+    partitions = await list_partitions(session)
+    maintenance = PartitionMaintenance()
+
+    for months in range(months_ahead + 1):
+        month = add_months(current_month, months)
+        if month not in partitions:
+            maintenance.created.append(await create_partition(session, month))
+
+    oldest_kept = add_months(current_month, -retention_months)
+    for month, name in sorted(partitions.items()):
+        if month >= oldest_kept:
+            break
+        if expired_action is ExpiredPartitionAction.DETACH:
+            await session.execute(
+                text(f'ALTER TABLE {ScanEvent.__tablename__} DETACH PARTITION "{name}"')
+            )
+            maintenance.detached.append(name)
+        else:
+            await session.execute(text(f'DROP TABLE "{name}"'))
+            maintenance.dropped.append(name)
+
+    return maintenance
@@ -0,0 +1,170 @@
+"""
+Scan rollups: the scans of every code are counted per hour and per day in rollup tables, refreshed
+incrementally from a watermark by a background job, so that the analytics never aggregate the raw events
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Select, func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.config import SCAN_ROLLUP_LATENESS_SECONDS, SCAN_ROLLUP_LOCK_KEY
+from src.analytics.models import (
+    ScanEvent,
+    ScanRollupDaily,
+    ScanRollupHourly,
+    ScanRollupWatermark,
+)
+from src.analytics.schemas import Granularity, ScanCount, ScanRollupRefresh
+
+# Name of the watermark row of the scan rollups
+SCAN_ROLLUP_WATERMARK_NAME = "scan_rollup"
+
+# Watermark before the first refresh, every scan event is aggregated
+INITIAL_WATERMARK = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+ROLLUP_MODELS: dict[Granularity, type[ScanRollupHourly] | type[ScanRollupDaily]] = {
+    Granularity.HOUR: ScanRollupHourly,
+    Granularity.DAY: ScanRollupDaily,
+}
+
+# Buckets are aligned on UTC, whatever the time zone of the database session
+_UTC = literal_column("'UTC'")
+
+
+def truncate(granularity: Granularity, moment: datetime) -> datetime:
+    """
+    Truncate a moment to the start of its bucket, in UTC
+
+    Args:
+        granularity (Granularity): Size of the buckets
+        moment (datetime): Aware datetime to truncate
+
+    Returns:
+        datetime: Start of the bucket containing the moment
+    """
+    moment = moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    if granularity is Granularity.DAY:
+        moment = moment.replace(hour=0)
+    return moment
+
+
+async def refresh_scan_rollups(
+    session: AsyncSession,
+    now: datetime | None = None,
+    lateness: timedelta = timedelta(seconds=SCAN_ROLLUP_LATENESS_SECONDS),
+) -> ScanRollupRefresh | None:
+    """
+    Refresh the scan rollups from their watermark, within the transaction of the session.
+
+    The hours from the watermark onwards are aggregated again from the scan events, and their days from
+    the hourly rollup, replacing the previous counts: refreshes are idempotent, and the hours which are not
+    over yet are completed by the following refreshes. The watermark then moves to the start of the hour
+    the scans written late are still expected in, lateness before now.
+    Only the scan events after the watermark are read, found through the BRIN index of their timestamp.
+
+    A transaction level advisory lock lets a single worker refresh the rollups at a time, the others
+    skip the refresh rather than aggregating the same events.
+
+    Args:
+        session (AsyncSession): Database session, committed by the caller
+        now (datetime | None, optional): Current time. Defaults to None, for the current time.
+        lateness (timedelta, optional): Delay after which scans are expected to be written. Defaults to SCAN_ROLLUP_LATENESS_SECONDS.
+
+    Returns:
+        ScanRollupRefresh | None: The outcome of the refresh, None if another refresh is in progress
+    """
+    locked = await session.scalar(
+        select(func.pg_try_advisory_xact_lock(SCAN_ROLLUP_LOCK_KEY))
+    )
+    if not locked:
+        return None
+
+    now = now or datetime.now(timezone.utc)
+    watermark = await session.get(
+        ScanRollupWatermark, SCAN_ROLLUP_WATERMARK_NAME, with_for_update=True
+    )
+    window_start = watermark.watermark if watermark else INITIAL_WATERMARK
+
+    hour = func.date_trunc("hour", ScanEvent.scanned_at, _UTC)
+    hourly = await session.execute(
+        _replace_buckets(
+            ScanRollupHourly,
+            select(ScanEvent.qr_code_id, hour, func.count())
+            .where(ScanEvent.scanned_at >= window_start)
+            .group_by(ScanEvent.qr_code_id, hour),
+        )
+    )
+
+    day = func.date_trunc("day", ScanRollupHourly.bucket, _UTC)
+    daily = await session.execute(
+        _replace_buckets(
+            ScanRollupDaily,
+            select(ScanRollupHourly.qr_code_id, day, func.sum(ScanRollupHourly.scans))
+            .where(ScanRollupHourly.bucket >= truncate(Granularity.DAY, window_start))
+            .group_by(ScanRollupHourly.qr_code_id, day),
+        )
+    )
+
+    new_watermark = max(window_start, truncate(Granularity.HOUR, now - lateness))
+    await session.execute(
+        insert(ScanRollupWatermark)
+        .values(name=SCAN_ROLLUP_WATERMARK_NAME, watermark=new_watermark)
+        .on_conflict_do_update(
+            index_elements=[ScanRollupWatermark.name],
+            set_={"watermark": new_watermark, "refreshed_at": func.now()},
+        )
+    )
+
+    return ScanRollupRefresh(
+        window_start=window_start,
+        watermark=new_watermark,
+        hourly_buckets=hourly.rowcount,  # type: ignore
+        daily_buckets=daily.rowcount,  # type: ignore
+    )
+
+
+def _replace_buckets(
+    model: type[ScanRollupHourly] | type[ScanRollupDaily], counts: Select
+):
+    """Build an upsert of the counts of a rollup table, replacing the counts of the existing buckets"""
+    statement = insert(model).from_select(["qr_code_id", "bucket", "scans"], counts)
+    return statement.on_conflict_do_update(
+        index_elements=[model.qr_code_id, model.bucket],
+        set_={"scans": statement.excluded.scans},
+    )
+
+
+async def get_scan_counts(
+    session: AsyncSession,
+    qr_code_id: uuid.UUID,
+    granularity: Granularity,
+    start: datetime,
+    end: datetime,
+) -> list[ScanCount]:
+    """
+    Get the scans of a code per bucket from the rollups, only the buckets with at least one scan
+
+    Args:
+        session (AsyncSession): Database session
+        qr_code_id (uuid.UUID): ID of the code
+        granularity (Granularity): Size of the buckets
+        start (datetime): Start of the period, aligned on a bucket
+        end (datetime): End of the period, excluded
+
+    Returns:
+        list[ScanCount]: Scans per bucket, in chronological order
+    """
+    model = ROLLUP_MODELS[granularity]
+    result = await session.execute(
+        select(model.bucket, model.scans)
+        .where(
+            model.qr_code_id == qr_code_id,
+            model.bucket >= start,
+            model.bucket < end,
+        )
+        .order_by(model.bucket)
+    )
+    return [ScanCount(bucket=bucket, scans=scans) for bucket, scans in result]
@@ -0,0 +1,118 @@
+"""Endpoints for the analytics of the scans of the dynamic QR codes"""
+
+from datetime import datetime, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.config import SCAN_SERIES_DEFAULT_BUCKETS, SCAN_SERIES_MAX_BUCKETS
+from src.analytics.dependencies import get_scan_event_queue
+from src.analytics.ingestion import ScanEventQueue
+from src.analytics.rollups import get_scan_counts, truncate
+from src.analytics.schemas import Granularity, ScanEventQueueStats, ScanSeries
+from src.auth.router import current_superuser
+from src.database import get_async_session
+from src.qr.dependencies import get_owned_qr_code
+from src.qr.models import QRCode
+from src.responses import FastJSONResponse
+
+# List of routers for the analytics endpoints
+analytics_routers: list[APIRouter] = []
+
+ingestion_router = APIRouter()
+codes_router = APIRouter(prefix="/codes")
+
+# Length of the buckets of each granularity
+BUCKET_SECONDS: dict[Granularity, int] = {
+    Granularity.HOUR: 3600,
+    Granularity.DAY: 86400,
+}
+
+
+@ingestion_router.get(
+    "/ingestion",
+    response_model=ScanEventQueueStats,
+    dependencies=[Depends(current_superuser)],
+)
+async def ingestion_stats(
+    scan_events: Annotated[ScanEventQueue, Depends(get_scan_event_queue)],
+) -> ScanEventQueueStats:
+    """
+    Expose the counters of the scan event queue of the worker, restricted to superusers
+
+    Args:
+        scan_events (ScanEventQueue): Scan event queue of the worker, injected by the get_scan_event_queue dependency
+
+    Returns:
+        ScanEventQueueStats: Counters of the queue
+    """
+    return scan_events.stats()
+
+
+@codes_router.get(
+    "/{qr_code_id}/scans", response_model=ScanSeries, response_class=FastJSONResponse
+)
+async def scan_series(
+    qr_code: Annotated[QRCode, Depends(get_owned_qr_code)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    granularity: Granularity = Granularity.DAY,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> FastJSONResponse:
+    """
+    Get the scans of a code of the current user per hour or per day, read from the scan rollups.
+
+    The rollups are refreshed in the background, the most recent scans show up after
+    SCAN_ROLLUP_INTERVAL_SECONDS at most. Buckets are aligned on UTC, the start of the period being
+    truncated to the start of its bucket, and the buckets without any scan are left out. The series is
+    encoded straight to JSON, without being validated again against the response model.
+
+    Args:
+        qr_code (QRCode): The code, injected by the get_owned_qr_code dependency
+        session (AsyncSession): Database session, injected by the get_async_session dependency
+        granularity (Granularity, optional): Size of the buckets. Defaults to Granularity.DAY.
+        start (datetime | None, optional): Start of the period. Defaults to None, for the default number of buckets before the end.
+        end (datetime | None, optional): End of the period, excluded. Defaults to None, for now.
+
+    Returns:
+        FastJSONResponse: The ScanSeries of the code, its scans per bucket over the period
+
+    Raises:
+        HTTPException: 400 if the period is empty or spans more than SCAN_SERIES_MAX_BUCKETS buckets
+    """
+    bucket_seconds = BUCKET_SECONDS[granularity]
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start is None:
+        start = datetime.fromtimestamp(
+            end.timestamp() - SCAN_SERIES_DEFAULT_BUCKETS[granularity] * bucket_seconds,
+            timezone.utc,
+        )
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    start = truncate(granularity, start)
+
+    span = (end - start).total_seconds()
+    if span <= 0 or span > SCAN_SERIES_MAX_BUCKETS * bucket_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The period should end after its start and span at most {SCAN_SERIES_MAX_BUCKETS} buckets",
+        )
+
+    buckets = await get_scan_counts(session, qr_code.id, granularity, start, end)
+    return FastJSONResponse(
+        ScanSeries(
+            qr_code_id=qr_code.id,
+            granularity=granularity,
+            start=start,
+            end=end,
+            total=sum(bucket.scans for bucket in buckets),
+            buckets=buckets,
+        )
+    )
+
+
+analytics_routers.append(ingestion_router)
+analytics_routers.append(codes_router)
@@ -0,0 +1,109 @@
+"""Pydantic models for the scan analytics, used for data validation and serialization"""
+
+import uuid
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class OverflowPolicy(str, Enum):
+    """Behaviour of the scan event queue once it is full"""
+
+    DROP = "drop"  # the scan is redirected right away and its event is lost
+    BLOCK = "block"  # the redirect waits until the event fits in the queue
+
+
+class ExpiredPartitionAction(str, Enum):
+    """What becomes of the scan event partitions past the retention"""
+
+    DETACH = "detach"  # the partition is kept as a standalone table, to be archived
+    DROP = "drop"
+
+
+class PartitionMaintenance(BaseModel):
+    """
+    Pydantic model for the outcome of a maintenance of the scan event partitions, used for serialization
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    created: list[str] = Field(default_factory=list)
+    detached: list[str] = Field(default_factory=list)
+    dropped: list[str] = Field(default_factory=list)
+
+
+class ScanEventQueueStats(BaseModel):
+    """
+    Pydantic model for a snapshot of the scan event queue counters, used for serialization
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    queued: int = Field(..., description="Number of events accepted by the queue")
+    flushed: int = Field(..., description="Number of events written to the database")
+    dropped: int = Field(
+        ..., description="Number of events dropped as the queue was full"
+    )
+    failed: int = Field(
+        ..., description="Number of events lost as their batch could not be written"
+    )
+    pending: int = Field(..., description="Number of events waiting to be written")
+    batches: int = Field(..., description="Number of batches written to the database")
+
+
+class Granularity(str, Enum):
+    """Size of the buckets of the scan rollups"""
+
+    HOUR = "hour"
+    DAY = "day"
+
+
+class ScanRollupRefresh(BaseModel):
+    """
+    Pydantic model for the outcome of a refresh of the scan rollups, used for serialization
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    window_start: datetime = Field(
+        ..., description="Start of the hours aggregated again by the refresh"
+    )
+    watermark: datetime = Field(
+        ..., description="Start of the hours to aggregate again on the next refresh"
+    )
+    hourly_buckets: int = Field(..., description="Number of hourly buckets written")
+    daily_buckets: int = Field(..., description="Number of daily buckets written")
+
+
+class ScanCount(BaseModel):
+    """
+    Pydantic model for the number of scans of a code in a bucket, used for serialization
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    bucket: datetime = Field(..., description="Start of the bucket, in UTC")
+    scans: int
+
+
+class ScanSeries(BaseModel):
+    """
+    Pydantic model for the scans of a code over a period, used for serialization
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    qr_code_id: uuid.UUID
+    granularity: Granularity
+    start: datetime = Field(..., description="Start of the first bucket of the period")
+    end: datetime = Field(..., description="End of the period, excluded")
+    total: int = Field(..., description="Number of scans over the period")
+    buckets: list[ScanCount] = Field(
+        ..., description="Buckets with at least one scan, in chronological order"
+    )
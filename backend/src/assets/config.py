@@ -0,0 +1,26 @@
+"""Asset storage specific configuration"""
+
+from src.config import settings
+
+# Directory of the assets when they are kept on the local filesystem
+ASSET_STORE_PATH: str = settings.ASSET_STORE_PATH
+# Bucket of the assets when they are kept in an S3 compatible storage shared by the workers, None keeps
+# them on the local filesystem
+ASSET_S3_BUCKET: str | None = settings.ASSET_S3_BUCKET
+ASSET_S3_ENDPOINT_URL: str | None = settings.ASSET_S3_ENDPOINT_URL
+# Prefix of the keys of the assets in the bucket
+ASSET_S3_PREFIX: str = "assets/"
+# Size of the parts of the multipart uploads, S3 refuses parts under 5 MiB but the last one
+ASSET_S3_PART_SIZE: int = 8 * 1024 * 1024
+
+# Streamed uploads are written to the filesystem by blocks of this size, off the event loop
+ASSET_WRITE_BUFFER_BYTES: int = 1024 * 1024  # 1 MiB
+# Size of the chunks in which the assets read from S3 are streamed to the clients
+ASSET_STREAM_CHUNK_SIZE: int = 64 * 1024
+
+# Path the assets are served from, followed by their key
+ASSET_URL_PREFIX: str = "/assets/"
+# Assets are served under their content hash and never change, so clients and CDNs can keep them for good
+ASSET_CACHE_MAX_AGE_SECONDS: int = (
+    365 * 86400
+)  # 1 year, the longest value caches are required to honour
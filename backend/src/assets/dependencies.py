@@ -0,0 +1,24 @@
+"""Asset storage specific dependencies"""
+
+from src.assets.config import (
+    ASSET_S3_BUCKET,
+    ASSET_S3_ENDPOINT_URL,
+    ASSET_S3_PREFIX,
+    ASSET_STORE_PATH,
+)
+from src.assets.stores import AssetStore, create_asset_store
+
+# Process wide asset store, started and closed by the lifespan of the application
+asset_store = create_asset_store(
+    ASSET_STORE_PATH, ASSET_S3_BUCKET, ASSET_S3_ENDPOINT_URL, ASSET_S3_PREFIX
+)
+
+
+async def get_asset_store() -> AssetStore:
+    """
+    Dependency that provides the process wide asset store
+
+    Returns:
+        AssetStore: The asset store of the current worker
+    """
+    return asset_store
@@ -0,0 +1,145 @@
+"""
+Range requests and conditional requests of the asset downloads (RFC 9110, sections 13 and 14), letting
+clients resume interrupted downloads and revalidate the assets they hold.
+"""
+
+from email.utils import parsedate_to_datetime
+from typing import NamedTuple
+
+from src.qr.cache import etag_matches
+
+# Ranges requested at once beyond which the Range header is ignored, the whole asset being cheaper to send
+# than a flood of tiny ranges
+RANGE_MAX_COUNT: int = 16
+
+
+class ByteRange(NamedTuple):
+    """
+    Satisfiable range of bytes of an asset
+
+    Args:
+        start (int): Offset of the first byte
+        end (int): Offset of the last byte, included
+    """
+
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        """Number of bytes of the range"""
+        return self.end - self.start + 1
+
+    def content_range(self, size: int) -> str:
+        """
+        Build the Content-Range header of the range
+
+        Args:
+            size (int): Size of the asset
+
+        Returns:
+            str: The header value
+        """
+        return f"bytes {self.start}-{self.end}/{size}"
+
+
+def parse_range(range_header: str, size: int) -> list[ByteRange] | None:
+    """
+    Parse a Range header against the size of an asset. Ranges past the end of the asset are dropped, and
+    the ends of the others clamped to it.
+
+    Args:
+        range_header (str): Value of the Range header, such as bytes=0-99, bytes=100- or bytes=-100
+        size (int): Size of the asset
+
+    Returns:
+        list[ByteRange] | None: The satisfiable ranges, empty if none is, or None if the header is invalid,
+            in a unit other than bytes or requests too many ranges, and must be ignored
+    """
+    unit, _, specs = range_header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+    specs_list = specs.split(",")
+    if len(specs_list) > RANGE_MAX_COUNT:
+        return None
+
+    ranges: list[ByteRange] = []
+    for spec in specs_list:
+        first, dash, last = spec.strip().partition("-")
+        positions = [part for part in (first, last) if part]
+        if not dash or not positions:
+            return None
+        if not all(part.isascii() and part.isdigit() for part in positions):
+            return None
+
+        if not first:
+            # Suffix range, the last bytes of the asset
+            suffix = int(last)
+            if suffix > 0 and size > 0:
+                ranges.append(ByteRange(max(size - suffix, 0), size - 1))
+            continue
+
+        start = int(first)
+        end = int(last) if last else size - 1
+        if last and end < start:
+            return None
+        if start < size:
+            ranges.append(ByteRange(start, min(end, size - 1)))
+    return ranges
+
+
+def _http_timestamp(value: str) -> float | None:
+    """Parse an HTTP date into a POSIX timestamp, None if it is not a date"""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_not_modified(
+    if_none_match: str | None,
+    if_modified_since: str | None,
+    etag: str,
+    modified: float,
+) -> bool:
+    """
+    Evaluate the conditional headers of a GET. If-Modified-Since is only evaluated without If-None-Match,
+    as the ETag is the more precise validator.
+
+    Args:
+        if_none_match (str | None): Value of the If-None-Match header
+        if_modified_since (str | None): Value of the If-Modified-Since header
+        etag (str): Current entity tag of the asset
+        modified (float): Time the asset was stored, as a POSIX timestamp
+
+    Returns:
+        bool: True if the client holds the current asset, to be answered with a 304
+    """
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if if_modified_since is not None:
+        since = _http_timestamp(if_modified_since)
+        # HTTP dates have a resolution of a second
+        return since is not None and int(modified) <= since
+    return False
+
+
+def if_range_matches(if_range: str | None, etag: str, modified: float) -> bool:
+    """
+    Evaluate the If-Range header of a range request, with the strong comparison it requires: the range is
+    only served if the client's partial copy is of the current asset, otherwise the whole asset is sent.
+
+    Args:
+        if_range (str | None): Value of the If-Range header
+        etag (str): Current entity tag of the asset
+        modified (float): Time the asset was stored, as a POSIX timestamp
+
+    Returns:
+        bool: True if the range can be served
+    """
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return _http_timestamp(if_range) == int(modified)
@@ -0,0 +1,104 @@
+"""Endpoints serving the stored assets"""
+
+from email.utils import formatdate
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from src.assets.config import ASSET_CACHE_MAX_AGE_SECONDS
+from src.assets.dependencies import get_asset_store
+from src.assets.ranges import (
+    ByteRange,
+    if_range_matches,
+    is_not_modified,
+    parse_range,
+)
+from src.assets.stores import ASSET_KEY_PATTERN, AssetStore
+
+assets_router = APIRouter()
+
+
+@assets_router.api_route(
+    "/{key}",
+    methods=["GET", "HEAD"],
+    responses={
+        200: {"content": {"image/png": {}, "image/svg+xml": {}, "application/pdf": {}}},
+        206: {"description": "Range of the asset"},
+        304: {"description": "The client's copy is current"},
+        404: {"description": "No asset has this key"},
+        416: {"description": "The range is past the end of the asset"},
+    },
+)
+async def read_asset(
+    key: str,
+    store: Annotated[AssetStore, Depends(get_asset_store)],
+    range_header: Annotated[str | None, Header(alias="Range")] = None,
+    if_range: Annotated[str | None, Header()] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    if_modified_since: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Serve a stored asset, a render or an uploaded logo, whole or by range.
+
+    Keys are content hashes, so that whoever knows the key of an asset already knows its content: assets
+    are served without authentication, and their ETag is the hash itself. An asset never changes under its
+    URL, so it is cached as immutable by clients and CDNs, which never revalidate it.
+
+    A single range of bytes can be requested with the Range header, for clients to resume interrupted
+    downloads, along with If-Range so that a partial copy of an asset which is not the current one is
+    replaced by the whole asset. Requests for several ranges are answered with the whole asset.
+
+    Args:
+        key (str): Key of the asset
+        store (AssetStore): Asset store of the worker, injected by the get_asset_store dependency
+        range_header (str | None, optional): Value of the Range header. Defaults to None.
+        if_range (str | None, optional): Value of the If-Range header. Defaults to None.
+        if_none_match (str | None, optional): Value of the If-None-Match header. Defaults to None.
+        if_modified_since (str | None, optional): Value of the If-Modified-Since header. Defaults to None.
+
+    Returns:
+        Response: The asset or its range, or an empty 304 response if the client's copy is current
+
+    Raises:
+        HTTPException: 404 if no asset has this key
+        HTTPException: 416 if the range starts past the end of the asset
+    """
+    asset = None
+    if ASSET_KEY_PATTERN.fullmatch(key) is not None:
+        asset = await store.stat(key)
+    if asset is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found"
+        )
+
+    headers = {
+        "ETag": f'"{key.partition(".")[0]}"',
+        "Last-Modified": formatdate(asset.modified, usegmt=True),
+        "Cache-Control": f"public, max-age={ASSET_CACHE_MAX_AGE_SECONDS}, immutable",
+        "Accept-Ranges": "bytes",
+    }
+    if is_not_modified(
+        if_none_match, if_modified_since, headers["ETag"], asset.modified
+    ):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    byte_range: ByteRange | None = None
+    if range_header is not None and if_range_matches(
+        if_range, headers["ETag"], asset.modified
+    ):
+        ranges = parse_range(range_header, asset.size)
+        if ranges == []:
+            raise HTTPException(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Range not satisfiable",
+                headers={"Content-Range": f"bytes */{asset.size}"},
+            )
+        if ranges is not None and len(ranges) == 1:
+            byte_range = ranges[0]
+
+    response = await store.response(asset, headers, byte_range)
+    if response is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Asset not found"
+        )
+    return response
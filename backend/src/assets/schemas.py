@@ -0,0 +1,40 @@
+"""Pydantic models for the stored assets, used for serialization"""
+
+from pydantic import BaseModel, Field
+
+from src.assets.config import ASSET_URL_PREFIX
+from src.assets.stores import Asset
+
+
+class AssetRead(BaseModel):
+    """
+    Pydantic model for reading a stored asset, used for serialization and response payloads
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    key: str = Field(
+        ..., description="Content hash of the asset followed by its extension"
+    )
+    url: str = Field(..., description="Path the asset is served from")
+    media_type: str
+    size: int = Field(..., description="Size of the asset, in bytes")
+
+    @classmethod
+    def from_asset(cls, asset: Asset) -> "AssetRead":
+        """
+        Describe a stored asset
+
+        Args:
+            asset (Asset): The asset
+
+        Returns:
+            AssetRead: Its description
+        """
+        return cls(
+            key=asset.key,
+            url=ASSET_URL_PREFIX + asset.key,
+            media_type=asset.media_type,
+            size=asset.size,
+        )
@@ -0,0 +1,724 @@
+"""
+Stores of the assets, the rendered QR codes and the uploaded logos, kept out of the database: on the
+local filesystem of the worker, or in an S3 compatible object storage shared by the workers.
+
+Assets are content addressed, their key being the SHA-256 of their content followed by the extension of
+their media type. Identical contents are stored once whoever stores them, and an asset never changes once
+stored: there is no update, and writers racing on the same key write the same bytes.
+
+Renders are found again from their parameters through references, small objects pointing from the cache
+key of the render to the key of its asset, so that a render is not produced again to learn its content
+hash.
+"""
+
+import abc
+import asyncio
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections.abc import AsyncIterable
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Any, BinaryIO, NamedTuple
+
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse, Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from src.assets.config import (
+    ASSET_S3_PART_SIZE,
+    ASSET_STREAM_CHUNK_SIZE,
+    ASSET_WRITE_BUFFER_BYTES,
+)
+from src.assets.ranges import ByteRange
+
+# Media types of the assets by the extension of their keys
+ASSET_MEDIA_TYPES: dict[str, str] = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+}
+ASSET_EXTENSIONS: dict[str, str] = {
+    media_type: extension for extension, media_type in ASSET_MEDIA_TYPES.items()
+}
+ASSET_KEY_PATTERN = re.compile(rf"[0-9a-f]{{64}}\.(?:{'|'.join(ASSET_MEDIA_TYPES)})")
+# Names of the references, cache keys of the renders
+REF_NAME_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class AssetTooLargeError(ValueError):
+    """Raised when a streamed asset exceeds the size allowed for it"""
+
+
+class Asset(NamedTuple):
+    """
+    Asset held by a store
+
+    Args:
+        key (str): Content hash of the asset, followed by the extension of its media type
+        size (int): Size of the asset, in bytes
+        modified (float): Time the asset was stored, as a POSIX timestamp
+    """
+
+    key: str
+    size: int
+    modified: float
+
+    @property
+    def media_type(self) -> str:
+        """Media type of the asset, from the extension of its key"""
+        return asset_media_type(self.key)
+
+
+def asset_key(digest: str, media_type: str) -> str:
+    """
+    Build the key of an asset
+
+    Args:
+        digest (str): Hex SHA-256 of the content of the asset
+        media_type (str): Media type of the asset, one of ASSET_MEDIA_TYPES
+
+    Returns:
+        str: The key
+    """
+    return f"{digest}.{ASSET_EXTENSIONS[media_type]}"
+
+
+def asset_media_type(key: str) -> str:
+    """
+    Find the media type of an asset from its key
+
+    Args:
+        key (str): Key of the asset
+
+    Returns:
+        str: The media type
+    """
+    return ASSET_MEDIA_TYPES[key.rpartition(".")[2]]
+
+
+def _check_ref_name(name: str) -> None:
+    # Names end up in paths and object keys
+    if REF_NAME_PATTERN.fullmatch(name) is None:
+        raise ValueError(f"Invalid reference name: {name!r}")
+
+
+class AssetStore(abc.ABC):
+    """Store of content addressed assets"""
+
+    async def start(self) -> None:
+        """Prepare the store, on startup"""
+
+    async def close(self) -> None:
+        """Release the resources of the store, on shutdown"""
+
+    async def put(self, content: bytes, media_type: str) -> Asset:
+        """
+        Store an asset, unless an asset with the same content is already stored
+
+        Args:
+            content (bytes): Content of the asset
+            media_type (str): Media type of the asset, one of ASSET_MEDIA_TYPES
+
+        Returns:
+            Asset: The stored asset
+        """
+        key = asset_key(hashlib.sha256(content).hexdigest(), media_type)
+        asset = await self.stat(key)
+        if asset is None:
+            asset = await self._write(key, content)
+        return asset
+
+    @abc.abstractmethod
+    async def _write(self, key: str, content: bytes) -> Asset:
+        """Write an asset which is not stored yet"""
+
+    @abc.abstractmethod
+    async def put_stream(
+        self, chunks: AsyncIterable[bytes], media_type: str, max_bytes: int
+    ) -> Asset:
+        """
+        Store an asset received in chunks, without holding all of it in memory, unless an asset with the
+        same content is already stored. Nothing is stored if the chunks fail or exceed max_bytes.
+
+        Args:
+            chunks (AsyncIterable[bytes]): Content of the asset
+            media_type (str): Media type of the asset, one of ASSET_MEDIA_TYPES
+            max_bytes (int): Maximum size of the asset
+
+        Returns:
+            Asset: The stored asset
+
+        Raises:
+            AssetTooLargeError: If the content exceeds max_bytes
+        """
+
+    @abc.abstractmethod
+    async def stat(self, key: str) -> Asset | None:
+        """
+        Look up an asset
+
+        Args:
+            key (str): Key of the asset
+
+        Returns:
+            Asset | None: The asset, or None if it is not stored
+        """
+
+    @abc.abstractmethod
+    async def read(self, key: str) -> bytes | None:
+        """
+        Read the content of an asset
+
+        Args:
+            key (str): Key of the asset
+
+        Returns:
+            bytes | None: The content, or None if the asset is not stored
+        """
+
+    @abc.abstractmethod
+    async def response(
+        self,
+        asset: Asset,
+        headers: dict[str, str],
+        byte_range: ByteRange | None = None,
+    ) -> Response | None:
+        """
+        Build the response serving an asset, or a range of it as a 206 Partial Content response, with its
+        Content-Type and Content-Length
+
+        Args:
+            asset (Asset): The asset, as looked up by stat
+            headers (dict[str, str]): Other headers of the response
+            byte_range (ByteRange | None, optional): Range of the asset to serve. Defaults to None, for the whole asset.
+
+        Returns:
+            Response | None: The response, or None if the asset is not stored
+        """
+
+    @abc.abstractmethod
+    async def get_ref(self, name: str) -> str | None:
+        """
+        Read a reference
+
+        Args:
+            name (str): Name of the reference, a hex SHA-256
+
+        Returns:
+            str | None: The key of the asset it points to, or None if there is no such reference
+        """
+
+    @abc.abstractmethod
+    async def set_ref(self, name: str, key: str) -> None:
+        """
+        Point a reference to an asset
+
+        Args:
+            name (str): Name of the reference, a hex SHA-256
+            key (str): Key of the asset
+        """
+
+
+class ZeroCopyFileResponse(FileResponse):
+    """
+    File response handing the file over to the server when it supports it, through the zerocopysend ASGI
+    extension for the server to sendfile its descriptor to the socket, or through the pathsend extension.
+    Otherwise the file is read and sent in chunks.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensions = scope.get("extensions") or {}
+        if (
+            "http.response.zerocopysend" not in extensions
+            or scope["method"].upper() == "HEAD"
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        file = await asyncio.to_thread(open, self.path, "rb")
+        with file:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": self.raw_headers,
+                }
+            )
+            await send({"type": "http.response.zerocopysend", "file": file})
+        if self.background is not None:
+            await self.background()
+
+
+class MappedRangeResponse(Response):
+    """
+    206 Partial Content response serving a range of a file. The range is handed over to the server along
+    with the file through the zerocopysend ASGI extension when it supports it. Otherwise only the range is
+    mapped in memory, its pages being read ahead by the kernel, and sent in chunks sliced from the mapping
+    without going through the buffers of a file object.
+
+    Args:
+        path (Path): Path of the file
+        byte_range (ByteRange): Range of the file to send
+        size (int): Size of the file
+        headers (dict[str, str]): Other headers of the response
+        media_type (str): Media type of the file
+    """
+
+    chunk_size = ASSET_STREAM_CHUNK_SIZE
+
+    def __init__(
+        self,
+        path: Path,
+        byte_range: ByteRange,
+        size: int,
+        headers: dict[str, str],
+        media_type: str,
+    ) -> None:
+        self.path = path
+        self.byte_range = byte_range
+        self.status_code = 206
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(
+            {
+                **headers,
+                "Content-Length": str(byte_range.length),
+                "Content-Range": byte_range.content_range(size),
+            }
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.raw_headers,
+            }
+        )
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        start, end = self.byte_range
+        file = await asyncio.to_thread(open, self.path, "rb")
+        with file:
+            if "http.response.zerocopysend" in (scope.get("extensions") or {}):
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file,
+                        "offset": start,
+                        "count": self.byte_range.length,
+                    }
+                )
+                return
+
+            # Mappings start on a page boundary
+            offset = start - start % mmap.ALLOCATIONGRANULARITY
+            with mmap.mmap(
+                file.fileno(),
+                end + 1 - offset,
+                access=mmap.ACCESS_READ,
+                offset=offset,
+            ) as mapped:
+                if hasattr(mmap, "MADV_WILLNEED"):
+                    mapped.madvise(mmap.MADV_WILLNEED)
+                for position in range(
+                    start - offset, end + 1 - offset, self.chunk_size
+                ):
+                    await send(
+                        {
+                            "type": "http.response.body",
+                            "body": mapped[position : position + self.chunk_size],
+                            "more_body": True,
+                        }
+                    )
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class FilesystemAssetStore(AssetStore):
+    """
+    Assets kept in a directory of the local filesystem, for a single host.
+
+    Assets are written to a temporary file of the store, synced, then renamed to their key, so that an
+    asset is either entirely there or not at all, even across a crash. Assets are served from their file
+    with ZeroCopyFileResponse, and ranges of them with MappedRangeResponse. File operations run in threads,
+    off the event loop.
+
+    Args:
+        root (str | Path): Directory of the store, created on the first write
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        # Spread over 256 directories, which keeps the directories small
+        return self.root / "objects" / key[:2] / key
+
+    def _ref_path(self, name: str) -> Path:
+        _check_ref_name(name)
+        return self.root / "refs" / name[:2] / name
+
+    def _temporary(self) -> tuple[BinaryIO, str]:
+        directory = self.root / "tmp"
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory)
+        return os.fdopen(fd, "wb"), path
+
+    @staticmethod
+    def _commit(
+        file: BinaryIO, temporary: str, path: Path, overwrite: bool = False
+    ) -> os.stat_result:
+        """Sync and close a temporary file, then move it to its path, unless it exists and is not overwritten"""
+        try:
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+            if path.exists() and not overwrite:
+                os.unlink(temporary)
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temporary, path)
+        except BaseException:
+            FilesystemAssetStore._discard(file, temporary)
+            raise
+        return path.stat()
+
+    @staticmethod
+    def _discard(file: BinaryIO, temporary: str) -> None:
+        file.close()
+        try:
+            os.unlink(temporary)
+        except FileNotFoundError:
+            pass
+
+    def _write_file(
+        self, path: Path, content: bytes, overwrite: bool = False
+    ) -> os.stat_result:
+        file, temporary = self._temporary()
+        try:
+            file.write(content)
+        except BaseException:
+            self._discard(file, temporary)
+            raise
+        return self._commit(file, temporary, path, overwrite)
+
+    async def _write(self, key: str, content: bytes) -> Asset:
+        result = await asyncio.to_thread(self._write_file, self._path(key), content)
+        return Asset(key, result.st_size, result.st_mtime)
+
+    async def put_stream(
+        self, chunks: AsyncIterable[bytes], media_type: str, max_bytes: int
+    ) -> Asset:
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        file, temporary = await asyncio.to_thread(self._temporary)
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AssetTooLargeError(
+                        f"Asset exceeds the limit of {max_bytes} bytes"
+                    )
+                digest.update(chunk)
+                buffer += chunk
+                # Written by blocks, a thread per chunk of the request would cost more than the writes
+                if len(buffer) >= ASSET_WRITE_BUFFER_BYTES:
+                    await asyncio.to_thread(file.write, buffer)
+                    buffer = bytearray()
+            await asyncio.to_thread(file.write, buffer)
+        except BaseException:
+            await asyncio.to_thread(self._discard, file, temporary)
+            raise
+
+        key = asset_key(digest.hexdigest(), media_type)
+        result = await asyncio.to_thread(self._commit, file, temporary, self._path(key))
+        return Asset(key, result.st_size, result.st_mtime)
+
+    def _stat(self, key: str) -> os.stat_result | None:
+        try:
+            return self._path(key).stat()
+        except FileNotFoundError:
+            return None
+
+    async def stat(self, key: str) -> Asset | None:
+        result = await asyncio.to_thread(self._stat, key)
+        return None if result is None else Asset(key, result.st_size, result.st_mtime)
+
+    async def read(self, key: str) -> bytes | None:
+        try:
+            return await asyncio.to_thread(self._path(key).read_bytes)
+        except FileNotFoundError:
+            return None
+
+    async def response(
+        self,
+        asset: Asset,
+        headers: dict[str, str],
+        byte_range: ByteRange | None = None,
+    ) -> Response | None:
+        path = self._path(asset.key)
+        if byte_range is not None:
+            return MappedRangeResponse(
+                path, byte_range, asset.size, headers, asset.media_type
+            )
+        # Stated again when sent, the headers set here taking precedence over those of the stat
+        return ZeroCopyFileResponse(
+            path,
+            headers={**headers, "Content-Length": str(asset.size)},
+            media_type=asset.media_type,
+        )
+
+    async def get_ref(self, name: str) -> str | None:
+        try:
+            return await asyncio.to_thread(self._ref_path(name).read_text)
+        except FileNotFoundError:
+            return None
+
+    async def set_ref(self, name: str, key: str) -> None:
+        # Unlike assets, references are overwritten, the rename replacing them at once for their readers
+        await asyncio.to_thread(
+            self._write_file, self._ref_path(name), key.encode(), True
+        )
+
+
+def _is_not_found(error: Exception) -> bool:
+    """Whether an error of the S3 client reports a missing object, without importing botocore"""
+    response = getattr(error, "response", None)
+    if not isinstance(response, dict):
+        return False
+    return response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class S3AssetStore(AssetStore):
+    """
+    Assets kept in an S3 compatible object storage, shared by the workers and by the hosts.
+
+    Objects are only ever visible once entirely written, as S3 guarantees. Streamed assets whose content
+    hash is only known at the end are uploaded by parts under a temporary key, holding a single part in
+    memory, then copied under their key by the storage itself; those fitting in a part are written straight
+    under their key. Assets, and ranges of them, are streamed from the storage to the clients.
+
+    Args:
+        client (Any): Async context manager of an asynchronous S3 client, such as the one created by
+            aiobotocore's AioSession.create_client, entered on startup and exited on shutdown
+        bucket (str): Bucket of the assets
+        prefix (str): Prefix of the keys of the assets in the bucket
+        part_size (int, optional): Size of the parts of the multipart uploads. Defaults to ASSET_S3_PART_SIZE.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        prefix: str,
+        part_size: int = ASSET_S3_PART_SIZE,
+    ) -> None:
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = part_size
+        self.client: Any = None
+        self._client_context = client
+        self._exit_stack = AsyncExitStack()
+
+    async def start(self) -> None:
+        self.client = await self._exit_stack.enter_async_context(self._client_context)
+
+    async def close(self) -> None:
+        await self._exit_stack.aclose()
+
+    async def _head(self, key: str) -> dict[str, Any] | None:
+        try:
+            return await self.client.head_object(
+                Bucket=self.bucket, Key=self.prefix + key
+            )
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+    async def _get(self, key: str, **kwargs: Any) -> dict[str, Any] | None:
+        try:
+            return await self.client.get_object(
+                Bucket=self.bucket, Key=self.prefix + key, **kwargs
+            )
+        except Exception as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+    async def _write(self, key: str, content: bytes) -> Asset:
+        await self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.prefix + key,
+            Body=content,
+            ContentType=asset_media_type(key),
+        )
+        return Asset(key, len(content), time.time())
+
+    async def put_stream(
+        self, chunks: AsyncIterable[bytes], media_type: str, max_bytes: int
+    ) -> Asset:
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        temporary = f"{self.prefix}uploads/{uuid.uuid4().hex}"
+        upload_id: str | None = None
+        parts: list[dict[str, Any]] = []
+
+        async def upload_part() -> None:
+            part = await self.client.upload_part(
+                Bucket=self.bucket,
+                Key=temporary,
+                UploadId=upload_id,
+                PartNumber=len(parts) + 1,
+                Body=bytes(buffer),
+            )
+            parts.append({"ETag": part["ETag"], "PartNumber": len(parts) + 1})
+
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AssetTooLargeError(
+                        f"Asset exceeds the limit of {max_bytes} bytes"
+                    )
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload = await self.client.create_multipart_upload(
+                            Bucket=self.bucket, Key=temporary, ContentType=media_type
+                        )
+                        upload_id = upload["UploadId"]
+                    await upload_part()
+                    buffer = bytearray()
+
+            key = asset_key(digest.hexdigest(), media_type)
+            if upload_id is None:
+                return await self.put(bytes(buffer), media_type)
+
+            if buffer:
+                await upload_part()
+            await self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=temporary,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            if upload_id is not None:
+                await self.client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=temporary, UploadId=upload_id
+                )
+            raise
+
+        try:
+            asset = await self.stat(key)
+            if asset is None:
+                await self.client.copy_object(
+                    Bucket=self.bucket,
+                    Key=self.prefix + key,
+                    CopySource={"Bucket": self.bucket, "Key": temporary},
+                    ContentType=media_type,
+                    MetadataDirective="REPLACE",
+                )
+                asset = Asset(key, size, time.time())
+        finally:
+            await self.client.delete_object(Bucket=self.bucket, Key=temporary)
+        return asset
+
+    async def stat(self, key: str) -> Asset | None:
+        head = await self._head(key)
+        if head is None:
+            return None
+        return Asset(key, head["ContentLength"], head["LastModified"].timestamp())
+
+    async def read(self, key: str) -> bytes | None:
+        response = await self._get(key)
+        if response is None:
+            return None
+        body = response["Body"]
+        try:
+            return await body.read()
+        finally:
+            body.close()
+
+    async def response(
+        self,
+        asset: Asset,
+        headers: dict[str, str],
+        byte_range: ByteRange | None = None,
+    ) -> Response | None:
+        headers = {**headers, "Content-Length": str(asset.size)}
+        if byte_range is None:
+            response = await self._get(asset.key)
+        else:
+            # Only the range is fetched from the storage
+            response = await self._get(
+                asset.key, Range=f"bytes={byte_range.start}-{byte_range.end}"
+            )
+            headers["Content-Length"] = str(byte_range.length)
+            headers["Content-Range"] = byte_range.content_range(asset.size)
+        if response is None:
+            return None
+
+        body = response["Body"]
+        return StreamingResponse(
+            body.iter_chunks(ASSET_STREAM_CHUNK_SIZE),
+            status_code=200 if byte_range is None else 206,
+            media_type=asset.media_type,
+            headers=headers,
+            background=BackgroundTask(body.close),
+        )
+
+    async def get_ref(self, name: str) -> str | None:
+        _check_ref_name(name)
+        response = await self._get(f"refs/{name}")
+        if response is None:
+            return None
+        body = response["Body"]
+        try:
+            return (await body.read()).decode()
+        finally:
+            body.close()
+
+    async def set_ref(self, name: str, key: str) -> None:
+        _check_ref_name(name)
+        await self.client.put_object(
+            Bucket=self.bucket, Key=f"{self.prefix}refs/{name}", Body=key.encode()
+        )
+
+
+def create_asset_store(
+    path: str, s3_bucket: str | None, s3_endpoint_url: str | None, s3_prefix: str
+) -> AssetStore:
+    """
+    Create the asset store: in an S3 compatible storage if a bucket is configured, on the local filesystem otherwise
+
+    Args:
+        path (str): Directory of the filesystem store
+        s3_bucket (str | None): Bucket of the S3 store, None for the filesystem store
+        s3_endpoint_url (str | None): Endpoint of the S3 compatible storage, None for AWS
+        s3_prefix (str): Prefix of the keys of the assets in the bucket
+
+    Returns:
+        AssetStore: The store
+    """
+    if s3_bucket is None:
+        return FilesystemAssetStore(path)
+
+    # Only required by deployments sharing the assets between hosts
+    from aiobotocore.session import get_session
+
+    client = get_session().create_client("s3", endpoint_url=s3_endpoint_url)
+    return S3AssetStore(client, s3_bucket, s3_prefix)
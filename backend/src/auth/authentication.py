@@ -5,7 +5,7 @@ from src.auth.jwt import get_jwt_strategy
 
 
 # Register the Transport Scheme as a BearerTransport object with the tokenUrl set to the login endpoint
-bearer_transport = BearerTransport(tokenUrl="/login")
+bearer_transport = BearerTransport(tokenUrl="auth/login")
 
 # Create an instance of the AuthenticationBackend class with the JWTStrategy object as a dependency
 auth_backend = AuthenticationBackend(
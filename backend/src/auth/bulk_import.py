@@ -0,0 +1,214 @@
+"""
+Bulk import of users: validation of the uploaded rows, hashing of their passwords in a process pool and
+insertion through COPY.
+
+Rows are validated one at a time and grouped in chunks. The passwords of a chunk are hashed by a single
+job of a pool of worker processes, a bounded window of chunks being hashed at once. Hashed chunks are
+written in order: the chunk is copied into a temporary staging table, created by the transaction of the
+chunk and dropped on its commit, then moved to the user table by a single INSERT ... SELECT ... ON CONFLICT
+DO NOTHING, so that the rows whose email or username is taken are skipped and reported rather than failing
+the chunk. Each chunk is committed on its own.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import uuid
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO
+
+from pydantic import ValidationError
+from sqlalchemy import Column, Integer, MetaData, Table, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateTable
+
+from src.auth.config import USER_IMPORT_CHUNK_SIZE, USER_IMPORT_HASH_WORKERS
+from src.auth.hashing import hash_passwords
+from src.auth.models import User
+from src.auth.password_policy import password_policy
+from src.auth.schemas import UserCreate
+from src.database import copy_records
+from src.uploads import UploadFormat, format_validation_error, iter_records
+
+# Reasons reported for the rows conflicting with an existing user, or with a previous row of the import
+USERNAME_TAKEN_MESSAGE = "Username already exists"
+EMAIL_TAKEN_MESSAGE = "Email already exists"
+
+# Columns of the user table, filled by the import
+USER_TABLE_COLUMNS: tuple[str, ...] = tuple(User.__table__.columns.keys())
+
+# Staging table receiving the COPY of each chunk. It is temporary, private to the connection, and kept
+# out of the metadata of the models so that migrations ignore it. It is dropped on commit: a session
+# returns its connection to the pool on commit, and the next chunk may be written on another connection
+user_import_table = Table(
+    "user_import",
+    MetaData(),
+    Column("row_number", Integer, nullable=False),
+    *(Column(column.name, column.type) for column in User.__table__.columns),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+
+def iter_import_rows(
+    file: BinaryIO, upload_format: UploadFormat
+) -> Iterator[tuple[int, dict[str, Any] | str]]:
+    """
+    Parse and validate the rows of an import with the UserCreate schema and the password policy,
+    one row at a time.
+
+    Only the fields a user may set on registration are kept, imported users are active, unverified
+    and never superusers.
+
+    Args:
+        file (BinaryIO): The import body
+        upload_format (UploadFormat): Format of the body
+
+    Yields:
+        tuple[int, dict[str, Any] | str]: Row number along with the fields of the user, or the reason the row is invalid
+    """
+    for row_number, record in enumerate(iter_records(file, upload_format), start=1):
+        if isinstance(record, str):
+            yield row_number, record
+            continue
+        try:
+            user = UserCreate.model_validate(record)
+        except ValidationError as e:
+            yield row_number, format_validation_error(e)
+            continue
+
+        violations = password_policy.violations(
+            user.password, user.email, user.username, user.name
+        )
+        if violations:
+            yield row_number, "; ".join(violations)
+        else:
+            yield row_number, user.create_update_dict()
+
+
+async def _write_chunk(
+    session: AsyncSession,
+    chunk: list[tuple[int, dict[str, Any]]],
+    hashed_passwords: list[str],
+) -> list[tuple[int, str]]:
+    staging = user_import_table.c
+    records = []
+    for (row_number, user), hashed_password in zip(chunk, hashed_passwords):
+        values = {
+            **user,
+            "row_number": row_number,
+            "id": uuid.uuid4(),
+            "hashed_password": hashed_password,
+            "is_active": True,
+            "is_superuser": False,
+            "is_verified": False,
+        }
+        records.append(tuple(values[column] for column in staging.keys()))
+
+    # The table is left over by the previous chunk when the session commits into an enclosing transaction,
+    # truncated rather than deleted from as autovacuum does not clean up temporary tables
+    await session.execute(CreateTable(user_import_table, if_not_exists=True))
+    await session.execute(text(f"TRUNCATE {user_import_table.name}"))
+    await copy_records(session, user_import_table.name, staging.keys(), records)
+
+    # Duplicates within the chunk are inserted in the order of the rows, the first occurrence wins
+    await session.execute(
+        insert(User.__table__)
+        .from_select(
+            USER_TABLE_COLUMNS,
+            select(*(staging[column] for column in USER_TABLE_COLUMNS)).order_by(
+                staging.row_number
+            ),
+        )
+        .on_conflict_do_nothing()
+    )
+    skipped = await session.execute(
+        select(
+            staging.row_number,
+            select(User.id).where(User.username == staging.username).exists(),
+        )
+        .where(~select(User.id).where(User.id == staging.id).exists())
+        .order_by(staging.row_number)
+    )
+    rejects = [
+        (row_number, USERNAME_TAKEN_MESSAGE if username_taken else EMAIL_TAKEN_MESSAGE)
+        for row_number, username_taken in skipped
+    ]
+
+    await session.commit()
+    return rejects
+
+
+async def import_users(
+    rows: Iterable[tuple[int, dict[str, Any] | str]],
+    session: AsyncSession,
+    on_reject: Callable[[int, str], None],
+    max_workers: int | None = USER_IMPORT_HASH_WORKERS,
+    chunk_size: int = USER_IMPORT_CHUNK_SIZE,
+) -> int:
+    """
+    Import users in bulk. Invalid and conflicting rows are reported and skipped, the other rows are
+    imported. The chunks committed before a failure stay imported.
+
+    Args:
+        rows (Iterable[tuple[int, dict[str, Any] | str]]): Rows of the import, as yielded by iter_import_rows
+        session (AsyncSession): Session of the database to import the users into
+        on_reject (Callable[[int, str], None]): Called with the row number and the reason of every rejected row
+        max_workers (int | None, optional): Processes hashing the passwords, None uses one per CPU. Defaults to USER_IMPORT_HASH_WORKERS.
+        chunk_size (int, optional): Rows hashed per process pool job and written per transaction. Defaults to USER_IMPORT_CHUNK_SIZE.
+
+    Returns:
+        int: Number of users created
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    pending: deque[tuple[list[tuple[int, dict[str, Any]]], asyncio.Future]] = deque()
+    imported = 0
+
+    def submit(chunk: list[tuple[int, dict[str, Any]]]) -> None:
+        passwords = [user["password"] for _, user in chunk]
+        pending.append(
+            (chunk, loop.run_in_executor(executor, hash_passwords, passwords))
+        )
+
+    async def write_oldest() -> None:
+        nonlocal imported
+        chunk, hashing = pending.popleft()
+        rejects = await _write_chunk(session, chunk, await hashing)
+        imported += len(chunk) - len(rejects)
+        for row_number, error in rejects:
+            on_reject(row_number, error)
+
+    try:
+        chunk: list[tuple[int, dict[str, Any]]] = []
+        for row_number, user in rows:
+            if isinstance(user, str):
+                on_reject(row_number, user)
+                continue
+
+            chunk.append((row_number, user))
+            if len(chunk) < chunk_size:
+                continue
+
+            submit(chunk)
+            chunk = []
+            # One chunk more than there are processes is hashed at once, keeping them busy while a chunk is written
+            if len(pending) > max_workers:
+                await write_oldest()
+
+        if chunk:
+            submit(chunk)
+        while pending:
+            await write_oldest()
+    finally:
+        for _, hashing in pending:
+            hashing.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return imported
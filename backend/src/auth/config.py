@@ -5,3 +5,29 @@ from src.config import settings
 SECRET_KEY = settings.SECRET_KEY
 JWT_ALGORITHM: str = "HS256"
 JWT_LIFETIME_SECONDS: int = 3600  # 1 hour
+JWT_CACHE_MAX_ENTRIES: int = settings.JWT_CACHE_MAX_ENTRIES
+# Verified tokens are reused for at most this long, bounding how stale a worker's copy of a user can be
+# when the user was changed by another worker
+JWT_CACHE_TTL_SECONDS: int = 60
+
+# Size of the thread pool computing the password hashes off the event loop, None uses one thread per CPU
+PASSWORD_HASH_WORKERS: int | None = settings.PASSWORD_HASH_WORKERS
+# Hashes allowed to run at once, the other requests wait for their turn, None allows one per thread
+PASSWORD_HASH_MAX_CONCURRENT: int | None = settings.PASSWORD_HASH_MAX_CONCURRENT
+
+# Password policy, applied on registration, password updates and bulk imports
+PASSWORD_MIN_LENGTH: int = settings.PASSWORD_MIN_LENGTH
+PASSWORD_REQUIRE_UPPERCASE: bool = settings.PASSWORD_REQUIRE_UPPERCASE
+PASSWORD_REQUIRE_DIGIT: bool = settings.PASSWORD_REQUIRE_DIGIT
+# One of these characters is required, an empty string disables the rule
+PASSWORD_SPECIAL_CHARACTERS: str = settings.PASSWORD_SPECIAL_CHARACTERS
+# Reject passwords containing the email, username or name of the user, regardless of case
+PASSWORD_FORBID_PERSONAL_INFO: bool = settings.PASSWORD_FORBID_PERSONAL_INFO
+
+# Size of the process pool hashing the passwords of a bulk import, None uses one process per CPU
+USER_IMPORT_HASH_WORKERS: int | None = settings.USER_IMPORT_HASH_WORKERS
+# Rows hashed per process pool job and copied to the database per transaction
+USER_IMPORT_CHUNK_SIZE: int = settings.USER_IMPORT_CHUNK_SIZE
+USER_IMPORT_MAX_BODY_BYTES: int = settings.USER_IMPORT_MAX_BODY_BYTES
+# Rejected rows listed in the response of the import endpoint, the others are only counted
+USER_IMPORT_MAX_REPORTED_REJECTS: int = 1000
@@ -1,6 +1,6 @@
 """Authentication and User Management specific dependencies"""
 
-from typing import Annotated
+from typing import Annotated, Any
 from uuid import UUID
 
 
@@ -8,12 +8,21 @@ from fastapi import Depends
 from fastapi_users.db import SQLAlchemyUserDatabase
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.sql import Select
-from sqlalchemy import select
+from sqlalchemy import func, or_, select
 
 from src.database import get_async_session
+from src.auth.config import PASSWORD_HASH_MAX_CONCURRENT, PASSWORD_HASH_WORKERS
+from src.auth.hashing import PasswordHashingExecutor
 from src.auth.models import User
 from src.auth.service import UserManager
+from src.metrics.dependencies import span
+
+# Password hashing executor of the worker, started and stopped by the application lifespan
+password_hashing = PasswordHashingExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, max_concurrent=PASSWORD_HASH_MAX_CONCURRENT
+)
 
 
 class CustomSQLAlchemyUserDatabase(SQLAlchemyUserDatabase[User, UUID]):
@@ -21,11 +30,40 @@ class CustomSQLAlchemyUserDatabase(SQLAlchemyUserDatabase[User, UUID]):
     Custom User Database adapter for SQLAlchemy, extending the SQLAlchemyUserDatabase class from fastapi_users
     for custom user operations:
         - get_by_username: Get a user by their username
+        - get_conflicting: Get a user holding the email or the username of a new user
+        - create_if_unique: Create a user in a single statement, unless their email or username is taken
+
+    Every database call is timed as a user_db.<operation> stage.
 
     Args:
         SQLAlchemyUserDatabase (SQLAlchemyUserDatabase): Base class for the User Database adapter
     """
 
+    async def get(self, id: UUID) -> User | None:
+        """Get a user by their ID"""
+        with span("user_db.get"):
+            return await super().get(id)
+
+    async def get_by_email(self, email: str) -> User | None:
+        """Get a user by their email, regardless of case"""
+        with span("user_db.get_by_email"):
+            return await super().get_by_email(email)
+
+    async def create(self, create_dict: dict[str, Any]) -> User:
+        """Create a user"""
+        with span("user_db.create"):
+            return await super().create(create_dict)
+
+    async def update(self, user: User, update_dict: dict[str, Any]) -> User:
+        """Update the fields of a user"""
+        with span("user_db.update"):
+            return await super().update(user, update_dict)
+
+    async def delete(self, user: User) -> None:
+        """Delete a user"""
+        with span("user_db.delete"):
+            await super().delete(user)
+
     async def get_by_username(self, username: str) -> User | None:
         """
         Get a user by their username
@@ -37,7 +75,56 @@ class CustomSQLAlchemyUserDatabase(SQLAlchemyUserDatabase[User, UUID]):
             User | None: The user with the given username, or None if no user is found
         """
         statement: Select[tuple[User]] = select(User).where(User.username == username)
-        return await self._get_user(statement)  # type: ignore
+        with span("user_db.get_by_username"):
+            return await self._get_user(statement)  # type: ignore
+
+    async def get_conflicting(self, email: str, username: str) -> User | None:
+        """
+        Get a user holding the email, regardless of case, or the username of a new user, in a single
+        lookup, to report which field is taken once create_if_unique skipped the user. The user holding
+        the username is preferred when both are taken.
+
+        Args:
+            email (str): Email of the new user
+            username (str): Username of the new user
+
+        Returns:
+            User | None: A user holding the email or the username, or None if both are free
+        """
+        statement: Select[tuple[User]] = (
+            select(User)
+            .where(
+                or_(
+                    func.lower(User.email) == func.lower(email),
+                    User.username == username,
+                )
+            )
+            .order_by((User.username == username).desc())
+            .limit(1)
+        )
+        with span("user_db.get_conflicting"):
+            return await self._get_user(statement)  # type: ignore
+
+    async def create_if_unique(self, create_dict: dict[str, Any]) -> User | None:
+        """
+        Create a user with a single INSERT ... ON CONFLICT DO NOTHING RETURNING statement, relying on
+        the unique constraint of the username and the unique indexes of the email (ix_user_email, and
+        ix_user_email_lower for case-insensitive duplicates) instead of looking duplicates up beforehand,
+        so that concurrent registrations cannot race past the checks.
+
+        Args:
+            create_dict (dict[str, Any]): Column values of the user to create
+
+        Returns:
+            User | None: The created user, or None if the email or the username is already taken
+        """
+        statement = (
+            insert(User).values(**create_dict).on_conflict_do_nothing().returning(User)
+        )
+        with span("user_db.create_if_unique"):
+            user = (await self.session.scalars(statement)).one_or_none()
+            await self.session.commit()
+        return user
 
 
 async def get_user_db(
@@ -55,15 +142,28 @@ async def get_user_db(
     yield CustomSQLAlchemyUserDatabase(async_session, User)
 
 
+def get_password_hashing() -> PasswordHashingExecutor:
+    """
+    Dependency that provides the password hashing executor of the worker
+
+    Returns:
+        PasswordHashingExecutor: The password hashing executor shared by the requests of the worker
+    """
+    return password_hashing
+
+
 async def get_user_manager(
     user_db: Annotated[CustomSQLAlchemyUserDatabase, Depends(get_user_db)],
+    hashing: Annotated[PasswordHashingExecutor, Depends(get_password_hashing)],
 ):
     """
     Dependency that creates the UserManager instance for the User model, which will later be injected at runtime
 
     Args:
         user_db (SQLAlchemyUserDatabase[User], optional): User database adapter, injected by the get_user_db dependency. Defaults to Depends(get_user_db).
+        hashing (PasswordHashingExecutor): Password hashing executor, injected by the get_password_hashing dependency
 
     Yields:
+        UserManager: UserManager instance hashing passwords with the given executor
     """
-    yield UserManager(user_db)
+    yield UserManager(user_db, hashing)
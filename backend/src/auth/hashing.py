@@ -0,0 +1,83 @@
+"""Thread pool backed password hashing, keeping the CPU bound hash computations off the event loop"""
+
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar
+
+from fastapi_users.password import PasswordHelper
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class PasswordHashingExecutor:
+    """
+    Executor running password hashes and verifications in a pool of threads.
+
+    argon2 and bcrypt release the GIL while hashing, so threads hash in parallel while the event loop
+    keeps serving requests. The number of hashes running at once is capped, the other callers wait for
+    their turn on the event loop rather than piling up in the queue of the thread pool.
+    """
+
+    def __init__(
+        self, max_workers: int | None = None, max_concurrent: int | None = None
+    ) -> None:
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        self.max_concurrent: int = max_concurrent or self.max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def start(self) -> None:
+        """Start the thread pool"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hashing"
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+    def shutdown(self) -> None:
+        """Stop the thread pool, waiting for the running hashes to complete"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+    async def run(self, func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        """
+        Run a hashing function in the thread pool, once fewer than max_concurrent hashes are running
+
+        Args:
+            func (Callable[P, R]): Function to run, such as the hash method of a password helper
+            *args, **kwargs: Arguments of the function
+
+        Returns:
+            R: The value returned by the function
+
+        Raises:
+            RuntimeError: If the executor is not started
+        """
+        if self._executor is None or self._semaphore is None:
+            raise RuntimeError("The password hashing executor is not started")
+
+        executor = self._executor
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, lambda: func(*args, **kwargs)
+            )
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hash a list of passwords with the default password helper, meant to run in the worker processes
+    of a bulk import so that a whole chunk of rows is shipped to a process at once
+
+    Args:
+        passwords (list[str]): Passwords to hash
+
+    Returns:
+        list[str]: Hashes of the passwords, in the same order
+    """
+    password_helper = PasswordHelper()
+    return [password_helper.hash(password) for password in passwords]
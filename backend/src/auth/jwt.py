@@ -1,21 +1,255 @@
 """Module containing the JWT token generation and verification functions."""
 
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from uuid import UUID
+
+import jwt
+from fastapi_users import BaseUserManager, exceptions
 from fastapi_users.authentication import JWTStrategy
-from src.auth.config import SECRET_KEY, JWT_ALGORITHM, JWT_LIFETIME_SECONDS
+from fastapi_users.jwt import decode_jwt
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from src.auth.config import (
+    JWT_ALGORITHM,
+    JWT_CACHE_MAX_ENTRIES,
+    JWT_CACHE_TTL_SECONDS,
+    JWT_LIFETIME_SECONDS,
+    SECRET_KEY,
+)
 from src.auth.models import User
-from uuid import UUID
+from src.metrics.dependencies import span
+
+# Column attributes of the User model, snapshotted by the token cache
+USER_COLUMNS: tuple[str, ...] = tuple(attr.key for attr in inspect(User).column_attrs)
+
+
+class VerifiedTokenCache:
+    """
+    Bounded cache of verified tokens, mapping each token to a snapshot of the columns of its user.
+
+    Entries expire after a TTL and never outlive the expiration claim of their token. The least recently
+    used entry is evicted once the cache is full. Tokens are also indexed by user, so that every token
+    of a user can be invalidated when the user changes.
+
+    The cache is only accessed from the event loop, it is not thread-safe.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._tokens_by_user: dict[UUID, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        """
+        Get the user snapshot of a token, if the token was verified and its entry is still fresh
+
+        Args:
+            token (str): The bearer token
+
+        Returns:
+            dict[str, Any] | None: Column values of the user, or None on a cache miss
+        """
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.time():
+            self.invalidate(token)
+            return None
+
+        self._entries.move_to_end(token)
+        return user
+
+    def set(self, token: str, user: dict[str, Any], expires_at: float) -> None:
+        """
+        Cache the user snapshot of a verified token
+
+        Args:
+            token (str): The bearer token
+            user (dict[str, Any]): Column values of the user of the token
+            expires_at (float): POSIX timestamp of the expiration of the token
+        """
+        self.invalidate(token)
+        self._entries[token] = (min(expires_at, time.time() + self.ttl_seconds), user)
+        self._tokens_by_user.setdefault(user["id"], set()).add(token)
+
+        while len(self._entries) > self.max_entries:
+            self.invalidate(next(iter(self._entries)))
+
+    def invalidate(self, token: str) -> None:
+        """
+        Drop a token from the cache
+
+        Args:
+            token (str): The bearer token
+        """
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            user_id = entry[1]["id"]
+            tokens = self._tokens_by_user[user_id]
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """
+        Drop every token of a user from the cache
+
+        Args:
+            user_id (UUID): ID of the user
+        """
+        for token in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        """Drop every token from the cache"""
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+
+class CachingJWTStrategy(JWTStrategy[User, UUID]):
+    """
+    JWTStrategy reusing the result of the token verifications.
+
+    The first request with a token decodes and verifies it, then loads its user from the database.
+    The user is cached for the following requests with the same token, which skip both the signature
+    verification and the database round trip. Every request gets its own detached copy of the user.
+    Decoding and encoding are timed as the jwt.decode and jwt.encode stages.
+
+    The cache is local to the worker. Changes made through the UserManager of the worker invalidate it
+    right away; changes made elsewhere are picked up once the cached entries expire.
+    """
+
+    def __init__(self, cache: VerifiedTokenCache, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    async def read_token(
+        self,
+        token: Optional[str],
+        user_manager: BaseUserManager[User, UUID],
+    ) -> Optional[User]:
+        """
+        Get the user of a token, from the cache or by verifying the token
+
+        Args:
+            token (Optional[str]): The bearer token
+            user_manager (BaseUserManager[User, UUID]): UserManager used to load the user on a cache miss
+
+        Returns:
+            Optional[User]: The user of the token, or None if the token is invalid or its user does not exist
+        """
+        if token is None:
+            return None
+
+        snapshot = self.cache.get(token)
+        if snapshot is not None:
+            user = User(**snapshot)
+            make_transient_to_detached(user)
+            return user
+
+        try:
+            with span("jwt.decode"):
+                data = decode_jwt(
+                    token,
+                    self.decode_key,
+                    self.token_audience,
+                    algorithms=[self.algorithm],
+                )
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+        except jwt.PyJWTError:
+            return None
+
+        try:
+            user = await user_manager.get(user_manager.parse_id(user_id))
+        except (exceptions.UserNotExists, exceptions.InvalidID):
+            return None
+
+        # Tokens issued without a lifetime do not expire, the TTL of the cache still applies
+        self.cache.set(
+            token,
+            {column: getattr(user, column) for column in USER_COLUMNS},
+            expires_at=data.get("exp", float("inf")),
+        )
+        return user
+
+    def read_user_id(self, token: str) -> Optional[UUID]:
+        """
+        Get the ID of the user of a token without loading the user, from the cache or by verifying the token.
+        Used to identify the client of a request ahead of the authentication, the user may not exist anymore.
+
+        Args:
+            token (str): The bearer token
+
+        Returns:
+            Optional[UUID]: ID of the user of the token, or None if the token is invalid
+        """
+        snapshot = self.cache.get(token)
+        if snapshot is not None:
+            return snapshot["id"]
+
+        try:
+            with span("jwt.decode"):
+                data = decode_jwt(
+                    token,
+                    self.decode_key,
+                    self.token_audience,
+                    algorithms=[self.algorithm],
+                )
+            return UUID(data["sub"])
+        except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+            return None
+
+    async def write_token(self, user: User) -> str:
+        """
+        Issue a token for a user, timed as the jwt.encode stage
+
+        Args:
+            user (User): The user to issue the token for
+
+        Returns:
+            str: The bearer token
+        """
+        with span("jwt.encode"):
+            return await super().write_token(user)
+
+    async def destroy_token(self, token: str, user: User) -> None:
+        """
+        Drop a token from the cache on logout. JWTs are stateless, the token itself stays valid
+        until it expires.
+
+        Args:
+            token (str): The bearer token
+            user (User): The user of the token
+        """
+        self.cache.invalidate(token)
+
+
+# Strategy shared by the requests of the worker, so that they share its cache of verified tokens
+jwt_strategy = CachingJWTStrategy(
+    cache=VerifiedTokenCache(JWT_CACHE_MAX_ENTRIES, JWT_CACHE_TTL_SECONDS),
+    secret=SECRET_KEY,
+    lifetime_seconds=JWT_LIFETIME_SECONDS,
+    algorithm=JWT_ALGORITHM,
+)
 
 
 def get_jwt_strategy() -> JWTStrategy[User, UUID]:
     """
-    Utility function to create a JWTStrategy object with the correct configuration, to be used as a dependency callable
+    Utility function to provide the JWTStrategy object with the correct configuration, to be used as a dependency callable
     with the fastapi_users AuthenticationBackend class
 
     Returns:
-        JWTStrategy: A JWTStrategy object with the correct auth configuration
+        JWTStrategy: The JWTStrategy object shared by the requests, caching the verified tokens
     """
-    return JWTStrategy(
-        secret=SECRET_KEY,
-        lifetime_seconds=JWT_LIFETIME_SECONDS,
-        algorithm=JWT_ALGORITHM,
-    )
+    return jwt_strategy
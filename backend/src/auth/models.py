@@ -1,6 +1,6 @@
 """Database models associated with User management"""
 
-from sqlalchemy import String
+from sqlalchemy import Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column
 from fastapi_users.db import SQLAlchemyBaseUserTableUUID
 from src.database import Base
@@ -15,5 +15,9 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
         Base (DecarativeBase): Base class for all SQLAlchemy database models
     """
 
+    # Emails are unique regardless of case, the way get_by_email compares them. Registrations rely on
+    # the index to reject duplicates, and the lookups by email of the logins use it
+    __table_args__ = (Index("ix_user_email_lower", text("lower(email)"), unique=True),)
+
     name: Mapped[str] = mapped_column(String(30), nullable=False)
     username: Mapped[str] = mapped_column(String(30), nullable=False, unique=True)
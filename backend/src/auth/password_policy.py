@@ -0,0 +1,106 @@
+"""Password policy applied to the passwords chosen on registration, password updates and bulk imports"""
+
+import re
+
+from src.auth.config import (
+    PASSWORD_FORBID_PERSONAL_INFO,
+    PASSWORD_MIN_LENGTH,
+    PASSWORD_REQUIRE_DIGIT,
+    PASSWORD_REQUIRE_UPPERCASE,
+    PASSWORD_SPECIAL_CHARACTERS,
+)
+
+PERSONAL_INFO_MESSAGE = (
+    "Password should not contain your email, username or name for security reasons"
+)
+
+
+class PasswordPolicy:
+    """
+    Reusable password policy, reporting every rule a password breaks.
+
+    The patterns are compiled and the messages formatted once, when the policy is built. Checking a
+    password lowercases it once and allocates nothing more unless it breaks a rule, so the policy is
+    cheap enough to run on every row of a bulk import.
+    """
+
+    def __init__(
+        self,
+        min_length: int = 8,
+        require_uppercase: bool = True,
+        require_digit: bool = True,
+        special_characters: str = "!@#$%^&*()_+",
+        forbid_personal_info: bool = True,
+    ) -> None:
+        """
+        Args:
+            min_length (int, optional): Minimum number of characters. Defaults to 8.
+            require_uppercase (bool, optional): Require an uppercase letter. Defaults to True.
+            require_digit (bool, optional): Require a digit. Defaults to True.
+            special_characters (str, optional): Characters of which one is required, an empty string disables the rule. Defaults to "!@#$%^&*()_+".
+            forbid_personal_info (bool, optional): Forbid the email, username or name of the user within the password, regardless of case. Defaults to True.
+        """
+        self.min_length = min_length
+        self.forbid_personal_info = forbid_personal_info
+
+        # Each rule is a compiled pattern which has to be found in the password, along with its message
+        rules: list[tuple[re.Pattern[str], str]] = []
+        if require_uppercase:
+            rules.append(
+                (
+                    re.compile(r"[A-Z]"),
+                    "Password should contain at least one uppercase letter",
+                )
+            )
+        if require_digit:
+            rules.append(
+                (re.compile(r"\d"), "Password should contain at least one digit")
+            )
+        if special_characters:
+            rules.append(
+                (
+                    re.compile(f"[{re.escape(special_characters)}]"),
+                    f"Password should contain at least one special character ({special_characters})",
+                )
+            )
+        self._rules: tuple[tuple[re.Pattern[str], str], ...] = tuple(rules)
+        self._min_length_message = (
+            f"Password should be at least {min_length} characters long"
+        )
+
+    def violations(self, password: str, *personal_info: str | None) -> tuple[str, ...]:
+        """
+        Check a password against the policy
+
+        Args:
+            password (str): The password to check
+            *personal_info (str | None): Email, username, name or other values of the user which the password should not contain, missing values are skipped
+
+        Returns:
+            tuple[str, ...]: Message of every rule the password breaks, empty if the password is valid
+        """
+        violations: tuple[str, ...] = ()
+        if len(password) < self.min_length:
+            violations += (self._min_length_message,)
+        for pattern, message in self._rules:
+            if pattern.search(password) is None:
+                violations += (message,)
+
+        if self.forbid_personal_info:
+            lowered = password.lower()
+            for value in personal_info:
+                if value and value.lower() in lowered:
+                    violations += (PERSONAL_INFO_MESSAGE,)
+                    break
+
+        return violations
+
+
+# Policy applied by the UserManager and the bulk imports
+password_policy = PasswordPolicy(
+    min_length=PASSWORD_MIN_LENGTH,
+    require_uppercase=PASSWORD_REQUIRE_UPPERCASE,
+    require_digit=PASSWORD_REQUIRE_DIGIT,
+    special_characters=PASSWORD_SPECIAL_CHARACTERS,
+    forbid_personal_info=PASSWORD_FORBID_PERSONAL_INFO,
+)
@@ -1,14 +1,25 @@
 """Core endpoints for authentication and authorization, also includes FastAPIUsers object configuration."""
 
+from typing import Annotated
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, Request
 from fastapi_users import FastAPIUsers
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.bulk_import import import_users, iter_import_rows
+from src.auth.config import USER_IMPORT_MAX_BODY_BYTES, USER_IMPORT_MAX_REPORTED_REJECTS
 from src.auth.dependencies import get_user_manager
 from src.auth.authentication import auth_backend
 from src.auth.models import User
-from src.auth.schemas import UserCreate, UserRead
+from src.auth.schemas import (
+    UserCreate,
+    UserImportReject,
+    UserImportResult,
+    UserRead,
+)
+from src.database import get_async_session
+from src.uploads import get_upload_format, spool_request_body
 
 
 # List of routers for the auth endpoints
@@ -20,7 +31,75 @@ fastapi_users = FastAPIUsers[User, UUID](
     [auth_backend],
 )
 
+# Dependencies resolving the authenticated user, used to protect endpoints of the other domains
+current_active_user = fastapi_users.current_user(active=True)
+current_superuser = fastapi_users.current_user(active=True, superuser=True)
+
 
 # Register and append all auth routes to the routers list
 register_router = fastapi_users.get_register_router(UserRead, UserCreate)
 auth_routers.append(register_router)
+
+login_router = fastapi_users.get_auth_router(auth_backend)
+auth_routers.append(login_router)
+
+import_router = APIRouter()
+
+
+@import_router.post(
+    "/users/import",
+    response_model=UserImportResult,
+    dependencies=[Depends(current_superuser)],
+)
+async def bulk_import_users(
+    request: Request,
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    content_type: Annotated[str | None, Header()] = None,
+) -> UserImportResult:
+    """
+    Import users in bulk, restricted to superusers.
+
+    The body holds one user per row, with the fields of a registration, either as NDJSON or as CSV
+    with a header line. Invalid rows and rows whose email or username is taken do not fail the import,
+    they are counted and the first USER_IMPORT_MAX_REPORTED_REJECTS of them are listed with the reason.
+    Imports of millions of rows are better run with the import_users.py script, which lists every reject.
+
+    Args:
+        request (Request): The incoming request, whose body holds the rows
+        session (AsyncSession): Database session, injected by the get_async_session dependency
+        content_type (str | None, optional): Value of the Content-Type header. Defaults to None.
+
+    Returns:
+        UserImportResult: Number of imported users, number of rejected rows and the first rejects
+
+    Raises:
+        HTTPException: 413 if the body exceeds USER_IMPORT_MAX_BODY_BYTES
+        HTTPException: 415 if the body is neither NDJSON nor CSV
+    """
+    upload_format = get_upload_format(content_type)
+    spool = await spool_request_body(request, USER_IMPORT_MAX_BODY_BYTES)
+
+    rejected = 0
+    rejects: list[UserImportReject] = []
+
+    def on_reject(row_number: int, error: str) -> None:
+        nonlocal rejected
+        rejected += 1
+        if len(rejects) < USER_IMPORT_MAX_REPORTED_REJECTS:
+            rejects.append(UserImportReject(row=row_number, error=error))
+
+    try:
+        imported = await import_users(
+            iter_import_rows(spool, upload_format), session, on_reject
+        )
+    finally:
+        spool.close()
+
+    return UserImportResult(
+        imported=imported,
+        rejected=rejected,
+        rejects=sorted(rejects, key=lambda reject: reject.row),
+    )
+
+
+auth_routers.append(import_router)
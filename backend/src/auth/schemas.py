@@ -1,7 +1,7 @@
 """Pydantic models for the User Model, used for data validation and serialization"""
 
 import uuid
-from pydantic import Field
+from pydantic import BaseModel, Field
 from fastapi_users import schemas
 
 
@@ -41,3 +41,23 @@ class UserUpdate(schemas.BaseUserUpdate):
     name: str | None = Field(
         ..., description="Name of the User being updated", max_length=30
     )
+
+
+class UserImportReject(BaseModel):
+    """Row of a bulk import which was not imported, along with the reason"""
+
+    row: int = Field(
+        ..., description="Number of the row in the upload, starting from 1"
+    )
+    error: str = Field(..., description="Reason the row was rejected")
+
+
+class UserImportResult(BaseModel):
+    """Outcome of a bulk import of users"""
+
+    imported: int = Field(..., description="Number of users created")
+    rejected: int = Field(..., description="Number of rows which were not imported")
+    rejects: list[UserImportReject] = Field(
+        ...,
+        description="Rejected rows, truncated to the first ones when there are many",
+    )
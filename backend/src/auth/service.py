@@ -1,17 +1,23 @@
 """Authentication and User specific business logic"""
 
 import uuid
-import re
-from typing import Annotated, Union, Optional
+from typing import Annotated, Any, Dict, Union, Optional
 
 from fastapi import HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import BaseUserManager, UUIDIDMixin, InvalidPasswordException
-from fastapi_users import schemas  # imported for type hinting
+from fastapi_users import exceptions, schemas  # schemas imported for type hinting
+from fastapi_users.db import BaseUserDatabase
+from fastapi_users.password import PasswordHelperProtocol
 
 
+from src.auth.hashing import PasswordHashingExecutor
+from src.auth.jwt import jwt_strategy
 from src.auth.models import User
+from src.auth.password_policy import PasswordPolicy, password_policy
 from src.auth.schemas import UserCreate
 from src.auth.config import SECRET_KEY
+from src.metrics.dependencies import span
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
@@ -27,13 +33,32 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     reset_pasword_token_secret = SECRET_KEY
     verification_token_secret = SECRET_KEY
 
+    def __init__(
+        self,
+        user_db: BaseUserDatabase[User, uuid.UUID],
+        password_hashing: PasswordHashingExecutor,
+        password_helper: Optional[PasswordHelperProtocol] = None,
+    ) -> None:
+        """
+        Args:
+            user_db (BaseUserDatabase[User, uuid.UUID]): User database adapter
+            password_hashing (PasswordHashingExecutor): Executor running the password hashes and verifications off the event loop
+            password_helper (PasswordHelperProtocol, optional): Password helper, the default one hashes with argon2. Defaults to None.
+        """
+        super().__init__(user_db, password_helper)
+        self.password_hashing = password_hashing
+
+    # Policy checked by validate_password, shared by the instances and built from the settings
+    password_policy: PasswordPolicy = password_policy
+
     async def validate_password(  # type: ignore
         self,
         password: str,
         user: Union[UserCreate, User],
     ) -> None:
         """
-        Validate the password for a user, overriding the default password validation method of the BaseUserManager class
+        Validate the password for a user against the password policy, overriding the default password
+        validation method of the BaseUserManager class
 
         Args:
             password (str): Password to validate
@@ -42,24 +67,13 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
         Returns: None, if the password is valid
 
         Raises:
-            InvalidPasswordException: If the password is invalid.
+            InvalidPasswordException: If the password is invalid, its reason listing every rule the password breaks
         """
-        # Regex pattern search for a password with at least 1 uppercase letter, 1 digit, 1 special character and a minimum length of 8 characters
-        pattern = r"^(?=.*[A-Z])(?=.*\d)(?=.*[!@#$%^&*()_+]).{8,}$"
-
-        if not re.match(pattern, password):
-            raise InvalidPasswordException(
-                reason="Password should be at least 8 characters long, contain at least one uppercase letter, one digit and one special character"
-            )
-
-        # Check that the User's password does not contain their email, username, or name
-        if any(
-            keyword.lower() in password.lower()
-            for keyword in [user.email, user.username, user.name]
-        ):
-            raise InvalidPasswordException(
-                reason="Password should not contain your email, username or name for security reasons"
-            )
+        violations = self.password_policy.violations(
+            password, user.email, user.username, user.name
+        )
+        if violations:
+            raise InvalidPasswordException(reason=list(violations))
 
     async def create(
         self,
@@ -68,7 +82,10 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
         request: Optional[Request] = None,
     ) -> User:
         """
-        Create a new user in the database, checking to ensure that the username is unique
+        Create a new user in the database, ensuring that the email and the username are unique.
+        The user is inserted in a single statement which skips duplicates, the existing users are
+        only looked up to report which field is taken when the insertion was skipped.
+        Follows the BaseUserManager implementation otherwise, with the password hashed off the event loop.
 
         Args:
             user_create (UserCreate): UserCreate object with the user's data
@@ -76,15 +93,139 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
 
         Returns:
             User: User object for the created user
+
+        Raises:
+            InvalidPasswordException: If the password is invalid
+            HTTPException: If a user already exists with the same username
+            UserAlreadyExists: If a user already exists with the same email
         """
-        existing_user = await self.user_db.get_by_username(user_create.username)  # type: ignore
+        await self.validate_password(user_create.password, user_create)
+
+        user_dict = (
+            user_create.create_update_dict()
+            if safe
+            else user_create.create_update_dict_superuser()
+        )
+        password = user_dict.pop("password")
+        with span("password.hash"):
+            user_dict["hashed_password"] = await self.password_hashing.run(
+                self.password_helper.hash, password
+            )
+
+        created_user = await self.user_db.create_if_unique(user_dict)  # type: ignore
+
+        if created_user is None:
+            await self._check_unique(user_create)
+            # The conflicting user was deleted since
+            raise exceptions.UserAlreadyExists()
+
+        await self.on_after_register(created_user, request)
+
+        return created_user
+
+    async def _check_unique(self, user_create: UserCreate) -> None:
+        """
+        Check that the email and the username of a new user are free, reporting which one is taken once
+        the insertion of the user was skipped
 
-        if existing_user:
+        Args:
+            user_create (UserCreate): UserCreate object with the user's data
+
+        Raises:
+            HTTPException: If a user already exists with the same username
+            UserAlreadyExists: If a user already exists with the same email
+        """
+        conflicting = await self.user_db.get_conflicting(  # type: ignore
+            user_create.email, user_create.username
+        )
+        if conflicting is None:
+            return
+        if conflicting.username == user_create.username:
             raise HTTPException(
                 status_code=400,
                 detail="Username already exists",
             )
+        raise exceptions.UserAlreadyExists()
+
+    async def authenticate(
+        self, credentials: OAuth2PasswordRequestForm
+    ) -> Optional[User]:
+        """
+        Authenticate a user from their email and password, overriding the BaseUserManager method so that
+        the password is verified off the event loop. Outdated password hashes are upgraded.
+        Hashes and verifications are timed as the password.hash and password.verify stages.
+
+        Args:
+            credentials (OAuth2PasswordRequestForm): The user's credentials, the username being their email
+
+        Returns:
+            Optional[User]: The authenticated user, or None if the credentials are invalid
+        """
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Hash the password anyway so that unknown emails take as long as wrong passwords
+            with span("password.hash"):
+                await self.password_hashing.run(
+                    self.password_helper.hash, credentials.password
+                )
+            return None
+
+        with span("password.verify"):
+            verified, updated_password_hash = await self.password_hashing.run(
+                self.password_helper.verify_and_update,
+                credentials.password,
+                user.hashed_password,
+            )
+        if not verified:
+            return None
+
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        """
+        Update a user, hashing a new password off the event loop before handing the remaining
+        fields to the BaseUserManager implementation. The cached tokens of the user are dropped,
+        so that password changes and deactivations apply to the following requests.
+
+        Args:
+            user (User): The user to update
+            update_dict (Dict[str, Any]): Fields to update
 
-        return await super().create(user_create, safe=safe, request=request)
+        Returns:
+            User: The updated user
+
+        Raises:
+            InvalidPasswordException: If the new password is invalid
+        """
+        update_dict = dict(update_dict)
+        password = update_dict.pop("password", None)
+
+        if password is not None:
+            await self.validate_password(password, user)
+            with span("password.hash"):
+                update_dict["hashed_password"] = await self.password_hashing.run(
+                    self.password_helper.hash, password
+                )
+
+        updated_user = await super()._update(user, update_dict)
+        jwt_strategy.cache.invalidate_user(user.id)
+
+        return updated_user
+
+    async def on_after_delete(
+        self, user: User, request: Optional[Request] = None
+    ) -> None:
+        """
+        Drop the cached tokens of a deleted user
+
+        Args:
+            user (User): The deleted user
+            request (Optional[Request], optional): Request which triggered the deletion. Defaults to None.
+        """
+        jwt_strategy.cache.invalidate_user(user.id)
 
     # TODO: Implement the remainder of custom User business logic for the UserManager
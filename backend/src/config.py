@@ -1,7 +1,9 @@
 """Global Settings module for the application."""
 
+from functools import cache
+from typing import Any, Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -11,8 +13,74 @@ class Settings(BaseSettings):
     ENVIRONMENT: str
     SHOW_DOCS_ENVIRONMENTS: tuple[str, str, str] = ("development", "staging", "testing")
     app_name: str = "QRafty API"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection before failing
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_RECYCLE: int = -1  # seconds after which connections are replaced, -1 never
+    DB_POOL_WARMUP: int = 2  # connections opened at startup, capped by DB_POOL_SIZE
+    DB_STATEMENT_CACHE_SIZE: int = 100  # 0 when connecting through PgBouncer
+    JWT_CACHE_MAX_ENTRIES: int = 10_000
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # defaults to the number of CPUs
+    PASSWORD_HASH_MAX_CONCURRENT: Optional[int] = (
+        None  # defaults to the number of workers
+    )
+    PASSWORD_MIN_LENGTH: int = 8
+    PASSWORD_REQUIRE_UPPERCASE: bool = True
+    PASSWORD_REQUIRE_DIGIT: bool = True
+    PASSWORD_SPECIAL_CHARACTERS: str = "!@#$%^&*()_+"  # empty to not require any
+    PASSWORD_FORBID_PERSONAL_INFO: bool = True
+    USER_IMPORT_HASH_WORKERS: Optional[int] = None  # defaults to the number of CPUs
+    USER_IMPORT_CHUNK_SIZE: int = 500
+    USER_IMPORT_MAX_BODY_BYTES: int = 256 * 1024 * 1024  # 256 MiB
+    QR_RENDER_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 MiB
+    QR_RENDER_WORKERS: Optional[int] = None  # defaults to the number of CPUs
+    QR_RENDER_MAX_QUEUE: int = 64
+    QR_RENDER_RETRY_AFTER_SECONDS: int = 1
+    QR_BATCH_MAX_ROWS: int = 100_000
+    QR_BATCH_MAX_BODY_BYTES: int = 64 * 1024 * 1024  # 64 MiB
+    QR_REDIRECT_CACHE_MAX_ENTRIES: int = 100_000
+    ASSET_STORE_PATH: str = "assets"  # directory of the filesystem asset store
+    ASSET_S3_BUCKET: Optional[str] = None  # requires the aiobotocore package
+    ASSET_S3_ENDPOINT_URL: Optional[str] = (
+        None  # None for AWS, set for other S3 compatible storages
+    )
+    SCAN_EVENT_QUEUE_MAX_SIZE: int = 10_000
+    SCAN_EVENT_BATCH_SIZE: int = 500
+    SCAN_EVENT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    SCAN_EVENT_OVERFLOW_POLICY: Literal["drop", "block"] = "drop"
+    SCAN_ROLLUP_INTERVAL_SECONDS: float = 60.0
+    SCAN_ROLLUP_LATENESS_SECONDS: int = 300
+    SCAN_EVENT_RETENTION_MONTHS: int = 13
+    SCAN_EVENT_PARTITIONS_AHEAD: int = 3
+    SCAN_EVENT_EXPIRED_PARTITIONS: Literal["detach", "drop"] = "drop"
+    SCAN_EVENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 6 * 3600
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_REDIS_URL: Optional[str] = None  # requires the redis package
+    METRICS_ENABLED: bool = True
+    METRICS_BEARER_TOKEN: Optional[str] = None
+    PROFILER_ENABLED: bool = False
+    SLOW_CALLBACK_THRESHOLD_SECONDS: Optional[float] = None  # None disables the tracing
 
     model_config = SettingsConfigDict(env_file=".env")
 
 
-settings = Settings()  # type: ignore
+@cache
+def get_settings() -> Settings:
+    """
+    Build the settings on first use, reading the environment and the .env file once per process
+
+    Returns:
+        Settings: The settings of the application
+    """
+    return Settings()  # type: ignore
+
+
+def __getattr__(name: str) -> Any:
+    # settings is built on first access rather than at import, so that importing a module which only
+    # reads the settings when called, such as the database module imported by the models, does not
+    # require the environment
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,23 @@
-from src.config import settings
-from typing import AsyncGenerator
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from pydantic import BaseModel
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
 
+from src.config import get_settings
 
-SQL_ALCHEMY_DATABASE_URL = settings.DEV_DATABASE_URL
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
@@ -19,13 +31,145 @@ class Base(DeclarativeBase):
     pass
 
 
-# Create the async engine and the async session maker, expire_on_commit is set to False to avoid session expiration
-engine = create_async_engine(SQL_ALCHEMY_DATABASE_URL)
-async_session_maker = async_sessionmaker(
-    engine,
-    expire_on_commit=False,
-    autocommit=False,  # autocommit is set to False to allow for fine-grained control over transactions
-)
+class PoolStats(BaseModel):
+    """Snapshot of the connection pool of the engine"""
+
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    acquisitions: int
+    timeouts: int
+    total_wait_seconds: float
+    max_wait_seconds: float
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool measuring the time spent acquiring connections, which includes waiting for a
+    connection to be checked in once the pool and its overflow are exhausted, and opening new connections.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.acquisitions: int = 0
+        self.timeouts: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            wait = time.perf_counter() - start
+            self.acquisitions += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> PoolStats:
+        """
+        Take a snapshot of the pool occupancy and of the acquisition counters
+
+        Returns:
+            PoolStats: Snapshot of the pool
+        """
+        return PoolStats(
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            acquisitions=self.acquisitions,
+            timeouts=self.timeouts,
+            total_wait_seconds=self.total_wait,
+            max_wait_seconds=self.max_wait,
+        )
+
+
+def create_engine() -> AsyncEngine:
+    """
+    Create the engine of the application from the settings, with an instrumented connection pool
+
+    Returns:
+        AsyncEngine: The engine, which connects lazily
+    """
+    settings = get_settings()
+    return create_async_engine(
+        settings.DEV_DATABASE_URL,  # type: ignore
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        # Both the asyncpg statement cache and the prepared statement cache of SQLAlchemy, 0 disables them
+        # as required behind a PgBouncer in transaction pooling mode
+        connect_args={
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+    )
+
+
+class Database:
+    """
+    Engine and session maker of the application, created on first use rather than at import: importing
+    the models, as Alembic and the tests do, neither reads the settings nor loads the database driver.
+
+    The lifespan of the application creates them at startup and disposes of them at shutdown, a later use
+    creating new ones, bound to the event loop running at that time.
+
+    Args:
+        engine_factory (Callable[[], AsyncEngine], optional): Creates the engine. Defaults to create_engine.
+    """
+
+    def __init__(
+        self, engine_factory: Callable[[], AsyncEngine] = create_engine
+    ) -> None:
+        self.engine_factory = engine_factory
+        self._engine: AsyncEngine | None = None
+        self._session_maker: async_sessionmaker[AsyncSession] | None = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """The engine, created on first use"""
+        if self._engine is None:
+            self._engine = self.engine_factory()
+        return self._engine
+
+    @property
+    def session_maker(self) -> async_sessionmaker[AsyncSession]:
+        """The session maker, created on first use along with the engine"""
+        if self._session_maker is None:
+            # expire_on_commit is set to False to avoid session expiration, autocommit to False to allow for
+            # fine-grained control over transactions
+            self._session_maker = async_sessionmaker(
+                self.engine, expire_on_commit=False, autocommit=False
+            )
+        return self._session_maker
+
+    def session(self) -> AsyncSession:
+        """
+        Open a new session, the session maker of the background tasks writing to the database
+
+        Returns:
+            AsyncSession: The session, to be used as an async context manager
+        """
+        return self.session_maker()
+
+    async def dispose(self) -> None:
+        """Close the connections of the engine and drop it, along with the session maker"""
+        if self._engine is not None:
+            await self._engine.dispose()
+        self._engine = None
+        self._session_maker = None
+
+
+# Engine and session maker of the application, owned by the lifespan of the application
+database = Database()
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -37,5 +181,78 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     Yields:
         Iterator[AsyncGenerator[AsyncSession, None]]: A new async session
     """
-    async with async_session_maker() as session:
+    async with database.session() as session:
         yield session
+
+
+async def warm_up_pool(async_engine: AsyncEngine, connections: int) -> None:
+    """
+    Open connections up front so that the first requests do not pay for the connection setup.
+    The connections are held at the same time, then returned to the pool. A failure is logged rather
+    than raised, the application can start while the database is unavailable.
+
+    Args:
+        async_engine (AsyncEngine): Engine whose pool to warm up
+        connections (int): Number of connections to open, capped by the size of the pool
+    """
+    connections = min(connections, async_engine.pool.size())  # type: ignore
+    if connections <= 0:
+        return
+
+    held = []
+    try:
+        for _ in range(connections):
+            held.append(
+                await asyncio.wait_for(
+                    async_engine.connect(), get_settings().DB_POOL_TIMEOUT
+                )
+            )
+        logger.info("Warmed up %d database connections", connections)
+    except Exception:
+        logger.warning("Could not warm up the database connection pool", exc_info=True)
+    finally:
+        for connection in held:
+            await connection.close()
+
+
+async def copy_records(
+    session: AsyncSession,
+    table_name: str,
+    columns: Sequence[str],
+    records: Iterable[Sequence[Any]],
+) -> None:
+    """
+    Copy rows into a table with the COPY protocol of asyncpg, within the transaction of the session.
+    COPY streams the rows in a binary format, which is much faster than INSERT statements for large
+    batches but cannot skip conflicting rows: a single conflict fails the whole copy.
+
+    The asyncpg adapter of SQLAlchemy only sends BEGIN along with the first statement it runs, so the
+    transaction is started with a trivial statement when the copy comes first. Otherwise the copy would
+    bypass the transaction and be committed on its own.
+
+    Args:
+        session (AsyncSession): Session whose connection and transaction to use
+        table_name (str): Name of the table
+        columns (Sequence[str]): Columns filled by the records
+        records (Iterable[Sequence[Any]]): Rows to copy, with one value per column
+    """
+    connection = await (await session.connection()).get_raw_connection()
+    driver_connection = connection.driver_connection
+    if not driver_connection.is_in_transaction():  # type: ignore
+        await session.execute(select(1))
+    await driver_connection.copy_records_to_table(  # type: ignore
+        table_name, records=records, columns=list(columns)
+    )
+
+
+def get_pool_stats(async_engine: AsyncEngine | None = None) -> PoolStats:
+    """
+    Take a snapshot of the connection pool of an engine
+
+    Args:
+        async_engine (AsyncEngine | None, optional): Engine whose pool to inspect. Defaults to the application engine.
+
+    Returns:
+        PoolStats: Snapshot of the pool
+    """
+    return (async_engine or database.engine).pool.stats()  # type: ignore
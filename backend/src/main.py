@@ -1,17 +1,42 @@
 """Root of the application, inits the FastAPI app"""
 
+import logging
 from typing import Any
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
-
-from src.auth.router import auth_routers
+from fastapi import Depends, FastAPI
+
+from src.auth.dependencies import password_hashing
+from src.auth.router import auth_routers, current_superuser
+from src.analytics.dependencies import (
+    scan_event_partitions,
+    scan_events,
+    scan_rollups,
+)
+from src.analytics.router import analytics_routers
+from src.assets.dependencies import asset_store
+from src.assets.router import assets_router
 from src.config import settings
+from src.database import PoolStats, database, get_pool_stats, warm_up_pool
+from src.metrics.config import METRICS_ENABLED
+from src.metrics.dependencies import request_latency
+from src.metrics.middleware import TimingMiddleware
+from src.metrics.router import metrics_router
+from src.profiling.config import SLOW_CALLBACK_THRESHOLD_SECONDS
+from src.profiling.dependencies import slow_callback_monitor
+from src.profiling.router import profiling_router
+from src.qr.dependencies import render_service
+from src.qr.router import qr_routers, redirect_router
+from src.ratelimit.config import RATE_LIMIT_ENABLED, RATE_LIMIT_RULES
+from src.ratelimit.dependencies import rate_limit_backend
+from src.ratelimit.middleware import RateLimitMiddleware
 
 #  Get current environment from settings, used to set visibility of OpenAPI docs
 ENVIRONMENT = settings.ENVIRONMENT
 SHOW_DOCS_ENVIRONMENTS = settings.SHOW_DOCS_ENVIRONMENTS
 
+logger = logging.getLogger(__name__)
+
 fasapi_config: dict[str, Any] = {
     "title": "QRafty API",
     "summary": "API to provide functionality for the QRafty Front-End application",
@@ -29,8 +54,40 @@ async def lifespan(app: FastAPI):
     Yields:
         Iterator[FastAPI]: The FastAPI application, which is closed after the context manager is done
     """
+    # Log the stack of the callbacks blocking the event loop, when configured
+    if SLOW_CALLBACK_THRESHOLD_SECONDS is not None:
+        await slow_callback_monitor.start(SLOW_CALLBACK_THRESHOLD_SECONDS)
+    # Start the process pool rendering the QR codes off the event loop
+    render_service.start()
+    # Start the thread pool hashing the passwords off the event loop
+    password_hashing.start()
+    # Create the database engine, and open connections up front so that the first requests do not pay for them
+    await warm_up_pool(database.engine, settings.DB_POOL_WARMUP)
+    # Connect to the storage of the renders and of the uploaded logos
+    await asset_store.start()
+    # Make sure the partitions of the scan events exist before any is written, then keep them maintained
+    await scan_event_partitions.run_once()
+    scan_event_partitions.start()
+    # Start the task writing the scan events in batches
+    scan_events.start()
+    # Start the job refreshing the scan rollups read by the analytics
+    scan_rollups.start()
+
     yield
 
+    await scan_rollups.stop()
+    await scan_event_partitions.stop()
+    # Write the scan events still queued while the database is still reachable
+    await scan_events.stop()
+    logger.info("Scan event queue at shutdown: %s", scan_events.stats())
+    logger.info("Database connection pool at shutdown: %s", get_pool_stats())
+    await database.dispose()
+    await asset_store.close()
+    await rate_limit_backend.close()
+    password_hashing.shutdown()
+    render_service.shutdown()
+    await slow_callback_monitor.stop()
+
 
 if ENVIRONMENT not in SHOW_DOCS_ENVIRONMENTS:
     fasapi_config["openapi_url"] = (
@@ -40,9 +97,34 @@ if ENVIRONMENT not in SHOW_DOCS_ENVIRONMENTS:
 
 app = FastAPI(lifespan=lifespan, **fasapi_config)
 
+# Refuse the requests over the rate limits before they reach the routes, and cost any hashing or rendering
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware, backend=rate_limit_backend, rules=RATE_LIMIT_RULES
+    )
+
+# Time every request, outermost so that the requests refused by the rate limits are timed as well
+if METRICS_ENABLED:
+    app.add_middleware(TimingMiddleware, histogram=request_latency)
+
 for router in auth_routers:
     app.include_router(router, prefix="/auth", tags=["auth"])
 
+for router in qr_routers:
+    app.include_router(router, prefix="/qr", tags=["qr"])
+
+for router in analytics_routers:
+    app.include_router(router, prefix="/analytics", tags=["analytics"])
+
+app.include_router(assets_router, prefix="/assets", tags=["assets"])
+
+app.include_router(redirect_router, tags=["redirect"])
+
+app.include_router(profiling_router, tags=["debug"])
+
+if METRICS_ENABLED:
+    app.include_router(metrics_router, tags=["metrics"])
+
 
 @app.get("/")
 async def root():
@@ -53,3 +135,20 @@ async def root():
         dict: A simple dictionary
     """
     return {"message": "Hello World"}
+
+
+@app.get(
+    "/db/pool",
+    response_model=PoolStats,
+    dependencies=[Depends(current_superuser)],
+    tags=["db"],
+)
+async def pool_stats() -> PoolStats:
+    """
+    Expose the occupancy and the acquisition counters of the database connection pool of the worker,
+    restricted to superusers. Used to size the pool for the number of workers.
+
+    Returns:
+        PoolStats: Snapshot of the connection pool
+    """
+    return get_pool_stats()
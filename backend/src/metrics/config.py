@@ -0,0 +1,45 @@
+"""Metrics specific configuration"""
+
+from src.config import settings
+
+# Requests are timed by a middleware in front of every route, disabling it removes the middleware and
+# the /metrics endpoint; the stages are still timed, at the cost of a clock read
+METRICS_ENABLED: bool = settings.METRICS_ENABLED
+# Token the scrapers must send as a bearer token to read /metrics, None leaves /metrics open
+METRICS_BEARER_TOKEN: str | None = settings.METRICS_BEARER_TOKEN
+
+# Upper bounds of the buckets of the latency histograms, in seconds
+HTTP_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Stages are finer grained than the requests they are part of
+STAGE_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+# Route label of the requests which did not match any route, the paths themselves would be unbounded
+UNMATCHED_ROUTE: str = "unmatched"
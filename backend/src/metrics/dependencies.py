@@ -0,0 +1,36 @@
+"""Metrics specific dependencies"""
+
+from src.metrics.config import HTTP_LATENCY_BUCKETS, STAGE_LATENCY_BUCKETS
+from src.metrics.registry import MetricsRegistry, Span
+
+# Process wide registry of the histograms, exposed at /metrics. Every worker exposes its own observations
+metrics_registry = MetricsRegistry()
+
+# Latency of the requests, recorded by the timing middleware
+request_latency = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "Latency of the HTTP requests, by method, route template and status code",
+    ("method", "route", "status"),
+    HTTP_LATENCY_BUCKETS,
+)
+
+# Latency of the stages of the hot paths: user lookups, password hashing and tokens
+stage_latency = metrics_registry.histogram(
+    "stage_duration_seconds",
+    "Latency of the stages of the requests, such as the user queries, password hashing and JWT",
+    ("stage",),
+    STAGE_LATENCY_BUCKETS,
+)
+
+
+def span(stage: str) -> Span:
+    """
+    Time a stage of a request, as a context manager around the stage
+
+    Args:
+        stage (str): Name of the stage, such as user_db.get or password.hash
+
+    Returns:
+        Span: Context manager observing the time spent in the stage
+    """
+    return stage_latency.labels(stage).time()
@@ -0,0 +1,50 @@
+"""ASGI middleware timing the requests, by route template rather than by path"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.metrics.config import UNMATCHED_ROUTE
+from src.metrics.registry import Histogram
+
+
+class TimingMiddleware:
+    """
+    Middleware observing the latency of every HTTP request, from its start to the end of its response.
+
+    Requests are labelled with their method, status code and the template of their route, such as
+    /qr/codes/{qr_code_id}, which the router leaves in the scope, so that the number of series stays
+    bounded whatever the paths requested. Requests ending with an exception are recorded with a 500.
+
+    Args:
+        app (ASGIApp): The application
+        histogram (Histogram): Histogram of the latencies, labelled by method, route and status
+    """
+
+    def __init__(self, app: ASGIApp, histogram: Histogram) -> None:
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            self.histogram.labels(
+                scope["method"],
+                route.path if route is not None else UNMATCHED_ROUTE,
+                str(status_code),
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,196 @@
+"""
+Latency histograms of the worker, exposed in the Prometheus text format.
+
+Histograms are kept in plain Python: an observation finds its bucket by bisection and increments a
+counter, which is cheap enough to time every request and every stage of the hot paths. Observations are
+only made from the event loop, the histograms are not thread-safe.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Sequence
+from types import TracebackType
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format"""
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_bound(bound: float) -> str:
+    """Format the upper bound of a bucket, as the le label"""
+    return repr(float(bound))
+
+
+class HistogramSeries:
+    """
+    Observations of a histogram for one combination of label values. Bucket counts are kept per bucket,
+    and only made cumulative when exposed.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # One more bucket for the observations above the last bound, the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """
+        Record an observation
+
+        Args:
+            value (float): The observed value, in seconds for the latencies
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> "Span":
+        """
+        Time a block of code, the elapsed time being observed when the block exits
+
+        Returns:
+            Span: Context manager timing the block
+        """
+        return Span(self)
+
+    @property
+    def count(self) -> int:
+        """Number of observations"""
+        return sum(self.counts)
+
+
+class Span:
+    """Context manager observing the time spent in its block, even when the block raises"""
+
+    __slots__ = ("series", "start")
+
+    def __init__(self, series: HistogramSeries) -> None:
+        self.series = series
+
+    def __enter__(self) -> "Span":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.series.observe(time.perf_counter() - self.start)
+
+
+class Histogram:
+    """
+    Histogram with a series per combination of label values
+
+    Args:
+        name (str): Name of the metric
+        documentation (str): Help text of the metric
+        label_names (Sequence[str]): Names of the labels
+        buckets (Sequence[float]): Upper bounds of the buckets, in increasing order
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.bounds = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], HistogramSeries] = {}
+
+    def labels(self, *values: str) -> HistogramSeries:
+        """
+        Get the series of a combination of label values, created on first use
+
+        Args:
+            *values (str): Values of the labels, in the order of the label names
+
+        Returns:
+            HistogramSeries: The series
+        """
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"{self.name} expects the labels {', '.join(self.label_names)}"
+                )
+            series = self._series[values] = HistogramSeries(self.bounds)
+        return series
+
+    def clear(self) -> None:
+        """Drop every series"""
+        self._series.clear()
+
+    def expose(self) -> list[str]:
+        """
+        Render the histogram in the Prometheus text format
+
+        Returns:
+            list[str]: Lines of the exposition
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for values, series in sorted(self._series.items()):
+            labels = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.label_names, values)
+            )
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, count in zip((*self.bounds, float("inf")), series.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_bound(bound)
+                lines.append(f'{self.name}_bucket{{{prefix}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series.sum!r}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Histograms exposed together at /metrics"""
+
+    def __init__(self) -> None:
+        self.histograms: list[Histogram] = []
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float],
+    ) -> Histogram:
+        """
+        Create a histogram and register it
+
+        Args:
+            name (str): Name of the metric
+            documentation (str): Help text of the metric
+            label_names (Sequence[str]): Names of the labels
+            buckets (Sequence[float]): Upper bounds of the buckets
+
+        Returns:
+            Histogram: The histogram
+        """
+        histogram = Histogram(name, documentation, label_names, buckets)
+        self.histograms.append(histogram)
+        return histogram
+
+    def expose(self) -> str:
+        """
+        Render every histogram in the Prometheus text format
+
+        Returns:
+            str: The exposition
+        """
+        lines = [line for histogram in self.histograms for line in histogram.expose()]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,57 @@
+"""Endpoint exposing the metrics of the worker to Prometheus"""
+
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from src.metrics.config import METRICS_BEARER_TOKEN
+from src.metrics.dependencies import metrics_registry
+
+# Media type of the Prometheus text format
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics_router = APIRouter()
+
+
+async def check_scraper_token(
+    authorization: Annotated[str | None, Header()] = None,
+) -> None:
+    """
+    Dependency that checks the bearer token of the scraper, when METRICS_BEARER_TOKEN is configured
+
+    Args:
+        authorization (str | None, optional): Value of the Authorization header. Defaults to None.
+
+    Raises:
+        HTTPException: 401 if the token is missing or wrong
+    """
+    if METRICS_BEARER_TOKEN is None:
+        return
+    if authorization is None or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {METRICS_BEARER_TOKEN}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Unauthorized",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@metrics_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(check_scraper_token)],
+)
+async def metrics() -> PlainTextResponse:
+    """
+    Expose the latency histograms of the worker in the Prometheus text format: the requests by route,
+    and the stages of the hot paths. Each worker exposes its own observations, to be scraped per worker.
+
+    Returns:
+        PlainTextResponse: The exposition
+    """
+    return PlainTextResponse(
+        metrics_registry.expose(), media_type=PROMETHEUS_MEDIA_TYPE
+    )
@@ -0,0 +1,19 @@
+"""Profiling specific configuration"""
+
+from src.config import settings
+
+# The sampling profiler endpoint answers 404 unless enabled, it is meant to be switched on while
+# investigating a worker, not left open
+PROFILER_ENABLED: bool = settings.PROFILER_ENABLED
+# Bounds of the duration of a profile, in seconds; the request is held open for the whole profile
+PROFILER_DEFAULT_SECONDS: float = 10.0
+PROFILER_MAX_SECONDS: float = 60.0
+# Bounds of the interval between two samples, in milliseconds. Each sample walks the stack of every
+# thread holding the GIL, 10 ms costs about 1% of a core for a handful of threads
+PROFILER_DEFAULT_INTERVAL_MS: float = 10.0
+PROFILER_MIN_INTERVAL_MS: float = 1.0
+PROFILER_MAX_INTERVAL_MS: float = 1000.0
+
+# Callbacks blocking the event loop for longer than this are logged with their stack at startup,
+# None leaves the tracing off until it is switched on through /debug/slow-callbacks
+SLOW_CALLBACK_THRESHOLD_SECONDS: float | None = settings.SLOW_CALLBACK_THRESHOLD_SECONDS
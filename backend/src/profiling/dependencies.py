@@ -0,0 +1,11 @@
+"""Profiling specific dependencies"""
+
+import asyncio
+
+from src.profiling.monitor import SlowCallbackMonitor
+
+# Process wide watchdog of the event loop, started in the lifespan when a threshold is configured
+slow_callback_monitor = SlowCallbackMonitor()
+
+# A single profile at a time per worker, concurrent profiles would sample each other
+profiler_lock = asyncio.Lock()
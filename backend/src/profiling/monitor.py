@@ -0,0 +1,112 @@
+"""
+Tracing of the callbacks blocking the event loop, with the stack they were blocked in.
+
+asyncio only reports the callbacks slower than loop.slow_callback_duration in debug mode, once they
+returned and without their stack, at the cost of a traceback captured at every callback scheduled. The
+monitor instead pings the loop from a thread: when the ping is not answered within the threshold, the
+loop is stuck in a callback, and the stack of the loop thread at that moment is where it is stuck.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+
+class SlowCallbackMonitor:
+    """
+    Watchdog thread logging the stack of the event loop whenever a callback blocks it for longer than a
+    threshold. The loop is pinged four times per threshold, so every callback blocking for more than
+    1.25 thresholds is caught, at the cost of a handful of wakeups of the loop per threshold.
+    """
+
+    def __init__(self) -> None:
+        self.threshold_seconds: float | None = None
+        # Number of times the loop was caught blocked since the start of the worker
+        self.stalls = 0
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._answered = threading.Event()
+
+    async def start(self, threshold_seconds: float) -> None:
+        """
+        Start tracing the callbacks of the running loop blocking it for longer than a threshold, or
+        change the threshold if already started
+
+        Args:
+            threshold_seconds (float): Time a callback may block the loop without being logged
+        """
+        await self.stop()
+        loop = asyncio.get_running_loop()
+        # Keeps the asyncio debug mode, if switched on, reporting the same callbacks
+        loop.slow_callback_duration = threshold_seconds
+        self.threshold_seconds = threshold_seconds
+        self._stop = threading.Event()
+        self._answered = threading.Event()
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(
+                loop,
+                threading.get_ident(),
+                threshold_seconds,
+                self._stop,
+                self._answered,
+            ),
+            name="slow-callback-monitor",
+            daemon=True,
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """
+        Stop tracing. The watchdog thread is woken up from its waits, including the wait for a ping
+        the loop cannot answer while it is stopping the monitor, and joined off the loop
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._thread = None
+        self.threshold_seconds = None
+        # Set before the ping is answered in its place, so that the woken up watchdog finds it set
+        self._stop.set()
+        self._answered.set()
+        await asyncio.to_thread(thread.join)
+
+    def _watch(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        loop_thread_id: int,
+        threshold_seconds: float,
+        stop: threading.Event,
+        answered: threading.Event,
+    ) -> None:
+        """Ping the loop until stopped, logging the stack of the loop thread when a ping is late"""
+        while not stop.wait(threshold_seconds / 4):
+            answered.clear()
+            # Stopped between the wait and the clear, the wake up was cleared along with the last ping
+            if stop.is_set():
+                return
+            sent = time.perf_counter()
+            try:
+                loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:  # the loop is closed
+                return
+            if answered.wait(threshold_seconds) or stop.is_set():
+                continue
+
+            frame = sys._current_frames().get(loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else ""
+            # Logged once the loop is free again, with the time it was blocked for
+            answered.wait()
+            if stop.is_set():
+                return
+            self.stalls += 1
+            logger.warning(
+                "Event loop blocked for %.3f s by a callback, which was at:\n%s",
+                time.perf_counter() - sent,
+                stack,
+            )
@@ -0,0 +1,123 @@
+"""Endpoints profiling the worker serving the request, restricted to superusers"""
+
+import os
+import time
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from src.auth.router import current_superuser
+from src.profiling.config import (
+    PROFILER_DEFAULT_INTERVAL_MS,
+    PROFILER_DEFAULT_SECONDS,
+    PROFILER_ENABLED,
+    PROFILER_MAX_INTERVAL_MS,
+    PROFILER_MAX_SECONDS,
+    PROFILER_MIN_INTERVAL_MS,
+)
+from src.profiling.dependencies import profiler_lock, slow_callback_monitor
+from src.profiling.sampler import profile
+from src.profiling.schemas import (
+    ProfileFormat,
+    SlowCallbackTracing,
+    SlowCallbackTracingStats,
+)
+
+profiling_router = APIRouter(prefix="/debug", dependencies=[Depends(current_superuser)])
+
+
+async def check_profiler_enabled() -> None:
+    """
+    Dependency hiding the profiler unless PROFILER_ENABLED is set
+
+    Raises:
+        HTTPException: 404 if the profiler is disabled
+    """
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+
+@profiling_router.get(
+    "/profile",
+    response_class=Response,
+    dependencies=[Depends(check_profiler_enabled)],
+)
+async def sampling_profile(
+    seconds: Annotated[
+        float, Query(gt=0, le=PROFILER_MAX_SECONDS)
+    ] = PROFILER_DEFAULT_SECONDS,
+    interval_ms: Annotated[
+        float, Query(ge=PROFILER_MIN_INTERVAL_MS, le=PROFILER_MAX_INTERVAL_MS)
+    ] = PROFILER_DEFAULT_INTERVAL_MS,
+    format: ProfileFormat = ProfileFormat.COLLAPSED,
+) -> Response:
+    """
+    Profile the worker serving the request by sampling the stacks of its threads, the event loop
+    included, for the given number of seconds. The request is answered once the profile is done; only
+    this worker is profiled, the other workers of the deployment are reached by repeating the request.
+
+    Args:
+        seconds (float): Duration of the profile. Defaults to PROFILER_DEFAULT_SECONDS.
+        interval_ms (float): Interval between two samples. Defaults to PROFILER_DEFAULT_INTERVAL_MS.
+        format (ProfileFormat): Collapsed stacks or speedscope file. Defaults to collapsed.
+
+    Raises:
+        HTTPException: 409 if a profile of the worker is already running
+
+    Returns:
+        Response: The profile, as text for the collapsed stacks and as a JSON file for speedscope
+    """
+    if profiler_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile of this worker is already running",
+        )
+    async with profiler_lock:
+        sampler = await profile(seconds, interval_ms / 1000)
+
+    if format == ProfileFormat.COLLAPSED:
+        return PlainTextResponse(sampler.collapsed())
+    name = f"profile-{os.getpid()}-{int(time.time())}"
+    return JSONResponse(
+        sampler.speedscope(name),
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.speedscope.json"'
+        },
+    )
+
+
+@profiling_router.get("/slow-callbacks", response_model=SlowCallbackTracingStats)
+async def slow_callback_tracing() -> SlowCallbackTracingStats:
+    """
+    Expose the threshold of the tracing of the slow callbacks of the worker, and the number of times
+    the event loop was caught blocked
+
+    Returns:
+        SlowCallbackTracingStats: State of the tracing
+    """
+    return SlowCallbackTracingStats(
+        threshold_seconds=slow_callback_monitor.threshold_seconds,
+        stalls=slow_callback_monitor.stalls,
+    )
+
+
+@profiling_router.put("/slow-callbacks", response_model=SlowCallbackTracingStats)
+async def set_slow_callback_tracing(
+    tracing: SlowCallbackTracing,
+) -> SlowCallbackTracingStats:
+    """
+    Start tracing the callbacks blocking the event loop of the worker for longer than the threshold,
+    logging their stack, or stop tracing with no threshold
+
+    Args:
+        tracing (SlowCallbackTracing): Threshold of the tracing, None to stop it
+
+    Returns:
+        SlowCallbackTracingStats: State of the tracing
+    """
+    if tracing.threshold_seconds is None:
+        await slow_callback_monitor.stop()
+    else:
+        await slow_callback_monitor.start(tracing.threshold_seconds)
+    return await slow_callback_tracing()
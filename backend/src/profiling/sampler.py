@@ -0,0 +1,210 @@
+"""
+Sampling profiler of the threads of the worker, the event loop included.
+
+A background thread wakes up at a fixed interval and records the stack of every other thread of the
+process, read from sys._current_frames(). Nothing is traced between two samples, so the code profiled
+runs at full speed: the cost is the walk of the stacks, paid by the sampling thread. Coroutines show up
+on the stack of the event loop thread while they run; a loop waiting for I/O shows up in its selector.
+
+Frames are identified by their function, not their current line, so that the samples of a function
+add up in the flame graphs whatever line it was at.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import Any, NamedTuple
+
+# Schema of the speedscope file format, https://www.speedscope.app
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+class ProfileFrame(NamedTuple):
+    """Function seen on the stacks, shared by every sample it appears in"""
+
+    name: str
+    file: str
+    line: int
+
+
+def _short_path(filename: str) -> str:
+    """Path of a source file relative to the longest entry of sys.path containing it"""
+    best = ""
+    for entry in sys.path:
+        if entry and filename.startswith(entry) and len(entry) > len(best):
+            best = entry
+    return os.path.relpath(filename, best) if best else filename
+
+
+class StackSampler:
+    """
+    Samples of the stacks of the threads of the process, taken at a fixed interval.
+
+    Stacks are interned: a sample is the index of its stack, a stack the tuple of the indexes of its
+    frames from the root, which keeps long profiles of a busy worker small.
+
+    Args:
+        interval_seconds (float): Interval between two samples
+    """
+
+    def __init__(self, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self.frames: list[ProfileFrame] = []
+        self.stacks: list[tuple[int, ...]] = []
+        # Stack and weight of each sample by thread name, in the order they were taken
+        self.samples: dict[str, list[int]] = {}
+        self.weights: dict[str, list[float]] = {}
+        self._frame_ids: dict[CodeType, int] = {}
+        self._stack_ids: dict[tuple[int, ...], int] = {}
+        self._last_sample: float | None = None
+
+    def _frame_id(self, code: CodeType) -> int:
+        """Index of the frame of a function, added on first sight"""
+        frame_id = self._frame_ids.get(code)
+        if frame_id is None:
+            frame_id = self._frame_ids[code] = len(self.frames)
+            self.frames.append(
+                ProfileFrame(
+                    code.co_qualname,
+                    _short_path(code.co_filename),
+                    code.co_firstlineno,
+                )
+            )
+        return frame_id
+
+    def _stack_id(self, frame: FrameType | None) -> int:
+        """Index of the stack ending at a frame, added on first sight"""
+        frame_ids = []
+        while frame is not None:
+            frame_ids.append(self._frame_id(frame.f_code))
+            frame = frame.f_back
+        stack = tuple(reversed(frame_ids))
+        stack_id = self._stack_ids.get(stack)
+        if stack_id is None:
+            stack_id = self._stack_ids[stack] = len(self.stacks)
+            self.stacks.append(stack)
+        return stack_id
+
+    def sample(self) -> None:
+        """Record the stack of every thread but the calling one"""
+        now = time.perf_counter()
+        # The time elapsed since the previous sample, which is more than the interval when the sampling
+        # thread is kept waiting for the GIL
+        weight = (
+            self.interval_seconds
+            if self._last_sample is None
+            else now - self._last_sample
+        )
+        self._last_sample = now
+
+        current = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == current:
+                continue
+            name = names.get(ident, f"Thread-{ident}")
+            self.samples.setdefault(name, []).append(self._stack_id(frame))
+            self.weights.setdefault(name, []).append(weight)
+
+    def run(self, stop: threading.Event) -> None:
+        """
+        Take samples until stopped, to be run in a thread of its own
+
+        Args:
+            stop (threading.Event): Set to stop the sampling
+        """
+        while True:
+            self.sample()
+            if stop.wait(self.interval_seconds):
+                return
+
+    def collapsed(self) -> str:
+        """
+        Render the samples as collapsed stacks, the input format of flamegraph.pl and most flame graph
+        viewers: a line per distinct stack, its frames from the root separated by semicolons, then the
+        number of samples. Each stack starts with the name of its thread.
+
+        Returns:
+            str: The collapsed stacks
+        """
+        labels = [
+            f"{frame.name} ({frame.file}:{frame.line})".replace(";", ":")
+            for frame in self.frames
+        ]
+        lines = []
+        for thread, samples in sorted(self.samples.items()):
+            counts: dict[int, int] = {}
+            for stack_id in samples:
+                counts[stack_id] = counts.get(stack_id, 0) + 1
+            for stack_id, count in sorted(counts.items()):
+                frames = ";".join(
+                    labels[frame_id] for frame_id in self.stacks[stack_id]
+                )
+                lines.append(f"{thread};{frames} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self, name: str) -> dict[str, Any]:
+        """
+        Render the samples as a speedscope file, with a sampled profile per thread in the time order of
+        the samples
+
+        Args:
+            name (str): Name of the profile
+
+        Returns:
+            dict[str, Any]: The file, to be serialized as JSON
+        """
+        profiles = [
+            {
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(self.weights[thread]),
+                "samples": [list(self.stacks[stack_id]) for stack_id in samples],
+                "weights": self.weights[thread],
+            }
+            for thread, samples in sorted(self.samples.items())
+        ]
+        # The event loop runs in the main thread of the worker, opened first
+        main_thread = threading.main_thread().name
+        active = next(
+            (i for i, p in enumerate(profiles) if p["name"] == main_thread), 0
+        )
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "qrafty",
+            "activeProfileIndex": active,
+            "shared": {"frames": [frame._asdict() for frame in self.frames]},
+            "profiles": profiles,
+        }
+
+
+async def profile(seconds: float, interval_seconds: float) -> StackSampler:
+    """
+    Sample the threads of the worker for a while, the event loop going on meanwhile
+
+    Args:
+        seconds (float): Duration of the profile
+        interval_seconds (float): Interval between two samples
+
+    Returns:
+        StackSampler: The samples
+    """
+    sampler = StackSampler(interval_seconds)
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=sampler.run, args=(stop,), name="stack-sampler", daemon=True
+    )
+    thread.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        # The sampler returns as soon as its current sample is taken, a fraction of a millisecond
+        thread.join()
+    return sampler
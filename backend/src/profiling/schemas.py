@@ -0,0 +1,34 @@
+"""Pydantic models for the profiling of the workers, used for data validation and serialization"""
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class ProfileFormat(str, Enum):
+    """Output format of a sampling profile"""
+
+    COLLAPSED = "collapsed"  # collapsed stacks, for flamegraph.pl and the likes
+    SPEEDSCOPE = "speedscope"  # speedscope JSON file, https://www.speedscope.app
+
+
+class SlowCallbackTracing(BaseModel):
+    """
+    Pydantic model for the settings of the tracing of the slow callbacks, used for data validation
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    threshold_seconds: float | None = Field(default=None, gt=0, le=60)
+
+
+class SlowCallbackTracingStats(SlowCallbackTracing):
+    """
+    Pydantic model for the state of the tracing of the slow callbacks, used for serialization
+
+    Args:
+        SlowCallbackTracing (SlowCallbackTracing): Settings of the tracing
+    """
+
+    stalls: int
@@ -0,0 +1,184 @@
+"""
+Streaming ZIP archive writer.
+
+Entries are serialized as soon as they are added, so an archive can be sent to the client while it is
+being built. Only the central directory is kept until the end, already serialized, which takes a few
+dozen bytes per entry instead of a ZipInfo object per entry with the standard library zipfile module.
+ZIP64 records are written when the archive holds 65535 entries or more, or grows past 2 GiB.
+"""
+
+import struct
+import time
+import zlib
+
+# Same conservative thresholds as the standard library zipfile module
+ZIP64_LIMIT = (1 << 31) - 1
+ZIP_FILECOUNT_LIMIT = (1 << 16) - 1
+# Value of the 32 and 16 bit header fields whose actual value is held by a ZIP64 record
+ZIP64_SENTINEL = 0xFFFFFFFF
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+UTF8_NAMES_FLAG = 0x0800
+ZIP_VERSION = 20  # 2.0, deflate
+ZIP64_VERSION = 45  # 4.5, ZIP64 extensions
+UNIX_FILE_ATTRIBUTES = (0o100644 & 0xFFFF) << 16  # regular file, rw-r--r--
+MADE_BY_UNIX = 3 << 8
+
+
+def _dos_timestamp(timestamp: float) -> tuple[int, int]:
+    """
+    Convert a POSIX timestamp to the MS-DOS time and date fields used by ZIP headers
+
+    Args:
+        timestamp (float): POSIX timestamp
+
+    Returns:
+        tuple[int, int]: The DOS time and DOS date
+    """
+    t = time.localtime(timestamp)
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((max(t.tm_year, 1980) - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+class StreamingZipWriter:
+    """
+    Incremental ZIP writer, every method returns the bytes to append to the archive.
+
+    The whole content of an entry is known when it is added, so the CRC and sizes are written in the
+    local header directly and no data descriptor is needed.
+    """
+
+    def __init__(self, timestamp: float | None = None) -> None:
+        self._dos_time, self._dos_date = _dos_timestamp(timestamp or time.time())
+        self._offset: int = 0
+        self._entries: int = 0
+        self._central_directory = bytearray()
+
+    @property
+    def entries(self) -> int:
+        """Number of entries added to the archive"""
+        return self._entries
+
+    def add(self, name: str, content: bytes, compress: bool = False) -> bytes:
+        """
+        Add an entry to the archive
+
+        Args:
+            name (str): Path of the entry in the archive
+            content (bytes): Content of the entry
+            compress (bool, optional): Deflate the content, pointless for already compressed formats such as PNG. Defaults to False.
+
+        Returns:
+            bytes: The local header and data of the entry
+        """
+        encoded_name = name.encode()
+        crc = zlib.crc32(content)
+        size = len(content)
+
+        method = ZIP_STORED
+        if compress:
+            # Raw deflate stream, without the zlib header and trailer
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            content = compressor.compress(content) + compressor.flush()
+            method = ZIP_DEFLATED
+
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            ZIP_VERSION,
+            UTF8_NAMES_FLAG,
+            method,
+            self._dos_time,
+            self._dos_date,
+            crc,
+            len(content),
+            size,
+            len(encoded_name),
+            0,
+        )
+
+        # Large offsets do not fit in the central directory header, they go in a ZIP64 extra field
+        offset, extra = self._offset, b""
+        if offset >= ZIP64_LIMIT:
+            extra = struct.pack("<HHQ", 0x0001, 8, offset)
+            offset = ZIP64_SENTINEL
+
+        self._central_directory += struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50,
+            MADE_BY_UNIX | (ZIP64_VERSION if extra else ZIP_VERSION),
+            ZIP64_VERSION if extra else ZIP_VERSION,
+            UTF8_NAMES_FLAG,
+            method,
+            self._dos_time,
+            self._dos_date,
+            crc,
+            len(content),
+            size,
+            len(encoded_name),
+            len(extra),
+            0,
+            0,
+            0,
+            UNIX_FILE_ATTRIBUTES,
+            offset,
+        )
+        self._central_directory += encoded_name + extra
+
+        self._entries += 1
+        self._offset += len(header) + len(encoded_name) + len(content)
+        return header + encoded_name + content
+
+    def close(self) -> bytes:
+        """
+        Terminate the archive
+
+        Returns:
+            bytes: The central directory and the end of central directory records
+        """
+        directory_offset = self._offset
+        directory_size = len(self._central_directory)
+        records = [bytes(self._central_directory)]
+
+        if (
+            self._entries >= ZIP_FILECOUNT_LIMIT
+            or directory_offset >= ZIP64_LIMIT
+            or directory_size >= ZIP64_LIMIT
+        ):
+            zip64_end_offset = directory_offset + directory_size
+            records.append(
+                struct.pack(
+                    "<IQHHIIQQQQ",
+                    0x06064B50,
+                    44,  # size of the remainder of the record
+                    MADE_BY_UNIX | ZIP64_VERSION,
+                    ZIP64_VERSION,
+                    0,
+                    0,
+                    self._entries,
+                    self._entries,
+                    directory_size,
+                    directory_offset,
+                )
+            )
+            records.append(struct.pack("<IIQI", 0x07064B50, 0, zip64_end_offset, 1))
+
+        records.append(
+            struct.pack(
+                "<IHHHHIIH",
+                0x06054B50,
+                0,
+                0,
+                min(self._entries, 0xFFFF),
+                min(self._entries, 0xFFFF),
+                directory_size if directory_size < ZIP64_LIMIT else ZIP64_SENTINEL,
+                directory_offset if directory_offset < ZIP64_LIMIT else ZIP64_SENTINEL,
+                0,
+            )
+        )
+
+        self._central_directory = bytearray()
+        return b"".join(records)
@@ -0,0 +1,218 @@
+"""
+Batch QR code generation: parsing of the uploaded rows and streaming of the resulting ZIP archive.
+
+Rows are read lazily from the spooled upload, validated, grouped in chunks and rendered in the process
+pool of the render service. Only a bounded window of chunks is in flight at any time and every finished
+chunk is written to the archive and sent right away, so the memory used by a batch does not grow with
+the number of rows.
+"""
+
+import asyncio
+import csv
+import io
+from collections.abc import AsyncIterator, Callable, Iterator
+from typing import Any, BinaryIO
+
+from pydantic import ValidationError
+
+from src.qr.archive import StreamingZipWriter
+from src.qr.config import QR_BATCH_CHUNK_SIZE, QR_BATCH_MAX_ROWS
+from src.qr.executor import RenderService
+from src.qr.schemas import ImageFormat, QRRenderParams
+from src.qr.service import MEDIA_TYPES, RenderedQR, render_batch
+from src.uploads import UploadFormat, format_validation_error, iter_records
+
+# Format of the renders by media type, naming the archive entries
+IMAGE_FORMATS: dict[str, ImageFormat] = {v: k for k, v in MEDIA_TYPES.items()}
+# Name of the archive entry listing the rows that could not be rendered
+BATCH_ERRORS_FILENAME = "errors.csv"
+
+
+def iter_batch_rows(
+    file: BinaryIO, batch_format: UploadFormat
+) -> Iterator[tuple[int, QRRenderParams | str]]:
+    """
+    Parse and validate the rows of a batch, one row at a time
+
+    NDJSON rows are JSON objects, one per line. CSV rows are read according to the header line, whose
+    columns are named after the render parameters. Rows are numbered from 1, not counting blank
+    NDJSON lines nor the CSV header.
+
+    Args:
+        file (BinaryIO): The batch body
+        batch_format (UploadFormat): Format of the body
+
+    Yields:
+        tuple[int, QRRenderParams | str]: Row number along with its render parameters, or the reason the row is invalid
+    """
+    for row_number, record in enumerate(iter_records(file, batch_format), start=1):
+        if isinstance(record, str):
+            yield row_number, record
+            continue
+        try:
+            params = QRRenderParams.model_validate(record)
+        except ValidationError as e:
+            yield row_number, format_validation_error(e)
+            continue
+        # Rows are rendered in the process pool, away from the asset store
+        if params.logo_key is not None:
+            yield row_number, "Uploaded logos are only available in single renders"
+        else:
+            yield row_number, params
+
+
+def _archive_results(
+    archive: StreamingZipWriter,
+    results: list[tuple[int, RenderedQR | str]],
+    errors: list[tuple[int, str]],
+) -> bytes:
+    entries = []
+    for row_number, result in results:
+        if isinstance(result, str):
+            errors.append((row_number, result))
+            continue
+        image_format = IMAGE_FORMATS[result.media_type]
+        entries.append(
+            archive.add(
+                f"{row_number:06d}.{image_format.value}",
+                result.content,
+                compress=image_format is ImageFormat.SVG,
+            )
+        )
+    return b"".join(entries)
+
+
+def _errors_csv(errors: list[tuple[int, str]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(("row", "error"))
+    writer.writerows(sorted(errors))
+    return buffer.getvalue().encode()
+
+
+async def render_chunks(
+    rows: Iterator[tuple[int, QRRenderParams | str]],
+    render_service: RenderService,
+    job: Callable[[list[tuple[int, QRRenderParams]]], list[tuple[int, Any]]],
+    errors: list[tuple[int, str]],
+    max_rows: int = QR_BATCH_MAX_ROWS,
+    chunk_size: int = QR_BATCH_CHUNK_SIZE,
+    ordered: bool = False,
+) -> AsyncIterator[list[tuple[int, Any]]]:
+    """
+    Render the rows of a batch in chunks in the process pool of the render service.
+
+    At most one chunk per worker process is in flight for a batch, finished chunks held back for the
+    order included, and chunks wait for a free slot of the render service rather than being rejected
+    when it is saturated. The rows which could not be parsed or validated, and those over the limit,
+    are added to the errors along with the reason.
+
+    Args:
+        rows (Iterator[tuple[int, QRRenderParams | str]]): Rows of the batch, as yielded by iter_batch_rows
+        render_service (RenderService): Render service of the worker
+        job (Callable[[list[tuple[int, QRRenderParams]]], list[tuple[int, Any]]]): Process pool job rendering a chunk, such as render_batch
+        errors (list[tuple[int, str]]): Row numbers and reasons of the rows which could not be rendered
+        max_rows (int, optional): Maximum number of rows of a batch, the remaining rows are reported as errors. Defaults to QR_BATCH_MAX_ROWS.
+        chunk_size (int, optional): Rows rendered per process pool job. Defaults to QR_BATCH_CHUNK_SIZE.
+        ordered (bool, optional): Yield the chunks in the order of the rows rather than as soon as they are rendered. Defaults to False.
+
+    Yields:
+        list[tuple[int, Any]]: The results of the job for each chunk
+    """
+    pending: dict[asyncio.Future, int] = {}
+    finished: dict[int, list[tuple[int, Any]]] = {}
+    submitted = emitted = 0
+    chunk: list[tuple[int, QRRenderParams]] = []
+
+    def submit() -> None:
+        nonlocal submitted
+        task = asyncio.ensure_future(render_service.run(job, chunk, wait=True))
+        pending[task] = submitted
+        submitted += 1
+
+    async def wait() -> None:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            finished[pending.pop(task)] = task.result()
+
+    def ready() -> Iterator[list[tuple[int, Any]]]:
+        nonlocal emitted
+        if not ordered:
+            yield from finished.values()
+            finished.clear()
+        while emitted in finished:
+            yield finished.pop(emitted)
+            emitted += 1
+
+    try:
+        for row_number, params in rows:
+            if row_number > max_rows:
+                errors.append(
+                    (
+                        row_number,
+                        f"Batch is limited to {max_rows} rows, the remaining rows were ignored",
+                    )
+                )
+                break
+            if isinstance(params, str):
+                errors.append((row_number, params))
+                continue
+
+            chunk.append((row_number, params))
+            if len(chunk) < chunk_size:
+                continue
+
+            submit()
+            chunk = []
+
+            while len(pending) + len(finished) >= render_service.max_workers:
+                await wait()
+                for results in ready():
+                    yield results
+
+        if chunk:
+            submit()
+
+        while pending:
+            await wait()
+            for results in ready():
+                yield results
+    finally:
+        # The client went away or a chunk failed, the chunks still waiting for the pool are dropped
+        for task in pending:
+            task.cancel()
+
+
+async def stream_batch_archive(
+    rows: Iterator[tuple[int, QRRenderParams | str]],
+    render_service: RenderService,
+    max_rows: int = QR_BATCH_MAX_ROWS,
+    chunk_size: int = QR_BATCH_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Render the rows of a batch and stream them as a ZIP archive.
+
+    Each rendered row is stored as <row number>.<format>, the rows which could not be parsed, validated
+    or rendered are listed with the reason in an errors.csv entry at the end of the archive.
+    Rows are rendered in chunks, see render_chunks.
+
+    Args:
+        rows (Iterator[tuple[int, QRRenderParams | str]]): Rows of the batch, as yielded by iter_batch_rows
+        render_service (RenderService): Render service of the worker
+        max_rows (int, optional): Maximum number of rows of a batch, the remaining rows are reported as errors. Defaults to QR_BATCH_MAX_ROWS.
+        chunk_size (int, optional): Rows rendered per process pool job. Defaults to QR_BATCH_CHUNK_SIZE.
+
+    Yields:
+        bytes: Successive parts of the ZIP archive
+    """
+    archive = StreamingZipWriter()
+    errors: list[tuple[int, str]] = []
+
+    async for results in render_chunks(
+        rows, render_service, render_batch, errors, max_rows, chunk_size
+    ):
+        yield _archive_results(archive, results, errors)
+
+    if errors:
+        yield archive.add(BATCH_ERRORS_FILENAME, _errors_csv(errors), compress=True)
+    yield archive.close()
@@ -0,0 +1,241 @@
+"""
+Content-addressed cache of rendered QR codes, along with the ETag helpers built on top of its keys,
+and cache of the redirect targets of the dynamic codes
+"""
+
+import hashlib
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple
+
+from src.qr.config import QR_RENDER_CACHE_VERSION
+from src.qr.schemas import QRRenderParams, RenderCacheStats
+from src.qr.service import RenderedQR
+
+
+def render_cache_key(params: QRRenderParams) -> str:
+    """
+    Compute the canonical key of a render: the SHA-256 of the render parameters serialized as sorted,
+    compact JSON, with the colors normalized so that equivalent requests share the same key, and the logo
+    replaced by its SHA-256, whether it was sent along or uploaded beforehand
+
+    Args:
+        params (QRRenderParams): Validated render parameters
+
+    Returns:
+        str: Hex digest identifying the rendered image
+    """
+    canonical = params.model_dump(mode="json", exclude={"logo", "logo_key"})
+    for color in ("fill_color", "back_color", "eye_color", "gradient_color"):
+        if canonical[color] is not None:
+            canonical[color] = canonical[color].lower()
+    # Logos are identified by their digest rather than carried along in the key
+    if params.logo is not None:
+        canonical["logo"] = hashlib.sha256(params.logo).hexdigest()
+    elif params.logo_key is not None:
+        canonical["logo"] = params.logo_key.partition(".")[0]
+    canonical["cache_version"] = QR_RENDER_CACHE_VERSION
+
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def make_etag(key: str) -> str:
+    """
+    Build the strong ETag of a render from its cache key
+
+    Args:
+        key (str): Cache key of the render
+
+    Returns:
+        str: The quoted entity tag
+    """
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, using the weak comparison mandated by RFC 9110 for If-None-Match
+
+    Args:
+        if_none_match (str | None): Value of the If-None-Match request header
+        etag (str): Current entity tag of the resource
+
+    Returns:
+        bool: True if the client already holds the current representation
+    """
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+class RenderCache:
+    """
+    In-process LRU cache of rendered QR codes, bounded by the total size in bytes of the cached images.
+
+    The cache is only accessed from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes: int = max_bytes
+        self._entries: OrderedDict[str, RenderedQR] = OrderedDict()
+        self._size_bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    def get(self, key: str) -> RenderedQR | None:
+        """
+        Look up a render, marking it as the most recently used entry
+
+        Args:
+            key (str): Cache key of the render
+
+        Returns:
+            RenderedQR | None: The cached render, or None if it is not cached
+        """
+        rendered = self._entries.get(key)
+        if rendered is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        self._entries.move_to_end(key)
+        return rendered
+
+    def set(self, key: str, rendered: RenderedQR) -> None:
+        """
+        Cache a render, evicting the least recently used entries until the cache fits in its byte budget.
+        Renders larger than the whole budget are not cached.
+
+        Args:
+            key (str): Cache key of the render
+            rendered (RenderedQR): The render to cache
+        """
+        size = len(rendered.content)
+        if size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size_bytes -= len(previous.content)
+
+        while self._entries and self._size_bytes + size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size_bytes -= len(evicted.content)
+            self._evictions += 1
+
+        self._entries[key] = rendered
+        self._size_bytes += size
+
+    def stats(self) -> RenderCacheStats:
+        """
+        Take a snapshot of the cache counters
+
+        Returns:
+            RenderCacheStats: The current counters
+        """
+        return RenderCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            size_bytes=self._size_bytes,
+            max_bytes=self.max_bytes,
+        )
+
+
+class RedirectTarget(NamedTuple):
+    """Target of a short id, along with the code it belongs to so that scans can be recorded"""
+
+    qr_code_id: uuid.UUID
+    url: str
+
+
+# Target cached for the short ids which do not redirect anywhere, unknown or inactive
+REDIRECT_NOT_FOUND = RedirectTarget(uuid.UUID(int=0), "")
+
+
+class RedirectCache:
+    """
+    Bounded cache of the redirect targets of the dynamic codes, by short id, so that scans are answered
+    without a database round trip.
+
+    Entries expire after a TTL, the short ids which do not redirect anywhere after a shorter one. The least
+    recently used entry is evicted once the cache is full. The cache is local to the worker: changes made
+    through the worker invalidate it right away, changes made elsewhere are picked up once the entries expire.
+
+    The cache is only accessed from the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self, max_entries: int, ttl_seconds: float, not_found_ttl_seconds: float
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.not_found_ttl_seconds = not_found_ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, RedirectTarget]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, short_id: str) -> RedirectTarget | None:
+        """
+        Get the redirect target of a short id, if it is cached and still fresh
+
+        Args:
+            short_id (str): Short id of the code
+
+        Returns:
+            RedirectTarget | None: The target, REDIRECT_NOT_FOUND if the short id is known not to redirect, or None on a cache miss
+        """
+        entry = self._entries.get(short_id)
+        if entry is None:
+            return None
+
+        expires_at, target = entry
+        if expires_at <= time.monotonic():
+            del self._entries[short_id]
+            return None
+
+        self._entries.move_to_end(short_id)
+        return target
+
+    def set(self, short_id: str, target: RedirectTarget | None) -> None:
+        """
+        Cache the redirect target of a short id
+
+        Args:
+            short_id (str): Short id of the code
+            target (RedirectTarget | None): The target, None if the short id does not redirect anywhere
+        """
+        if target is None:
+            target = REDIRECT_NOT_FOUND
+        ttl = self.ttl_seconds if target.url else self.not_found_ttl_seconds
+        self._entries[short_id] = (time.monotonic() + ttl, target)
+        self._entries.move_to_end(short_id)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, short_id: str) -> None:
+        """
+        Drop a short id from the cache, once its code changed
+
+        Args:
+            short_id (str): Short id of the code
+        """
+        self._entries.pop(short_id, None)
+
+    def clear(self) -> None:
+        """Drop every short id from the cache"""
+        self._entries.clear()
@@ -0,0 +1,249 @@
+"""Business logic of the dynamic QR codes: creation with a unique short id, listing, updates and redirect lookups"""
+
+import base64
+import secrets
+import string
+import struct
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.qr.cache import RedirectTarget
+from src.qr.config import QR_CODES_PAGE_SIZE, QR_SHORT_ID_LENGTH
+from src.qr.models import QRCode
+from src.qr.schemas import QRCodeCreate, QRCodeListItem, QRCodePage
+
+SHORT_ID_ALPHABET = string.ascii_letters + string.digits
+# Short ids drawn before giving up on a creation, a single collision is already unlikely
+SHORT_ID_ATTEMPTS = 3
+
+# Cursors of the listing pack the creation time, in microseconds since the epoch, and the id of the last code
+_CURSOR_FORMAT = struct.Struct(">q16s")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class ListCursor(NamedTuple):
+    """Position in the listing of a user's codes: the sort key of the last code of a page"""
+
+    created_at: datetime
+    id: uuid.UUID
+
+
+def encode_cursor(cursor: ListCursor) -> str:
+    """
+    Encode a position in the listing into an opaque, URL safe cursor
+
+    Args:
+        cursor (ListCursor): Sort key of the last code of a page
+
+    Returns:
+        str: The cursor
+    """
+    microseconds = (cursor.created_at - _EPOCH) // timedelta(microseconds=1)
+    packed = _CURSOR_FORMAT.pack(microseconds, cursor.id.bytes)
+    return base64.urlsafe_b64encode(packed).decode()
+
+
+def decode_cursor(cursor: str) -> ListCursor:
+    """
+    Decode a cursor built by encode_cursor
+
+    Args:
+        cursor (str): The cursor
+
+    Returns:
+        ListCursor: Sort key of the last code of a page
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        packed = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        microseconds, id_bytes = _CURSOR_FORMAT.unpack(packed)
+        return ListCursor(
+            _EPOCH + timedelta(microseconds=microseconds), uuid.UUID(bytes=id_bytes)
+        )
+    except (ValueError, struct.error, OverflowError) as error:
+        raise ValueError("Invalid cursor") from error
+
+
+def generate_short_id(length: int = QR_SHORT_ID_LENGTH) -> str:
+    """
+    Draw a random short id, made of letters and digits
+
+    Args:
+        length (int, optional): Number of characters. Defaults to QR_SHORT_ID_LENGTH.
+
+    Returns:
+        str: The short id
+    """
+    return "".join(secrets.choice(SHORT_ID_ALPHABET) for _ in range(length))
+
+
+async def create_qr_code(
+    session: AsyncSession, owner_id: uuid.UUID, qr_code_create: QRCodeCreate
+) -> QRCode:
+    """
+    Create a dynamic QR code with a random short id. The code is inserted with a single
+    INSERT ... ON CONFLICT DO NOTHING RETURNING statement, a new short id being drawn on a collision.
+
+    Args:
+        session (AsyncSession): Database session
+        owner_id (uuid.UUID): ID of the user owning the code
+        qr_code_create (QRCodeCreate): Fields of the code
+
+    Returns:
+        QRCode: The created code
+
+    Raises:
+        RuntimeError: If no unique short id was found within SHORT_ID_ATTEMPTS draws
+    """
+    for _ in range(SHORT_ID_ATTEMPTS):
+        statement = (
+            insert(QRCode)
+            .values(
+                owner_id=owner_id,
+                short_id=generate_short_id(),
+                name=qr_code_create.name,
+                target_url=str(qr_code_create.target_url),
+                is_active=True,
+            )
+            .on_conflict_do_nothing(index_elements=[QRCode.short_id])
+            .returning(QRCode)
+        )
+        qr_code = (await session.scalars(statement)).one_or_none()
+        if qr_code is not None:
+            await session.commit()
+            return qr_code
+
+    raise RuntimeError("Could not generate a unique short id")
+
+
+async def get_qr_code(
+    session: AsyncSession, qr_code_id: uuid.UUID, owner_id: uuid.UUID
+) -> QRCode | None:
+    """
+    Get a code of a user
+
+    Args:
+        session (AsyncSession): Database session
+        qr_code_id (uuid.UUID): ID of the code
+        owner_id (uuid.UUID): ID of the user owning the code
+
+    Returns:
+        QRCode | None: The code, or None if it does not exist or belongs to another user
+    """
+    return await session.scalar(
+        select(QRCode).where(QRCode.id == qr_code_id, QRCode.owner_id == owner_id)
+    )
+
+
+async def list_qr_codes(
+    session: AsyncSession,
+    owner_id: uuid.UUID,
+    limit: int = QR_CODES_PAGE_SIZE,
+    after: ListCursor | None = None,
+) -> QRCodePage:
+    """
+    List the codes of a user, newest first, a page at a time.
+
+    Pages are keyed on (created_at, id) rather than offset: the next page starts right after the last code
+    of the previous one, found through the (owner_id, created_at, id) index, so every page costs the same
+    however deep into the listing it is. Only the columns of the list are loaded, as rows rather than ORM
+    entities. One more code than the limit is fetched to tell whether there is a next page.
+
+    Args:
+        session (AsyncSession): Database session
+        owner_id (uuid.UUID): ID of the user owning the codes
+        limit (int, optional): Maximum number of codes in the page. Defaults to QR_CODES_PAGE_SIZE.
+        after (ListCursor | None, optional): Position of the previous page. Defaults to None, for the first page.
+
+    Returns:
+        QRCodePage: The codes of the page, with the cursor of the next page
+    """
+    statement = (
+        select(
+            QRCode.id,
+            QRCode.short_id,
+            QRCode.name,
+            QRCode.target_url,
+            QRCode.is_active,
+            QRCode.created_at,
+        )
+        .where(QRCode.owner_id == owner_id)
+        .order_by(QRCode.created_at.desc(), QRCode.id.desc())
+        .limit(limit + 1)
+    )
+    if after is not None:
+        statement = statement.where(
+            tuple_(QRCode.created_at, QRCode.id) < tuple_(after.created_at, after.id)
+        )
+    rows = (await session.execute(statement)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(ListCursor(rows[-1].created_at, rows[-1].id))
+    return QRCodePage(
+        items=[QRCodeListItem(**row._mapping) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+async def update_qr_code(
+    session: AsyncSession, qr_code: QRCode, update_dict: dict[str, Any]
+) -> QRCode:
+    """
+    Update the fields of a code
+
+    Args:
+        session (AsyncSession): Database session
+        qr_code (QRCode): The code to update
+        update_dict (dict[str, Any]): Fields to update
+
+    Returns:
+        QRCode: The updated code
+    """
+    for field, value in update_dict.items():
+        setattr(qr_code, field, str(value) if field == "target_url" else value)
+    await session.commit()
+    return qr_code
+
+
+async def delete_qr_code(session: AsyncSession, qr_code: QRCode) -> None:
+    """
+    Delete a code, its short URL stops redirecting
+
+    Args:
+        session (AsyncSession): Database session
+        qr_code (QRCode): The code to delete
+    """
+    await session.delete(qr_code)
+    await session.commit()
+
+
+async def get_redirect_target(
+    session: AsyncSession, short_id: str
+) -> RedirectTarget | None:
+    """
+    Look up the target of a short id, loading the id and target columns only
+
+    Args:
+        session (AsyncSession): Database session
+        short_id (str): Short id of the code
+
+    Returns:
+        RedirectTarget | None: The target, or None if no active code has this short id
+    """
+    row = (
+        await session.execute(
+            select(QRCode.id, QRCode.target_url).where(
+                QRCode.short_id == short_id, QRCode.is_active.is_(True)
+            )
+        )
+    ).one_or_none()
+    return RedirectTarget(*row) if row is not None else None
@@ -0,0 +1,78 @@
+"""QR code generation specific configuration"""
+
+from src.config import settings
+
+QR_DEFAULT_BOX_SIZE: int = 10  # size in pixels of a single module
+QR_MAX_BOX_SIZE: int = 100
+# Quiet zone in modules, 4 is the minimum required by the QR code specification
+QR_DEFAULT_BORDER: int = 4
+QR_MAX_BORDER: int = 20
+# Byte mode capacity of a version 40 code at error correction level L
+QR_MAX_DATA_LENGTH: int = 2953
+# zlib level used for the PNG IDAT chunk, 6 is the zlib default
+QR_PNG_COMPRESSION_LEVEL: int = 6
+# zlib level of the PDF page contents, path operators compress as well at 5 as at the default 6, twice as fast
+QR_PDF_COMPRESSION_LEVEL: int = 5
+# Approximate size of the pieces in which SVG documents are written
+QR_SVG_CHUNK_SIZE: int = 64 * 1024
+
+# Encoded matrices kept by each render process, so a payload rendered in several styles, sizes or formats
+# is encoded once, up to 4 KiB each
+QR_ENCODE_CACHE_MAX_ENTRIES: int = 1024
+
+# Styled renders are anti-aliased RGB images, their width is capped to bound the memory of a render
+QR_STYLE_MAX_SIZE: int = 2048
+# Compiled styles kept by each render process, a style being compiled once per box size and geometry
+QR_STYLE_CACHE_MAX_ENTRIES: int = 64
+# Color canvases of the gradients, kept for fewer geometries as they take up to 12 MiB each
+QR_STYLE_CANVAS_CACHE_MAX_ENTRIES: int = 8
+# Samples per pixel side used to anti-alias the stamps of the styles when they are compiled
+QR_STYLE_SUPERSAMPLING: int = 4
+# Logos are sent along with the render parameters, base64 encoded
+QR_LOGO_MAX_BYTES: int = 256 * 1024
+# Logos uploaded ahead of the renders are streamed to the asset store, and can be far larger
+QR_LOGO_UPLOAD_MAX_BYTES: int = 16 * 1024 * 1024
+# Decoded logos larger than this are rejected before being decompressed
+QR_LOGO_MAX_PIXELS: int = 4096 * 4096
+QR_LOGO_DEFAULT_SIZE: float = (
+    0.2  # fraction of the width of the code covered by the logo
+)
+# Modules hidden by the logo are lost, beyond this share of the width codes stop being readable
+QR_LOGO_MAX_SIZE: float = 0.3
+
+QR_RENDER_CACHE_MAX_BYTES: int = settings.QR_RENDER_CACHE_MAX_BYTES
+# Renders are immutable for a given set of parameters, so clients can keep them around
+QR_RENDER_CACHE_MAX_AGE_SECONDS: int = 86400  # 1 day
+# Salt of the cache keys, bump it whenever the engine output changes to invalidate stale ETags
+QR_RENDER_CACHE_VERSION: str = "2"
+
+# Size of the process pool rasterizing the QR codes off the event loop, None uses one process per CPU
+QR_RENDER_WORKERS: int | None = settings.QR_RENDER_WORKERS
+# Renders allowed to wait for a free process, beyond that requests are rejected with a 503
+QR_RENDER_MAX_QUEUE: int = settings.QR_RENDER_MAX_QUEUE
+QR_RENDER_RETRY_AFTER_SECONDS: int = settings.QR_RENDER_RETRY_AFTER_SECONDS
+
+QR_BATCH_MAX_ROWS: int = settings.QR_BATCH_MAX_ROWS
+QR_BATCH_MAX_BODY_BYTES: int = settings.QR_BATCH_MAX_BODY_BYTES
+# Rows rendered per process pool job, amortizing the cost of shipping jobs to the worker processes
+QR_BATCH_CHUNK_SIZE: int = 32
+
+# Codes per row of the PDF sheets, the rows per page follow from the page size
+QR_SHEET_DEFAULT_COLUMNS: int = 3
+QR_SHEET_MAX_COLUMNS: int = 8
+
+# Length of the generated short ids of the dynamic codes, 62^8 possible ids
+QR_SHORT_ID_LENGTH: int = 8
+QR_SHORT_ID_MAX_LENGTH: int = 16
+QR_TARGET_URL_MAX_LENGTH: int = 2048
+
+# Codes per page of the listing of a user's codes
+QR_CODES_PAGE_SIZE: int = 50
+QR_CODES_MAX_PAGE_SIZE: int = 200
+
+QR_REDIRECT_CACHE_MAX_ENTRIES: int = settings.QR_REDIRECT_CACHE_MAX_ENTRIES
+# Redirect targets are reused for at most this long, bounding how stale a worker's copy of a target can be
+# when the code was updated through another worker
+QR_REDIRECT_CACHE_TTL_SECONDS: int = 60
+# Unknown and inactive short ids are remembered for a shorter time, sparing the database from repeated scans
+QR_REDIRECT_NOT_FOUND_TTL_SECONDS: int = 10
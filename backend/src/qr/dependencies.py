@@ -0,0 +1,161 @@
+"""QR code generation specific dependencies"""
+
+import uuid
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Query, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import User
+from src.auth.router import current_active_user
+from src.database import get_async_session
+
+from src.qr.cache import RedirectCache, RenderCache
+from src.qr.config import (
+    QR_DEFAULT_BORDER,
+    QR_DEFAULT_BOX_SIZE,
+    QR_REDIRECT_CACHE_MAX_ENTRIES,
+    QR_REDIRECT_CACHE_TTL_SECONDS,
+    QR_REDIRECT_NOT_FOUND_TTL_SECONDS,
+    QR_RENDER_CACHE_MAX_BYTES,
+    QR_RENDER_MAX_QUEUE,
+    QR_RENDER_WORKERS,
+)
+from src.qr.codes import get_qr_code
+from src.qr.executor import RenderService
+from src.qr.models import QRCode
+from src.qr.schemas import (
+    ErrorCorrectionLevel,
+    EyeShape,
+    GradientKind,
+    ImageFormat,
+    ModuleShape,
+    QRRenderParams,
+)
+
+
+async def get_render_params(
+    data: Annotated[str, Query(description="Payload to encode in the QR code")],
+    error_correction: ErrorCorrectionLevel = ErrorCorrectionLevel.M,
+    version: int | None = None,
+    box_size: int = QR_DEFAULT_BOX_SIZE,
+    border: int = QR_DEFAULT_BORDER,
+    fill_color: str = "#000000",
+    back_color: str = "#FFFFFF",
+    format: ImageFormat = ImageFormat.PNG,
+    module_shape: ModuleShape = ModuleShape.SQUARE,
+    eye_shape: EyeShape = EyeShape.SQUARE,
+    eye_color: str | None = None,
+    gradient: GradientKind | None = None,
+    gradient_color: str | None = None,
+    logo_key: str | None = None,
+) -> QRRenderParams:
+    """
+    Dependency that collects the render parameters from the query string and validates them against the QRRenderParams schema.
+    Logos do not fit in a query string, they are either sent in the body of POST /qr/render or uploaded
+    to POST /qr/logos beforehand and referenced by their key
+
+    Returns:
+        QRRenderParams: The validated render parameters
+
+    Raises:
+        HTTPException: 422 if the parameters do not satisfy the QRRenderParams constraints
+    """
+    try:
+        return QRRenderParams(
+            data=data,
+            error_correction=error_correction,
+            version=version,
+            box_size=box_size,
+            border=border,
+            fill_color=fill_color,
+            back_color=back_color,
+            format=format,
+            module_shape=module_shape,
+            eye_shape=eye_shape,
+            eye_color=eye_color,
+            gradient=gradient,
+            gradient_color=gradient_color,
+            logo_key=logo_key,
+        )
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=e.errors(include_url=False, include_context=False),
+        )
+
+
+# Process wide render cache, shared by every request handled by this worker
+render_cache = RenderCache(QR_RENDER_CACHE_MAX_BYTES)
+
+
+async def get_render_cache() -> RenderCache:
+    """
+    Dependency that provides the process wide render cache
+
+    Returns:
+        RenderCache: The render cache of the current worker
+    """
+    return render_cache
+
+
+# Process wide cache of the redirect targets of the dynamic codes
+redirect_cache = RedirectCache(
+    QR_REDIRECT_CACHE_MAX_ENTRIES,
+    QR_REDIRECT_CACHE_TTL_SECONDS,
+    QR_REDIRECT_NOT_FOUND_TTL_SECONDS,
+)
+
+
+async def get_redirect_cache() -> RedirectCache:
+    """
+    Dependency that provides the process wide redirect cache
+
+    Returns:
+        RedirectCache: The redirect cache of the current worker
+    """
+    return redirect_cache
+
+
+# Process wide render service, started and stopped by the lifespan of the application
+render_service = RenderService(
+    max_workers=QR_RENDER_WORKERS, max_queue=QR_RENDER_MAX_QUEUE
+)
+
+
+async def get_render_service() -> RenderService:
+    """
+    Dependency that provides the process wide render service
+
+    Returns:
+        RenderService: The render service of the current worker
+    """
+    return render_service
+
+
+async def get_owned_qr_code(
+    qr_code_id: uuid.UUID,
+    user: Annotated[User, Depends(current_active_user)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+) -> QRCode:
+    """
+    Dependency that loads a code of the current user from the path
+
+    Args:
+        qr_code_id (uuid.UUID): ID of the code, from the path
+        user (User): The current user, injected by the current_active_user dependency
+        session (AsyncSession): Database session, injected by the get_async_session dependency
+
+    Returns:
+        QRCode: The code
+
+    Raises:
+        HTTPException: 404 if the code does not exist or belongs to another user
+    """
+    qr_code = await get_qr_code(session, qr_code_id, user.id)
+    if qr_code is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="QR code not found"
+        )
+    return qr_code
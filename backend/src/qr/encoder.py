@@ -0,0 +1,478 @@
+"""
+QR code encode stage: from the payload to the module matrix, bit-packed.
+
+The payload is segmented and the version selected by the qrcode library, everything after that is done
+with NumPy: the bit stream of the segments, the padding of the data codewords, the Reed-Solomon error correction of all the blocks at
+once, the placement of the codewords, and the scoring of the 8 mask patterns with the penalty rules of
+the specification, all 8 candidates being scored together. The function patterns and the placement
+order of each version are computed once. Masks are chosen exactly as the qrcode library does, so the
+matrices are identical to the ones it builds.
+
+Encoded matrices are memoized, a payload rendered in several styles, sizes or formats being encoded
+once, and are kept bit-packed: a version 40 matrix takes 4 KiB.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import qrcode
+from qrcode import base, constants, util
+from qrcode.exceptions import DataOverflowError
+
+from src.qr.config import QR_ENCODE_CACHE_MAX_ENTRIES
+from src.qr.schemas import ErrorCorrectionLevel
+
+# Mapping of the error correction levels to the constants expected by the qrcode library
+ERROR_CORRECTION_LEVELS: dict[ErrorCorrectionLevel, int] = {
+    ErrorCorrectionLevel.L: constants.ERROR_CORRECT_L,
+    ErrorCorrectionLevel.M: constants.ERROR_CORRECT_M,
+    ErrorCorrectionLevel.Q: constants.ERROR_CORRECT_Q,
+    ErrorCorrectionLevel.H: constants.ERROR_CORRECT_H,
+}
+
+# Pad codewords filling the data capacity, alternating
+PAD_CODEWORDS = np.array([0xEC, 0x11], dtype=np.uint8)
+
+# Characters per group, radix of the characters and bit width of the groups by number of characters,
+# for every mode of the segments
+SEGMENT_ENCODINGS: dict[int, tuple[int, int, dict[int, int]]] = {
+    util.MODE_NUMBER: (3, 10, util.NUMBER_LENGTH),
+    util.MODE_ALPHA_NUM: (2, 45, {2: 11, 1: 6}),
+    util.MODE_8BIT_BYTE: (1, 256, {1: 8}),
+}
+# Value of the characters of the alphanumeric mode, by byte
+ALPHA_NUM_VALUES = np.zeros(256, dtype=np.int64)
+ALPHA_NUM_VALUES[np.frombuffer(util.ALPHA_NUM, dtype=np.uint8)] = np.arange(45)
+
+
+def _gf_tables() -> tuple[np.ndarray, np.ndarray]:
+    """Exponent table and multiplication table of GF(256) with the primitive polynomial x^8+x^4+x^3+x^2+1"""
+    exp = np.zeros(255, dtype=np.int64)
+    value = 1
+    for power in range(255):
+        exp[power] = value
+        value <<= 1
+        if value & 0x100:
+            value ^= 0x11D
+    log = np.zeros(256, dtype=np.int64)
+    log[exp] = np.arange(255)
+
+    multiplication = np.zeros((256, 256), dtype=np.uint8)
+    multiplication[1:, 1:] = exp[(log[1:, None] + log[None, 1:]) % 255]
+    return exp, multiplication
+
+
+GF_EXP, GF_MUL = _gf_tables()
+
+
+@lru_cache(maxsize=None)
+def _generator(ec_count: int) -> np.ndarray:
+    """
+    Coefficients of the Reed-Solomon generator polynomial of degree ec_count, (x - 1)(x - a)...(x - a^(ec_count-1)),
+    highest degree first, without the leading 1
+    """
+    generator = np.array([1], dtype=np.uint8)
+    for power in range(ec_count):
+        shifted = np.append(generator, 0)
+        shifted[1:] ^= GF_MUL[generator, GF_EXP[power]]
+        generator = shifted
+    return generator[1:]
+
+
+def error_correction_codewords(blocks: np.ndarray, ec_count: int) -> np.ndarray:
+    """
+    Compute the error correction codewords of data blocks of the same length: the remainder of the
+    division of each block by the generator polynomial, all blocks being divided together
+
+    Args:
+        blocks (np.ndarray): uint8 data codewords, one block per row
+        ec_count (int): Number of error correction codewords per block
+
+    Returns:
+        np.ndarray: uint8 error correction codewords, one block per row
+    """
+    generator = _generator(ec_count)
+    remainder = np.zeros((blocks.shape[0], ec_count), dtype=np.uint8)
+    for column in blocks.T:
+        factor = column ^ remainder[:, 0]
+        remainder[:, :-1] = remainder[:, 1:]
+        remainder[:, -1] = 0
+        remainder ^= GF_MUL[factor[:, None], generator[None, :]]
+    return remainder
+
+
+def segment_bits(data_list: list[util.QRData], version: int) -> np.ndarray:
+    """
+    Write the segments of a payload as a bit stream: mode indicator, character count and characters of
+    each segment, the characters packed by groups as the mode defines
+
+    Args:
+        data_list (list[util.QRData]): Segments of the payload
+        version (int): QR code version, which sets the width of the character counts
+
+    Returns:
+        np.ndarray: The uint8 bits, most significant bit of every field first
+    """
+    values, widths = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for data in data_list:
+        size, radix, group_widths = SEGMENT_ENCODINGS[data.mode]
+        chars = np.frombuffer(data.data, dtype=np.uint8)
+        if data.mode == util.MODE_NUMBER:
+            chars = chars - ord("0")
+        elif data.mode == util.MODE_ALPHA_NUM:
+            chars = ALPHA_NUM_VALUES[chars]
+
+        values.append([data.mode, len(data)])
+        widths.append([4, util.length_in_bits(data.mode, version)])
+
+        # Full groups, then the shorter group of the remaining characters
+        full = len(chars) // size * size
+        groups = [chars[:full].reshape(-1, size)]
+        if len(chars) > full:
+            groups.append(chars[full:][None])
+        for group in groups:
+            weights = radix ** np.arange(group.shape[1] - 1, -1, -1, dtype=np.int64)
+            values.append(group @ weights)
+            widths.append(np.full(len(group), group_widths[group.shape[1]]))
+
+    values = np.concatenate(values).astype(np.int64)
+    widths = np.concatenate(widths)
+    shifts = np.arange(15, -1, -1)
+    bits = (values[:, None] >> shifts) & 1
+    return bits[shifts < widths[:, None]].astype(np.uint8)
+
+
+def create_codewords(
+    data_list: list[util.QRData], version: int, error_correction: int
+) -> np.ndarray:
+    """
+    Build the final sequence of codewords of a QR code: the segments of the payload, terminated and padded
+    to the data capacity of the version, split into blocks which are interleaved, followed by the
+    interleaved error correction codewords of the blocks
+
+    Args:
+        data_list (list[util.QRData]): Segments of the payload
+        version (int): QR code version
+        error_correction (int): Error correction constant of the qrcode library
+
+    Returns:
+        np.ndarray: The uint8 codewords
+
+    Raises:
+        DataOverflowError: If the segments do not fit in the version
+    """
+    segments = segment_bits(data_list, version)
+
+    rs_blocks = base.rs_blocks(version, error_correction)
+    capacity = sum(block.data_count for block in rs_blocks)
+    if len(segments) > capacity * 8:
+        raise DataOverflowError(
+            "Code length overflow. Data size (%s) > size available (%s)"
+            % (len(segments), capacity * 8)
+        )
+
+    # Up to 4 zero bits terminate the data, then zero bits up to the next codeword boundary
+    length = min(len(segments) + 4, capacity * 8)
+    bits = np.zeros(-(-length // 8) * 8, dtype=np.uint8)
+    bits[: len(segments)] = segments
+    codewords = np.packbits(bits)
+    codewords = np.concatenate(
+        (codewords, np.resize(PAD_CODEWORDS, capacity - len(codewords)))
+    )
+
+    # Blocks of the second group are one codeword longer. The shorter blocks are padded with a leading
+    # zero for the division, which leaves their remainder unchanged, and skip their last column when
+    # the blocks are interleaved column by column
+    data_counts = np.array([block.data_count for block in rs_blocks])
+    ec_count = rs_blocks[0].total_count - rs_blocks[0].data_count
+    columns = np.arange(data_counts.max())
+    leading = columns[None, :] >= (columns[-1] + 1 - data_counts)[:, None]
+    trailing = columns[None, :] < data_counts[:, None]
+
+    blocks = np.zeros(leading.shape, dtype=np.uint8)
+    blocks[leading] = codewords
+    ec_codewords = error_correction_codewords(blocks, ec_count)
+
+    blocks[trailing] = codewords
+    return np.concatenate((blocks.T[trailing.T], ec_codewords.T.ravel()))
+
+
+class Layout(NamedTuple):
+    """
+    Everything about a version which does not depend on the payload
+
+    Args:
+        template (np.ndarray): Function patterns, the format and version information left light
+        rows (np.ndarray): Row of every data module, in placement order
+        columns (np.ndarray): Column of every data module, in placement order
+        masks (np.ndarray): The 8 mask patterns, restricted to the data modules
+        format_rows (np.ndarray): Rows of the two copies of the 15 format information bits
+        format_columns (np.ndarray): Columns of the two copies of the 15 format information bits
+        version_rows (np.ndarray): Rows of the two copies of the 18 version information bits, empty below version 7
+        version_columns (np.ndarray): Columns of the two copies of the 18 version information bits
+    """
+
+    template: np.ndarray
+    rows: np.ndarray
+    columns: np.ndarray
+    masks: np.ndarray
+    format_rows: np.ndarray
+    format_columns: np.ndarray
+    version_rows: np.ndarray
+    version_columns: np.ndarray
+
+
+@lru_cache(maxsize=None)
+def version_layout(version: int) -> Layout:
+    """
+    Compute the layout of a version, once per version
+
+    Args:
+        version (int): QR code version
+
+    Returns:
+        Layout: The layout of the version
+    """
+    # The function patterns are drawn by the qrcode library, the format and version information being
+    # reserved as the library does while scoring the masks
+    qr = qrcode.QRCode(version=version)
+    size = qr.modules_count = version * 4 + 17
+    qr.modules = [[None] * size for _ in range(size)]
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(size - 7, 0)
+    qr.setup_position_probe_pattern(0, size - 7)
+    qr.setup_position_adjust_pattern()
+    qr.setup_timing_pattern()
+    qr.setup_type_info(True, 0)
+    if version >= 7:
+        qr.setup_type_number(True)
+    reserved = np.array([[module is not None for module in row] for row in qr.modules])
+    template = np.array([[module is True for module in row] for row in qr.modules])
+
+    # Data modules are placed in pairs of columns from the right, upwards then downwards, skipping the
+    # vertical timing pattern, right module first
+    right = np.arange(size - 1, 0, -2)
+    right[right <= 6] -= 1
+    upwards = np.arange(size - 1, -1, -1)
+    rows = np.where((np.arange(len(right)) % 2 == 0)[:, None], upwards, upwards[::-1])
+    rows = np.repeat(rows, 2, axis=1).ravel()
+    columns = (right[:, None, None] - np.array([0, 1])).repeat(size, axis=1).ravel()
+    data = ~reserved[rows, columns]
+    rows, columns = rows[data], columns[data]
+
+    i, j = np.indices((size, size))
+    masks = np.array(
+        [
+            (i + j) % 2 == 0,
+            i % 2 == 0,
+            j % 3 == 0,
+            (i + j) % 3 == 0,
+            (i // 2 + j // 3) % 2 == 0,
+            (i * j) % 2 + (i * j) % 3 == 0,
+            ((i * j) % 2 + (i * j) % 3) % 2 == 0,
+            ((i * j) % 3 + (i + j) % 2) % 2 == 0,
+        ]
+    )
+    masks &= ~reserved
+
+    bit = np.arange(15)
+    format_rows = np.concatenate(
+        (
+            np.where(bit < 6, bit, np.where(bit < 8, bit + 1, size - 15 + bit)),
+            np.full(15, 8),
+        )
+    )
+    format_columns = np.concatenate(
+        (
+            np.full(15, 8),
+            np.where(bit < 8, size - bit - 1, np.where(bit < 9, 15 - bit, 14 - bit)),
+        )
+    )
+    bit = np.arange(18 if version >= 7 else 0)
+    version_rows = np.concatenate((bit // 3, bit % 3 + size - 11))
+    version_columns = np.concatenate((bit % 3 + size - 11, bit // 3))
+
+    return Layout(
+        template,
+        rows,
+        columns,
+        masks,
+        format_rows,
+        format_columns,
+        version_rows,
+        version_columns,
+    )
+
+
+def mask_candidates(codewords: np.ndarray, layout: Layout) -> np.ndarray:
+    """
+    Place the codewords in the data modules and apply each of the 8 mask patterns
+
+    Args:
+        codewords (np.ndarray): uint8 codewords, as returned by create_codewords
+        layout (Layout): Layout of the version
+
+    Returns:
+        np.ndarray: The 8 masked boolean matrices, the format and version information left light
+    """
+    # The remainder bits past the last codeword are light before masking
+    modules = layout.template.copy()
+    bits = np.unpackbits(codewords)[: len(layout.rows)]
+    modules[layout.rows[: len(bits)], layout.columns[: len(bits)]] = bits
+    return modules ^ layout.masks
+
+
+def _run_penalties(lines: np.ndarray) -> np.ndarray:
+    """
+    First rule: every run of 5 or more modules of the same color along a line costs its length minus 2,
+    counted as one per window of 5 equal modules, a run of length L having L - 4 of them, plus 2 per run
+    """
+    equal = lines[:, :, 1:] == lines[:, :, :-1]
+    windows = equal[:, :, :-3] & equal[:, :, 1:-2] & equal[:, :, 2:-1] & equal[:, :, 3:]
+    # The first window of a run is not preceded by an equal module
+    first = windows.copy()
+    first[:, :, 1:] &= ~equal[:, :, :-4]
+    return windows.sum(axis=(1, 2)) + 2 * first.sum(axis=(1, 2))
+
+
+def _finder_penalties(lines: np.ndarray) -> np.ndarray:
+    """
+    Third rule: every finder-like pattern along a line costs 40, that is dark light dark dark dark light
+    dark followed or preceded by 4 light modules
+    """
+    width = lines.shape[2]
+    core = (
+        lines[:, :, : width - 6]
+        & ~lines[:, :, 1 : width - 5]
+        & lines[:, :, 2 : width - 4]
+        & lines[:, :, 3 : width - 3]
+        & lines[:, :, 4 : width - 2]
+        & ~lines[:, :, 5 : width - 1]
+        & lines[:, :, 6:]
+    )
+    light = ~(
+        lines[:, :, : width - 3]
+        | lines[:, :, 1 : width - 2]
+        | lines[:, :, 2 : width - 1]
+        | lines[:, :, 3:]
+    )
+    before = core[:, :, : width - 10] & light[:, :, 7:]
+    after = light[:, :, : width - 10] & core[:, :, 4:]
+    return 40 * (before.sum(axis=(1, 2)) + after.sum(axis=(1, 2)))
+
+
+def mask_penalties(candidates: np.ndarray) -> np.ndarray:
+    """
+    Score masked matrices with the four penalty rules, as the qrcode library does
+
+    Args:
+        candidates (np.ndarray): Boolean matrices, one per mask pattern
+
+    Returns:
+        np.ndarray: The penalty of every matrix
+    """
+    columns = candidates.transpose(0, 2, 1)
+    size = candidates.shape[1]
+
+    runs = _run_penalties(candidates) + _run_penalties(columns)
+
+    # Second rule: every 2x2 block of the same color costs 3
+    top_left = candidates[:, :-1, :-1]
+    blocks = (
+        (top_left == candidates[:, :-1, 1:])
+        & (top_left == candidates[:, 1:, :-1])
+        & (top_left == candidates[:, 1:, 1:])
+    )
+    blocks = 3 * blocks.sum(axis=(1, 2))
+
+    finders = _finder_penalties(candidates) + _finder_penalties(columns)
+
+    # Fourth rule: every 5% of dark modules away from 50% costs 10
+    dark = candidates.sum(axis=(1, 2)) / size**2
+    balance = 10 * (np.abs(dark * 100 - 50) / 5).astype(np.int64)
+
+    return runs + blocks + finders + balance
+
+
+class EncodedQR(NamedTuple):
+    """
+    Module matrix of an encoded QR code, without the quiet zone
+
+    Args:
+        version (int): QR code version
+        mask (int): Mask pattern applied to the data modules
+        packed (bytes): Rows of modules, 8 modules per byte, each row padded to a whole byte
+    """
+
+    version: int
+    mask: int
+    packed: bytes
+
+    @property
+    def size(self) -> int:
+        """Side of the matrix, in modules"""
+        return self.version * 4 + 17
+
+    def matrix(self, border: int = 0) -> np.ndarray:
+        """
+        Unpack the module matrix
+
+        Args:
+            border (int, optional): Width of the quiet zone to add around the matrix, in modules. Defaults to 0.
+
+        Returns:
+            np.ndarray: Square boolean matrix, True for dark modules
+        """
+        size = self.size
+        rows = np.frombuffer(self.packed, dtype=np.uint8).reshape(size, -1)
+        matrix = np.zeros((size + 2 * border,) * 2, dtype=bool)
+        matrix[border : border + size, border : border + size] = np.unpackbits(
+            rows, axis=1, count=size
+        )
+        return matrix
+
+
+@lru_cache(maxsize=QR_ENCODE_CACHE_MAX_ENTRIES)
+def encode(
+    data: str,
+    error_correction: ErrorCorrectionLevel = ErrorCorrectionLevel.M,
+    version: int | None = None,
+) -> EncodedQR:
+    """
+    Encode the data into the module matrix of a QR code, memoized
+
+    Args:
+        data (str): Payload to encode
+        error_correction (ErrorCorrectionLevel, optional): Error correction level. Defaults to M.
+        version (int | None, optional): QR code version, the smallest fitting version is used if None. Defaults to None.
+
+    Returns:
+        EncodedQR: The encoded matrix
+
+    Raises:
+        qrcode.exceptions.DataOverflowError: If the data does not fit in the requested version
+    """
+    level = ERROR_CORRECTION_LEVELS[error_correction]
+    qr = qrcode.QRCode(version=version, error_correction=level)
+    qr.add_data(data)
+    if version is None:
+        version = qr.best_fit()
+
+    layout = version_layout(version)
+    candidates = mask_candidates(create_codewords(qr.data_list, version, level), layout)
+    mask = int(np.argmin(mask_penalties(candidates)))
+    matrix = candidates[mask]
+
+    format_bits = util.BCH_type_info((level << 3) | mask)
+    matrix[layout.format_rows, layout.format_columns] = np.tile(
+        (format_bits >> np.arange(15)) & 1, 2
+    )
+    if version >= 7:
+        version_bits = util.BCH_type_number(version)
+        matrix[layout.version_rows, layout.version_columns] = np.tile(
+            (version_bits >> np.arange(18)) & 1, 2
+        )
+    matrix[matrix.shape[0] - 8, 8] = True
+
+    return EncodedQR(version, mask, np.packbits(matrix, axis=1).tobytes())
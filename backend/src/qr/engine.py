@@ -0,0 +1,435 @@
+"""
+Vectorized QR code rendering engine.
+
+The module matrix is encoded by src.qr.encoder, which memoizes it, and unpacked as a NumPy boolean
+array. Every output format is rasterized straight from it, instead of going through the qrcode image
+factories which draw each module individually from Python. Vector formats draw the outlines of the regions of dark modules rather than
+the modules themselves.
+"""
+
+import struct
+import zlib
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
+
+from src.qr.config import QR_PNG_COMPRESSION_LEVEL, QR_SVG_CHUNK_SIZE
+from src.qr.encoder import encode
+from src.qr.pdf import StreamingPDFWriter
+from src.qr.schemas import ErrorCorrectionLevel
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def build_matrix(
+    data: str,
+    error_correction: ErrorCorrectionLevel = ErrorCorrectionLevel.M,
+    version: int | None = None,
+    border: int = 4,
+) -> np.ndarray:
+    """
+    Build the module matrix of the QR code, including the quiet zone, from the memoized encoding of the data
+
+    Args:
+        data (str): Payload to encode
+        error_correction (ErrorCorrectionLevel, optional): Error correction level. Defaults to M.
+        version (int | None, optional): QR code version, the smallest fitting version is used if None. Defaults to None.
+        border (int, optional): Width of the quiet zone in modules. Defaults to 4.
+
+    Returns:
+        np.ndarray: Square boolean matrix, True for dark modules
+
+    Raises:
+        qrcode.exceptions.DataOverflowError: If the data does not fit in the requested version
+    """
+    return encode(data, error_correction, version).matrix(border)
+
+
+def hex_to_rgb(color: str) -> tuple[int, int, int]:
+    """
+    Convert a #RRGGBB hex color string to an RGB tuple
+
+    Args:
+        color (str): Hex color string
+
+    Returns:
+        tuple[int, int, int]: The red, green and blue components of the color
+    """
+    value = int(color.lstrip("#"), 16)
+    return (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF
+
+
+def _png_chunk(chunk_type: bytes, payload: bytes) -> bytes:
+    """
+    Build a single PNG chunk: length, type, payload and the CRC of the type and payload
+
+    Args:
+        chunk_type (bytes): Four letter chunk type, e.g. b"IHDR"
+        payload (bytes): Chunk data
+
+    Returns:
+        bytes: The serialized chunk
+    """
+    crc = zlib.crc32(payload, zlib.crc32(chunk_type))
+    return (
+        struct.pack(">I", len(payload)) + chunk_type + payload + struct.pack(">I", crc)
+    )
+
+
+def render_png(
+    matrix: np.ndarray,
+    box_size: int = 10,
+    fill_color: str = "#000000",
+    back_color: str = "#FFFFFF",
+) -> bytes:
+    """
+    Rasterize a module matrix into a 1-bit palette PNG.
+
+    Modules are scaled horizontally with np.repeat and packed 8 pixels per byte, the packed scanline
+    of each module row is then repeated box_size times, so no per-pixel work is done in Python.
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        box_size (int, optional): Size in pixels of a single module. Defaults to 10.
+        fill_color (str, optional): Hex color of the dark modules. Defaults to "#000000".
+        back_color (str, optional): Hex color of the background. Defaults to "#FFFFFF".
+
+    Returns:
+        bytes: The encoded PNG image
+    """
+    size = matrix.shape[0] * box_size
+
+    # Scale every module row horizontally, then pack the pixels as 1 bit palette indexes
+    scanlines = np.packbits(np.repeat(matrix, box_size, axis=1), axis=1)
+
+    # Each scanline is prefixed with the filter type byte (0, no filtering), then repeated vertically
+    scanlines = np.hstack(
+        (np.zeros((scanlines.shape[0], 1), dtype=np.uint8), scanlines)
+    )
+    raw = np.repeat(scanlines, box_size, axis=0).tobytes()
+
+    # IHDR: width, height, bit depth 1, color type 3 (palette), default compression/filter/interlace
+    header = struct.pack(">IIBBBBB", size, size, 1, 3, 0, 0, 0)
+    palette = bytes(hex_to_rgb(back_color) + hex_to_rgb(fill_color))
+
+    return b"".join(
+        (
+            PNG_SIGNATURE,
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"PLTE", palette),
+            _png_chunk(b"IDAT", zlib.compress(raw, QR_PNG_COMPRESSION_LEVEL)),
+            _png_chunk(b"IEND", b""),
+        )
+    )
+
+
+def horizontal_runs(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find every horizontal run of dark modules in the matrix
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: Row index, start column and length of each run, in row-major order
+    """
+    padded = np.zeros((matrix.shape[0], matrix.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix
+    edges = np.diff(padded, axis=1)
+
+    # np.nonzero scans in row-major order, so the n-th run start always pairs with the n-th run end
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends - starts
+
+
+class Outlines(NamedTuple):
+    """
+    Outlines of the regions of dark modules of a matrix, as closed loops of horizontal and vertical segments.
+
+    The corners of every loop follow each other, a horizontal segment going from each corner at an even
+    index to the next one, a vertical segment from each corner at an odd index to the next one or back to
+    the first corner of the loop. Loops run with the dark modules on their right, so that outer boundaries
+    run clockwise and holes counterclockwise (y pointing down), and are filled with the nonzero rule.
+
+    Args:
+        x (np.ndarray): Abscissa of the corners, loop after loop
+        y (np.ndarray): Ordinate of the corners, loop after loop
+        starts (np.ndarray): Index of the first corner of every loop, followed by the number of corners
+    """
+
+    x: np.ndarray
+    y: np.ndarray
+    starts: np.ndarray
+
+
+def _edge_runs(
+    edges: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the runs of identical, non-zero edges along each grid line
+
+    Args:
+        edges (np.ndarray): int8 edges by grid line, 1 or -1 depending on the side of the dark module
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: Grid line, start, end and sign of each run
+    """
+    padded = np.zeros((edges.shape[0], edges.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = edges
+    change = padded[:, 1:] != padded[:, :-1]
+
+    # Runs are contiguous along a line, so the n-th start always pairs with the n-th end
+    lines, starts = np.nonzero(change & (padded[:, 1:] != 0))
+    _, ends = np.nonzero(change & (padded[:, :-1] != 0))
+    return lines, starts, ends, edges[lines, starts]
+
+
+def _order_cycles(successors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Order the elements of a permutation cycle after cycle, each cycle starting at its smallest element.
+
+    Runs in a logarithmic number of NumPy passes, by pointer jumping: every element first finds the
+    smallest element of its cycle, then its distance to the end of the cycle once cut before that element.
+
+    Args:
+        successors (np.ndarray): The permutation, the successor of every element
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The elements in order, and the index of the start of every cycle
+    """
+    count = len(successors)
+    steps = max(1, (count - 1).bit_length())
+    indexes = np.arange(count)
+
+    first, jump = indexes, successors
+    for _ in range(steps):
+        first = np.minimum(first, first[jump])
+        jump = jump[jump]
+
+    last = successors == first
+    remaining = (~last).astype(np.intp)
+    jump = np.where(last, indexes, successors)
+    for _ in range(steps):
+        remaining = remaining + remaining[jump]
+        jump = jump[jump]
+
+    order = np.lexsort((-remaining, first))
+    return order, np.flatnonzero(first[order] == order)
+
+
+def trace_outlines(matrix: np.ndarray) -> Outlines:
+    """
+    Trace the outlines of the regions of dark modules, merging the edges of the modules into maximal
+    segments so that every segment ends on a corner of a region.
+
+    The edges and their runs are found with NumPy, the segments are then chained into loops by matching
+    the corner where each one ends with the corner where the next one starts.
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix
+
+    Returns:
+        Outlines: The corners of the outlines
+    """
+    height, width = matrix.shape
+    padded = np.zeros((height + 2, width + 2), dtype=np.int8)
+    padded[1:-1, 1:-1] = matrix
+
+    # Horizontal edges by horizontal grid line: 1 under a light module and above a dark one, drawn to
+    # the right, -1 the other way around, drawn to the left
+    lines, starts, ends, signs = _edge_runs(padded[1:, 1:-1] - padded[:-1, 1:-1])
+    h_y = lines
+    h_x0 = np.where(signs > 0, starts, ends)
+    h_x1 = np.where(signs > 0, ends, starts)
+
+    # Vertical edges by vertical grid line: 1 right of a light module and left of a dark one, drawn
+    # upwards, -1 the other way around, drawn downwards
+    lines, starts, ends, signs = _edge_runs((padded[1:-1, 1:] - padded[1:-1, :-1]).T)
+    v_x = lines
+    v_y0 = np.where(signs > 0, ends, starts)
+    v_y1 = np.where(signs > 0, starts, ends)
+
+    # Every horizontal segment is followed by the vertical one starting where it ends, and the other way
+    # around. Corners are numbered row by row: where two regions touch by a corner, two horizontal
+    # segments meet two vertical ones, any pairing closes the loops and the nonzero rule fills them alike
+    stride = width + 1
+    h_to_v = np.empty(len(h_y), dtype=np.intp)
+    h_to_v[np.argsort(h_y * stride + h_x1, kind="stable")] = np.argsort(
+        v_y0 * stride + v_x, kind="stable"
+    )
+    v_to_h = np.empty(len(v_x), dtype=np.intp)
+    v_to_h[np.argsort(v_y1 * stride + v_x, kind="stable")] = np.argsort(
+        h_y * stride + h_x0, kind="stable"
+    )
+
+    horizontal, loop_starts = _order_cycles(v_to_h[h_to_v])
+    vertical = h_to_v[horizontal]
+    x = np.empty(2 * len(horizontal), dtype=np.intp)
+    y = np.empty_like(x)
+    x[0::2], y[0::2] = h_x0[horizontal], h_y[horizontal]
+    x[1::2], y[1::2] = v_x[vertical], v_y0[vertical]
+    return Outlines(x, y, np.append(2 * loop_starts, len(x)))
+
+
+def svg_path_data(outlines: Outlines) -> Iterator[str]:
+    """
+    Write the outlines as SVG path data, one sub-path of relative horizontal and vertical lines per loop
+
+    Args:
+        outlines (Outlines): Outlines of the dark modules
+
+    Yields:
+        str: The path data of each loop
+    """
+    x, y, starts = outlines
+    # Lengths of the horizontal segments, and of the vertical ones except the last of every loop, which
+    # goes back to the start of the loop as the z command does
+    widths = (x[1::2] - x[0::2]).tolist()
+    heights = (y[2::2] - y[1:-1:2]).tolist()
+    commands = list(map("h{}v{}".format, widths, heights))
+
+    first_x, first_y = x[starts[:-1]].tolist(), y[starts[:-1]].tolist()
+    bounds = (starts // 2).tolist()
+    for index, (start, end) in enumerate(zip(bounds, bounds[1:])):
+        yield (
+            f"M{first_x[index]} {first_y[index]}"
+            + "".join(commands[start : end - 1])
+            + f"h{widths[end - 1]}z"
+        )
+
+
+def iter_svg(
+    matrix: np.ndarray,
+    box_size: int = 10,
+    fill_color: str = "#000000",
+    back_color: str = "#FFFFFF",
+    chunk_size: int = QR_SVG_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Write a module matrix as an SVG document, piece by piece. All dark modules are drawn as a single path
+    with one sub-path per outline of a region of dark modules.
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        box_size (int, optional): Size in pixels of a single module. Defaults to 10.
+        fill_color (str, optional): Hex color of the dark modules. Defaults to "#000000".
+        back_color (str, optional): Hex color of the background. Defaults to "#FFFFFF".
+        chunk_size (int, optional): Approximate size of the pieces, in bytes. Defaults to QR_SVG_CHUNK_SIZE.
+
+    Yields:
+        bytes: Successive pieces of the UTF-8 encoded SVG document
+    """
+    modules = matrix.shape[0]
+    size = modules * box_size
+
+    # The view box is expressed in modules so the path does not depend on the box size
+    pending = [
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+        f'<rect width="{modules}" height="{modules}" fill="{back_color}"/>'
+        f'<path fill="{fill_color}" d="'
+    ]
+    pending_size = len(pending[0])
+    for path in svg_path_data(trace_outlines(matrix)):
+        pending.append(path)
+        pending_size += len(path)
+        if pending_size >= chunk_size:
+            yield "".join(pending).encode()
+            pending, pending_size = [], 0
+    pending.append('"/></svg>')
+    yield "".join(pending).encode()
+
+
+def render_svg(
+    matrix: np.ndarray,
+    box_size: int = 10,
+    fill_color: str = "#000000",
+    back_color: str = "#FFFFFF",
+) -> bytes:
+    """
+    Render a module matrix as an SVG document, drawing all dark modules as a single path
+    with one sub-path per outline of a region of dark modules, see iter_svg
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        box_size (int, optional): Size in pixels of a single module. Defaults to 10.
+        fill_color (str, optional): Hex color of the dark modules. Defaults to "#000000".
+        back_color (str, optional): Hex color of the background. Defaults to "#FFFFFF".
+
+    Returns:
+        bytes: The UTF-8 encoded SVG document
+    """
+    return b"".join(iter_svg(matrix, box_size, fill_color, back_color))
+
+
+def pdf_color(color: str) -> str:
+    """
+    Convert a #RRGGBB hex color string to the components of a PDF color
+
+    Args:
+        color (str): Hex color string
+
+    Returns:
+        str: The red, green and blue components of the color, from 0 to 1
+    """
+    return " ".join(f"{component / 255:.4g}" for component in hex_to_rgb(color))
+
+
+def pdf_operators(
+    matrix: np.ndarray, fill_color: str = "#000000", back_color: str = "#FFFFFF"
+) -> bytes:
+    """
+    Draw a module matrix with PDF content stream operators, in module units with y pointing down: the
+    background as a rectangle, then the outlines of the dark modules as a single filled path
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        fill_color (str, optional): Hex color of the dark modules. Defaults to "#000000".
+        back_color (str, optional): Hex color of the background. Defaults to "#FFFFFF".
+
+    Returns:
+        bytes: The content stream operators
+    """
+    modules = matrix.shape[0]
+    x, y, starts = trace_outlines(matrix)
+    # Absolute lines between the corners, a path being started at the first corner of every loop and
+    # closed after its last one
+    commands = list(map("{} {} l ".format, x.tolist(), y.tolist()))
+    for start, end in zip(starts[:-1].tolist(), starts[1:].tolist()):
+        commands[start] = commands[start][:-2] + "m "
+        commands[end - 1] += "h "
+    path = "".join(commands)
+    return (
+        f"{pdf_color(back_color)} rg 0 0 {modules} {modules} re f "
+        f"{pdf_color(fill_color)} rg {path}f\n"
+    ).encode()
+
+
+def render_pdf(
+    matrix: np.ndarray,
+    box_size: int = 10,
+    fill_color: str = "#000000",
+    back_color: str = "#FFFFFF",
+) -> bytes:
+    """
+    Render a module matrix as a single page PDF document, a module measuring box_size points
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        box_size (int, optional): Size in points of a single module. Defaults to 10.
+        fill_color (str, optional): Hex color of the dark modules. Defaults to "#000000".
+        back_color (str, optional): Hex color of the background. Defaults to "#FFFFFF".
+
+    Returns:
+        bytes: The PDF document
+    """
+    size = matrix.shape[0] * box_size
+    # Module units, with the origin at the top left corner of the page
+    content = f"{box_size} 0 0 {-box_size} 0 {size} cm ".encode()
+    content += pdf_operators(matrix, fill_color, back_color)
+
+    writer = StreamingPDFWriter()
+    return writer.start() + writer.add_page(size, size, content) + writer.close()
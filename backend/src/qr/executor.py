@@ -0,0 +1,128 @@
+"""Process pool backed render service, keeping the CPU bound QR rasterization off the event loop"""
+
+import asyncio
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import ParamSpec, TypeVar
+
+from src.qr.schemas import QRRenderParams
+from src.qr.service import RenderedQR, render_qr
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+
+class RenderPoolSaturatedError(Exception):
+    """Raised when the render pool already holds as many jobs as it is allowed to queue"""
+
+
+class RenderService:
+    """
+    Render service dispatching jobs to a pool of worker processes, so that rendering large codes
+    does not stall the other requests served by the event loop.
+
+    The number of jobs held by the service (running and waiting for a free process) is bounded,
+    new jobs are rejected with a RenderPoolSaturatedError once the bound is reached, so that
+    an overloaded worker sheds load instead of queueing requests indefinitely.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_queue: int = 64) -> None:
+        self.max_workers: int = max_workers or os.cpu_count() or 1
+        self.max_queue: int = max_queue
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight: int = 0
+        self._released: asyncio.Event = asyncio.Event()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of jobs held by the service, running or queued"""
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently running or waiting for a free process"""
+        return self._in_flight
+
+    def start(self) -> None:
+        """
+        Start the process pool. The workers are spawned rather than forked, a forked copy of
+        a running event loop and its threads is not safe to use in the children.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def shutdown(self) -> None:
+        """Stop the process pool, cancelling the jobs that did not start yet"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(
+        self,
+        func: Callable[P, R],
+        *args: P.args,
+        wait: bool = False,
+        **kwargs: P.kwargs,
+    ) -> R:
+        """
+        Run a function in the process pool, the function and its arguments must be picklable
+
+        Args:
+            func (Callable[P, R]): Module level function to run
+            *args, **kwargs: Arguments of the function
+            wait (bool, optional): Wait for a free slot instead of failing when the service is saturated. Defaults to False.
+
+        Returns:
+            R: The value returned by the function
+
+        Raises:
+            RuntimeError: If the service is not started
+            RenderPoolSaturatedError: If the service already holds as many jobs as it can queue
+        """
+        if self._executor is None:
+            raise RuntimeError("The render service is not started")
+
+        while self._in_flight >= self.capacity:
+            if not wait:
+                raise RenderPoolSaturatedError()
+            self._released.clear()
+            await self._released.wait()
+
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except BrokenProcessPool:
+            # A worker died abruptly and took the pool down with it, replace the pool and resubmit
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self.start()
+            future = self._executor.submit(func, *args, **kwargs)  # type: ignore
+
+        # The slot is released when the job completes rather than when the caller stops waiting,
+        # a job whose client went away still occupies a process until it finishes
+        self._in_flight += 1
+        result = asyncio.wrap_future(future)
+        result.add_done_callback(self._release)
+
+        return await asyncio.shield(result)
+
+    def _release(self, _: asyncio.Future) -> None:
+        self._in_flight -= 1
+        self._released.set()
+
+    async def render(self, params: QRRenderParams) -> RenderedQR:
+        """
+        Render a QR code in the process pool
+
+        Args:
+            params (QRRenderParams): Validated render parameters
+
+        Returns:
+            RenderedQR: The rendered image and its media type
+        """
+        return await self.run(render_qr, params)
@@ -0,0 +1,53 @@
+"""Database models associated with QR code management"""
+
+import uuid
+from datetime import datetime
+from typing import Any, ClassVar
+
+from fastapi_users_db_sqlalchemy.generics import GUID
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import Base
+from src.qr.config import QR_SHORT_ID_MAX_LENGTH, QR_TARGET_URL_MAX_LENGTH
+
+
+class QRCode(Base):
+    """
+    Dynamic QR code owned by a user. The code encodes the short URL /r/<short_id>, which redirects to the
+    target URL, so the target can be changed without reprinting the code.
+
+    Args:
+        Base (DeclarativeBase): Base class for all SQLAlchemy database models
+    """
+
+    __tablename__ = "qr_code"
+    # Fetch the timestamps set by the database with RETURNING, rather than lazily loading them
+    __mapper_args__: ClassVar[dict[str, Any]] = {"eager_defaults": True}
+    # The codes of a user are listed newest first, paginated on (created_at, id): the index walks straight
+    # to the cursor of any page. It also serves the lookups by owner, such as the cascades from the users
+    __table_args__ = (
+        Index("ix_qr_code_owner_id_created_at_id", "owner_id", "created_at", "id"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID, primary_key=True, default=uuid.uuid4)
+    owner_id: Mapped[uuid.UUID] = mapped_column(
+        GUID, ForeignKey("user.id", ondelete="CASCADE"), nullable=False
+    )
+    short_id: Mapped[str] = mapped_column(
+        String(QR_SHORT_ID_MAX_LENGTH), nullable=False, unique=True
+    )
+    name: Mapped[str | None] = mapped_column(String(100))
+    target_url: Mapped[str] = mapped_column(
+        String(QR_TARGET_URL_MAX_LENGTH), nullable=False
+    )
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
@@ -0,0 +1,128 @@
+"""
+Streaming PDF writer.
+
+Objects are serialized as soon as they are added, so a document of many pages can be sent to the client
+while it is being built. Only the byte offset of every object and the object numbers of the pages are
+kept until the end, where the page tree, the catalog and the cross-reference table are written. Page
+contents are deflated.
+"""
+
+import zlib
+
+from src.qr.config import QR_PDF_COMPRESSION_LEVEL
+
+PDF_HEADER = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+
+# Object numbers reserved ahead of the pages, which reference the page tree and the font
+CATALOG_OBJECT = 1
+PAGES_OBJECT = 2
+FONT_OBJECT = 3
+
+# The standard Helvetica font, available in every reader, named /F1 in the page contents
+FONT = (
+    b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+)
+
+
+def pdf_string(text: str) -> bytes:
+    """
+    Encode text as a PDF literal string, characters outside of Latin-1 being replaced
+
+    Args:
+        text (str): Text to encode
+
+    Returns:
+        bytes: The string, parentheses included
+    """
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    escaped = escaped.replace("\r", " ").replace("\n", " ")
+    return b"(" + escaped.encode("latin-1", errors="replace") + b")"
+
+
+class StreamingPDFWriter:
+    """Incremental PDF writer, every method returns the bytes to append to the document"""
+
+    def __init__(self, compression_level: int = QR_PDF_COMPRESSION_LEVEL) -> None:
+        self._compression_level = compression_level
+        self._offset: int = 0
+        self._offsets: dict[int, int] = {}
+        self._pages: list[int] = []
+        self._next_object: int = FONT_OBJECT + 1
+
+    @property
+    def pages(self) -> int:
+        """Number of pages added to the document"""
+        return len(self._pages)
+
+    def _object(self, number: int, body: bytes) -> bytes:
+        data = b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        self._offsets[number] = self._offset
+        self._offset += len(data)
+        return data
+
+    def start(self) -> bytes:
+        """
+        Start the document
+
+        Returns:
+            bytes: The header of the document and the font used by the pages
+        """
+        self._offset = len(PDF_HEADER)
+        return PDF_HEADER + self._object(FONT_OBJECT, FONT)
+
+    def add_page(self, width: float, height: float, content: bytes) -> bytes:
+        """
+        Add a page to the document
+
+        Args:
+            width (float): Width of the page, in points
+            height (float): Height of the page, in points
+            content (bytes): Content stream of the page, which may use the font /F1
+
+        Returns:
+            bytes: The content stream and the page objects
+        """
+        content_object, page_object = self._next_object, self._next_object + 1
+        self._next_object += 2
+        self._pages.append(page_object)
+
+        compressed = zlib.compress(content, self._compression_level)
+        stream = b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (
+            len(compressed),
+            compressed,
+        )
+        page = (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (PAGES_OBJECT, width, height, FONT_OBJECT, content_object)
+        )
+        return self._object(content_object, stream) + self._object(page_object, page)
+
+    def close(self) -> bytes:
+        """
+        Finish the document
+
+        Returns:
+            bytes: The page tree, the catalog, the cross-reference table and the trailer
+        """
+        kids = b" ".join(b"%d 0 R" % page for page in self._pages)
+        data = self._object(
+            PAGES_OBJECT,
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)),
+        )
+        data += self._object(
+            CATALOG_OBJECT, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_OBJECT
+        )
+
+        # Every entry of the table is exactly 20 bytes long, end of line included
+        size = self._next_object
+        xref = [b"xref\n0 %d\n0000000000 65535 f \n" % size]
+        xref.extend(
+            b"%010d 00000 n \n" % self._offsets[number] for number in range(1, size)
+        )
+        trailer = b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            size,
+            CATALOG_OBJECT,
+            self._offset,
+        )
+        return data + b"".join(xref) + trailer
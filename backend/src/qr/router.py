@@ -0,0 +1,671 @@
+"""Core endpoints for QR code generation and for the dynamic QR codes"""
+
+import re
+from collections.abc import AsyncIterator
+from typing import Annotated
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import RedirectResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+
+from src.analytics.dependencies import get_scan_event_queue
+from src.analytics.ingestion import ScanEventQueue
+from src.assets.dependencies import get_asset_store
+from src.assets.schemas import AssetRead
+from src.assets.stores import AssetStore, AssetTooLargeError
+from src.auth.models import User
+from src.auth.router import current_active_user, current_superuser
+from src.database import get_async_session
+from src.qr.batch import iter_batch_rows, stream_batch_archive
+from src.qr.cache import (
+    REDIRECT_NOT_FOUND,
+    RedirectCache,
+    RenderCache,
+    etag_matches,
+    make_etag,
+    render_cache_key,
+)
+from src.qr.codes import (
+    create_qr_code,
+    decode_cursor,
+    delete_qr_code,
+    get_redirect_target,
+    list_qr_codes,
+    update_qr_code,
+)
+from src.qr.config import (
+    QR_BATCH_MAX_BODY_BYTES,
+    QR_CODES_MAX_PAGE_SIZE,
+    QR_CODES_PAGE_SIZE,
+    QR_LOGO_UPLOAD_MAX_BYTES,
+    QR_SHORT_ID_MAX_LENGTH,
+    QR_RENDER_CACHE_MAX_AGE_SECONDS,
+    QR_RENDER_RETRY_AFTER_SECONDS,
+    QR_SHEET_DEFAULT_COLUMNS,
+    QR_SHEET_MAX_COLUMNS,
+)
+from src.qr.dependencies import (
+    get_owned_qr_code,
+    get_redirect_cache,
+    get_render_cache,
+    get_render_params,
+    get_render_service,
+)
+from src.qr.executor import RenderPoolSaturatedError, RenderService
+from src.qr.models import QRCode
+from src.qr.schemas import (
+    PageSize,
+    QRCodeCreate,
+    QRCodePage,
+    QRCodeRead,
+    QRCodeUpdate,
+    QRRenderParams,
+    RenderCacheStats,
+)
+from src.qr.service import DataOverflowError, RenderedQR, StyleError
+from src.qr.sheets import SheetLayout, stream_pdf_sheet
+from src.responses import FastJSONResponse
+from src.uploads import get_upload_format, spool_request_body
+
+# List of routers for the QR code endpoints
+qr_routers: list[APIRouter] = []
+
+render_router = APIRouter()
+batch_router = APIRouter()
+codes_router = APIRouter(prefix="/codes")
+
+# Router of the short URLs encoded in the dynamic codes, served at the root of the application
+redirect_router = APIRouter()
+
+# Short ids which could belong to a code, anything else is rejected before looking it up
+SHORT_ID_PATTERN = re.compile(rf"[0-9A-Za-z]{{1,{QR_SHORT_ID_MAX_LENGTH}}}")
+
+# Leading bytes of the images accepted as logos, by the media type they are uploaded as
+LOGO_SIGNATURES: dict[str, tuple[bytes, ...]] = {
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/webp": (b"RIFF", b"WEBP"),  # around the size of the file, bytes 4 to 8
+}
+
+
+async def render_image(
+    params: QRRenderParams, render_service: RenderService, store: AssetStore
+) -> RenderedQR:
+    """
+    Render a QR code in the process pool of the render service, with its uploaded logo if any
+
+    Args:
+        params (QRRenderParams): Validated render parameters
+        render_service (RenderService): Render service of the worker
+        store (AssetStore): Asset store of the worker, holding the uploaded logos
+
+    Returns:
+        RenderedQR: The rendered image
+
+    Raises:
+        HTTPException: 400 if the data does not fit in the requested QR code version, the style cannot be rendered or the logo was not uploaded
+        HTTPException: 503 if the render pool is saturated
+    """
+    if params.logo_key is not None:
+        logo = await store.read(params.logo_key)
+        if logo is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No logo was uploaded with this key",
+            )
+        # Render processes are handed the logo itself, they have no access to the store
+        params = params.model_copy(update={"logo": logo, "logo_key": None})
+
+    try:
+        return await render_service.render(params)
+    except (DataOverflowError, StyleError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RenderPoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many renders in progress, please retry later",
+            headers={"Retry-After": str(QR_RENDER_RETRY_AFTER_SECONDS)},
+        )
+
+
+async def render_response(
+    params: QRRenderParams,
+    cache: RenderCache,
+    render_service: RenderService,
+    store: AssetStore,
+    if_none_match: str | None,
+) -> Response:
+    """
+    Answer a render request, from the render cache or by rendering in the process pool of the render service
+
+    Args:
+        params (QRRenderParams): Validated render parameters
+        cache (RenderCache): Render cache of the worker
+        render_service (RenderService): Render service of the worker
+        store (AssetStore): Asset store of the worker, holding the uploaded logos
+        if_none_match (str | None): Value of the If-None-Match header
+
+    Returns:
+        Response: The rendered image, or an empty 304 response if the client's copy is current
+
+    Raises:
+        HTTPException: 400 if the data does not fit in the requested QR code version, the style cannot be rendered or the logo was not uploaded
+        HTTPException: 503 if the render pool is saturated
+    """
+    key = render_cache_key(params)
+    headers = {
+        "ETag": make_etag(key),
+        "Cache-Control": f"public, max-age={QR_RENDER_CACHE_MAX_AGE_SECONDS}",
+    }
+
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    rendered = cache.get(key)
+    headers["X-Cache"] = "HIT" if rendered is not None else "MISS"
+
+    if rendered is None:
+        rendered = await render_image(params, render_service, store)
+        cache.set(key, rendered)
+
+    return Response(
+        content=rendered.content, media_type=rendered.media_type, headers=headers
+    )
+
+
+@render_router.get("/render")
+async def render(
+    params: Annotated[QRRenderParams, Depends(get_render_params)],
+    cache: Annotated[RenderCache, Depends(get_render_cache)],
+    render_service: Annotated[RenderService, Depends(get_render_service)],
+    store: Annotated[AssetStore, Depends(get_asset_store)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Render a QR code as a PNG or SVG image.
+
+    Renders are content-addressed: the ETag is derived from the render parameters, so a client
+    revalidating a render it already holds gets a 304 without any rendering or cache lookup,
+    and repeated renders of the same parameters are answered from the render cache.
+    Cache misses are rendered in the process pool of the render service.
+
+    Args:
+        params (QRRenderParams): Validated render parameters, injected by the get_render_params dependency
+        cache (RenderCache): Render cache of the worker, injected by the get_render_cache dependency
+        render_service (RenderService): Render service of the worker, injected by the get_render_service dependency
+        store (AssetStore): Asset store of the worker, injected by the get_asset_store dependency
+        if_none_match (str | None, optional): Value of the If-None-Match header. Defaults to None.
+
+    Returns:
+        Response: The rendered image, or an empty 304 response if the client's copy is current
+
+    Raises:
+        HTTPException: 400 if the data does not fit in the requested QR code version, the style cannot be rendered or the logo was not uploaded
+        HTTPException: 503 if the render pool is saturated
+    """
+    return await render_response(params, cache, render_service, store, if_none_match)
+
+
+@render_router.post("/render")
+async def render_with_logo(
+    params: QRRenderParams,
+    cache: Annotated[RenderCache, Depends(get_render_cache)],
+    render_service: Annotated[RenderService, Depends(get_render_service)],
+    store: Annotated[AssetStore, Depends(get_asset_store)],
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    """
+    Render a QR code as a PNG or SVG image from render parameters sent as JSON, which unlike the query
+    string of GET /qr/render can carry a logo. Renders are cached and revalidated as with GET /qr/render.
+
+    Args:
+        params (QRRenderParams): Validated render parameters
+        cache (RenderCache): Render cache of the worker, injected by the get_render_cache dependency
+        render_service (RenderService): Render service of the worker, injected by the get_render_service dependency
+        store (AssetStore): Asset store of the worker, injected by the get_asset_store dependency
+        if_none_match (str | None, optional): Value of the If-None-Match header. Defaults to None.
+
+    Returns:
+        Response: The rendered image, or an empty 304 response if the client's copy is current
+
+    Raises:
+        HTTPException: 400 if the data does not fit in the requested QR code version, the style cannot be rendered or the logo was not uploaded
+        HTTPException: 503 if the render pool is saturated
+    """
+    return await render_response(params, cache, render_service, store, if_none_match)
+
+
+@render_router.post(
+    "/assets",
+    response_model=AssetRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(current_active_user)],
+)
+async def store_render(
+    params: QRRenderParams,
+    cache: Annotated[RenderCache, Depends(get_render_cache)],
+    render_service: Annotated[RenderService, Depends(get_render_service)],
+    store: Annotated[AssetStore, Depends(get_asset_store)],
+) -> AssetRead:
+    """
+    Render a QR code into the asset store, restricted to active users, to be downloaded from its asset URL.
+
+    Renders are stored once whoever requests them: the asset of a set of render parameters is looked up
+    by their render cache key before rendering, and identical images share their content hash key.
+
+    Args:
+        params (QRRenderParams): Validated render parameters
+        cache (RenderCache): Render cache of the worker, injected by the get_render_cache dependency
+        render_service (RenderService): Render service of the worker, injected by the get_render_service dependency
+        store (AssetStore): Asset store of the worker, injected by the get_asset_store dependency
+
+    Returns:
+        AssetRead: The stored render
+
+    Raises:
+        HTTPException: 400 if the data does not fit in the requested QR code version, the style cannot be rendered or the logo was not uploaded
+        HTTPException: 503 if the render pool is saturated
+    """
+    key = render_cache_key(params)
+    asset_key = await store.get_ref(key)
+    asset = await store.stat(asset_key) if asset_key is not None else None
+
+    if asset is None:
+        rendered = cache.get(key)
+        if rendered is None:
+            rendered = await render_image(params, render_service, store)
+            cache.set(key, rendered)
+        asset = await store.put(rendered.content, rendered.media_type)
+        await store.set_ref(key, asset.key)
+    return AssetRead.from_asset(asset)
+
+
+async def check_logo_signature(
+    chunks: AsyncIterator[bytes], media_type: str
+) -> AsyncIterator[bytes]:
+    """
+    Pass the chunks of an uploaded logo through, checking that it starts as an image of its media type
+
+    Args:
+        chunks (AsyncIterator[bytes]): Chunks of the upload
+        media_type (str): Media type the logo is uploaded as, one of LOGO_SIGNATURES
+
+    Yields:
+        bytes: The chunks
+
+    Raises:
+        HTTPException: 415 if the upload is not an image of its media type
+    """
+    magic, *webp = LOGO_SIGNATURES[media_type]
+    head: bytes | None = b""
+    async for chunk in chunks:
+        if head is not None:
+            # Held back until the 12 bytes covering every signature are received
+            head += chunk
+            if len(head) < 12:
+                continue
+            if not head.startswith(magic) or (webp and head[8:12] != webp[0]):
+                break
+            chunk, head = head, None
+        yield chunk
+    if head is not None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Body is not a {media_type} image",
+        )
+
+
+@render_router.post(
+    "/logos",
+    response_model=AssetRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(current_active_user)],
+    openapi_extra={
+        "requestBody": {
+            "content": {media_type: {} for media_type in LOGO_SIGNATURES},
+            "required": True,
+        }
+    },
+)
+async def upload_logo(
+    request: Request,
+    store: Annotated[AssetStore, Depends(get_asset_store)],
+    content_type: Annotated[str | None, Header()] = None,
+) -> AssetRead:
+    """
+    Upload a logo, restricted to active users, to be drawn in renders by its key rather than sent along.
+
+    The body is the image itself, PNG, JPEG or WebP, streamed to the asset store as it is received without
+    being held in memory. Logos are stored once whoever uploads them, their key being their content hash.
+
+    Args:
+        request (Request): The incoming request, whose body is the logo
+        store (AssetStore): Asset store of the worker, injected by the get_asset_store dependency
+        content_type (str | None, optional): Value of the Content-Type header. Defaults to None.
+
+    Returns:
+        AssetRead: The stored logo, whose key is the logo_key of the renders
+
+    Raises:
+        HTTPException: 413 if the logo exceeds QR_LOGO_UPLOAD_MAX_BYTES
+        HTTPException: 415 if the body is not a PNG, JPEG or WebP image
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in LOGO_SIGNATURES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Logo must be a PNG, JPEG or WebP image",
+        )
+
+    try:
+        asset = await store.put_stream(
+            check_logo_signature(request.stream(), media_type),
+            media_type,
+            QR_LOGO_UPLOAD_MAX_BYTES,
+        )
+    except AssetTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Logo exceeds the limit of {QR_LOGO_UPLOAD_MAX_BYTES} bytes",
+        )
+    return AssetRead.from_asset(asset)
+
+
+@render_router.get(
+    "/cache/stats",
+    response_model=RenderCacheStats,
+    dependencies=[Depends(current_superuser)],
+)
+async def cache_stats(
+    cache: Annotated[RenderCache, Depends(get_render_cache)],
+) -> RenderCacheStats:
+    """
+    Expose the hit, miss and eviction counters of the render cache, restricted to superusers
+
+    Args:
+        cache (RenderCache): Render cache of the worker, injected by the get_render_cache dependency
+
+    Returns:
+        RenderCacheStats: Snapshot of the render cache counters
+    """
+    return cache.stats()
+
+
+@batch_router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    dependencies=[Depends(current_active_user)],
+    responses={200: {"content": {"application/zip": {}}}},
+)
+async def batch(
+    request: Request,
+    render_service: Annotated[RenderService, Depends(get_render_service)],
+    content_type: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """
+    Render a batch of QR codes and stream them back as a ZIP archive, restricted to active users.
+
+    The body holds one set of render parameters per row, either as NDJSON or as CSV with a header line.
+    The archive is streamed while the rows are rendered, each rendered row being stored as
+    <row number>.<format>. Invalid rows do not fail the batch, they are listed in an errors.csv entry.
+
+    Args:
+        request (Request): The incoming request, whose body holds the rows
+        render_service (RenderService): Render service of the worker, injected by the get_render_service dependency
+        content_type (str | None, optional): Value of the Content-Type header. Defaults to None.
+
+    Returns:
+        StreamingResponse: The ZIP archive of the rendered rows
+
+    Raises:
+        HTTPException: 413 if the body exceeds QR_BATCH_MAX_BODY_BYTES
+        HTTPException: 415 if the body is neither NDJSON nor CSV
+    """
+    batch_format = get_upload_format(content_type)
+    spool = await spool_request_body(request, QR_BATCH_MAX_BODY_BYTES)
+
+    return StreamingResponse(
+        stream_batch_archive(iter_batch_rows(spool, batch_format), render_service),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="qr-batch.zip"'},
+        background=BackgroundTask(spool.close),
+    )
+
+
+@batch_router.post(
+    "/sheet",
+    response_class=StreamingResponse,
+    dependencies=[Depends(current_active_user)],
+    responses={200: {"content": {"application/pdf": {}}}},
+)
+async def sheet(
+    request: Request,
+    render_service: Annotated[RenderService, Depends(get_render_service)],
+    page_size: PageSize = PageSize.A4,
+    columns: Annotated[
+        int, Query(description="Codes per row", ge=1, le=QR_SHEET_MAX_COLUMNS)
+    ] = QR_SHEET_DEFAULT_COLUMNS,
+    content_type: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """
+    Draw a batch of QR codes and stream them back as a PDF sheet for printing, restricted to active users.
+
+    The body holds the rows as for POST /qr/batch. The codes are laid out in vector form on a grid, in
+    the order of the rows and captioned with their row number, the size, format and style of the rows
+    being ignored. Invalid rows do not fail the sheet, they are listed on the last pages.
+
+    Args:
+        request (Request): The incoming request, whose body holds the rows
+        render_service (RenderService): Render service of the worker, injected by the get_render_service dependency
+        page_size (PageSize, optional): Size of the pages. Defaults to PageSize.A4.
+        columns (int, optional): Codes per row. Defaults to QR_SHEET_DEFAULT_COLUMNS.
+        content_type (str | None, optional): Value of the Content-Type header. Defaults to None.
+
+    Returns:
+        StreamingResponse: The PDF sheet of the drawn rows
+
+    Raises:
+        HTTPException: 413 if the body exceeds QR_BATCH_MAX_BODY_BYTES
+        HTTPException: 415 if the body is neither NDJSON nor CSV
+    """
+    batch_format = get_upload_format(content_type)
+    spool = await spool_request_body(request, QR_BATCH_MAX_BODY_BYTES)
+
+    return StreamingResponse(
+        stream_pdf_sheet(
+            iter_batch_rows(spool, batch_format),
+            render_service,
+            SheetLayout.of(page_size, columns),
+        ),
+        media_type="application/pdf",
+        headers={"Content-Disposition": 'attachment; filename="qr-sheet.pdf"'},
+        background=BackgroundTask(spool.close),
+    )
+
+
+@codes_router.post("", response_model=QRCodeRead, status_code=status.HTTP_201_CREATED)
+async def create_code(
+    qr_code_create: QRCodeCreate,
+    user: Annotated[User, Depends(current_active_user)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    cache: Annotated[RedirectCache, Depends(get_redirect_cache)],
+) -> QRCode:
+    """
+    Create a dynamic QR code for the current user, redirecting from its short URL to the target URL
+
+    Args:
+        qr_code_create (QRCodeCreate): Fields of the code
+        user (User): The current user, injected by the current_active_user dependency
+        session (AsyncSession): Database session, injected by the get_async_session dependency
+        cache (RedirectCache): Redirect cache of the worker, injected by the get_redirect_cache dependency
+
+    Returns:
+        QRCode: The created code
+    """
+    qr_code = await create_qr_code(session, user.id, qr_code_create)
+    # The short id may have been scanned before, while it did not redirect anywhere
+    cache.invalidate(qr_code.short_id)
+    return qr_code
+
+
+@codes_router.get("", response_model=QRCodePage, response_class=FastJSONResponse)
+async def list_codes(
+    user: Annotated[User, Depends(current_active_user)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    limit: Annotated[int, Query(ge=1, le=QR_CODES_MAX_PAGE_SIZE)] = QR_CODES_PAGE_SIZE,
+    cursor: str | None = None,
+) -> FastJSONResponse:
+    """
+    List the dynamic QR codes of the current user, newest first. Pages are chained through their cursor,
+    the next page being requested with the next_cursor of the previous one. The page is encoded straight
+    to JSON, without being validated again against the response model.
+
+    Args:
+        user (User): The current user, injected by the current_active_user dependency
+        session (AsyncSession): Database session, injected by the get_async_session dependency
+        limit (int, optional): Maximum number of codes in the page. Defaults to QR_CODES_PAGE_SIZE.
+        cursor (str | None, optional): Cursor of the page. Defaults to None, for the first page.
+
+    Returns:
+        FastJSONResponse: The QRCodePage of the codes, with the cursor of the next page
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        after = decode_cursor(cursor) if cursor is not None else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
+    return FastJSONResponse(await list_qr_codes(session, user.id, limit, after))
+
+
+@codes_router.get("/{qr_code_id}", response_model=QRCodeRead)
+async def read_code(
+    qr_code: Annotated[QRCode, Depends(get_owned_qr_code)],
+) -> QRCode:
+    """
+    Read a dynamic QR code of the current user
+
+    Args:
+        qr_code (QRCode): The code, injected by the get_owned_qr_code dependency
+
+    Returns:
+        QRCode: The code
+    """
+    return qr_code
+
+
+@codes_router.patch("/{qr_code_id}", response_model=QRCodeRead)
+async def update_code(
+    qr_code_update: QRCodeUpdate,
+    qr_code: Annotated[QRCode, Depends(get_owned_qr_code)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    cache: Annotated[RedirectCache, Depends(get_redirect_cache)],
+) -> QRCode:
+    """
+    Update a dynamic QR code of the current user, the scans following the update use the new target
+
+    Args:
+        qr_code_update (QRCodeUpdate): Fields to update, the fields which are not set are left as is
+        qr_code (QRCode): The code, injected by the get_owned_qr_code dependency
+        session (AsyncSession): Database session, injected by the get_async_session dependency
+        cache (RedirectCache): Redirect cache of the worker, injected by the get_redirect_cache dependency
+
+    Returns:
+        QRCode: The updated code
+    """
+    qr_code = await update_qr_code(
+        session, qr_code, qr_code_update.model_dump(exclude_unset=True)
+    )
+    cache.invalidate(qr_code.short_id)
+    return qr_code
+
+
+@codes_router.delete("/{qr_code_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_code(
+    qr_code: Annotated[QRCode, Depends(get_owned_qr_code)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    cache: Annotated[RedirectCache, Depends(get_redirect_cache)],
+) -> None:
+    """
+    Delete a dynamic QR code of the current user, its short URL stops redirecting
+
+    Args:
+        qr_code (QRCode): The code, injected by the get_owned_qr_code dependency
+        session (AsyncSession): Database session, injected by the get_async_session dependency
+        cache (RedirectCache): Redirect cache of the worker, injected by the get_redirect_cache dependency
+    """
+    await delete_qr_code(session, qr_code)
+    cache.invalidate(qr_code.short_id)
+
+
+@redirect_router.get(
+    "/r/{short_id}",
+    response_class=RedirectResponse,
+    status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+    responses={404: {"description": "No active QR code has this short id"}},
+)
+async def redirect(
+    short_id: str,
+    cache: Annotated[RedirectCache, Depends(get_redirect_cache)],
+    session: Annotated[AsyncSession, Depends(get_async_session)],
+    scan_events: Annotated[ScanEventQueue, Depends(get_scan_event_queue)],
+    user_agent: Annotated[str | None, Header()] = None,
+) -> RedirectResponse:
+    """
+    Redirect a scan of a dynamic QR code to its target.
+
+    Targets are answered from the redirect cache of the worker, the database is only queried on a miss,
+    once per short id and TTL. Short ids which do not redirect anywhere are cached as well. The redirect
+    itself must not be cached by clients, since the target of the code can change.
+    Scans are queued and written to the database in batches, after the redirect has been answered.
+
+    Args:
+        short_id (str): Short id of the code
+        cache (RedirectCache): Redirect cache of the worker, injected by the get_redirect_cache dependency
+        session (AsyncSession): Database session, injected by the get_async_session dependency, only used on a cache miss
+        scan_events (ScanEventQueue): Scan event queue of the worker, injected by the get_scan_event_queue dependency
+        user_agent (str | None, optional): Value of the User-Agent header, recorded with the scan. Defaults to None.
+
+    Returns:
+        RedirectResponse: Redirect to the target of the code
+
+    Raises:
+        HTTPException: 404 if no active code has this short id
+    """
+    target = cache.get(short_id)
+    if target is None:
+        if SHORT_ID_PATTERN.fullmatch(short_id) is None:
+            target = REDIRECT_NOT_FOUND
+        else:
+            target = await get_redirect_target(session, short_id) or REDIRECT_NOT_FOUND
+            cache.set(short_id, target)
+
+    if not target.url:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="QR code not found"
+        )
+
+    await scan_events.record(target.qr_code_id, user_agent)
+    return RedirectResponse(
+        target.url,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+qr_routers.append(render_router)
+qr_routers.append(batch_router)
+qr_routers.append(codes_router)
@@ -0,0 +1,305 @@
+"""Pydantic models for QR code generation, used for data validation and serialization"""
+
+import uuid
+from datetime import datetime
+from enum import Enum
+from typing import Annotated
+
+from pydantic import (
+    AnyUrl,
+    Base64Bytes,
+    BaseModel,
+    ConfigDict,
+    Field,
+    UrlConstraints,
+    model_validator,
+)
+
+from src.qr.config import (
+    QR_DEFAULT_BORDER,
+    QR_DEFAULT_BOX_SIZE,
+    QR_LOGO_DEFAULT_SIZE,
+    QR_LOGO_MAX_BYTES,
+    QR_LOGO_MAX_SIZE,
+    QR_MAX_BORDER,
+    QR_MAX_BOX_SIZE,
+    QR_MAX_DATA_LENGTH,
+    QR_TARGET_URL_MAX_LENGTH,
+)
+
+# Colors are accepted as 6 digit hex strings, e.g. #1A2B3C
+HEX_COLOR_PATTERN = r"^#[0-9a-fA-F]{6}$"
+# Uploaded logos are referenced by their asset key, the SHA-256 of the image followed by its extension
+LOGO_KEY_PATTERN = r"^[0-9a-f]{64}\.(png|jpg|webp)$"
+
+# Dynamic codes redirect to web pages only
+TargetUrl = Annotated[
+    AnyUrl,
+    UrlConstraints(
+        max_length=QR_TARGET_URL_MAX_LENGTH, allowed_schemes=["http", "https"]
+    ),
+]
+
+
+class ErrorCorrectionLevel(str, Enum):
+    """
+    Error correction levels supported by the QR code specification, the higher the level the more damage
+    the code can sustain while still being readable, at the cost of a denser matrix.
+    """
+
+    L = "L"  # ~7% of codewords can be restored
+    M = "M"  # ~15% of codewords can be restored
+    Q = "Q"  # ~25% of codewords can be restored
+    H = "H"  # ~30% of codewords can be restored
+
+
+class ImageFormat(str, Enum):
+    """Output formats supported by the QR rendering engine"""
+
+    PNG = "png"
+    SVG = "svg"
+    PDF = "pdf"
+
+
+class PageSize(str, Enum):
+    """Page sizes of the PDF sheets"""
+
+    A4 = "a4"
+    LETTER = "letter"
+
+
+class ModuleShape(str, Enum):
+    """Shapes of the dark modules of a styled render"""
+
+    SQUARE = "square"
+    ROUNDED = "rounded"  # the corners not touching another dark module are rounded
+    DOT = "dot"
+
+
+class EyeShape(str, Enum):
+    """Shapes of the three finder patterns, the eyes, of a styled render"""
+
+    SQUARE = "square"
+    ROUNDED = "rounded"
+    CIRCLE = "circle"
+
+
+class GradientKind(str, Enum):
+    """Gradients filling the dark modules, from the fill color to the gradient color"""
+
+    HORIZONTAL = "horizontal"  # left to right
+    VERTICAL = "vertical"  # top to bottom
+    DIAGONAL = "diagonal"  # top left to bottom right
+    RADIAL = "radial"  # center to corners
+
+
+class QRRenderParams(BaseModel):
+    """
+    Pydantic model describing a single QR code render, used to validate incoming render requests
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    data: str = Field(
+        ...,
+        description="Payload to encode in the QR code",
+        min_length=1,
+        max_length=QR_MAX_DATA_LENGTH,
+    )
+    error_correction: ErrorCorrectionLevel = Field(
+        ErrorCorrectionLevel.M, description="Error correction level of the QR code"
+    )
+    version: int | None = Field(
+        None,
+        description="QR code version (1-40), the smallest version fitting the data is used if omitted",
+        ge=1,
+        le=40,
+    )
+    box_size: int = Field(
+        QR_DEFAULT_BOX_SIZE,
+        description="Size in pixels of a single module, in points for PDF",
+        ge=1,
+        le=QR_MAX_BOX_SIZE,
+    )
+    border: int = Field(
+        QR_DEFAULT_BORDER,
+        description="Width of the quiet zone around the code, in modules",
+        ge=0,
+        le=QR_MAX_BORDER,
+    )
+    fill_color: str = Field(
+        "#000000", description="Color of the dark modules", pattern=HEX_COLOR_PATTERN
+    )
+    back_color: str = Field(
+        "#FFFFFF", description="Background color", pattern=HEX_COLOR_PATTERN
+    )
+    format: ImageFormat = Field(ImageFormat.PNG, description="Output image format")
+    module_shape: ModuleShape = Field(
+        ModuleShape.SQUARE, description="Shape of the dark modules"
+    )
+    eye_shape: EyeShape = Field(
+        EyeShape.SQUARE, description="Shape of the finder patterns"
+    )
+    eye_color: str | None = Field(
+        None,
+        description="Color of the finder patterns, the fill of the modules is used if omitted",
+        pattern=HEX_COLOR_PATTERN,
+    )
+    gradient: GradientKind | None = Field(
+        None, description="Gradient filling the dark modules, requires a gradient color"
+    )
+    gradient_color: str | None = Field(
+        None, description="End color of the gradient", pattern=HEX_COLOR_PATTERN
+    )
+    logo: Annotated[Base64Bytes, Field(max_length=QR_LOGO_MAX_BYTES)] | None = Field(
+        None,
+        description="Base64 encoded PNG, JPEG or WebP image drawn at the center of the code, "
+        "requires the error correction level Q or H",
+    )
+    logo_key: str | None = Field(
+        None,
+        description="Key of a logo uploaded to POST /qr/logos, in place of the logo itself",
+        pattern=LOGO_KEY_PATTERN,
+    )
+    logo_size: float = Field(
+        QR_LOGO_DEFAULT_SIZE,
+        description="Share of the width of the code covered by the logo",
+        gt=0,
+        le=QR_LOGO_MAX_SIZE,
+    )
+
+    @model_validator(mode="after")
+    def check_style(self) -> "QRRenderParams":
+        """
+        Check that a gradient comes with its end color, that a logo can be covered by error correction
+        and that styled renders are requested in a format of the style pipeline
+        """
+        if self.gradient is not None and self.gradient_color is None:
+            raise ValueError("A gradient requires a gradient color")
+        if self.logo is not None and self.logo_key is not None:
+            raise ValueError("A logo and a logo key are mutually exclusive")
+        if self.has_logo and self.error_correction not in (
+            ErrorCorrectionLevel.Q,
+            ErrorCorrectionLevel.H,
+        ):
+            raise ValueError("A logo requires the error correction level Q or H")
+        if self.styled and self.format is ImageFormat.PDF:
+            raise ValueError("Styled renders are only available in PNG and SVG")
+        return self
+
+    @property
+    def styled(self) -> bool:
+        """Whether the render goes through the style pipeline rather than the plain 1-bit rasterization"""
+        return (
+            self.module_shape is not ModuleShape.SQUARE
+            or self.eye_shape is not EyeShape.SQUARE
+            or self.eye_color is not None
+            or self.gradient is not None
+            or self.has_logo
+        )
+
+    @property
+    def has_logo(self) -> bool:
+        """Whether a logo is drawn, either sent along or uploaded beforehand"""
+        return self.logo is not None or self.logo_key is not None
+
+
+class RenderCacheStats(BaseModel):
+    """
+    Pydantic model for a snapshot of the render cache counters, used for serialization
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    hits: int = Field(..., description="Number of lookups answered from the cache")
+    misses: int = Field(..., description="Number of lookups not found in the cache")
+    evictions: int = Field(
+        ..., description="Number of entries evicted to stay within the byte budget"
+    )
+    entries: int = Field(..., description="Number of entries currently cached")
+    size_bytes: int = Field(..., description="Total size of the cached images")
+    max_bytes: int = Field(..., description="Byte budget of the cache")
+
+
+class QRCodeCreate(BaseModel):
+    """
+    Pydantic model for creating a dynamic QR code, its short id being generated
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    target_url: TargetUrl = Field(..., description="URL the code redirects to")
+    name: str | None = Field(None, description="Name of the code", max_length=100)
+
+
+class QRCodeUpdate(BaseModel):
+    """
+    Pydantic model for updating a dynamic QR code, only the fields which are set are updated
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    target_url: TargetUrl | None = Field(None, description="URL the code redirects to")
+    name: str | None = Field(None, description="Name of the code", max_length=100)
+    is_active: bool | None = Field(
+        None, description="Whether scans of the code are redirected"
+    )
+
+
+class QRCodeRead(BaseModel):
+    """
+    Pydantic model for reading a dynamic QR code, used for serialization and response payloads
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    short_id: str = Field(
+        ..., description="Id of the code in its short URL, /r/<short_id>"
+    )
+    name: str | None
+    target_url: str
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+
+class QRCodeListItem(BaseModel):
+    """
+    Pydantic model for a dynamic QR code in the listing of a user's codes, only the columns shown in the list
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    short_id: str = Field(
+        ..., description="Id of the code in its short URL, /r/<short_id>"
+    )
+    name: str | None
+    target_url: str
+    is_active: bool
+    created_at: datetime
+
+
+class QRCodePage(BaseModel):
+    """
+    Pydantic model for a page of the listing of a user's codes, newest first
+
+    Args:
+        BaseModel (BaseModel): Pydantic BaseModel
+    """
+
+    items: list[QRCodeListItem]
+    next_cursor: str | None = Field(
+        ..., description="Cursor of the next page, None on the last page"
+    )
@@ -0,0 +1,184 @@
+"""QR code generation specific business logic"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from src.qr.schemas import ImageFormat, QRRenderParams
+
+if TYPE_CHECKING:
+    # The web workers do not load NumPy, see render_qr
+    import numpy as np
+
+# Media types of the supported output formats, used for the Content-Type of the responses
+MEDIA_TYPES: dict[ImageFormat, str] = {
+    ImageFormat.PNG: "image/png",
+    ImageFormat.SVG: "image/svg+xml",
+    ImageFormat.PDF: "application/pdf",
+}
+
+
+DATA_OVERFLOW_MESSAGE = "Data is too large for the requested QR code version"
+
+
+class DataOverflowError(ValueError):
+    """
+    Raised when the data does not fit in the requested QR code version. Stands for the error of the qrcode
+    library, so that the web workers catch it without importing the rendering engine
+    """
+
+
+class StyleError(ValueError):
+    """Raised when a styled render cannot be produced, such as with a logo which is not a readable image"""
+
+
+@dataclass(frozen=True, slots=True)
+class VectorQR:
+    """
+    QR code drawn for a PDF sheet
+
+    Args:
+        modules (int): Side of the code, quiet zone included, in modules
+        operators (bytes): PDF content stream operators drawing the code, in module units with y pointing down
+    """
+
+    modules: int
+    operators: bytes
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedQR:
+    """
+    Result of a QR code render
+
+    Args:
+        content (bytes): The encoded image
+        media_type (str): Media type of the encoded image
+    """
+
+    content: bytes
+    media_type: str
+
+
+def rasterize(matrix: "np.ndarray", params: QRRenderParams) -> bytes:
+    """
+    Rasterize a module matrix into the requested format, through the style pipeline for the styled renders
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        params (QRRenderParams): Validated render parameters
+
+    Returns:
+        bytes: The rendered image
+
+    Raises:
+        StyleError: If the styled render cannot be produced
+    """
+    from src.qr.engine import render_pdf, render_png, render_svg
+
+    if params.styled:
+        from src.qr.styles import render_styled_png, render_styled_svg
+
+        if params.format is ImageFormat.SVG:
+            return render_styled_svg(matrix, params)
+        return render_styled_png(matrix, params)
+    if params.format is ImageFormat.SVG:
+        return render_svg(matrix, params.box_size, params.fill_color, params.back_color)
+    if params.format is ImageFormat.PDF:
+        return render_pdf(matrix, params.box_size, params.fill_color, params.back_color)
+    return render_png(matrix, params.box_size, params.fill_color, params.back_color)
+
+
+def render_qr(params: QRRenderParams) -> RenderedQR:
+    """
+    Render a QR code according to the given parameters in two stages: the data is encoded into the module
+    matrix, memoized across renders of the same payload, which is then rasterized into the requested format
+
+    Args:
+        params (QRRenderParams): Validated render parameters
+
+    Returns:
+        RenderedQR: The rendered image and its media type
+
+    Raises:
+        DataOverflowError: If the data does not fit in the requested version
+        StyleError: If the styled render cannot be produced
+    """
+    # Imported by the render processes on their first job: the web workers only hand the renders over to
+    # them, and start without loading NumPy, qrcode and Pillow
+    from qrcode.exceptions import DataOverflowError as QRCodeDataOverflowError
+
+    from src.qr.engine import build_matrix
+
+    try:
+        matrix = build_matrix(
+            params.data,
+            error_correction=params.error_correction,
+            version=params.version,
+            border=params.border,
+        )
+    except QRCodeDataOverflowError as e:
+        raise DataOverflowError(DATA_OVERFLOW_MESSAGE) from e
+
+    return RenderedQR(
+        content=rasterize(matrix, params), media_type=MEDIA_TYPES[params.format]
+    )
+
+
+def render_batch(
+    rows: list[tuple[int, QRRenderParams]],
+) -> list[tuple[int, RenderedQR | str]]:
+    """
+    Render a chunk of batch rows, meant to run as a single process pool job
+
+    Args:
+        rows (list[tuple[int, QRRenderParams]]): Row numbers and render parameters of the chunk
+
+    Returns:
+        list[tuple[int, RenderedQR | str]]: Row numbers along with their render, or the reason the row could not be rendered
+    """
+    results: list[tuple[int, RenderedQR | str]] = []
+    for row_number, params in rows:
+        try:
+            results.append((row_number, render_qr(params)))
+        except (DataOverflowError, StyleError) as e:
+            results.append((row_number, str(e)))
+    return results
+
+
+def render_sheet_batch(
+    rows: list[tuple[int, QRRenderParams]],
+) -> list[tuple[int, VectorQR | str]]:
+    """
+    Draw a chunk of the rows of a PDF sheet, meant to run as a single process pool job. Only the data,
+    error correction, version, border and colors of the rows are used, the layout of the sheet sets the size
+
+    Args:
+        rows (list[tuple[int, QRRenderParams]]): Row numbers and render parameters of the chunk
+
+    Returns:
+        list[tuple[int, VectorQR | str]]: Row numbers along with their drawing, or the reason the row could not be drawn
+    """
+    from qrcode.exceptions import DataOverflowError as QRCodeDataOverflowError
+
+    from src.qr.engine import build_matrix, pdf_operators
+
+    results: list[tuple[int, VectorQR | str]] = []
+    for row_number, params in rows:
+        if params.styled:
+            results.append(
+                (row_number, "Styled renders are not available in PDF sheets")
+            )
+            continue
+        try:
+            matrix = build_matrix(
+                params.data,
+                error_correction=params.error_correction,
+                version=params.version,
+                border=params.border,
+            )
+        except QRCodeDataOverflowError:
+            results.append((row_number, DATA_OVERFLOW_MESSAGE))
+            continue
+        operators = pdf_operators(matrix, params.fill_color, params.back_color)
+        results.append((row_number, VectorQR(matrix.shape[0], operators)))
+    return results
@@ -0,0 +1,205 @@
+"""
+PDF sheets of QR codes for print runs: the rows of a batch laid out on a grid, page after page.
+
+Rows are read, validated and drawn in chunks in the process pool as for the ZIP archives, each code as the
+vector outlines of its dark modules. Chunks are written in the order of the rows and every full page is
+sent right away, so the memory used by a sheet does not grow with the number of rows.
+"""
+
+from collections.abc import AsyncIterator, Iterator
+from typing import NamedTuple
+
+from src.qr.batch import render_chunks
+from src.qr.config import (
+    QR_BATCH_CHUNK_SIZE,
+    QR_BATCH_MAX_ROWS,
+    QR_SHEET_DEFAULT_COLUMNS,
+)
+from src.qr.executor import RenderService
+from src.qr.pdf import StreamingPDFWriter, pdf_string
+from src.qr.schemas import PageSize, QRRenderParams
+from src.qr.service import VectorQR, render_sheet_batch
+
+# Width and height of the pages, in points
+PAGE_SIZES: dict[PageSize, tuple[float, float]] = {
+    PageSize.A4: (595.28, 841.89),
+    PageSize.LETTER: (612.0, 792.0),
+}
+# Blank space around the grid and between its cells, in points
+SHEET_MARGIN = 36.0
+SHEET_GUTTER = 18.0
+# Font size of the row number under each code, and the space it takes
+CAPTION_FONT_SIZE = 8
+CAPTION_HEIGHT = 12.0
+# Font size of the lines of the listing of the rows which could not be drawn, and their spacing
+ERRORS_FONT_SIZE = 10
+ERRORS_LEADING = 14.0
+# Longer reasons are cut to stay within the width of the page
+ERRORS_MAX_LENGTH = 100
+
+
+class SheetLayout(NamedTuple):
+    """
+    Grid of the codes on the pages of a sheet
+
+    Args:
+        width (float): Width of the pages, in points
+        height (float): Height of the pages, in points
+        columns (int): Codes per row
+        rows (int): Rows of codes per page
+        side (float): Side of each code, quiet zone included, in points
+    """
+
+    width: float
+    height: float
+    columns: int
+    rows: int
+    side: float
+
+    @classmethod
+    def of(
+        cls, page_size: PageSize, columns: int = QR_SHEET_DEFAULT_COLUMNS
+    ) -> "SheetLayout":
+        """
+        Lay out as many rows of codes as fit on the page, the codes taking the whole width
+
+        Args:
+            page_size (PageSize): Size of the pages
+            columns (int, optional): Codes per row. Defaults to QR_SHEET_DEFAULT_COLUMNS.
+
+        Returns:
+            SheetLayout: The layout
+        """
+        width, height = PAGE_SIZES[page_size]
+        side = (width - 2 * SHEET_MARGIN - (columns - 1) * SHEET_GUTTER) / columns
+        pitch = side + CAPTION_HEIGHT + SHEET_GUTTER
+        rows = max(1, int((height - 2 * SHEET_MARGIN + SHEET_GUTTER) // pitch))
+        return cls(width, height, columns, rows, side)
+
+    @property
+    def per_page(self) -> int:
+        """Number of codes per page"""
+        return self.columns * self.rows
+
+    def cell(self, index: int) -> tuple[float, float]:
+        """
+        Position of a cell of the grid of a page
+
+        Args:
+            index (int): Index of the cell on the page, row after row
+
+        Returns:
+            tuple[float, float]: Left and top of the code, in points from the bottom left of the page
+        """
+        row, column = divmod(index, self.columns)
+        left = SHEET_MARGIN + column * (self.side + SHEET_GUTTER)
+        top = (
+            self.height
+            - SHEET_MARGIN
+            - row * (self.side + CAPTION_HEIGHT + SHEET_GUTTER)
+        )
+        return left, top
+
+
+def _page_content(layout: SheetLayout, codes: list[tuple[int, VectorQR]]) -> bytes:
+    parts = []
+    for index, (row_number, code) in enumerate(codes):
+        left, top = layout.cell(index)
+        scale = layout.side / code.modules
+        # Module units, with the origin at the top left corner of the code
+        parts.append(b"q %.4f 0 0 %.4f %.2f %.2f cm " % (scale, -scale, left, top))
+        parts.append(code.operators)
+        parts.append(
+            b"Q BT 0 g /F1 %d Tf %.2f %.2f Td %s Tj ET\n"
+            % (
+                CAPTION_FONT_SIZE,
+                left,
+                top - layout.side - CAPTION_FONT_SIZE - 2,
+                pdf_string(f"Row {row_number}"),
+            )
+        )
+    return b"".join(parts)
+
+
+def _errors_pages(
+    layout: SheetLayout, errors: list[tuple[int, str]]
+) -> Iterator[bytes]:
+    lines = [
+        f"Row {row_number}: {error}"[:ERRORS_MAX_LENGTH]
+        for row_number, error in sorted(errors)
+    ]
+    per_page = max(1, int((layout.height - 2 * SHEET_MARGIN) // ERRORS_LEADING) - 2)
+    for start in range(0, len(lines), per_page):
+        text = [
+            b"BT /F1 %d Tf %.2f TL %.2f %.2f Td (Rows not drawn) Tj T*"
+            % (
+                ERRORS_FONT_SIZE,
+                ERRORS_LEADING,
+                SHEET_MARGIN,
+                layout.height - SHEET_MARGIN - ERRORS_FONT_SIZE,
+            )
+        ]
+        text.extend(
+            b"T* %s Tj" % pdf_string(line) for line in lines[start : start + per_page]
+        )
+        text.append(b"ET\n")
+        yield b" ".join(text)
+
+
+async def stream_pdf_sheet(
+    rows: Iterator[tuple[int, QRRenderParams | str]],
+    render_service: RenderService,
+    layout: SheetLayout,
+    max_rows: int = QR_BATCH_MAX_ROWS,
+    chunk_size: int = QR_BATCH_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Draw the rows of a batch and stream them as a PDF sheet.
+
+    Codes are laid out in the order of the rows, captioned with their row number. The rows which could
+    not be parsed, validated or drawn are listed with the reason on pages at the end of the sheet.
+    Rows are drawn in chunks, see render_chunks, the size, format and style of the rows being ignored.
+
+    Args:
+        rows (Iterator[tuple[int, QRRenderParams | str]]): Rows of the batch, as yielded by iter_batch_rows
+        render_service (RenderService): Render service of the worker
+        layout (SheetLayout): Grid of the codes on the pages
+        max_rows (int, optional): Maximum number of rows of a batch, the remaining rows are reported as errors. Defaults to QR_BATCH_MAX_ROWS.
+        chunk_size (int, optional): Rows drawn per process pool job. Defaults to QR_BATCH_CHUNK_SIZE.
+
+    Yields:
+        bytes: Successive parts of the PDF document
+    """
+    document = StreamingPDFWriter()
+    errors: list[tuple[int, str]] = []
+    page: list[tuple[int, VectorQR]] = []
+
+    yield document.start()
+    async for results in render_chunks(
+        rows,
+        render_service,
+        render_sheet_batch,
+        errors,
+        max_rows,
+        chunk_size,
+        ordered=True,
+    ):
+        for row_number, result in results:
+            if isinstance(result, str):
+                errors.append((row_number, result))
+                continue
+            page.append((row_number, result))
+            if len(page) == layout.per_page:
+                yield document.add_page(
+                    layout.width, layout.height, _page_content(layout, page)
+                )
+                page = []
+
+    # A sheet has at least one page, be it blank
+    if page or not document.pages and not errors:
+        yield document.add_page(
+            layout.width, layout.height, _page_content(layout, page)
+        )
+    for content in _errors_pages(layout, errors):
+        yield document.add_page(layout.width, layout.height, content)
+    yield document.close()
@@ -0,0 +1,727 @@
+"""
+Styled QR code rendering: module shapes, eye shapes, gradient fills and a center logo.
+
+Every shape of a style is made of rounded rectangles, filled with the even-odd rule. A style is compiled
+once into anti-aliased coverage stamps for the PNG renders, per box size, and once into a <defs>
+template for the SVG renders. A render then only picks the stamp of every module from the module
+matrix and gathers them with NumPy, instead of drawing every module with Pillow as the styled image
+factories of the qrcode library do.
+
+Dark modules are stamped according to their four neighbors, so that the rounded modules of a run merge
+into a single shape, while the finder patterns, the eyes, are stamped whole with the eye shape.
+"""
+
+import base64
+import io
+import math
+import struct
+import zlib
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+from PIL import Image
+
+from src.qr.config import (
+    QR_LOGO_MAX_PIXELS,
+    QR_PNG_COMPRESSION_LEVEL,
+    QR_STYLE_CACHE_MAX_ENTRIES,
+    QR_STYLE_CANVAS_CACHE_MAX_ENTRIES,
+    QR_STYLE_MAX_SIZE,
+    QR_STYLE_SUPERSAMPLING,
+)
+from src.qr.engine import (
+    PNG_SIGNATURE,
+    _png_chunk,
+    hex_to_rgb,
+    svg_path_data,
+    trace_outlines,
+)
+from src.qr.schemas import EyeShape, GradientKind, ModuleShape, QRRenderParams
+from src.qr.service import StyleError
+
+# Bits of the neighbor codes of the modules, set when the neighbor in that direction is dark
+UP, RIGHT, DOWN, LEFT = 1, 2, 4, 8
+NEIGHBOR_CODES = 16
+
+# Side of a finder pattern, in modules
+EYE_MODULES = 7
+
+# Formats accepted for the logos, along with their media type once embedded in an SVG render
+LOGO_MEDIA_TYPES: dict[str, str] = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+# Logos decoded by each render process, reused across the renders of the same logo
+LOGO_CACHE_MAX_ENTRIES = 16
+
+
+class RoundedRect(NamedTuple):
+    """
+    Rectangle with rounded corners, in modules
+
+    Args:
+        x0, y0, x1, y1 (float): Bounds of the rectangle
+        radii (tuple[float, float, float, float]): Radii of the top left, top right, bottom right and
+            bottom left corners
+    """
+
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    radii: tuple[float, float, float, float] = (0, 0, 0, 0)
+
+    def contains(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Test which points lie inside the rectangle
+
+        Args:
+            x (np.ndarray): Abscissas of the points, broadcast against the ordinates
+            y (np.ndarray): Ordinates of the points
+
+        Returns:
+            np.ndarray: Boolean mask of the points inside
+        """
+        inside = (x >= self.x0) & (x < self.x1) & (y >= self.y0) & (y < self.y1)
+        top_left, top_right, bottom_right, bottom_left = self.radii
+        corners = (
+            (self.x0 + top_left, self.y0 + top_left, top_left, -1, -1),
+            (self.x1 - top_right, self.y0 + top_right, top_right, 1, -1),
+            (self.x1 - bottom_right, self.y1 - bottom_right, bottom_right, 1, 1),
+            (self.x0 + bottom_left, self.y1 - bottom_left, bottom_left, -1, 1),
+        )
+        for cx, cy, radius, sx, sy in corners:
+            if radius:
+                in_corner = ((x - cx) * sx > 0) & ((y - cy) * sy > 0)
+                inside &= ~(in_corner & ((x - cx) ** 2 + (y - cy) ** 2 > radius**2))
+        return inside
+
+    def path(self, dx: float = 0, dy: float = 0) -> str:
+        """
+        Build the SVG path data of the rectangle, drawn clockwise
+
+        Args:
+            dx (float, optional): Horizontal offset of the rectangle. Defaults to 0.
+            dy (float, optional): Vertical offset of the rectangle. Defaults to 0.
+
+        Returns:
+            str: The path data
+        """
+        x0, y0, x1, y1 = self.x0 + dx, self.y0 + dy, self.x1 + dx, self.y1 + dy
+        top_left, top_right, bottom_right, bottom_left = self.radii
+        path = [f"M{x0 + top_left:g} {y0:g}H{x1 - top_right:g}"]
+        if top_right:
+            path.append(f"A{top_right:g} {top_right:g} 0 0 1 {x1:g} {y0 + top_right:g}")
+        path.append(f"V{y1 - bottom_right:g}")
+        if bottom_right:
+            path.append(
+                f"A{bottom_right:g} {bottom_right:g} 0 0 1 {x1 - bottom_right:g} {y1:g}"
+            )
+        path.append(f"H{x0 + bottom_left:g}")
+        if bottom_left:
+            path.append(
+                f"A{bottom_left:g} {bottom_left:g} 0 0 1 {x0:g} {y1 - bottom_left:g}"
+            )
+        path.append(f"V{y0 + top_left:g}")
+        if top_left:
+            path.append(f"A{top_left:g} {top_left:g} 0 0 1 {x0 + top_left:g} {y0:g}")
+        return "".join(path) + "Z"
+
+
+# A shape is a set of rectangles filled with the even-odd rule, nested rectangles cutting holes
+Shape = tuple[RoundedRect, ...]
+
+EYE_SHAPES: dict[EyeShape, Shape] = {
+    EyeShape.SQUARE: (
+        RoundedRect(0, 0, 7, 7),
+        RoundedRect(1, 1, 6, 6),
+        RoundedRect(2, 2, 5, 5),
+    ),
+    EyeShape.ROUNDED: (
+        RoundedRect(0, 0, 7, 7, (2, 2, 2, 2)),
+        RoundedRect(1, 1, 6, 6, (1, 1, 1, 1)),
+        RoundedRect(2, 2, 5, 5, (0.75, 0.75, 0.75, 0.75)),
+    ),
+    EyeShape.CIRCLE: (
+        RoundedRect(0, 0, 7, 7, (3.5, 3.5, 3.5, 3.5)),
+        RoundedRect(1, 1, 6, 6, (2.5, 2.5, 2.5, 2.5)),
+        RoundedRect(2, 2, 5, 5, (1.5, 1.5, 1.5, 1.5)),
+    ),
+}
+
+
+def shape_of_module(shape: ModuleShape, neighbors: int) -> Shape:
+    """
+    Shape of a dark module
+
+    Args:
+        shape (ModuleShape): Shape of the modules of the style
+        neighbors (int): Neighbor code of the module, made of the UP, RIGHT, DOWN and LEFT bits
+
+    Returns:
+        Shape: The shape of the module, in a unit square
+    """
+    if shape is ModuleShape.DOT:
+        return (RoundedRect(0.1, 0.1, 0.9, 0.9, (0.4, 0.4, 0.4, 0.4)),)
+    if shape is ModuleShape.ROUNDED:
+        # A corner is rounded when neither of the two modules it touches is dark
+        radii = tuple(
+            0 if neighbors & sides else 0.5
+            for sides in (UP | LEFT, UP | RIGHT, DOWN | RIGHT, DOWN | LEFT)
+        )
+        return (RoundedRect(0, 0, 1, 1, radii),)
+    return (RoundedRect(0, 0, 1, 1),)
+
+
+def rasterize(shape: Shape, modules: int, box_size: int) -> np.ndarray:
+    """
+    Rasterize a shape into an anti-aliased coverage stamp, QR_STYLE_SUPERSAMPLING² samples per pixel
+
+    Args:
+        shape (Shape): The shape to rasterize
+        modules (int): Side of the stamp, in modules
+        box_size (int): Size in pixels of a single module
+
+    Returns:
+        np.ndarray: Square uint8 coverage stamp, 255 for the pixels fully inside the shape
+    """
+    side = modules * box_size
+    samples = side * QR_STYLE_SUPERSAMPLING
+    # Centers of the samples, in modules
+    axis = (np.arange(samples) + 0.5) / (QR_STYLE_SUPERSAMPLING * box_size)
+    x, y = axis[np.newaxis, :], axis[:, np.newaxis]
+
+    inside = np.zeros((samples, samples), dtype=bool)
+    for rect in shape:
+        inside ^= rect.contains(x, y)
+
+    coverage = inside.reshape(
+        side, QR_STYLE_SUPERSAMPLING, side, QR_STYLE_SUPERSAMPLING
+    ).mean(axis=(1, 3))
+    return np.rint(coverage * 255).astype(np.uint8)
+
+
+def neighbor_codes(dark: np.ndarray) -> np.ndarray:
+    """
+    Compute the neighbor code of every module
+
+    Args:
+        dark (np.ndarray): Boolean matrix of the dark modules
+
+    Returns:
+        np.ndarray: uint8 matrix of the UP, RIGHT, DOWN and LEFT bits set for the dark neighbors of each module
+    """
+    codes = np.zeros(dark.shape, dtype=np.uint8)
+    codes[1:, :] |= dark[:-1, :] * np.uint8(UP)
+    codes[:, :-1] |= dark[:, 1:] * np.uint8(RIGHT)
+    codes[:-1, :] |= dark[1:, :] * np.uint8(DOWN)
+    codes[:, 1:] |= dark[:, :-1] * np.uint8(LEFT)
+    return codes
+
+
+def eye_origins(modules: int, border: int) -> tuple[tuple[int, int], ...]:
+    """
+    Find the finder patterns of a code
+
+    Args:
+        modules (int): Side of the module matrix, quiet zone included
+        border (int): Width of the quiet zone
+
+    Returns:
+        tuple[tuple[int, int], ...]: Row and column of the top left module of the three finder patterns
+    """
+    far = modules - border - EYE_MODULES
+    return (border, border), (border, far), (far, border)
+
+
+def eye_regions(modules: int, border: int, box_size: int) -> list[tuple[slice, slice]]:
+    """
+    Find the pixels of the finder patterns of a code
+
+    Args:
+        modules (int): Side of the module matrix, quiet zone included
+        border (int): Width of the quiet zone
+        box_size (int): Size in pixels of a single module
+
+    Returns:
+        list[tuple[slice, slice]]: Rows and columns of the pixels of the three finder patterns
+    """
+    side = EYE_MODULES * box_size
+    return [
+        (
+            slice(row * box_size, row * box_size + side),
+            slice(column * box_size, column * box_size + side),
+        )
+        for row, column in eye_origins(modules, border)
+    ]
+
+
+class LogoArea(NamedTuple):
+    """
+    Area of the logo at the center of a code, in modules
+
+    Args:
+        start (float): Row and column of the top left corner of the logo
+        side (float): Side of the logo
+        hidden (slice): Rows and columns of the modules hidden by the logo
+    """
+
+    start: float
+    side: float
+    hidden: slice
+
+
+def logo_area(modules: int, border: int, logo_size: float) -> LogoArea:
+    """
+    Place the logo at the center of a code
+
+    Args:
+        modules (int): Side of the module matrix, quiet zone included
+        border (int): Width of the quiet zone
+        logo_size (float): Share of the width of the code covered by the logo
+
+    Returns:
+        LogoArea: Area of the logo
+    """
+    side = logo_size * (modules - 2 * border)
+    start = (modules - side) / 2
+    return LogoArea(start, side, slice(math.floor(start), math.ceil(start + side)))
+
+
+def visible_modules(matrix: np.ndarray, params: QRRenderParams) -> np.ndarray:
+    """
+    Dark modules drawn one by one, leaving out the finder patterns and the modules hidden by the logo
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        params (QRRenderParams): Render parameters
+
+    Returns:
+        np.ndarray: Boolean matrix of the dark modules to draw
+    """
+    dark = matrix.copy()
+    for row, column in eye_origins(matrix.shape[0], params.border):
+        dark[row : row + EYE_MODULES, column : column + EYE_MODULES] = False
+    if params.logo is not None:
+        hidden = logo_area(matrix.shape[0], params.border, params.logo_size).hidden
+        dark[hidden, hidden] = False
+    return dark
+
+
+@lru_cache(maxsize=LOGO_CACHE_MAX_ENTRIES)
+def open_logo(logo: bytes) -> Image.Image:
+    """
+    Decode a logo, once per render process
+
+    Args:
+        logo (bytes): The encoded image
+
+    Returns:
+        Image.Image: The decoded image
+
+    Raises:
+        StyleError: If the logo is not a readable PNG, JPEG or WebP image, or is too large
+    """
+    try:
+        image = Image.open(io.BytesIO(logo), formats=list(LOGO_MEDIA_TYPES))
+        if image.width * image.height > QR_LOGO_MAX_PIXELS:
+            raise StyleError(
+                f"The logo is too large, it must have at most {QR_LOGO_MAX_PIXELS} pixels"
+            )
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise StyleError("The logo is not a readable PNG, JPEG or WebP image") from e
+    return image
+
+
+@lru_cache(maxsize=LOGO_CACHE_MAX_ENTRIES)
+def compile_logo(logo: bytes, side: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Scale a logo to fit a square, keeping its aspect ratio, once per render process and size
+
+    Args:
+        logo (bytes): The encoded image
+        side (int): Side of the square, in pixels
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: uint16 RGB and alpha channels of the square, the logo centered in it
+    """
+    image = open_logo(logo).convert("RGBA")
+    image.thumbnail((side, side), Image.Resampling.LANCZOS)
+    square = Image.new("RGBA", (side, side))
+    square.paste(image, ((side - image.width) // 2, (side - image.height) // 2))
+
+    pixels = np.asarray(square, dtype=np.uint16)
+    return pixels[:, :, :3], pixels[:, :, 3:]
+
+
+class PNGStyle(NamedTuple):
+    """
+    Style compiled for the PNG renders at a given box size
+
+    Args:
+        stamps (np.ndarray): Coverage stamps of the modules, the light module first, then the dark ones
+            by neighbor code
+        eye (np.ndarray): Coverage stamp of the finder patterns
+    """
+
+    stamps: np.ndarray
+    eye: np.ndarray
+
+
+@lru_cache(maxsize=QR_STYLE_CACHE_MAX_ENTRIES)
+def compile_png_style(
+    module_shape: ModuleShape, eye_shape: EyeShape, box_size: int
+) -> PNGStyle:
+    """
+    Compile the shapes of a style into coverage stamps
+
+    Args:
+        module_shape (ModuleShape): Shape of the modules
+        eye_shape (EyeShape): Shape of the finder patterns
+        box_size (int): Size in pixels of a single module
+
+    Returns:
+        PNGStyle: The compiled style
+    """
+    stamps = np.zeros((NEIGHBOR_CODES + 1, box_size, box_size), dtype=np.uint8)
+    for code in range(NEIGHBOR_CODES):
+        stamps[code + 1] = rasterize(shape_of_module(module_shape, code), 1, box_size)
+    return PNGStyle(stamps, rasterize(EYE_SHAPES[eye_shape], EYE_MODULES, box_size))
+
+
+@lru_cache(maxsize=QR_STYLE_CACHE_MAX_ENTRIES)
+def compile_palette(fill_color: str, eye_color: str, back_color: str) -> np.ndarray:
+    """
+    Blend the colors of the style over the background for every coverage, making the palette of the
+    renders without gradient. With a single color, the palette index is the coverage. With a distinct
+    eye color, the modules take the lower half of the palette and the finder patterns the upper half,
+    each with 128 levels of coverage.
+
+    Args:
+        fill_color (str): Hex color of the dark modules
+        eye_color (str): Hex color of the finder patterns
+        back_color (str): Hex color of the background
+
+    Returns:
+        np.ndarray: uint8 RGB colors of the 256 palette indexes
+    """
+    indexes = np.arange(256, dtype=np.uint16)[:, np.newaxis]
+    fill = np.array(hex_to_rgb(fill_color), dtype=np.uint16)
+    back = np.array(hex_to_rgb(back_color), dtype=np.uint16)
+    if eye_color.lower() == fill_color.lower():
+        coverage = indexes
+    else:
+        coverage = ((indexes & 127) * 255 + 63) // 127
+        fill = np.where(indexes < 128, fill, hex_to_rgb(eye_color))
+    return ((fill * coverage + back * (255 - coverage) + 127) // 255).astype(np.uint8)
+
+
+@lru_cache(maxsize=QR_STYLE_CANVAS_CACHE_MAX_ENTRIES)
+def compile_canvas(
+    fill_color: str,
+    gradient: GradientKind | None,
+    gradient_color: str | None,
+    eye_color: str | None,
+    modules: int,
+    border: int,
+    box_size: int,
+) -> np.ndarray:
+    """
+    Paint the color of every pixel of the dark modules: the gradient across the code, and the eye color
+    over the finder patterns
+
+    Args:
+        fill_color (str): Hex color of the dark modules, where the gradient starts
+        gradient (GradientKind | None): Gradient of the dark modules, if any
+        gradient_color (str | None): Hex color where the gradient ends
+        eye_color (str | None): Hex color of the finder patterns, the fill is used if None
+        modules (int): Side of the module matrix, quiet zone included
+        border (int): Width of the quiet zone
+        box_size (int): Size in pixels of a single module
+
+    Returns:
+        np.ndarray: uint8 RGB image of the colors
+    """
+    size = modules * box_size
+    start = np.array(hex_to_rgb(fill_color), dtype=np.float32)
+    canvas = np.empty((size, size, 3), dtype=np.uint8)
+    canvas[...] = start
+
+    if gradient is not None:
+        # Position of the pixel centers across the code, quiet zone excluded, from 0 to 1
+        axis = (np.arange(size, dtype=np.float32) + 0.5 - border * box_size) / (
+            (modules - 2 * border) * box_size
+        )
+        u, v = axis[np.newaxis, :], axis[:, np.newaxis]
+        if gradient is GradientKind.HORIZONTAL:
+            t = np.broadcast_to(u, (size, size))
+        elif gradient is GradientKind.VERTICAL:
+            t = np.broadcast_to(v, (size, size))
+        elif gradient is GradientKind.DIAGONAL:
+            t = (u + v) / 2
+        else:
+            t = np.hypot(u - 0.5, v - 0.5) / math.sqrt(0.5)
+        end = np.array(hex_to_rgb(gradient_color), dtype=np.float32)
+        canvas[...] = np.rint(start + np.clip(t, 0, 1)[..., np.newaxis] * (end - start))
+
+    if eye_color is not None:
+        for region in eye_regions(modules, border, box_size):
+            canvas[region] = hex_to_rgb(eye_color)
+    return canvas
+
+
+def encode_png(pixels: np.ndarray, palette: np.ndarray | None = None) -> bytes:
+    """
+    Encode an 8-bit RGB or palette image into a PNG.
+
+    The scanlines of a palette image are filtered with the Up filter: the coverage repeats from row to
+    row within a module, so most of them filter down to zeros. The RGB images of the gradients change
+    from row to row and compress better unfiltered.
+
+    Args:
+        pixels (np.ndarray): uint8 RGB image, or palette indexes if a palette is given
+        palette (np.ndarray | None, optional): uint8 RGB colors of the palette indexes. Defaults to None.
+
+    Returns:
+        bytes: The encoded PNG image
+    """
+    height, width = pixels.shape[:2]
+    rows = pixels.reshape(height, -1)
+    raw = np.empty((height, rows.shape[1] + 1), dtype=np.uint8)
+    if palette is None:
+        raw[:, 0] = 0
+        raw[:, 1:] = rows
+    else:
+        # Filter type 2 (Up), the difference with the previous scanline modulo 256
+        raw[:, 0] = 2
+        raw[0, 1:] = rows[0]
+        np.subtract(rows[1:], rows[:-1], out=raw[1:, 1:])
+
+    # IHDR: width, height, bit depth 8, color type 2 (RGB) or 3 (palette), default compression/filter/interlace
+    color_type = 2 if palette is None else 3
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    chunks = [PNG_SIGNATURE, _png_chunk(b"IHDR", header)]
+    if palette is not None:
+        chunks.append(_png_chunk(b"PLTE", palette.tobytes()))
+    chunks.append(
+        _png_chunk(b"IDAT", zlib.compress(raw.tobytes(), QR_PNG_COMPRESSION_LEVEL))
+    )
+    chunks.append(_png_chunk(b"IEND", b""))
+    return b"".join(chunks)
+
+
+def render_styled_png(matrix: np.ndarray, params: QRRenderParams) -> bytes:
+    """
+    Render a module matrix into an anti-aliased PNG with the style of the render parameters.
+
+    The stamp of every module is picked by its neighbor code and all of them are gathered in a single
+    NumPy indexing, the finder patterns being copied over the result. The coverage is then either used
+    as the indexes of a palette PNG, or blended with the gradient and the logo into an RGB PNG.
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        params (QRRenderParams): Render parameters
+
+    Returns:
+        bytes: The encoded PNG image
+
+    Raises:
+        StyleError: If the image would be larger than QR_STYLE_MAX_SIZE, or the logo cannot be read
+    """
+    modules, box_size = matrix.shape[0], params.box_size
+    size = modules * box_size
+    if size > QR_STYLE_MAX_SIZE:
+        raise StyleError(
+            f"Styled renders are limited to {QR_STYLE_MAX_SIZE} pixels wide, "
+            "use a smaller box size"
+        )
+    style = compile_png_style(params.module_shape, params.eye_shape, box_size)
+
+    dark = visible_modules(matrix, params)
+    stamp_indexes = np.where(dark, neighbor_codes(dark) + 1, 0)
+    coverage = style.stamps[stamp_indexes].transpose(0, 2, 1, 3).reshape(size, size)
+    eyes = eye_regions(modules, params.border, box_size)
+    for region in eyes:
+        coverage[region] = style.eye
+
+    if params.gradient is None:
+        eye_color = params.eye_color or params.fill_color
+        palette = compile_palette(params.fill_color, eye_color, params.back_color)
+        if eye_color.lower() != params.fill_color.lower():
+            coverage >>= 1
+            for region in eyes:
+                coverage[region] |= 128
+        if params.logo is None:
+            return encode_png(coverage, palette)
+        pixels = palette[coverage]
+    else:
+        canvas = compile_canvas(
+            params.fill_color,
+            params.gradient,
+            params.gradient_color,
+            params.eye_color,
+            modules,
+            params.border,
+            box_size,
+        )
+        back = np.array(hex_to_rgb(params.back_color), dtype=np.uint16)
+        alpha = coverage[..., np.newaxis].astype(np.uint16)
+        pixels = ((canvas * alpha + back * (255 - alpha) + 127) // 255).astype(np.uint8)
+
+    # Logos are blended over the colors, which leaves the palette
+    if params.logo is not None:
+        area = logo_area(modules, params.border, params.logo_size)
+        start, side = round(area.start * box_size), round(area.side * box_size)
+        if side > 0:
+            logo, alpha = compile_logo(params.logo, side)
+            region = pixels[start : start + side, start : start + side]
+            region[...] = (logo * alpha + region * (255 - alpha) + 127) // 255
+    return encode_png(pixels)
+
+
+class SVGStyle(NamedTuple):
+    """
+    Style compiled for the SVG renders
+
+    Args:
+        defs (str): Shapes of the modules and of the finder patterns, to be placed in the <defs> element
+        module_ids (tuple[str, ...]): Id of the shape of the dark modules, by neighbor code
+    """
+
+    defs: str
+    module_ids: tuple[str, ...]
+
+
+@lru_cache(maxsize=QR_STYLE_CACHE_MAX_ENTRIES)
+def compile_svg_style(module_shape: ModuleShape, eye_shape: EyeShape) -> SVGStyle:
+    """
+    Compile the shapes of a style into an SVG template, the distinct shapes of the modules being
+    defined once
+
+    Args:
+        module_shape (ModuleShape): Shape of the modules
+        eye_shape (EyeShape): Shape of the finder patterns
+
+    Returns:
+        SVGStyle: The compiled style
+    """
+    paths: dict[str, str] = {}
+    module_ids = []
+    for code in range(NEIGHBOR_CODES):
+        path = "".join(rect.path() for rect in shape_of_module(module_shape, code))
+        module_ids.append(paths.setdefault(path, f"m{len(paths)}"))
+
+    eye_path = "".join(rect.path() for rect in EYE_SHAPES[eye_shape])
+    defs = "".join(f'<path id="{id}" d="{path}"/>' for path, id in paths.items())
+    defs += f'<path id="eye" fill-rule="evenodd" d="{eye_path}"/>'
+    return SVGStyle(defs, tuple(module_ids))
+
+
+# Gradients in the bounding box of the code: start and end points of the linear ones
+LINEAR_GRADIENTS: dict[GradientKind, tuple[int, int, int, int]] = {
+    GradientKind.HORIZONTAL: (0, 0, 1, 0),
+    GradientKind.VERTICAL: (0, 0, 0, 1),
+    GradientKind.DIAGONAL: (0, 0, 1, 1),
+}
+
+
+def svg_gradient(params: QRRenderParams) -> str:
+    """
+    Define the gradient of the render parameters, spanning the bounding box of the element it fills
+
+    Args:
+        params (QRRenderParams): Render parameters with a gradient
+
+    Returns:
+        str: The gradient element, with the id "gradient"
+    """
+    stops = (
+        f'<stop offset="0" stop-color="{params.fill_color}"/>'
+        f'<stop offset="1" stop-color="{params.gradient_color}"/>'
+    )
+    if params.gradient is GradientKind.RADIAL:
+        # Reaches the corners of the code, as the PNG renders do
+        return f'<radialGradient id="gradient" r="{math.sqrt(0.5):.4f}">{stops}</radialGradient>'
+    x1, y1, x2, y2 = LINEAR_GRADIENTS[params.gradient]
+    return (
+        f'<linearGradient id="gradient" x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}">'
+        f"{stops}</linearGradient>"
+    )
+
+
+def render_styled_svg(matrix: np.ndarray, params: QRRenderParams) -> bytes:
+    """
+    Render a module matrix as an SVG document with the style of the render parameters.
+
+    Shaped modules reference the shape of their neighbor code in the template, square modules are drawn
+    as a single path of their outlines. A gradient is painted on a single rectangle masked by the
+    modules, so that it spans the whole code instead of restarting at every module.
+
+    Args:
+        matrix (np.ndarray): Boolean module matrix, as returned by build_matrix
+        params (QRRenderParams): Render parameters
+
+    Returns:
+        bytes: The UTF-8 encoded SVG document
+
+    Raises:
+        StyleError: If the logo cannot be read
+    """
+    modules, border = matrix.shape[0], params.border
+    size = modules * params.box_size
+    style = compile_svg_style(params.module_shape, params.eye_shape)
+
+    dark = visible_modules(matrix, params)
+    if params.module_shape is ModuleShape.SQUARE:
+        path = "".join(svg_path_data(trace_outlines(dark)))
+        module_marks = f'<path shape-rendering="crispEdges" d="{path}"/>'
+    else:
+        rows, columns = np.nonzero(dark)
+        codes = neighbor_codes(dark)[rows, columns]
+        module_marks = "".join(
+            f'<use href="#{style.module_ids[code]}" x="{x}" y="{y}"/>'
+            for y, x, code in zip(rows.tolist(), columns.tolist(), codes.tolist())
+        )
+    eye_marks = "".join(
+        f'<use href="#eye" x="{x}" y="{y}"/>' for y, x in eye_origins(modules, border)
+    )
+
+    defs = style.defs
+    if params.gradient is not None:
+        defs += svg_gradient(params)
+        masked = module_marks if params.eye_color else module_marks + eye_marks
+        defs += f'<mask id="modules"><g fill="#fff">{masked}</g></mask>'
+        side = modules - 2 * border
+        body = (
+            f'<rect x="{border}" y="{border}" width="{side}" height="{side}" '
+            'fill="url(#gradient)" mask="url(#modules)"/>'
+        )
+        if params.eye_color:
+            body += f'<g fill="{params.eye_color}">{eye_marks}</g>'
+    else:
+        body = (
+            f'<g fill="{params.fill_color}">{module_marks}</g>'
+            f'<g fill="{params.eye_color or params.fill_color}">{eye_marks}</g>'
+        )
+
+    if params.logo is not None:
+        media_type = LOGO_MEDIA_TYPES[open_logo(params.logo).format]
+        area = logo_area(modules, border, params.logo_size)
+        body += (
+            f'<image x="{area.start:g}" y="{area.start:g}" width="{area.side:g}" '
+            f'height="{area.side:g}" preserveAspectRatio="xMidYMid meet" '
+            f'href="data:{media_type};base64,{base64.b64encode(params.logo).decode()}"/>'
+        )
+
+    # The view box is expressed in modules so the template does not depend on the box size
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {modules} {modules}">'
+        f"<defs>{defs}</defs>"
+        f'<rect width="{modules}" height="{modules}" fill="{params.back_color}"/>'
+        f"{body}</svg>"
+    ).encode()
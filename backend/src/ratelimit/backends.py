@@ -0,0 +1,183 @@
+"""
+Backends keeping the token buckets of the rate limits, in the worker or shared between the workers.
+
+Buckets are stored as their theoretical arrival time, the generic cell rate algorithm form of a token
+bucket: the time at which the bucket will be full again. Each request pushes it one interval further, and
+is refused if that would push it more than a period past now. A single number per bucket, updated in
+constant time, with no refill to schedule.
+"""
+
+import abc
+import time
+from collections.abc import Callable
+from typing import Any
+
+from src.ratelimit.schemas import RateLimitDecision, RateLimitRule
+
+
+def make_decision(
+    rule: RateLimitRule, allowed: bool, full_in: float, retry_after: float
+) -> RateLimitDecision:
+    """
+    Build the decision of a request from the state of its bucket
+
+    Args:
+        rule (RateLimitRule): Rule of the bucket
+        allowed (bool): Whether the request was allowed
+        full_in (float): Time for the bucket to be full again, after the request
+        retry_after (float): Time before a request is allowed again, 0 if the request was allowed
+
+    Returns:
+        RateLimitDecision: The decision
+    """
+    # Rounded down to whole requests, with some slack for the floating point error of the intervals
+    remaining = int((rule.period_seconds - full_in) / rule.interval_seconds + 1e-9)
+    return RateLimitDecision(
+        allowed=allowed,
+        limit=rule.limit,
+        remaining=max(remaining, 0),
+        reset_seconds=full_in,
+        retry_after_seconds=retry_after,
+    )
+
+
+class RateLimitBackend(abc.ABC):
+    """Store of the token buckets of the rate limits"""
+
+    @abc.abstractmethod
+    async def acquire(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        """
+        Take a request out of a bucket, if the bucket is not empty
+
+        Args:
+            key (str): Key of the bucket, unique to the rule and the client
+            rule (RateLimitRule): Rule of the bucket
+
+        Returns:
+            RateLimitDecision: Whether the request is allowed, and the state of the bucket
+        """
+
+    async def close(self) -> None:
+        """Release the resources of the backend, on shutdown"""
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets kept in the worker. Each worker enforces the limits on its own, so a client spreading
+    its requests over N workers gets up to N times the limit.
+
+    Decisions read and write the bucket without awaiting in between, so that they are atomic on the event
+    loop without any lock. Buckets are kept in least recently used order: the buckets at the front which
+    are full again are dropped as new ones are added, since a full bucket is the same as no bucket, and
+    the least recently used buckets are evicted beyond max_keys.
+    """
+
+    def __init__(
+        self, max_keys: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_keys = max_keys
+        self._clock = clock
+        self._arrivals: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._arrivals)
+
+    async def acquire(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        now = self._clock()
+        # Moved to the end of the dict, which keeps the buckets in least recently used order
+        arrival = max(self._arrivals.pop(key, now), now)
+        next_arrival = arrival + rule.interval_seconds
+        allowed_at = next_arrival - rule.period_seconds
+
+        if now < allowed_at:
+            self._arrivals[key] = arrival
+            return make_decision(rule, False, arrival - now, allowed_at - now)
+
+        self._arrivals[key] = next_arrival
+        self._evict(now)
+        return make_decision(rule, True, next_arrival - now, 0.0)
+
+    def _evict(self, now: float) -> None:
+        """Drop a couple of full buckets from the front, and the least recently used ones beyond max_keys"""
+        for _ in range(2):
+            oldest = next(iter(self._arrivals))
+            if self._arrivals[oldest] > now:
+                break
+            del self._arrivals[oldest]
+        while len(self._arrivals) > self.max_keys:
+            del self._arrivals[next(iter(self._arrivals))]
+
+    def clear(self) -> None:
+        """Drop every bucket"""
+        self._arrivals.clear()
+
+
+# Atomic update of a bucket, timed by the clock of the Redis server so that the clocks of the workers
+# do not matter. Times are returned as strings, Redis would truncate Lua numbers to integers
+REDIS_ACQUIRE_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local arrival = math.max(tonumber(redis.call('GET', KEYS[1])) or now, now)
+local next_arrival = arrival + interval
+local allowed_at = next_arrival - period
+if now < allowed_at then
+    return {0, tostring(arrival - now), tostring(allowed_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(next_arrival), 'PX', math.ceil((next_arrival - now) * 1000))
+return {1, tostring(next_arrival - now), '0'}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets shared by the workers through Redis, so that the limits hold across a deployment.
+
+    Every decision is a single round trip running REDIS_ACQUIRE_SCRIPT, which reads and writes the bucket
+    atomically. Buckets expire once they are full again, Redis does not keep idle clients around.
+
+    Args:
+        client (Any): Asynchronous Redis client, such as redis.asyncio.Redis
+        prefix (str): Prefix of the keys of the buckets
+    """
+
+    def __init__(self, client: Any, prefix: str) -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def acquire(self, key: str, rule: RateLimitRule) -> RateLimitDecision:
+        allowed, full_in, retry_after = await self.client.eval(
+            REDIS_ACQUIRE_SCRIPT,
+            1,
+            self.prefix + key,
+            repr(rule.interval_seconds),
+            repr(float(rule.period_seconds)),
+        )
+        return make_decision(rule, bool(allowed), float(full_in), float(retry_after))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def create_rate_limit_backend(
+    max_keys: int, redis_url: str | None, prefix: str
+) -> RateLimitBackend:
+    """
+    Create the backend of the rate limits: shared through Redis if a URL is configured, in the worker otherwise
+
+    Args:
+        max_keys (int): Buckets kept by the in-process backend
+        redis_url (str | None): URL of the Redis server, None for the in-process backend
+        prefix (str): Prefix of the keys of the buckets in Redis
+
+    Returns:
+        RateLimitBackend: The backend
+    """
+    if redis_url is None:
+        return LocalRateLimitBackend(max_keys)
+
+    # Only required by deployments sharing the limits between workers
+    from redis.asyncio import Redis
+
+    return RedisRateLimitBackend(Redis.from_url(redis_url), prefix)
@@ -0,0 +1,45 @@
+"""Rate limiting specific configuration"""
+
+from src.config import settings
+from src.ratelimit.schemas import RateLimitRule
+
+# Rate limits are enforced by a middleware in front of every route, disabling it removes the middleware
+RATE_LIMIT_ENABLED: bool = settings.RATE_LIMIT_ENABLED
+# Buckets kept by the in-process backend, the least recently used ones are evicted beyond that
+RATE_LIMIT_MAX_KEYS: int = settings.RATE_LIMIT_MAX_KEYS
+# Redis server sharing the buckets between the workers, None keeps the buckets in each worker
+RATE_LIMIT_REDIS_URL: str | None = settings.RATE_LIMIT_REDIS_URL
+# Prefix of the keys of the buckets in the shared backend
+RATE_LIMIT_KEY_PREFIX: str = "ratelimit:"
+
+# Rate limits by method and path of the route. Login and registration are limited per IP, since their
+# requests are anonymous, and hash passwords; renders and batches are limited per user, or per IP for
+# anonymous requests, since they rasterize QR codes, as are the logo uploads which fill the asset store.
+# Rules of the same name share their buckets
+RATE_LIMIT_RULES: dict[tuple[str, str], RateLimitRule] = {
+    ("POST", "/auth/login"): RateLimitRule("login", limit=10, period_seconds=60),
+    ("POST", "/auth/register"): RateLimitRule(
+        "register", limit=10, period_seconds=3600
+    ),
+    ("GET", "/qr/render"): RateLimitRule(
+        "render", limit=120, period_seconds=60, per_user=True
+    ),
+    ("POST", "/qr/render"): RateLimitRule(
+        "render", limit=120, period_seconds=60, per_user=True
+    ),
+    ("POST", "/qr/assets"): RateLimitRule(
+        "render", limit=120, period_seconds=60, per_user=True
+    ),
+    ("POST", "/qr/logos"): RateLimitRule(
+        "uploads", limit=20, period_seconds=60, per_user=True
+    ),
+    ("POST", "/qr/batch"): RateLimitRule(
+        "batch", limit=10, period_seconds=60, per_user=True
+    ),
+    ("POST", "/qr/sheet"): RateLimitRule(
+        "batch", limit=10, period_seconds=60, per_user=True
+    ),
+    ("POST", "/qr/codes"): RateLimitRule(
+        "codes", limit=60, period_seconds=60, per_user=True
+    ),
+}
@@ -0,0 +1,14 @@
+"""Rate limiting specific dependencies"""
+
+from src.ratelimit.backends import create_rate_limit_backend
+from src.ratelimit.config import (
+    RATE_LIMIT_KEY_PREFIX,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_REDIS_URL,
+)
+
+# Process wide backend of the rate limits, used by the rate limit middleware and closed by the lifespan of
+# the application
+rate_limit_backend = create_rate_limit_backend(
+    RATE_LIMIT_MAX_KEYS, RATE_LIMIT_REDIS_URL, RATE_LIMIT_KEY_PREFIX
+)
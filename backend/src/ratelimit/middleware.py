@@ -0,0 +1,138 @@
+"""
+ASGI middleware enforcing the rate limits of the routes, ahead of the routing, the authentication and any
+database access, with the RateLimit headers of the IETF httpapi working group draft on the responses
+"""
+
+import math
+from collections.abc import Callable
+from uuid import UUID
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.auth.jwt import jwt_strategy
+from src.ratelimit.backends import RateLimitBackend
+from src.ratelimit.schemas import RateLimitDecision, RateLimitRule
+
+
+def get_bearer_token(scope: Scope) -> str | None:
+    """
+    Get the bearer token of a request from its Authorization header
+
+    Args:
+        scope (Scope): ASGI scope of the request
+
+    Returns:
+        str | None: The token, or None if the request has no bearer token
+    """
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" and token else None
+    return None
+
+
+def rate_limit_headers(
+    rule: RateLimitRule, decision: RateLimitDecision
+) -> dict[str, str]:
+    """
+    Build the RateLimit headers of a response, along with Retry-After for the refused requests
+
+    Args:
+        rule (RateLimitRule): Rule of the route
+        decision (RateLimitDecision): Decision on the request
+
+    Returns:
+        dict[str, str]: The headers
+    """
+    headers = {
+        "RateLimit-Limit": str(decision.limit),
+        "RateLimit-Remaining": str(decision.remaining),
+        "RateLimit-Reset": str(math.ceil(decision.reset_seconds)),
+        "RateLimit-Policy": f"{rule.limit};w={math.ceil(rule.period_seconds)}",
+    }
+    if not decision.allowed:
+        headers["Retry-After"] = str(math.ceil(decision.retry_after_seconds))
+    return headers
+
+
+class RateLimitMiddleware:
+    """
+    Middleware enforcing the rate limits of the routes, refusing the requests over the limit with a 429.
+
+    Rules are looked up by the method and the path of the request, the routes without a rule are not
+    limited. Each rule has a bucket per client: per user for the rules limiting authenticated requests per
+    user, the user being read from the bearer token without loading it, and per IP otherwise. The IP is
+    the client of the ASGI server, which takes it from the proxy headers when run behind a trusted proxy.
+
+    Args:
+        app (ASGIApp): The application
+        backend (RateLimitBackend): Backend keeping the buckets
+        rules (dict[tuple[str, str], RateLimitRule]): Rules by method and path of the route
+        read_user_id (Callable[[str], UUID | None], optional): Reads the user of a bearer token. Defaults to the JWT strategy.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: RateLimitBackend,
+        rules: dict[tuple[str, str], RateLimitRule],
+        read_user_id: Callable[[str], UUID | None] = jwt_strategy.read_user_id,
+    ) -> None:
+        self.app = app
+        self.backend = backend
+        self.rules = rules
+        self.read_user_id = read_user_id
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.rules.get((scope["method"], scope["path"]))
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        decision = await self.backend.acquire(self.client_key(scope, rule), rule)
+        headers = rate_limit_headers(rule, decision)
+        if not decision.allowed:
+            response = JSONResponse(
+                {"detail": "Too many requests, please retry later"},
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        raw_headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in headers.items()
+        ]
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *raw_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    def client_key(self, scope: Scope, rule: RateLimitRule) -> str:
+        """
+        Key of the bucket of the client of a request
+
+        Args:
+            scope (Scope): ASGI scope of the request
+            rule (RateLimitRule): Rule of the route
+
+        Returns:
+            str: The key, made of the name of the rule and the user or the IP of the client
+        """
+        if rule.per_user:
+            token = get_bearer_token(scope)
+            user_id = self.read_user_id(token) if token is not None else None
+            if user_id is not None:
+                return f"{rule.name}:user:{user_id}"
+        client = scope.get("client")
+        return f"{rule.name}:ip:{client[0] if client else 'unknown'}"
@@ -0,0 +1,44 @@
+"""Rules and decisions of the rate limits"""
+
+from typing import NamedTuple
+
+
+class RateLimitRule(NamedTuple):
+    """
+    Rate limit of a route: limit requests per period, with bursts of up to limit requests
+
+    Args:
+        name (str): Name of the rule, prefixing the keys of its buckets
+        limit (int): Requests allowed per period
+        period_seconds (float): Length of the period
+        per_user (bool): Whether authenticated requests are limited per user rather than per IP
+    """
+
+    name: str
+    limit: int
+    period_seconds: float
+    per_user: bool = False
+
+    @property
+    def interval_seconds(self) -> float:
+        """Time for the bucket to regain a request"""
+        return self.period_seconds / self.limit
+
+
+class RateLimitDecision(NamedTuple):
+    """
+    Outcome of a request against the bucket of its rule and client
+
+    Args:
+        allowed (bool): Whether the request may proceed
+        limit (int): Requests allowed per period
+        remaining (int): Requests left before the bucket is empty
+        reset_seconds (float): Time for the bucket to be full again
+        retry_after_seconds (float): Time before a request is allowed again, 0 if the request was allowed
+    """
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: float
+    retry_after_seconds: float
@@ -0,0 +1,51 @@
+"""
+Fast JSON responses for the endpoints returning large payloads, such as the listings and the analytics.
+
+When an endpoint returns a model, FastAPI dumps it to a dict, validates the dict against the response
+model again, serializes it to JSON compatible objects and only then encodes them with the json module.
+A FastJSONResponse encodes its content straight to bytes with orjson instead, the models being dumped
+to Python objects by the Rust serializer of Pydantic on the way, which is faster than both the JSON mode
+of that serializer and the json module. Returning a response also makes FastAPI skip the validation
+against the response model, which is kept on the route for the OpenAPI schema. The content must then
+already be what the route documents: nothing is filtered out, unlike with the response model.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import to_jsonable_python
+
+# Datetimes in UTC end with a Z, as they do once serialized by Pydantic
+ORJSON_OPTIONS: int = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    """Convert the values orjson does not support natively: the models, then the URLs, durations and such"""
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_python(value, by_alias=True)
+    return to_jsonable_python(value)
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Encode content to JSON, as FastAPI would with the aliases of the models
+
+    Args:
+        content (Any): A model, or plain data made of dicts, lists, dataclasses, datetimes, UUIDs, enums
+            and models
+
+    Returns:
+        bytes: The JSON document
+    """
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(Response):
+    """JSON response encoding its content straight to bytes, see dump_json"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
@@ -0,0 +1,144 @@
+"""
+Helpers for the endpoints receiving rows in bulk: negotiation of the body format, spooling of the body
+and parsing of its rows as NDJSON or CSV.
+"""
+
+import csv
+import io
+import json
+import tempfile
+from collections.abc import Iterator
+from enum import Enum
+from typing import Any, BinaryIO
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+
+# Uploads are buffered in memory up to this size, then spooled to a temporary file
+UPLOAD_SPOOL_MEMORY_BYTES: int = 1024 * 1024  # 1 MiB
+
+
+class UploadFormat(str, Enum):
+    """Formats accepted for the rows of a bulk upload, keyed by their media type"""
+
+    NDJSON = "application/x-ndjson"
+    CSV = "text/csv"
+
+
+# Media types accepted for the rows, NDJSON has no registered media type and goes by a few names
+UPLOAD_MEDIA_TYPES: dict[str, UploadFormat] = {
+    "application/x-ndjson": UploadFormat.NDJSON,
+    "application/ndjson": UploadFormat.NDJSON,
+    "application/jsonl": UploadFormat.NDJSON,
+    "text/csv": UploadFormat.CSV,
+}
+
+
+def get_upload_format(content_type: str | None) -> UploadFormat:
+    """
+    Determine the format of an upload from the Content-Type of the request, ignoring its parameters
+
+    Args:
+        content_type (str | None): Value of the Content-Type header
+
+    Returns:
+        UploadFormat: Format of the body
+
+    Raises:
+        HTTPException: 415 if the media type is not supported
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    try:
+        return UPLOAD_MEDIA_TYPES[media_type]
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Body must be NDJSON (application/x-ndjson) or CSV (text/csv)",
+        )
+
+
+async def spool_request_body(request: Request, max_bytes: int) -> BinaryIO:
+    """
+    Read the request body into a spooled temporary file, kept in memory while small and moved to disk
+    past UPLOAD_SPOOL_MEMORY_BYTES. Streaming responses need the body to be fully received before they
+    start, since they take over the receive channel to detect disconnects.
+
+    Args:
+        request (Request): The incoming request
+        max_bytes (int): Maximum size of the body
+
+    Returns:
+        BinaryIO: The spooled body, rewound to its start
+
+    Raises:
+        HTTPException: 413 if the body is larger than max_bytes
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES)
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            spool.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Body exceeds the limit of {max_bytes} bytes",
+            )
+        spool.write(chunk)
+    spool.seek(0)
+    return spool  # type: ignore
+
+
+def _iter_ndjson(file: BinaryIO) -> Iterator[dict[str, Any] | str]:
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield "Invalid JSON"
+            continue
+        yield record if isinstance(record, dict) else "Row must be a JSON object"
+
+
+def _iter_csv(file: BinaryIO) -> Iterator[dict[str, Any] | str]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    for record in csv.DictReader(text):
+        # Empty cells fall back to the defaults of the model, extra cells are ignored
+        yield {k: v for k, v in record.items() if k is not None and v not in ("", None)}
+
+
+def iter_records(
+    file: BinaryIO, upload_format: UploadFormat
+) -> Iterator[dict[str, Any] | str]:
+    """
+    Read the records of an upload, one row at a time
+
+    NDJSON rows are JSON objects, one per line, blank lines being skipped. CSV rows are read according
+    to the header line, empty cells being left out of the records.
+
+    Args:
+        file (BinaryIO): The upload body
+        upload_format (UploadFormat): Format of the body
+
+    Yields:
+        dict[str, Any] | str: Fields of the row, or the reason the row could not be parsed
+    """
+    if upload_format is UploadFormat.NDJSON:
+        return _iter_ndjson(file)
+    return _iter_csv(file)
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """
+    Summarize the errors of a validation on a single line, to be reported for a row
+
+    Args:
+        error (ValidationError): The validation error of the row
+
+    Returns:
+        str: The location and message of each error, separated by semicolons
+    """
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}"
+        for e in error.errors(include_url=False)
+    )
@@ -0,0 +1,26 @@
+"""Analytics domain level fixtures used throughout the scan analytics tests"""
+
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.router import current_active_user
+from src.main import app as test_app
+from src.qr.codes import create_qr_code
+from src.qr.models import QRCode
+from src.qr.schemas import QRCodeCreate
+from tests.qr.conftest import create_user
+
+
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def qr_code(client: AsyncClient, async_db_session: AsyncSession) -> QRCode:
+    """
+    Provides a code stored in the test database, every request of the test being authenticated as its owner
+    """
+    owner = await create_user(async_db_session, "owner")
+    test_app.dependency_overrides[current_active_user] = lambda: owner
+    return await create_qr_code(
+        async_db_session,
+        owner.id,
+        QRCodeCreate(target_url="https://qrafty.app"),  # type: ignore
+    )
@@ -0,0 +1,217 @@
+"""Testing the batched ingestion of the scan events"""
+
+import asyncio
+import uuid
+from contextlib import nullcontext
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.config import SCAN_EVENT_USER_AGENT_MAX_LENGTH
+from src.analytics.ingestion import ScanEventQueue
+from src.analytics.models import ScanEvent
+from src.analytics.schemas import OverflowPolicy
+from src.qr.codes import create_qr_code
+from src.qr.schemas import QRCodeCreate
+from tests.qr.conftest import create_user
+
+
+def make_queue(session: AsyncSession, **kwargs) -> ScanEventQueue:
+    """Build a scan event queue writing through the test session"""
+    options = {
+        "max_size": 100,
+        "batch_size": 10,
+        "flush_interval_seconds": 3600,
+        "session_maker": lambda: nullcontext(session),
+    } | kwargs
+    return ScanEventQueue(**options)
+
+
+async def wait_for_batches(queue: ScanEventQueue, batches: int) -> None:
+    """Wait for the background task of a queue to have written a number of batches"""
+    async with asyncio.timeout(5):
+        while queue.batches < batches:
+            await asyncio.sleep(0.001)
+
+
+async def count_events(session: AsyncSession, qr_code_id: uuid.UUID) -> int:
+    """Count the scan events of a code in the test database"""
+    result = await session.scalars(
+        select(ScanEvent.id).where(ScanEvent.qr_code_id == qr_code_id)
+    )
+    return len(result.all())
+
+
+@pytest.mark.asyncio
+class TestScanEventQueue:
+    """Test class for the queue batching the scan events"""
+
+    async def test_flushes_full_batches(self, async_db_session: AsyncSession) -> None:
+        """Test that full batches are written right away, the rest once the queue is stopped."""
+        queue = make_queue(async_db_session, batch_size=10)
+        queue.start()
+        qr_code_id = uuid.uuid4()
+        for _ in range(25):
+            await queue.record(qr_code_id, "Scanner/1.0")
+
+        await wait_for_batches(queue, 2)
+        assert queue.stats().pending == 5
+
+        await queue.stop()
+        stats = queue.stats()
+        assert (stats.queued, stats.flushed, stats.batches, stats.pending) == (
+            25,
+            25,
+            3,
+            0,
+        )
+        assert await count_events(async_db_session, qr_code_id) == 25
+        print("Test passed successfully!")
+
+    async def test_flushes_after_interval(self, async_db_session: AsyncSession) -> None:
+        """Test that a partial batch is written once the flush interval has elapsed."""
+        queue = make_queue(async_db_session, flush_interval_seconds=0.01)
+        queue.start()
+        qr_code_id = uuid.uuid4()
+        await queue.record(qr_code_id, None)
+        await queue.record(qr_code_id, "x" * 1000)
+
+        await wait_for_batches(queue, 1)
+        assert queue.stats().flushed == 2
+        user_agents = await async_db_session.scalars(
+            select(ScanEvent.user_agent).where(ScanEvent.qr_code_id == qr_code_id)
+        )
+        assert sorted(user_agents, key=bool) == [
+            None,
+            "x" * SCAN_EVENT_USER_AGENT_MAX_LENGTH,
+        ]
+        await queue.stop()
+        print("Test passed successfully!")
+
+    async def test_drop_overflow(self, async_db_session: AsyncSession) -> None:
+        """Test that events are dropped once the queue is full under the drop policy."""
+        queue = make_queue(async_db_session, max_size=3)
+        queue.start()
+        accepted = [await queue.record(uuid.uuid4(), None) for _ in range(5)]
+
+        assert accepted == [True, True, True, False, False]
+        await queue.stop()
+        stats = queue.stats()
+        assert (stats.queued, stats.flushed, stats.dropped) == (3, 3, 2)
+        print("Test passed successfully!")
+
+    async def test_block_overflow(self, async_db_session: AsyncSession) -> None:
+        """Test that callers wait for room in the queue under the block policy, no event being dropped."""
+        queue = make_queue(
+            async_db_session, max_size=3, overflow_policy=OverflowPolicy.BLOCK
+        )
+        queue.start()
+        qr_code_id = uuid.uuid4()
+        await asyncio.gather(*(queue.record(qr_code_id, None) for _ in range(20)))
+
+        await queue.stop()
+        stats = queue.stats()
+        assert (stats.queued, stats.flushed, stats.dropped) == (20, 20, 0)
+        assert await count_events(async_db_session, qr_code_id) == 20
+        print("Test passed successfully!")
+
+    async def test_failed_batch(self, async_db_session: AsyncSession) -> None:
+        """Test that a batch which cannot be written is counted as failed, the queue carrying on."""
+        sessions = iter([None, async_db_session])
+
+        def session_maker():
+            session = next(sessions)
+            if session is None:
+                raise ConnectionError("The database is unreachable")
+            return nullcontext(session)
+
+        queue = make_queue(async_db_session, batch_size=2, session_maker=session_maker)
+        queue.start()
+        for _ in range(3):
+            await queue.record(uuid.uuid4(), None)
+
+        await queue.stop()
+        stats = queue.stats()
+        assert (stats.queued, stats.flushed, stats.failed, stats.pending) == (
+            3,
+            1,
+            2,
+            0,
+        )
+        print("Test passed successfully!")
+
+    async def test_requires_start(self, async_db_session: AsyncSession) -> None:
+        """Test that events are refused before the queue is started and after it is stopped."""
+        queue = make_queue(async_db_session)
+        with pytest.raises(RuntimeError):
+            await queue.record(uuid.uuid4(), None)
+
+        queue.start()
+        await queue.stop()
+        await queue.stop()
+        with pytest.raises(RuntimeError):
+            await queue.record(uuid.uuid4(), None)
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestScanRecording:
+    """Test class for the recording of the scans by the redirects, and the counters of the queue"""
+
+    async def test_redirect_records_scan(
+        self,
+        client: AsyncClient,
+        async_db_session: AsyncSession,
+        scan_events: ScanEventQueue,
+    ) -> None:
+        """Test that redirects queue a scan with the user agent, unknown short ids none."""
+        owner = await create_user(async_db_session, "owner")
+        qr_code = await create_qr_code(
+            async_db_session,
+            owner.id,
+            QRCodeCreate(target_url="https://qrafty.app"),  # type: ignore
+        )
+
+        response: Response = await client.get(
+            f"/r/{qr_code.short_id}", headers={"User-Agent": "Scanner/1.0"}
+        )
+        assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+        await client.get("/r/unknown")
+        assert scan_events.stats().queued == 1
+
+        await scan_events.stop()
+        event = (
+            await async_db_session.scalars(
+                select(ScanEvent).where(ScanEvent.qr_code_id == qr_code.id)
+            )
+        ).one()
+        assert event.user_agent == "Scanner/1.0"
+        print("Test passed successfully!")
+
+    async def test_ingestion_stats(
+        self, client: AsyncClient, as_superuser: None, scan_events: ScanEventQueue
+    ) -> None:
+        """Test that the counters of the queue are exposed to superusers."""
+        await scan_events.record(uuid.uuid4(), None)
+        response: Response = await client.get("/analytics/ingestion")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "queued": 1,
+            "flushed": 0,
+            "dropped": 0,
+            "failed": 0,
+            "pending": 1,
+            "batches": 0,
+        }
+        print("Test passed successfully!")
+
+    async def test_ingestion_stats_requires_superuser(
+        self, client: AsyncClient
+    ) -> None:
+        """Test that the counters of the queue are restricted to superusers."""
+        response: Response = await client.get("/analytics/ingestion")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        print("Test passed successfully!")
@@ -0,0 +1,49 @@
+"""Testing the periodic background jobs of the analytics"""
+
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.analytics.jobs import PeriodicJob
+
+
+@pytest.mark.asyncio
+class TestPeriodicJob:
+    """Test class for the periodic jobs running a database task"""
+
+    async def test_runs_every_interval(self, async_db_session: AsyncSession) -> None:
+        """Test that the task runs in the background until the job is stopped, skipped runs keeping the last result."""
+        results = iter([1, None])
+
+        async def task(session: AsyncSession) -> int | None:
+            assert session is async_db_session
+            return next(results, 2)
+
+        job = PeriodicJob(
+            "test", task, 0.001, session_maker=lambda: nullcontext(async_db_session)
+        )
+        job.start()
+        async with asyncio.timeout(5):
+            while job.last_result != 2:
+                await asyncio.sleep(0.001)
+        await job.stop()
+        await job.stop()
+        assert job.failures == 0
+        print("Test passed successfully!")
+
+    async def test_failure(self) -> None:
+        """Test that failed runs are counted, the job carrying on."""
+
+        def session_maker():
+            raise ConnectionError("The database is unreachable")
+
+        async def task(session: AsyncSession) -> int:
+            return 1
+
+        job = PeriodicJob("test", task, 60, session_maker=session_maker)
+        assert await job.run_once() is None
+        assert job.failures == 1
+        assert job.last_result is None
+        print("Test passed successfully!")
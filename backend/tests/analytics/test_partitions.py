@@ -0,0 +1,120 @@
+"""Testing the maintenance of the monthly partitions of the scan events"""
+
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.analytics.config import SCAN_EVENT_PARTITION_LOCK_KEY
+from src.analytics.models import ScanEvent
+from src.analytics.partitions import (
+    add_months,
+    create_partition,
+    list_partitions,
+    maintain_scan_event_partitions,
+    partition_name,
+)
+from src.analytics.schemas import ExpiredPartitionAction
+
+# Far enough from the partitions of the test database for all of them to be expired
+TODAY = date(2040, 12, 15)
+
+
+class TestPartitionNames:
+    """Test class for the months of the partitions"""
+
+    def test_add_months(self) -> None:
+        """Test that months are moved across years in both directions."""
+        assert add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert add_months(date(2026, 1, 1), -13) == date(2024, 12, 1)
+        assert partition_name(date(2026, 3, 1)) == "scan_event_2026_03"
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestMaintainPartitions:
+    """Test class for the creation of the partitions ahead of time and the expiry of the old ones"""
+
+    async def test_create_and_drop(self, async_db_session: AsyncSession) -> None:
+        """Test that the coming partitions are created once, and the expired ones dropped."""
+        expired = sorted((await list_partitions(async_db_session)).values())
+        await create_partition(async_db_session, date(2040, 10, 1))
+
+        maintenance = await maintain_scan_event_partitions(
+            async_db_session,
+            TODAY,
+            months_ahead=2,
+            retention_months=1,
+            expired_action=ExpiredPartitionAction.DROP,
+        )
+        assert maintenance is not None
+        assert maintenance.created == [
+            "scan_event_2040_12",
+            "scan_event_2041_01",
+            "scan_event_2041_02",
+        ]
+        assert maintenance.dropped == expired + ["scan_event_2040_10"]
+        assert maintenance.detached == []
+        assert sorted((await list_partitions(async_db_session)).values()) == (
+            maintenance.created
+        )
+
+        maintenance = await maintain_scan_event_partitions(
+            async_db_session, TODAY, months_ahead=2, retention_months=1
+        )
+        assert maintenance is not None
+        assert maintenance.model_dump() == {
+            "created": [],
+            "detached": [],
+            "dropped": [],
+        }
+        print("Test passed successfully!")
+
+    async def test_detach(self, async_db_session: AsyncSession) -> None:
+        """Test that detached partitions are kept as standalone tables with their events."""
+        month = date(2040, 1, 1)
+        await create_partition(async_db_session, month)
+        await async_db_session.execute(
+            ScanEvent.__table__.insert().values(
+                qr_code_id=uuid.uuid4(),
+                scanned_at=datetime(2040, 1, 2, tzinfo=timezone.utc),
+            )
+        )
+
+        maintenance = await maintain_scan_event_partitions(
+            async_db_session,
+            TODAY,
+            months_ahead=0,
+            retention_months=6,
+            expired_action=ExpiredPartitionAction.DETACH,
+        )
+        assert maintenance is not None
+        assert "scan_event_2040_01" in maintenance.detached
+        assert month not in await list_partitions(async_db_session)
+        assert (
+            await async_db_session.scalar(select(func.count()).select_from(ScanEvent))
+            == 0
+        )
+        assert (
+            await async_db_session.scalar(
+                text("SELECT count(*) FROM scan_event_2040_01")
+            )
+            == 1
+        )
+        print("Test passed successfully!")
+
+    async def test_single_maintenance_at_a_time(
+        self, async_db_session: AsyncSession, async_db_engine: AsyncEngine
+    ) -> None:
+        """Test that a maintenance is skipped while another one holds the advisory lock."""
+        async with async_db_engine.connect() as connection:
+            await connection.execute(
+                select(func.pg_advisory_lock(SCAN_EVENT_PARTITION_LOCK_KEY))
+            )
+            assert await maintain_scan_event_partitions(async_db_session, TODAY) is None
+            await connection.execute(
+                select(func.pg_advisory_unlock(SCAN_EVENT_PARTITION_LOCK_KEY))
+            )
+        print("Test passed successfully!")
@@ -0,0 +1,184 @@
+"""Testing the scan rollups, their incremental refresh and the scan series read from them"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from fastapi import status
+from httpx import AsyncClient, Response
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.analytics.config import SCAN_ROLLUP_LOCK_KEY
+from src.analytics.models import ScanEvent, ScanRollupDaily, ScanRollupHourly
+from src.analytics.partitions import create_partition
+from src.analytics.rollups import refresh_scan_rollups
+from src.qr.models import QRCode
+
+NOW = datetime(2026, 3, 2, 10, 30, tzinfo=timezone.utc)
+LATENESS = timedelta(minutes=5)
+
+
+async def add_scans(
+    session: AsyncSession, qr_code_id: uuid.UUID, *scanned_at: datetime
+) -> None:
+    """Insert scan events of a code in the test database"""
+    await session.execute(
+        insert(ScanEvent),
+        [{"qr_code_id": qr_code_id, "scanned_at": moment} for moment in scanned_at],
+    )
+
+
+async def read_rollup(
+    session: AsyncSession, model: type[ScanRollupHourly] | type[ScanRollupDaily]
+) -> dict[tuple[uuid.UUID, datetime], int]:
+    """Read a rollup table of the test database"""
+    result = await session.execute(select(model.qr_code_id, model.bucket, model.scans))
+    return {(qr_code_id, bucket): scans for qr_code_id, bucket, scans in result}
+
+
+@pytest_asyncio.fixture(autouse=True)  # type: ignore
+async def partitions(async_db_session: AsyncSession) -> None:
+    """
+    Creates the partitions of the scan events of the tests, the partitions being rolled back with the test
+    """
+    for month in (2, 3):
+        await create_partition(async_db_session, date(2026, month, 1))
+
+
+def hour(day: int, hour: int) -> datetime:
+    """Start of an hour of March 2026, in UTC"""
+    return datetime(2026, 3, day, hour, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+class TestRefreshScanRollups:
+    """Test class for the incremental refresh of the scan rollups"""
+
+    async def test_refresh(self, async_db_session: AsyncSession) -> None:
+        """Test that the scans are counted per code and bucket, and the watermark set lateness before now."""
+        first, second = uuid.uuid4(), uuid.uuid4()
+        minute = timedelta(minutes=1)
+        await add_scans(
+            async_db_session, first, hour(1, 23), hour(1, 23) + minute, hour(2, 9)
+        )
+        await add_scans(async_db_session, second, hour(2, 10) + minute)
+
+        refresh = await refresh_scan_rollups(async_db_session, NOW, LATENESS)
+        assert refresh is not None
+        assert refresh.watermark == hour(2, 10)
+        assert (refresh.hourly_buckets, refresh.daily_buckets) == (3, 3)
+        assert await read_rollup(async_db_session, ScanRollupHourly) == {
+            (first, hour(1, 23)): 2,
+            (first, hour(2, 9)): 1,
+            (second, hour(2, 10)): 1,
+        }
+        assert await read_rollup(async_db_session, ScanRollupDaily) == {
+            (first, hour(1, 0)): 2,
+            (first, hour(2, 0)): 1,
+            (second, hour(2, 0)): 1,
+        }
+        print("Test passed successfully!")
+
+    async def test_incremental(self, async_db_session: AsyncSession) -> None:
+        """Test that only the hours from the watermark are aggregated again, replacing their counts."""
+        qr_code_id = uuid.uuid4()
+        await add_scans(async_db_session, qr_code_id, hour(2, 9), hour(2, 10))
+        await refresh_scan_rollups(async_db_session, NOW, LATENESS)
+
+        # A scan in the open hour is counted, one written later than the lateness is not
+        await add_scans(async_db_session, qr_code_id, hour(2, 10), hour(2, 8))
+        refresh = await refresh_scan_rollups(
+            async_db_session, NOW + timedelta(hours=1), LATENESS
+        )
+        assert refresh is not None
+        assert (refresh.window_start, refresh.watermark) == (hour(2, 10), hour(2, 11))
+        assert refresh.hourly_buckets == 1
+        assert await read_rollup(async_db_session, ScanRollupHourly) == {
+            (qr_code_id, hour(2, 9)): 1,
+            (qr_code_id, hour(2, 10)): 2,
+        }
+        assert await read_rollup(async_db_session, ScanRollupDaily) == {
+            (qr_code_id, hour(2, 0)): 3,
+        }
+
+        # Refreshing again changes nothing
+        await refresh_scan_rollups(async_db_session, NOW + timedelta(hours=1), LATENESS)
+        assert await read_rollup(async_db_session, ScanRollupDaily) == {
+            (qr_code_id, hour(2, 0)): 3,
+        }
+        print("Test passed successfully!")
+
+    async def test_single_refresh_at_a_time(
+        self, async_db_session: AsyncSession, async_db_engine: AsyncEngine
+    ) -> None:
+        """Test that a refresh is skipped while another one holds the advisory lock."""
+        async with async_db_engine.connect() as connection:
+            await connection.execute(
+                select(func.pg_advisory_lock(SCAN_ROLLUP_LOCK_KEY))
+            )
+            assert await refresh_scan_rollups(async_db_session, NOW, LATENESS) is None
+            await connection.execute(
+                select(func.pg_advisory_unlock(SCAN_ROLLUP_LOCK_KEY))
+            )
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestScanSeries:
+    """Test class for the scan series of a code, /analytics/codes/{qr_code_id}/scans"""
+
+    async def test_series(
+        self, client: AsyncClient, qr_code: QRCode, async_db_session: AsyncSession
+    ) -> None:
+        """Test that the series is read from the rollups, per day or per hour."""
+        await add_scans(
+            async_db_session, qr_code.id, hour(1, 23), hour(2, 9), hour(2, 9)
+        )
+        await refresh_scan_rollups(async_db_session, NOW, LATENESS)
+        url = f"/analytics/codes/{qr_code.id}/scans"
+
+        response: Response = await client.get(
+            url, params={"start": "2026-03-01T12:00:00Z", "end": "2026-03-03T00:00:00Z"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "qr_code_id": str(qr_code.id),
+            "granularity": "day",
+            "start": "2026-03-01T00:00:00Z",
+            "end": "2026-03-03T00:00:00Z",
+            "total": 3,
+            "buckets": [
+                {"bucket": "2026-03-01T00:00:00Z", "scans": 1},
+                {"bucket": "2026-03-02T00:00:00Z", "scans": 2},
+            ],
+        }
+
+        response = await client.get(
+            url, params={"granularity": "hour", "end": "2026-03-02T10:00:00"}
+        )
+        assert response.json()["start"] == "2026-02-28T10:00:00Z"
+        assert response.json()["buckets"] == [
+            {"bucket": "2026-03-01T23:00:00Z", "scans": 1},
+            {"bucket": "2026-03-02T09:00:00Z", "scans": 2},
+        ]
+        assert response.json()["total"] == 3
+        print("Test passed successfully!")
+
+    async def test_invalid_period(self, client: AsyncClient, qr_code: QRCode) -> None:
+        """Test that empty periods and periods spanning too many buckets are rejected."""
+        url = f"/analytics/codes/{qr_code.id}/scans"
+        for params in [
+            {"start": "2026-03-02T00:00:00Z", "end": "2026-03-01T00:00:00Z"},
+            {"granularity": "hour", "start": "2025-01-01T00:00:00Z"},
+        ]:
+            response: Response = await client.get(url, params=params)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+        print("Test passed successfully!")
+
+    async def test_other_users_code(self, client: AsyncClient, qr_code: QRCode) -> None:
+        """Test that the series of unknown codes, or codes of other users, are not found."""
+        response: Response = await client.get(f"/analytics/codes/{uuid.uuid4()}/scans")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        print("Test passed successfully!")
@@ -0,0 +1,121 @@
+"""Asset storage level fixtures"""
+
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Any
+
+
+class LocalS3Error(Exception):
+    """Error of the S3 stand-in, carrying the error code in its response as the errors of botocore do"""
+
+    def __init__(self, code: str) -> None:
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class LocalS3Body:
+    """Streamed body of an object of the S3 stand-in"""
+
+    def __init__(self, content: bytes) -> None:
+        self.content = content
+        self.closed = False
+
+    async def read(self) -> bytes:
+        return self.content
+
+    async def iter_chunks(self, chunk_size: int) -> AsyncIterator[bytes]:
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start : start + chunk_size]
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class LocalS3:
+    """
+    Stand-in for an asynchronous S3 client of a single bucket, keeping the objects and the multipart uploads
+    in dicts. Missing objects raise errors with the codes of S3: 404 for HEAD, NoSuchKey for GET.
+    """
+
+    def __init__(self, bucket: str = "qrafty") -> None:
+        self.bucket = bucket
+        self.objects: dict[str, tuple[bytes, datetime]] = {}
+        self.uploads: dict[str, dict[int, bytes]] = {}
+        self.parts: list[int] = []
+        self.bodies: list[LocalS3Body] = []
+        self.entered = False
+        self.closed = False
+
+    async def __aenter__(self) -> "LocalS3":
+        self.entered = True
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.closed = True
+
+    def _store(self, key: str, content: bytes) -> None:
+        self.objects[key] = (content, datetime.now(timezone.utc))
+
+    async def head_object(self, Bucket: str, Key: str) -> dict[str, Any]:
+        assert Bucket == self.bucket
+        if Key not in self.objects:
+            raise LocalS3Error("404")
+        content, modified = self.objects[Key]
+        return {"ContentLength": len(content), "LastModified": modified}
+
+    async def get_object(
+        self, Bucket: str, Key: str, Range: str | None = None
+    ) -> dict[str, Any]:
+        assert Bucket == self.bucket
+        if Key not in self.objects:
+            raise LocalS3Error("NoSuchKey")
+        content, modified = self.objects[Key]
+        if Range is not None:
+            start, end = map(int, Range.removeprefix("bytes=").split("-"))
+            content = content[start : end + 1]
+        body = LocalS3Body(content)
+        self.bodies.append(body)
+        return {"Body": body, "ContentLength": len(content), "LastModified": modified}
+
+    async def put_object(
+        self, Bucket: str, Key: str, Body: bytes, **kwargs: Any
+    ) -> None:
+        assert Bucket == self.bucket
+        self._store(Key, Body)
+
+    async def copy_object(
+        self, Bucket: str, Key: str, CopySource: dict[str, str], **kwargs: Any
+    ) -> None:
+        assert Bucket == self.bucket == CopySource["Bucket"]
+        self._store(Key, self.objects[CopySource["Key"]][0])
+
+    async def delete_object(self, Bucket: str, Key: str) -> None:
+        assert Bucket == self.bucket
+        self.objects.pop(Key, None)
+
+    async def create_multipart_upload(
+        self, Bucket: str, Key: str, **kwargs: Any
+    ) -> dict[str, Any]:
+        upload_id = f"{Key}#{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    async def upload_part(
+        self, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes
+    ) -> dict[str, Any]:
+        self.uploads[UploadId][PartNumber] = Body
+        self.parts.append(len(Body))
+        return {"ETag": f'"{PartNumber}"'}
+
+    async def complete_multipart_upload(
+        self, Bucket: str, Key: str, UploadId: str, MultipartUpload: dict[str, Any]
+    ) -> None:
+        parts = self.uploads.pop(UploadId)
+        numbers = [part["PartNumber"] for part in MultipartUpload["Parts"]]
+        assert numbers == sorted(parts)
+        self._store(Key, b"".join(parts[number] for number in numbers))
+
+    async def abort_multipart_upload(
+        self, Bucket: str, Key: str, UploadId: str
+    ) -> None:
+        del self.uploads[UploadId]
@@ -0,0 +1,116 @@
+"""Testing the parsing of range requests and the evaluation of conditional requests"""
+
+from email.utils import formatdate
+
+import pytest
+
+from src.assets.ranges import (
+    RANGE_MAX_COUNT,
+    ByteRange,
+    if_range_matches,
+    is_not_modified,
+    parse_range,
+)
+
+ETAG = '"abc"'
+MODIFIED = 1_700_000_000.75
+LAST_MODIFIED = formatdate(MODIFIED, usegmt=True)
+
+
+class TestParseRange:
+    """Test class for the parsing of the Range header"""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("bytes=0-99", [ByteRange(0, 99)]),
+            ("bytes=100-", [ByteRange(100, 999)]),
+            ("bytes=-100", [ByteRange(900, 999)]),
+            ("bytes=-5000", [ByteRange(0, 999)]),
+            ("bytes=900-5000", [ByteRange(900, 999)]),
+            ("BYTES = 0-0 , 10-19", [ByteRange(0, 0), ByteRange(10, 19)]),
+            ("bytes=999-", [ByteRange(999, 999)]),
+        ],
+    )
+    def test_satisfiable(self, header: str, expected: list[ByteRange]) -> None:
+        """Test the ranges of bytes, open ended and suffix ranges, clamped to the end of the asset."""
+        assert parse_range(header, 1000) == expected
+
+    @pytest.mark.parametrize(
+        "header", ["bytes=1000-", "bytes=1000-2000", "bytes=-0", "bytes=1000-, -0"]
+    )
+    def test_unsatisfiable(self, header: str) -> None:
+        """Test that ranges past the end of the asset are dropped."""
+        assert parse_range(header, 1000) == []
+        assert parse_range("bytes=-10", 0) == []
+
+    @pytest.mark.parametrize(
+        "header",
+        [
+            "items=0-1",
+            "bytes",
+            "bytes=",
+            "bytes=-",
+            "bytes=5",
+            "bytes=a-b",
+            "bytes=10-5",
+            "bytes=0-1,",
+            "bytes=+1-2",
+            "bytes=¹-2",
+            "bytes=" + ",".join(["0-0"] * (RANGE_MAX_COUNT + 1)),
+        ],
+    )
+    def test_invalid(self, header: str) -> None:
+        """Test that invalid headers are ignored, rather than rejected."""
+        assert parse_range(header, 1000) is None
+
+    def test_byte_range(self) -> None:
+        """Test the length and the Content-Range of a range."""
+        byte_range = ByteRange(10, 19)
+        assert byte_range.length == 10
+        assert byte_range.content_range(1000) == "bytes 10-19/1000"
+
+
+class TestConditions:
+    """Test class for the evaluation of the conditional headers"""
+
+    @pytest.mark.parametrize(
+        "if_none_match, if_modified_since, expected",
+        [
+            (None, None, False),
+            (ETAG, None, True),
+            ('W/"abc", "other"', None, True),
+            ('"other"', None, False),
+            # If-None-Match takes precedence over If-Modified-Since
+            ('"other"', LAST_MODIFIED, False),
+            (None, LAST_MODIFIED, True),
+            (None, formatdate(MODIFIED + 60, usegmt=True), True),
+            (None, formatdate(MODIFIED - 60, usegmt=True), False),
+            (None, "yesterday", False),
+        ],
+    )
+    def test_is_not_modified(
+        self, if_none_match: str | None, if_modified_since: str | None, expected: bool
+    ) -> None:
+        """Test If-None-Match and If-Modified-Since."""
+        assert (
+            is_not_modified(if_none_match, if_modified_since, ETAG, MODIFIED)
+            is expected
+        )
+
+    @pytest.mark.parametrize(
+        "if_range, expected",
+        [
+            (None, True),
+            (ETAG, True),
+            ('"other"', False),
+            # Weak tags never match, If-Range requires the strong comparison
+            ('W/"abc"', False),
+            (LAST_MODIFIED, True),
+            (formatdate(MODIFIED + 60, usegmt=True), False),
+            ("yesterday", False),
+        ],
+    )
+    def test_if_range_matches(self, if_range: str | None, expected: bool) -> None:
+        """Test that a range is only served for a partial copy of the current asset."""
+        assert if_range_matches(if_range, ETAG, MODIFIED) is expected
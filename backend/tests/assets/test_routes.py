@@ -0,0 +1,165 @@
+"""Testing the asset endpoints"""
+
+import hashlib
+from email.utils import formatdate
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient, Response
+
+from src.assets.stores import FilesystemAssetStore
+
+CONTENT = b"%PDF-1.4 print resolution render"
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+
+
+@pytest.mark.asyncio
+class TestReadAsset:
+    """Test class for the asset download endpoint, /assets/{key}"""
+
+    async def test_read_asset(
+        self, client: AsyncClient, asset_store: FilesystemAssetStore
+    ) -> None:
+        """Test that a stored asset is served with its media type and its content hash as ETag."""
+        print("Testing the asset endpoint with a stored asset")
+        asset = await asset_store.put(CONTENT, "application/pdf")
+        response: Response = await client.get(f"/assets/{asset.key}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.headers["etag"] == f'"{DIGEST}"'
+        assert response.headers["last-modified"] == formatdate(
+            asset.modified, usegmt=True
+        )
+        assert response.headers["cache-control"] == (
+            "public, max-age=31536000, immutable"
+        )
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.content == CONTENT
+
+        response = await client.head(f"/assets/{asset.key}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.content == b""
+        print("Test passed successfully!")
+
+    @pytest.mark.parametrize(
+        "range_header, content_range, content",
+        [
+            ("bytes=0-3", "bytes 0-3/32", CONTENT[:4]),
+            ("bytes=9-", "bytes 9-31/32", CONTENT[9:]),
+            ("bytes=-6", "bytes 26-31/32", CONTENT[-6:]),
+            ("bytes=30-100", "bytes 30-31/32", CONTENT[30:]),
+        ],
+    )
+    async def test_read_range(
+        self,
+        client: AsyncClient,
+        asset_store: FilesystemAssetStore,
+        range_header: str,
+        content_range: str,
+        content: bytes,
+    ) -> None:
+        """Test that a range of an asset is served as partial content."""
+        print("Testing the asset endpoint with a range")
+        asset = await asset_store.put(CONTENT, "application/pdf")
+        response: Response = await client.get(
+            f"/assets/{asset.key}", headers={"Range": range_header}
+        )
+        assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+        assert response.headers["content-range"] == content_range
+        assert response.headers["content-length"] == str(len(content))
+        assert response.headers["etag"] == f'"{DIGEST}"'
+        assert response.content == content
+        print("Test passed successfully!")
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {"Range": "bytes=0-3,8-11"},
+            {"Range": "bytes=3-0"},
+            {"Range": "pages=1"},
+            {"Range": "bytes=0-3", "If-Range": '"0123"'},
+            {"Range": "bytes=0-3", "If-Range": "Thu, 01 Jan 2015 00:00:00 GMT"},
+        ],
+    )
+    async def test_read_range_ignored(
+        self, client: AsyncClient, asset_store: FilesystemAssetStore, headers: dict
+    ) -> None:
+        """Test that the whole asset is served for several ranges, invalid ranges or a stale If-Range."""
+        print("Testing the asset endpoint with an ignored range")
+        asset = await asset_store.put(CONTENT, "application/pdf")
+        response: Response = await client.get(f"/assets/{asset.key}", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == CONTENT
+        print("Test passed successfully!")
+
+    async def test_read_range_if_range(
+        self, client: AsyncClient, asset_store: FilesystemAssetStore
+    ) -> None:
+        """Test that a range is served when If-Range holds the ETag or the Last-Modified of the asset."""
+        print("Testing the asset endpoint with a matching If-Range")
+        asset = await asset_store.put(CONTENT, "application/pdf")
+        for if_range in (f'"{DIGEST}"', formatdate(asset.modified, usegmt=True)):
+            response: Response = await client.get(
+                f"/assets/{asset.key}",
+                headers={"Range": "bytes=4-", "If-Range": if_range},
+            )
+            assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+            assert response.content == CONTENT[4:]
+        print("Test passed successfully!")
+
+    async def test_read_range_not_satisfiable(
+        self, client: AsyncClient, asset_store: FilesystemAssetStore
+    ) -> None:
+        """Test that a range past the end of the asset is rejected with its size."""
+        print("Testing the asset endpoint with an unsatisfiable range")
+        asset = await asset_store.put(CONTENT, "application/pdf")
+        response: Response = await client.get(
+            f"/assets/{asset.key}", headers={"Range": "bytes=32-"}
+        )
+        assert response.status_code == status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        assert response.headers["content-range"] == "bytes */32"
+        print("Test passed successfully!")
+
+    async def test_read_asset_not_modified(
+        self, client: AsyncClient, asset_store: FilesystemAssetStore
+    ) -> None:
+        """Test that a client holding the asset is answered with a 304, by ETag or by date."""
+        print("Testing the asset endpoint with conditional requests")
+        asset = await asset_store.put(CONTENT, "application/pdf")
+        last_modified = formatdate(asset.modified, usegmt=True)
+        for headers in (
+            {"If-None-Match": f'"{DIGEST}"'},
+            {"If-Modified-Since": last_modified},
+            # Conditions are evaluated before the range
+            {"If-None-Match": f'W/"{DIGEST}"', "Range": "bytes=0-3"},
+        ):
+            response: Response = await client.get(
+                f"/assets/{asset.key}", headers=headers
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.headers["etag"] == f'"{DIGEST}"'
+            assert response.headers["last-modified"] == last_modified
+            assert "immutable" in response.headers["cache-control"]
+            assert response.content == b""
+
+        response = await client.get(
+            f"/assets/{asset.key}", headers={"If-None-Match": '"other"'}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        print("Test passed successfully!")
+
+    @pytest.mark.parametrize(
+        "key",
+        [f"{DIGEST}.pdf", f"{DIGEST}.exe", f"{DIGEST[:8]}.pdf", "x" * 64 + ".pdf"],
+    )
+    async def test_read_asset_not_found(
+        self, client: AsyncClient, asset_store: FilesystemAssetStore, key: str
+    ) -> None:
+        """Test that missing assets and invalid keys are not found."""
+        print("Testing the asset endpoint with a missing asset")
+        response: Response = await client.get(f"/assets/{key}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.json()["detail"] == "Asset not found"
+        print("Test passed successfully!")
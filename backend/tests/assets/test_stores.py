@@ -0,0 +1,314 @@
+"""Testing the filesystem and S3 asset stores"""
+
+import hashlib
+from collections.abc import AsyncIterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from starlette.responses import Response
+
+from src.assets.ranges import ByteRange
+from src.assets.stores import (
+    Asset,
+    AssetStore,
+    AssetTooLargeError,
+    FilesystemAssetStore,
+    MappedRangeResponse,
+    S3AssetStore,
+    ZeroCopyFileResponse,
+    asset_key,
+    create_asset_store,
+)
+from tests.assets.conftest import LocalS3, LocalS3Error
+
+CONTENT = bytes(range(256)) * 40
+DIGEST = hashlib.sha256(CONTENT).hexdigest()
+# Spanning several chunks and pages, of a size which is not a multiple of either
+LARGE_SIZE = 300_007
+LARGE = bytes(index * 7 % 251 for index in range(LARGE_SIZE))
+REF = "a" * 64
+
+
+async def make_store(kind: str, root: Path) -> AssetStore:
+    """Build and start a store of the given kind, S3 uploads being split in 1 KiB parts"""
+    if kind == "filesystem":
+        store: AssetStore = FilesystemAssetStore(root)
+    else:
+        store = S3AssetStore(LocalS3(), "qrafty", "assets/", part_size=1024)
+    await store.start()
+    return store
+
+
+async def chunked(content: bytes, size: int = 100) -> AsyncIterator[bytes]:
+    """Stream content in chunks of the given size"""
+    for start in range(0, len(content), size):
+        yield content[start : start + size]
+
+
+async def failing() -> AsyncIterator[bytes]:
+    """Stream a chunk then fail, as a client disconnecting in the middle of an upload"""
+    yield CONTENT
+    raise ConnectionResetError
+
+
+def leftovers(store: AssetStore) -> list[Any]:
+    """Temporary files or objects and pending uploads left behind by the store"""
+    if isinstance(store, FilesystemAssetStore):
+        tmp = store.root / "tmp"
+        return list(tmp.iterdir()) if tmp.exists() else []
+    client: LocalS3 = store.client
+    return [key for key in client.objects if "/uploads/" in key] + list(client.uploads)
+
+
+async def run_response(
+    response: Response,
+    extensions: dict[str, Any] | None = None,
+    method: str = "GET",
+) -> list[dict[str, Any]]:
+    """Run a response as an ASGI application, returning the messages it sends"""
+    messages: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.zerocopysend":
+            message = {**message, "content": message["file"].read()}
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "extensions": extensions or {}}
+    await response(scope, receive, send)
+    return messages
+
+
+def body_of(messages: list[dict[str, Any]]) -> bytes:
+    """Body sent by a response"""
+    return b"".join(
+        message.get("body", message.get("content", b"")) for message in messages[1:]
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["filesystem", "s3"])
+class TestStores:
+    """Test class for the content addressed asset stores, shared by the filesystem and the S3 stores"""
+
+    async def test_put_dedupes(self, kind: str, tmp_path: Path) -> None:
+        """Test that assets are keyed by their content hash, and stored once."""
+        store = await make_store(kind, tmp_path)
+        asset = await store.put(CONTENT, "image/png")
+        assert asset.key == f"{DIGEST}.png"
+        assert asset.size == len(CONTENT)
+        assert asset.media_type == "image/png"
+
+        again = await store.put(CONTENT, "image/png")
+        assert again == await store.stat(asset.key)
+        assert await store.read(asset.key) == CONTENT
+        # The same content is another asset under another media type
+        assert (await store.put(CONTENT, "image/svg+xml")).key == f"{DIGEST}.svg"
+        await store.close()
+
+    async def test_missing(self, kind: str, tmp_path: Path) -> None:
+        """Test the lookups of assets which are not stored."""
+        store = await make_store(kind, tmp_path)
+        key = asset_key(DIGEST, "application/pdf")
+        assert await store.stat(key) is None
+        assert await store.read(key) is None
+        assert await store.get_ref(REF) is None
+        await store.close()
+
+    async def test_put_stream(self, kind: str, tmp_path: Path) -> None:
+        """Test that streamed assets are hashed as they are received, and deduplicated."""
+        store = await make_store(kind, tmp_path)
+        asset = await store.put_stream(chunked(CONTENT), "image/webp", len(CONTENT))
+        assert asset.key == f"{DIGEST}.webp"
+        assert asset.size == len(CONTENT)
+        assert await store.read(asset.key) == CONTENT
+
+        again = await store.put_stream(chunked(CONTENT, 7), "image/webp", len(CONTENT))
+        assert again.key == asset.key
+        assert await store.read(asset.key) == CONTENT
+        assert leftovers(store) == []
+        if isinstance(store, S3AssetStore):
+            # Uploaded in parts, the last one shorter
+            assert store.client.parts[:3] == [1100, 1100, 1100]
+        await store.close()
+
+    async def test_put_stream_small(self, kind: str, tmp_path: Path) -> None:
+        """Test streamed assets smaller than a part, and empty ones."""
+        store = await make_store(kind, tmp_path)
+        asset = await store.put_stream(chunked(b"logo"), "image/jpeg", 1024)
+        assert await store.read(asset.key) == b"logo"
+
+        empty = await store.put_stream(chunked(b""), "image/jpeg", 1024)
+        assert empty.key == f"{hashlib.sha256(b'').hexdigest()}.jpg"
+        assert empty.size == 0
+        assert leftovers(store) == []
+        await store.close()
+
+    async def test_put_stream_too_large(self, kind: str, tmp_path: Path) -> None:
+        """Test that a stream over the limit is refused, leaving nothing behind."""
+        store = await make_store(kind, tmp_path)
+        with pytest.raises(AssetTooLargeError):
+            await store.put_stream(chunked(CONTENT), "image/png", len(CONTENT) - 1)
+        assert await store.stat(f"{DIGEST}.png") is None
+        assert leftovers(store) == []
+        await store.close()
+
+    async def test_put_stream_interrupted(self, kind: str, tmp_path: Path) -> None:
+        """Test that an interrupted stream leaves nothing behind."""
+        store = await make_store(kind, tmp_path)
+        with pytest.raises(ConnectionResetError):
+            await store.put_stream(failing(), "image/png", 2 * len(CONTENT))
+        assert leftovers(store) == []
+        await store.close()
+
+    async def test_refs(self, kind: str, tmp_path: Path) -> None:
+        """Test that references point to the assets, and are overwritten."""
+        store = await make_store(kind, tmp_path)
+        await store.set_ref(REF, f"{DIGEST}.png")
+        assert await store.get_ref(REF) == f"{DIGEST}.png"
+        await store.set_ref(REF, f"{DIGEST}.svg")
+        assert await store.get_ref(REF) == f"{DIGEST}.svg"
+        assert leftovers(store) == []
+
+        with pytest.raises(ValueError):
+            await store.get_ref("../objects")
+        with pytest.raises(ValueError):
+            await store.set_ref("../objects", f"{DIGEST}.png")
+        await store.close()
+
+    async def test_response(self, kind: str, tmp_path: Path) -> None:
+        """Test that assets are served with their type, size and modification time."""
+        store = await make_store(kind, tmp_path)
+        asset = await store.put(CONTENT, "application/pdf")
+        response = await store.response(asset, {"ETag": f'"{DIGEST}"'})
+        assert response is not None
+        assert response.media_type == "application/pdf"
+        assert response.headers["content-length"] == str(len(CONTENT))
+        assert response.headers["etag"] == f'"{DIGEST}"'
+
+        messages = await run_response(response)
+        assert messages[0]["status"] == 200
+        assert body_of(messages) == CONTENT
+        if isinstance(store, S3AssetStore):
+            assert all(body.closed for body in store.client.bodies)
+        await store.close()
+
+    @pytest.mark.parametrize(
+        "byte_range",
+        [ByteRange(0, 0), ByteRange(5000, 150_000), ByteRange(65_536, LARGE_SIZE - 1)],
+    )
+    async def test_range_response(
+        self, kind: str, tmp_path: Path, byte_range: ByteRange
+    ) -> None:
+        """Test that ranges are served as partial content, across chunks and from unaligned offsets."""
+        store = await make_store(kind, tmp_path)
+        asset = await store.put(LARGE, "application/pdf")
+        response = await store.response(asset, {}, byte_range)
+        assert response is not None
+        assert response.status_code == 206
+        assert response.headers["content-length"] == str(byte_range.length)
+        assert response.headers["content-range"] == (
+            f"bytes {byte_range.start}-{byte_range.end}/{LARGE_SIZE}"
+        )
+
+        messages = await run_response(response)
+        assert messages[0]["status"] == 206
+        assert body_of(messages) == LARGE[byte_range.start : byte_range.end + 1]
+        assert not messages[-1]["more_body"]
+        await store.close()
+
+
+@pytest.mark.asyncio
+class TestFilesystemStore:
+    """Test class for the specifics of the filesystem asset store"""
+
+    async def test_layout(self, tmp_path: Path) -> None:
+        """Test that the directories are created on the first write, and assets spread over subdirectories."""
+        store = FilesystemAssetStore(tmp_path / "assets")
+        await store.start()
+        assert not store.root.exists()
+
+        asset = await store.put(CONTENT, "image/png")
+        assert (store.root / "objects" / DIGEST[:2] / asset.key).read_bytes() == CONTENT
+        assert list((store.root / "tmp").iterdir()) == []
+
+    async def test_zero_copy_response(self, tmp_path: Path) -> None:
+        """Test that the open file is handed to servers supporting the zerocopysend extension."""
+        store = FilesystemAssetStore(tmp_path)
+        asset = await store.put(CONTENT, "image/png")
+        response = await store.response(asset, {})
+        assert isinstance(response, ZeroCopyFileResponse)
+
+        messages = await run_response(response, {"http.response.zerocopysend": {}})
+        assert [message["type"] for message in messages] == [
+            "http.response.start",
+            "http.response.zerocopysend",
+        ]
+        assert messages[1]["content"] == CONTENT
+
+        messages = await run_response(response, {"http.response.pathsend": {}})
+        assert messages[1]["path"] == str(store._path(asset.key))
+
+    async def test_zero_copy_range_response(self, tmp_path: Path) -> None:
+        """Test that ranges are handed to servers supporting the zerocopysend extension as an offset and a count."""
+        store = FilesystemAssetStore(tmp_path)
+        asset = await store.put(CONTENT, "image/png")
+        response = await store.response(asset, {}, ByteRange(100, 199))
+        assert isinstance(response, MappedRangeResponse)
+
+        messages = await run_response(response, {"http.response.zerocopysend": {}})
+        assert messages[1]["type"] == "http.response.zerocopysend"
+        assert (messages[1]["offset"], messages[1]["count"]) == (100, 100)
+
+        messages = await run_response(response, method="HEAD")
+        assert messages[0]["status"] == 206 and body_of(messages) == b""
+
+
+@pytest.mark.asyncio
+class TestS3Store:
+    """Test class for the specifics of the S3 asset store"""
+
+    async def test_client_lifecycle(self) -> None:
+        """Test that the client is entered on startup and exited on shutdown."""
+        client = LocalS3()
+        store = S3AssetStore(client, "qrafty", "assets/")
+        await store.start()
+        assert client.entered and store.client is client
+
+        await store.put(CONTENT, "image/png")
+        await store.set_ref(REF, f"{DIGEST}.png")
+        assert set(client.objects) == {f"assets/{DIGEST}.png", f"assets/refs/{REF}"}
+        await store.close()
+        assert client.closed
+
+    async def test_errors(self) -> None:
+        """Test that the errors other than missing objects are raised."""
+        client = LocalS3()
+        store = S3AssetStore(client, "qrafty", "assets/")
+        await store.start()
+
+        async def denied(**kwargs: Any) -> None:
+            raise LocalS3Error("AccessDenied")
+
+        client.head_object = denied  # type: ignore[method-assign]
+        client.get_object = denied  # type: ignore[method-assign]
+        with pytest.raises(LocalS3Error):
+            await store.stat(f"{DIGEST}.png")
+        with pytest.raises(LocalS3Error):
+            await store.read(f"{DIGEST}.png")
+
+    async def test_vanished_asset(self) -> None:
+        """Test that an asset which is no longer stored is not served by the S3 store."""
+        store = S3AssetStore(LocalS3(), "qrafty", "assets/")
+        await store.start()
+        asset = Asset(f"{DIGEST}.png", len(CONTENT), 0.0)
+        assert await store.response(asset, {}) is None
+
+    async def test_create_asset_store(self, tmp_path: Path) -> None:
+        """Test that the filesystem store is used unless a bucket is configured."""
+        store = create_asset_store(str(tmp_path), None, None, "assets/")
+        assert isinstance(store, FilesystemAssetStore)
+        assert store.root == tmp_path
@@ -1,6 +1,15 @@
 """Auth domain level fixtures used throughout authencation unit & integration tests"""
 
+from collections.abc import AsyncGenerator
+
 import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.dependencies import CustomSQLAlchemyUserDatabase
+from src.auth.hashing import PasswordHashingExecutor
+from src.auth.models import User
+from src.auth.service import UserManager
 
 
 @pytest.fixture(scope="function")
@@ -17,11 +26,16 @@ def base_registration_payload():
 
 
 @pytest.fixture(scope="module")
-def invalid_password_message():
+def password_violation_messages():
     """
-    Provides a base invalid password message for usage across different tests, removing the need to hardcode the message in each test
+    Provides the message of each rule of the default password policy, removing the need to hardcode the messages in each test
     """
-    return "Password should be at least 8 characters long, contain at least one uppercase letter, one digit and one special character"
+    return {
+        "length": "Password should be at least 8 characters long",
+        "uppercase": "Password should contain at least one uppercase letter",
+        "digit": "Password should contain at least one digit",
+        "special": "Password should contain at least one special character (!@#$%^&*()_+)",
+    }
 
 
 @pytest.fixture(scope="module")
@@ -32,3 +46,16 @@ def invalid_password_contains_pii_info_message():
     return (
         "Password should not contain your email, username or name for security reasons"
     )
+
+
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def user_manager(
+    async_db_session: AsyncSession,
+) -> AsyncGenerator[UserManager, None]:
+    """
+    Fixture which provides a UserManager bound to the test session, with its own password hashing executor
+    """
+    hashing = PasswordHashingExecutor(max_workers=1)
+    hashing.start()
+    yield UserManager(CustomSQLAlchemyUserDatabase(async_db_session, User), hashing)
+    hashing.shutdown()
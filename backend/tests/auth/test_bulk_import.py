@@ -0,0 +1,155 @@
+"""Testing the bulk import of users"""
+
+import io
+
+import pytest
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.auth.bulk_import import (
+    EMAIL_TAKEN_MESSAGE,
+    USERNAME_TAKEN_MESSAGE,
+    import_users,
+    iter_import_rows,
+)
+from src.auth.models import User
+from src.config import settings
+from src.database import Database, InstrumentedAsyncQueuePool, warm_up_pool
+from src.uploads import UploadFormat
+
+
+class TestIterImportRows:
+    """Test class for the parsing and validation of the rows of an import"""
+
+    def test_rows(self) -> None:
+        """Test that rows are validated with UserCreate and the password policy, keeping only the fields of a registration."""
+        body = (
+            b"email,password,name,username,is_superuser\r\n"
+            b"a@example.com,Password1!,Alice,alice,true\r\n"
+            b"not-an-email,Password1!,Bob,bob,\r\n"
+            b"c@example.com,Password1!,Carol,,\r\n"
+            b"d@example.com,password,Dan,dan,\r\n"
+        )
+        rows = list(iter_import_rows(io.BytesIO(body), UploadFormat.CSV))
+
+        assert rows[0] == (
+            1,
+            {
+                "email": "a@example.com",
+                "password": "Password1!",
+                "name": "Alice",
+                "username": "alice",
+            },
+        )
+        assert rows[1][0] == 2 and rows[1][1].startswith("email:")
+        assert rows[2] == (3, "username: Field required")
+        assert rows[3][0] == 4 and rows[3][1].startswith(
+            "Password should contain at least one uppercase letter; "
+        )
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestImportUsers:
+    """Test class for the import of users through the staging table"""
+
+    async def test_import(self, async_db_session: AsyncSession) -> None:
+        """Test that valid rows are imported across chunks while invalid and duplicate rows are rejected."""
+        await async_db_session.execute(
+            insert(User).values(
+                email="taken@example.com",
+                username="taken",
+                name="Taken",
+                hashed_password="unused",
+            )
+        )
+
+        def user(n: int, email: str | None = None, username: str | None = None):
+            return {
+                "email": email or f"import{n}@example.com",
+                "password": f"Password{n}!",
+                "name": f"Import {n}",
+                "username": username or f"import{n}",
+            }
+
+        rows = [
+            (1, user(1)),
+            (2, "Invalid JSON"),
+            (3, user(3, email="TAKEN@example.com")),
+            (4, user(4, username="taken")),
+            (5, user(5)),
+            (6, user(6, email="import1@example.com")),
+            (7, user(7, username="import5")),
+        ]
+        rejects: list[tuple[int, str]] = []
+
+        imported = await import_users(
+            rows,
+            async_db_session,
+            lambda row_number, error: rejects.append((row_number, error)),
+            max_workers=1,
+            chunk_size=2,
+        )
+
+        assert imported == 2
+        assert sorted(rejects) == [
+            (2, "Invalid JSON"),
+            (3, EMAIL_TAKEN_MESSAGE),
+            (4, USERNAME_TAKEN_MESSAGE),
+            (6, EMAIL_TAKEN_MESSAGE),
+            (7, USERNAME_TAKEN_MESSAGE),
+        ]
+
+        users = (
+            await async_db_session.scalars(
+                select(User).where(User.email.like("import%")).order_by(User.email)
+            )
+        ).all()
+        assert [u.username for u in users] == ["import1", "import5"]
+        assert all(u.is_active and not u.is_superuser for u in users)
+        assert PasswordHelper().verify_and_update(
+            "Password1!", users[0].hashed_password
+        )[0]
+        print("Test passed successfully!")
+
+    async def test_import_pooled_session(self) -> None:
+        """Test an import of several chunks through a session of a warmed up pool, whose chunks are committed on different connections."""
+        database = Database(
+            lambda: create_async_engine(
+                settings.TEST_DATABASE_URL,
+                poolclass=InstrumentedAsyncQueuePool,
+                pool_size=2,
+                max_overflow=0,
+            )
+        )
+        await warm_up_pool(database.engine, 2)
+        rows = [
+            (
+                n,
+                {
+                    "email": f"pooled{n}@example.com",
+                    "password": f"Password{n}!",
+                    "name": f"Pooled {n}",
+                    "username": f"pooled{n}",
+                },
+            )
+            for n in range(1, 6)
+        ]
+        try:
+            async with database.session() as session:
+                imported = await import_users(
+                    rows, session, lambda *reject: None, max_workers=1, chunk_size=2
+                )
+            assert imported == 5
+
+            async with database.session() as session:
+                emails = await session.scalars(
+                    select(User.email).where(User.email.like("pooled%"))
+                )
+                assert len(emails.all()) == 5
+        finally:
+            async with database.session() as session:
+                await session.execute(delete(User).where(User.email.like("pooled%")))
+                await session.commit()
+            await database.dispose()
@@ -0,0 +1,71 @@
+"""Testing the thread pool backed password hashing executor"""
+
+import asyncio
+import threading
+import time
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+
+from src.auth.hashing import PasswordHashingExecutor
+
+
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def hashing() -> AsyncGenerator[PasswordHashingExecutor, None]:
+    """
+    Fixture which starts a password hashing executor allowing two concurrent hashes, stopping it after the test
+    """
+    executor = PasswordHashingExecutor(max_workers=4, max_concurrent=2)
+    executor.start()
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+class TestPasswordHashingExecutor:
+    """Test class for the password hashing executor, testing the dispatching and the concurrency cap"""
+
+    async def test_run_off_the_event_loop(
+        self, hashing: PasswordHashingExecutor
+    ) -> None:
+        """Test that functions run in a pool thread and return their value."""
+        thread_name = await hashing.run(lambda: threading.current_thread().name)
+        assert thread_name.startswith("password-hashing")
+        assert await hashing.run(pow, 2, exp=3) == 8
+
+    async def test_exceptions_are_propagated(
+        self, hashing: PasswordHashingExecutor
+    ) -> None:
+        """Test that an exception raised by the function is raised to the caller."""
+        with pytest.raises(ValueError):
+            await hashing.run(int, "not a number")
+
+    async def test_concurrency_cap(self, hashing: PasswordHashingExecutor) -> None:
+        """Test that no more than max_concurrent functions run at once."""
+        running = peak = 0
+        lock = threading.Lock()
+
+        def slow_hash() -> None:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+
+        await asyncio.gather(*(hashing.run(slow_hash) for _ in range(8)))
+        assert peak == 2
+        print("Test passed successfully!")
+
+    async def test_not_started(self) -> None:
+        """Test that functions cannot run before the executor is started."""
+        with pytest.raises(RuntimeError):
+            await PasswordHashingExecutor().run(pow, 2, 3)
+
+    async def test_defaults(self) -> None:
+        """Test that the concurrency cap defaults to the number of threads."""
+        executor = PasswordHashingExecutor(max_workers=3)
+        assert executor.max_concurrent == 3
+        executor.shutdown()  # no-op when not started
@@ -0,0 +1,183 @@
+"""Testing the verified token cache and the caching JWT strategy"""
+
+import time
+import uuid
+
+import pytest
+from fastapi_users.jwt import generate_jwt
+from pytest import MonkeyPatch  # imported for type hinting
+from sqlalchemy import inspect
+
+from src.auth.config import SECRET_KEY
+from src.auth.jwt import VerifiedTokenCache, get_jwt_strategy, jwt_strategy
+from src.auth.models import User
+from src.auth.schemas import UserCreate
+from src.auth.service import UserManager
+
+
+def snapshot(user_id: uuid.UUID) -> dict[str, uuid.UUID]:
+    """Build a minimal user snapshot"""
+    return {"id": user_id}
+
+
+class TestVerifiedTokenCache:
+    """Test class for the verified token cache, testing the expiration, eviction and invalidation"""
+
+    def test_get_set(self) -> None:
+        """Test that cached tokens are returned until they are invalidated."""
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=60)
+        user_id = uuid.uuid4()
+        assert cache.get("token") is None
+
+        cache.set("token", snapshot(user_id), expires_at=time.time() + 60)
+        assert cache.get("token") == snapshot(user_id)
+
+        cache.invalidate("token")
+        cache.invalidate("token")  # no-op once dropped
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_expiration(self) -> None:
+        """Test that entries expire with their token, and after the TTL at the latest."""
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=60)
+        cache.set("expired", snapshot(uuid.uuid4()), expires_at=time.time() - 1)
+        assert cache.get("expired") is None
+        assert len(cache) == 0
+
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=0)
+        cache.set("stale", snapshot(uuid.uuid4()), expires_at=time.time() + 60)
+        assert cache.get("stale") is None
+
+    def test_lru_eviction(self) -> None:
+        """Test that the least recently used token is evicted once the cache is full."""
+        cache = VerifiedTokenCache(max_entries=2, ttl_seconds=60)
+        expires_at = time.time() + 60
+        cache.set("a", snapshot(uuid.uuid4()), expires_at)
+        cache.set("b", snapshot(uuid.uuid4()), expires_at)
+        cache.get("a")
+        cache.set("c", snapshot(uuid.uuid4()), expires_at)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+    def test_invalidate_user(self) -> None:
+        """Test that every token of a user is dropped at once."""
+        cache = VerifiedTokenCache(max_entries=10, ttl_seconds=60)
+        user_id, other_id = uuid.uuid4(), uuid.uuid4()
+        expires_at = time.time() + 60
+        cache.set("a", snapshot(user_id), expires_at)
+        cache.set("b", snapshot(user_id), expires_at)
+        cache.set("c", snapshot(other_id), expires_at)
+
+        cache.invalidate_user(user_id)
+        assert cache.get("a") is None and cache.get("b") is None
+        assert cache.get("c") == snapshot(other_id)
+
+        cache.clear()
+        assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+class TestCachingJWTStrategy:
+    """Test class for the caching JWT strategy"""
+
+    async def create_user(
+        self, user_manager: UserManager, payload: dict[str, str]
+    ) -> tuple[User, str]:
+        """Create a user and a token for them"""
+        jwt_strategy.cache.clear()
+        user = await user_manager.create(UserCreate(**payload))
+        return user, await jwt_strategy.write_token(user)
+
+    async def test_shared_strategy(self) -> None:
+        """Test that every request gets the same strategy."""
+        assert get_jwt_strategy() is get_jwt_strategy() is jwt_strategy
+
+    async def test_cached_read_skips_database(
+        self,
+        user_manager: UserManager,
+        base_registration_payload: dict[str, str],
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        """Test that a token read again is served from the cache, as a detached copy of the user."""
+        user, token = await self.create_user(user_manager, base_registration_payload)
+        assert await jwt_strategy.read_token(token, user_manager) == user
+
+        async def fail_get(*args: object) -> None:
+            raise AssertionError("The user should be read from the cache")
+
+        monkeypatch.setattr(user_manager, "get", fail_get)
+        cached_user = await jwt_strategy.read_token(token, user_manager)
+
+        assert cached_user is not user
+        assert cached_user.id == user.id and cached_user.email == user.email
+        assert inspect(cached_user).detached
+        print("Test passed successfully!")
+
+    async def test_invalid_tokens(self, user_manager: UserManager) -> None:
+        """Test that invalid tokens are rejected and not cached."""
+        tokens = [
+            None,
+            "not a token",
+            generate_jwt({"aud": jwt_strategy.token_audience}, SECRET_KEY, 60),
+            generate_jwt(
+                {"sub": "not a uuid", "aud": jwt_strategy.token_audience},
+                SECRET_KEY,
+                60,
+            ),
+        ]
+        for token in tokens:
+            assert await jwt_strategy.read_token(token, user_manager) is None
+
+    async def test_logout_drops_token(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that a destroyed token is dropped from the cache."""
+        user, token = await self.create_user(user_manager, base_registration_payload)
+        await jwt_strategy.read_token(token, user_manager)
+
+        await jwt_strategy.destroy_token(token, user)
+        assert jwt_strategy.cache.get(token) is None
+
+    async def test_update_invalidates_user(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that deactivating a user drops their tokens, so that the change applies right away."""
+        user, token = await self.create_user(user_manager, base_registration_payload)
+        await jwt_strategy.read_token(token, user_manager)
+
+        await user_manager._update(user, {"is_active": False})
+        assert jwt_strategy.cache.get(token) is None
+        assert (await jwt_strategy.read_token(token, user_manager)).is_active is False
+        print("Test passed successfully!")
+
+    async def test_delete_invalidates_user(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that deleting a user drops their tokens."""
+        user, token = await self.create_user(user_manager, base_registration_payload)
+        await jwt_strategy.read_token(token, user_manager)
+
+        await user_manager.delete(user)
+        assert await jwt_strategy.read_token(token, user_manager) is None
+
+    async def test_read_user_id(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that the user of a token is identified without loading the user, invalid tokens being rejected."""
+        user, token = await self.create_user(user_manager, base_registration_payload)
+        assert jwt_strategy.read_user_id(token) == user.id
+
+        await jwt_strategy.read_token(token, user_manager)
+        assert jwt_strategy.read_user_id(token) == user.id
+
+        for invalid in [
+            "not a token",
+            generate_jwt(
+                {"sub": "not a uuid", "aud": jwt_strategy.token_audience},
+                SECRET_KEY,
+                60,
+            ),
+        ]:
+            assert jwt_strategy.read_user_id(invalid) is None
+        print("Test passed successfully!")
@@ -0,0 +1,53 @@
+"""Testing the password policy"""
+
+from src.auth.password_policy import PERSONAL_INFO_MESSAGE, PasswordPolicy
+
+
+class TestPasswordPolicy:
+    """Test class for the rules of the password policy"""
+
+    def test_valid_password(self) -> None:
+        """Test that a password following every rule has no violations."""
+        policy = PasswordPolicy()
+        assert (
+            policy.violations("TestPassword1!", "user@example.com", "user", "Name")
+            == ()
+        )
+        print("Test passed successfully!")
+
+    def test_all_violations(self) -> None:
+        """Test that every broken rule is reported, in a stable order."""
+        policy = PasswordPolicy()
+        assert policy.violations("user", "user@example.com", "user", "Name") == (
+            "Password should be at least 8 characters long",
+            "Password should contain at least one uppercase letter",
+            "Password should contain at least one digit",
+            "Password should contain at least one special character (!@#$%^&*()_+)",
+            PERSONAL_INFO_MESSAGE,
+        )
+        print("Test passed successfully!")
+
+    def test_personal_info(self) -> None:
+        """Test that personal info is matched regardless of case, skipping missing and empty values."""
+        policy = PasswordPolicy()
+        assert policy.violations("MyNAME1!xyz", None, "", "name") == (
+            PERSONAL_INFO_MESSAGE,
+        )
+        assert policy.violations("Password1!", None, "", None) == ()
+        print("Test passed successfully!")
+
+    def test_configuration(self) -> None:
+        """Test that rules can be tuned or disabled, special characters being matched literally."""
+        policy = PasswordPolicy(
+            min_length=4,
+            require_uppercase=False,
+            require_digit=False,
+            special_characters="]-^",
+            forbid_personal_info=False,
+        )
+        assert policy.violations("ab-c", "ab") == ()
+        assert policy.violations("abcd") == (
+            "Password should contain at least one special character (]-^)",
+        )
+        assert PasswordPolicy(special_characters="").violations("Password1") == ()
+        print("Test passed successfully!")
@@ -1,15 +1,14 @@
 """Testing authentication endpoints"""
 
+import json
+
 import pytest
 
-from pytest import MonkeyPatch  # imported for type hinting
 from typing import Dict
 
 from fastapi import status
 from httpx import AsyncClient, Response
 
-from tests.auth.mocks import MockedUserManager
-
 
 @pytest.mark.asyncio
 class TestRegistration:
@@ -146,7 +145,7 @@ class TestRegistration:
         self,
         client: AsyncClient,
         base_registration_payload: Dict[str, str],
-        invalid_password_message: str,
+        password_violation_messages: Dict[str, str],
     ) -> None:
         """Test the registration endpoint when the password is too short."""
         print("Testing the registration endpoint with a password that is too short")
@@ -157,14 +156,16 @@ class TestRegistration:
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         print(response.json())
-        assert response.json()["detail"]["reason"] == invalid_password_message
+        assert response.json()["detail"]["reason"] == [
+            password_violation_messages["length"]
+        ]
         print("Test passed successfully!")
 
     async def test_register_invalid_password_no_uppercase(
         self,
         client: AsyncClient,
         base_registration_payload: Dict[str, str],
-        invalid_password_message: str,
+        password_violation_messages: Dict[str, str],
     ) -> None:
         """Test the registration endpoint when the password does not contain an uppercase letter."""
         print(
@@ -176,14 +177,16 @@ class TestRegistration:
             json=base_registration_payload,
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert response.json()["detail"]["reason"] == invalid_password_message
+        assert response.json()["detail"]["reason"] == [
+            password_violation_messages["uppercase"]
+        ]
         print("Test passed successfully!")
 
     async def test_register_invalid_password_no_digit(
         self,
         client: AsyncClient,
         base_registration_payload: Dict[str, str],
-        invalid_password_message: str,
+        password_violation_messages: Dict[str, str],
     ) -> None:
         """Test the registration endpoint when the password does not contain a digit."""
         print(
@@ -195,14 +198,16 @@ class TestRegistration:
             json=base_registration_payload,
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert response.json()["detail"]["reason"] == invalid_password_message
+        assert response.json()["detail"]["reason"] == [
+            password_violation_messages["digit"]
+        ]
         print("Test passed successfully!")
 
     async def test_register_invalid_password_no_special_character(
         self,
         client: AsyncClient,
         base_registration_payload: Dict[str, str],
-        invalid_password_message: str,
+        password_violation_messages: Dict[str, str],
     ) -> None:
         """Test the registration endpoint when the password does not contain a special character."""
         print(
@@ -214,7 +219,32 @@ class TestRegistration:
             json=base_registration_payload,
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert response.json()["detail"]["reason"] == invalid_password_message
+        assert response.json()["detail"]["reason"] == [
+            password_violation_messages["special"]
+        ]
+        print("Test passed successfully!")
+
+    async def test_register_invalid_password_all_violations(
+        self,
+        client: AsyncClient,
+        base_registration_payload: Dict[str, str],
+        password_violation_messages: Dict[str, str],
+        invalid_password_contains_pii_info_message: str,
+    ) -> None:
+        """Test the registration endpoint reports every rule the password breaks at once."""
+        print("Testing the registration endpoint with a password breaking every rule")
+        base_registration_payload["password"] = "testuser"
+        response: Response = await client.post(
+            "/auth/register",
+            json=base_registration_payload,
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["reason"] == [
+            password_violation_messages["uppercase"],
+            password_violation_messages["digit"],
+            password_violation_messages["special"],
+            invalid_password_contains_pii_info_message,
+        ]
         print("Test passed successfully!")
 
     async def test_register_invalid_password_contains_username(
@@ -233,10 +263,9 @@ class TestRegistration:
             json=base_registration_payload,
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert (
-            response.json()["detail"]["reason"]
-            == invalid_password_contains_pii_info_message
-        )
+        assert response.json()["detail"]["reason"] == [
+            invalid_password_contains_pii_info_message
+        ]
         print("Test passed successfully!")
 
     async def test_register_invalid_password_contains_email(
@@ -255,10 +284,9 @@ class TestRegistration:
             json=base_registration_payload,
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert (
-            response.json()["detail"]["reason"]
-            == invalid_password_contains_pii_info_message
-        )
+        assert response.json()["detail"]["reason"] == [
+            invalid_password_contains_pii_info_message
+        ]
 
         print("Test passed successfully!")
 
@@ -278,10 +306,9 @@ class TestRegistration:
             json=base_registration_payload,
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert (
-            response.json()["detail"]["reason"]
-            == invalid_password_contains_pii_info_message
-        )
+        assert response.json()["detail"]["reason"] == [
+            invalid_password_contains_pii_info_message
+        ]
 
         print("Test passed successfully")
 
@@ -289,48 +316,162 @@ class TestRegistration:
         self,
         client: AsyncClient,
         base_registration_payload: Dict[str, str],
-        monkeypatch: MonkeyPatch,
     ) -> None:
-        """Test the registration endpoint when the email is already in use."""
+        """Test the registration endpoint when the email is already in use, compared case-insensitively."""
         print("Testing the registration endpoint with a duplicate email")
 
-        user_manager = MockedUserManager(user_exists=False, email_exists=True)
+        await client.post("/auth/register", json=base_registration_payload)
 
-        # Mock the get_by_email method to return a user with the same email
-        monkeypatch.setattr(
-            "src.auth.dependencies.CustomSQLAlchemyUserDatabase.get_by_email",
-            user_manager.get_by_email,
-        )
-
-        response: Response = await client.post(
-            "/auth/register",
-            json=base_registration_payload,
-        )
-        assert response.status_code == status.HTTP_400_BAD_REQUEST
-        assert response.json()["detail"] == "REGISTER_USER_ALREADY_EXISTS"
+        base_registration_payload["username"] = "otheruser"
+        for email in ["user@example.com", "User@Example.com"]:
+            base_registration_payload["email"] = email
+            response: Response = await client.post(
+                "/auth/register",
+                json=base_registration_payload,
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.json()["detail"] == "REGISTER_USER_ALREADY_EXISTS"
 
-    print("Test passed successfully!")
+        print("Test passed successfully!")
 
     async def test_register_duplicate_username(
         self,
         client: AsyncClient,
         base_registration_payload: Dict[str, str],
-        monkeypatch: MonkeyPatch,
     ) -> None:
         """Test the registration endpoint when the username is already in use."""
         print("Testing the registration endpoint with a duplicate username")
 
-        user_manager = MockedUserManager(user_exists=True, email_exists=False)
-
-        # Mock the get_by_username method to return a user with the same username
-        monkeypatch.setattr(
-            "src.auth.dependencies.CustomSQLAlchemyUserDatabase.get_by_username",
-            user_manager.get_by_username,
-        )
+        await client.post("/auth/register", json=base_registration_payload)
 
+        base_registration_payload["email"] = "other@example.com"
         response: Response = await client.post(
             "/auth/register",
             json=base_registration_payload,
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert response.json()["detail"] == "Username already exists"
+
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestLogin:
+    """Test class for the login endpoint, /auth/login"""
+
+    async def test_login_success(
+        self, client: AsyncClient, base_registration_payload: Dict[str, str]
+    ) -> None:
+        """Test the login endpoint with the credentials of a registered user."""
+        print("Testing the login endpoint with valid credentials")
+        await client.post("/auth/register", json=base_registration_payload)
+
+        response: Response = await client.post(
+            "/auth/login",
+            data={
+                "username": base_registration_payload["email"],
+                "password": base_registration_payload["password"],
+            },
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["token_type"] == "bearer"
+        assert response.json()["access_token"]
+        print("Test passed successfully!")
+
+    async def test_login_bad_credentials(
+        self, client: AsyncClient, base_registration_payload: Dict[str, str]
+    ) -> None:
+        """Test the login endpoint with a wrong password and with an unknown email."""
+        print("Testing the login endpoint with invalid credentials")
+        await client.post("/auth/register", json=base_registration_payload)
+
+        for username, password in [
+            (base_registration_payload["email"], "WrongPassword1!"),
+            ("unknown@example.com", base_registration_payload["password"]),
+        ]:
+            response: Response = await client.post(
+                "/auth/login", data={"username": username, "password": password}
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.json()["detail"] == "LOGIN_BAD_CREDENTIALS"
+        print("Test passed successfully!")
+
+    async def test_logout(
+        self, client: AsyncClient, base_registration_payload: Dict[str, str]
+    ) -> None:
+        """Test the logout endpoint with the token of a logged in user."""
+        print("Testing the logout endpoint")
+        await client.post("/auth/register", json=base_registration_payload)
+        login: Response = await client.post(
+            "/auth/login",
+            data={
+                "username": base_registration_payload["email"],
+                "password": base_registration_payload["password"],
+            },
+        )
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+        response: Response = await client.post("/auth/logout", headers=headers)
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestUserImport:
+    """Test class for the bulk import endpoint, /auth/users/import"""
+
+    async def test_import(
+        self,
+        client: AsyncClient,
+        as_superuser: None,
+        base_registration_payload: Dict[str, str],
+    ) -> None:
+        """Test that a superuser imports users, the rejected rows being listed with the reason."""
+        print("Testing the bulk import endpoint with NDJSON rows")
+        body = "\n".join(
+            json.dumps(row)
+            for row in [
+                base_registration_payload,
+                {**base_registration_payload, "username": "other"},
+                {"email": "invalid"},
+            ]
+        )
+        response: Response = await client.post(
+            "/auth/users/import",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert (result["imported"], result["rejected"]) == (1, 2)
+        assert result["rejects"][0] == {"row": 2, "error": "Email already exists"}
+        assert result["rejects"][1]["row"] == 3
+        assert result["rejects"][1]["error"].startswith("email:")
+
+        login: Response = await client.post(
+            "/auth/login",
+            data={
+                "username": base_registration_payload["email"],
+                "password": base_registration_payload["password"],
+            },
+        )
+        assert login.status_code == status.HTTP_200_OK
+        print("Test passed successfully!")
+
+    async def test_import_unsupported_format(
+        self, client: AsyncClient, as_superuser: None
+    ) -> None:
+        """Test that bodies which are neither NDJSON nor CSV are rejected."""
+        response: Response = await client.post(
+            "/auth/users/import", json=[], headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        print("Test passed successfully!")
+
+    async def test_import_requires_superuser(self, client: AsyncClient) -> None:
+        """Test that the bulk import is restricted to superusers."""
+        response: Response = await client.post(
+            "/auth/users/import", content="", headers={"Content-Type": "text/csv"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        print("Test passed successfully!")
@@ -0,0 +1,122 @@
+"""Testing the UserManager business logic"""
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import exceptions
+
+from src.auth.schemas import UserCreate
+from src.auth.service import UserManager
+
+
+def credentials(email: str, password: str) -> OAuth2PasswordRequestForm:
+    """Build the login form of a user"""
+    return OAuth2PasswordRequestForm(username=email, password=password)
+
+
+@pytest.mark.asyncio
+class TestUserManagerPasswords:
+    """Test class for the password handling of the UserManager"""
+
+    async def test_create_and_authenticate(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that created users are stored with a hash and can authenticate."""
+        user = await user_manager.create(UserCreate(**base_registration_payload))
+        assert user.hashed_password.startswith("$argon2")
+
+        email, password = user.email, base_registration_payload["password"]
+        assert await user_manager.authenticate(credentials(email, password)) == user
+        assert await user_manager.authenticate(credentials(email, "Wrong1!pwd")) is None
+        assert (
+            await user_manager.authenticate(credentials("nobody@example.com", password))
+            is None
+        )
+        print("Test passed successfully!")
+
+    async def test_authenticate_upgrades_outdated_hash(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that a password hashed with a deprecated scheme is rehashed on login."""
+        user = await user_manager.create(UserCreate(**base_registration_payload))
+        bcrypt_hash = user_manager.password_helper.password_hash.hashers[1].hash(
+            base_registration_payload["password"]
+        )
+        await user_manager.user_db.update(user, {"hashed_password": bcrypt_hash})
+
+        await user_manager.authenticate(
+            credentials(user.email, base_registration_payload["password"])
+        )
+        assert user.hashed_password.startswith("$argon2")
+
+    async def test_update_password(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that password updates are validated and hashed."""
+        user = await user_manager.create(UserCreate(**base_registration_payload))
+        await user_manager._update(user, {"password": "NewPassword2@", "name": "New"})
+
+        assert user.name == "New"
+        assert await user_manager.authenticate(credentials(user.email, "NewPassword2@"))
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestUserManagerCreate:
+    """Test class for the creation of users, relying on the database to reject duplicates"""
+
+    async def test_create_if_unique(self, user_manager: UserManager) -> None:
+        """Test that duplicates are skipped by the insertion itself, without any lookup."""
+        user_db = user_manager.user_db
+        user_dict = {
+            "email": "user@example.com",
+            "username": "testuser",
+            "name": "Test User",
+            "hashed_password": "hash",
+        }
+        user = await user_db.create_if_unique(user_dict)
+        assert user is not None and user.username == "testuser"
+        assert user.is_active is True
+
+        for duplicate in [
+            {**user_dict, "username": "other"},
+            {**user_dict, "email": "USER@example.com", "username": "other"},
+            {**user_dict, "email": "other@example.com"},
+        ]:
+            assert await user_db.create_if_unique(duplicate) is None
+        print("Test passed successfully!")
+
+    async def test_duplicates_reported(
+        self, user_manager: UserManager, base_registration_payload: dict[str, str]
+    ) -> None:
+        """Test that users are only looked up once their insertion was skipped, to report the field taken."""
+        get_conflicting = user_manager.user_db.get_conflicting
+        lookups = 0
+
+        async def counting_get_conflicting(email: str, username: str):
+            nonlocal lookups
+            lookups += 1
+            return await get_conflicting(email, username)
+
+        user_manager.user_db.get_conflicting = counting_get_conflicting  # type: ignore[attr-defined]
+
+        await user_manager.create(UserCreate(**base_registration_payload))
+        assert lookups == 0
+
+        with pytest.raises(HTTPException) as username_taken:
+            await user_manager.create(
+                UserCreate(**{**base_registration_payload, "email": "b@example.com"})
+            )
+        assert username_taken.value.detail == "Username already exists"
+        with pytest.raises(exceptions.UserAlreadyExists):
+            await user_manager.create(
+                UserCreate(
+                    **{
+                        **base_registration_payload,
+                        "email": "USER@example.com",
+                        "username": "other",
+                    }
+                )
+            )
+        assert lookups == 2
+        print("Test passed successfully!")
@@ -1,7 +1,9 @@
 """Common fixtures which will be throughout the tests"""
 
+from contextlib import nullcontext
 from typing import AsyncGenerator
 
+import pytest
 import pytest_asyncio
 
 from fastapi import FastAPI
@@ -17,9 +19,17 @@ from sqlalchemy.ext.asyncio import (
     AsyncEngine,
 )
 
+from src.assets.dependencies import get_asset_store
+from src.assets.stores import FilesystemAssetStore
+from src.auth.router import current_active_user, current_superuser
+from src.analytics.dependencies import get_scan_event_queue
+from src.analytics.ingestion import ScanEventQueue
+from src.analytics.partitions import maintain_scan_event_partitions
 from src.main import app as test_app
 from src.config import settings
 from src.database import get_async_session
+from src.ratelimit.backends import LocalRateLimitBackend
+from src.ratelimit.dependencies import rate_limit_backend
 
 TEST_DATABASE_URL = settings.TEST_DATABASE_URL
 
@@ -38,6 +48,17 @@ async def async_db_engine() -> AsyncGenerator[AsyncEngine, None]:
     yield engine
 
 
+@pytest_asyncio.fixture(scope="session", autouse=True)  # type: ignore
+async def scan_event_partitions(async_db_engine: AsyncEngine) -> None:
+    """
+    Fixture which makes sure that the partitions of the scan events recorded by the tests exist in the test
+    database, the migrations only creating them a few months ahead
+    """
+    async with AsyncSession(async_db_engine) as session:
+        await maintain_scan_event_partitions(session)
+        await session.commit()
+
+
 @pytest_asyncio.fixture(scope="function")  # type: ignore
 async def async_db_session(
     async_db_engine: AsyncEngine,
@@ -82,9 +103,31 @@ async def app() -> AsyncGenerator[FastAPI, None]:
     print("The app is now closed after testing")
 
 
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def scan_events(
+    async_db_session: AsyncSession,
+) -> AsyncGenerator[ScanEventQueue, None]:
+    """
+    Fixture which creates a scan event queue writing through the db_session fixture. Scans are only
+    flushed once the queue is stopped, so that the queue never uses the session at the same time as a request.
+
+    Yields:
+        Iterator[AsyncGenerator[ScanEventQueue, None]]: The started scan event queue, stopped after each test
+    """
+    queue = ScanEventQueue(
+        max_size=1000,
+        batch_size=1000,
+        flush_interval_seconds=3600,
+        session_maker=lambda: nullcontext(async_db_session),
+    )
+    queue.start()
+    yield queue
+    await queue.stop()
+
+
 @pytest_asyncio.fixture(scope="function")  # type: ignore
 async def client(
-    app: FastAPI, async_db_session: AsyncSession
+    app: FastAPI, async_db_session: AsyncSession, scan_events: ScanEventQueue
 ) -> AsyncGenerator[AsyncClient, None]:
     """
     Fixture which creates a new client for testing
@@ -97,6 +140,11 @@ async def client(
     """
     # Override the get_async_session dependency with the db_session fixture
     test_app.dependency_overrides[get_async_session] = lambda: async_db_session
+    # Override the get_scan_event_queue dependency with the scan_events fixture
+    test_app.dependency_overrides[get_scan_event_queue] = lambda: scan_events
+    # Start every test with full rate limit buckets, tests share the client IP
+    assert isinstance(rate_limit_backend, LocalRateLimitBackend)
+    rate_limit_backend.clear()
 
     async with AsyncClient(
         transport=ASGITransport(app=app),  # type: ignore
@@ -107,3 +155,30 @@ async def client(
 
     # Remove the dependency override after the tests are done
     test_app.dependency_overrides = {}
+
+
+@pytest.fixture(scope="function")
+def as_superuser(client: AsyncClient) -> None:
+    """
+    Authenticates every request of the test as a superuser, bypassing the bearer token verification
+    """
+    test_app.dependency_overrides[current_superuser] = lambda: None
+
+
+@pytest.fixture(scope="function")
+def as_active_user(client: AsyncClient) -> None:
+    """
+    Authenticates every request of the test as an active user, bypassing the bearer token verification
+    """
+    test_app.dependency_overrides[current_active_user] = lambda: None
+
+
+@pytest.fixture(scope="function")
+def asset_store(client: AsyncClient, tmp_path) -> FilesystemAssetStore:
+    """
+    Provides an empty filesystem asset store to the application for the duration of a test, kept in the
+    temporary directory of the test
+    """
+    store = FilesystemAssetStore(tmp_path / "assets")
+    test_app.dependency_overrides[get_asset_store] = lambda: store
+    return store
@@ -0,0 +1,102 @@
+"""Testing the timing middleware, the stage spans of the auth hot paths and the /metrics endpoint"""
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient, Response
+
+from src.metrics.dependencies import request_latency, stage_latency
+from src.metrics.router import PROMETHEUS_MEDIA_TYPE
+
+
+def stage_count(stage: str) -> int:
+    """Number of observations of a stage"""
+    return stage_latency.labels(stage).count
+
+
+@pytest.mark.asyncio
+class TestTimingMiddleware:
+    """Test class for the timing of the requests and of their stages"""
+
+    async def test_requests_by_route(self, client: AsyncClient) -> None:
+        """Test that requests are timed by route template and status, unmatched paths sharing a label."""
+        by_template = request_latency.labels("GET", "/qr/codes/{qr_code_id}", "401")
+        unmatched = request_latency.labels("GET", "unmatched", "404")
+        before = by_template.count, unmatched.count
+
+        await client.get("/qr/codes/abc")
+        await client.get("/qr/codes/def")
+        await client.get("/not/a/route")
+
+        assert (by_template.count, unmatched.count) == (before[0] + 2, before[1] + 1)
+        print("Test passed successfully!")
+
+    async def test_auth_stages(self, client: AsyncClient) -> None:
+        """Test that the user queries, password hashing and JWT of the auth flow are timed as stages."""
+        stages = [
+            "password.hash",
+            "password.verify",
+            "user_db.create_if_unique",
+            "user_db.get_by_email",
+            "user_db.get",
+            "jwt.encode",
+            "jwt.decode",
+        ]
+        before = {stage: stage_count(stage) for stage in stages}
+
+        await client.post(
+            "/auth/register",
+            json={
+                "username": "metrics",
+                "email": "metrics@example.com",
+                "password": "TestPassword1!",
+                "name": "Metrics User",
+            },
+        )
+        login: Response = await client.post(
+            "/auth/login",
+            data={"username": "metrics@example.com", "password": "TestPassword1!"},
+        )
+        token = login.json()["access_token"]
+        response: Response = await client.get(
+            "/qr/codes", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        assert {stage: stage_count(stage) - before[stage] for stage in stages} == {
+            stage: 1 for stage in stages
+        }
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestMetricsEndpoint:
+    """Test class for the metrics endpoint, /metrics"""
+
+    async def test_exposition(self, client: AsyncClient) -> None:
+        """Test that the histograms are exposed in the Prometheus text format."""
+        await client.get("/")
+        response: Response = await client.get("/metrics")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == PROMETHEUS_MEDIA_TYPE
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert (
+            'http_request_duration_seconds_count{method="GET",route="/",status="200"}'
+            in response.text
+        )
+        print("Test passed successfully!")
+
+    async def test_scraper_token(
+        self, client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a configured scraper token is required to read the metrics."""
+        monkeypatch.setattr("src.metrics.router.METRICS_BEARER_TOKEN", "scraper")
+
+        for headers in ({}, {"Authorization": "Bearer wrong"}):
+            response: Response = await client.get("/metrics", headers=headers)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = await client.get(
+            "/metrics", headers={"Authorization": "Bearer scraper"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        print("Test passed successfully!")
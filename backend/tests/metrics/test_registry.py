@@ -0,0 +1,72 @@
+"""Testing the latency histograms and their Prometheus exposition"""
+
+import pytest
+
+from src.metrics.registry import Histogram, MetricsRegistry
+
+
+class TestHistogram:
+    """Test class for the histograms"""
+
+    def test_observe(self) -> None:
+        """Test that observations are counted in the first bucket whose bound they do not exceed."""
+        histogram = Histogram("latency", "Latency", ("route",), (0.1, 0.01, 1.0))
+        series = histogram.labels("/")
+        for value in (0.005, 0.01, 0.5, 2.0):
+            series.observe(value)
+
+        assert histogram.bounds == (0.01, 0.1, 1.0)
+        assert series.counts == [2, 0, 1, 1]
+        assert series.count == 4
+        assert series.sum == pytest.approx(2.515)
+        assert histogram.labels("/") is series
+        print("Test passed successfully!")
+
+    def test_span(self) -> None:
+        """Test that spans observe their block, including when it raises."""
+        series = Histogram("latency", "Latency", (), (1.0,)).labels()
+        with series.time():
+            pass
+        with pytest.raises(RuntimeError):
+            with series.time():
+                raise RuntimeError
+        assert series.counts == [2, 0]
+        print("Test passed successfully!")
+
+    def test_label_count(self) -> None:
+        """Test that series are only created with a value for every label."""
+        histogram = Histogram("latency", "Latency", ("method", "route"), (1.0,))
+        with pytest.raises(ValueError):
+            histogram.labels("GET")
+        print("Test passed successfully!")
+
+
+class TestExposition:
+    """Test class for the Prometheus text format"""
+
+    def test_expose(self) -> None:
+        """Test that buckets are exposed cumulatively, with the sum, the count and escaped labels."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram(
+            "latency_seconds", "Latency", ("route",), (0.1, 1.0)
+        )
+        registry.histogram("empty_seconds", "Nothing yet", ("stage",), (1.0,))
+        series = histogram.labels('/a"b')
+        series.observe(0.05)
+        series.observe(0.5)
+
+        assert registry.expose() == (
+            "# HELP latency_seconds Latency\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1\n'
+            'latency_seconds_bucket{route="/a\\"b",le="1.0"} 2\n'
+            'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 2\n'
+            'latency_seconds_sum{route="/a\\"b"} 0.55\n'
+            'latency_seconds_count{route="/a\\"b"} 2\n'
+            "# HELP empty_seconds Nothing yet\n"
+            "# TYPE empty_seconds histogram\n"
+        )
+
+        histogram.clear()
+        assert "latency_seconds_bucket" not in registry.expose()
+        print("Test passed successfully!")
@@ -0,0 +1,109 @@
+"""Testing the profiling endpoints, /debug"""
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient, Response
+
+from src.profiling import router as profiling_router
+from src.profiling.dependencies import profiler_lock, slow_callback_monitor
+
+
+@pytest.fixture(scope="function")
+def profiler_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Enables the profiler, disabled by default"""
+    monkeypatch.setattr(profiling_router, "PROFILER_ENABLED", True)
+
+
+@pytest.mark.asyncio
+class TestProfile:
+    """Test class for the sampling profiles, /debug/profile"""
+
+    async def test_collapsed(
+        self, client: AsyncClient, as_superuser: None, profiler_enabled: None
+    ) -> None:
+        """Test a profile as collapsed stacks, the event loop thread being sampled."""
+        response: Response = await client.get(
+            "/debug/profile", params={"seconds": 0.1, "interval_ms": 5}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert any(
+            line.startswith("MainThread;") for line in response.text.splitlines()
+        )
+        print("Test passed successfully!")
+
+    async def test_speedscope(
+        self, client: AsyncClient, as_superuser: None, profiler_enabled: None
+    ) -> None:
+        """Test a profile as a speedscope file, downloaded as an attachment."""
+        response: Response = await client.get(
+            "/debug/profile", params={"seconds": 0.1, "format": "speedscope"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert "speedscope.json" in response.headers["content-disposition"]
+        assert response.json()["profiles"]
+        print("Test passed successfully!")
+
+    async def test_rejections(
+        self, client: AsyncClient, as_superuser: None, profiler_enabled: None
+    ) -> None:
+        """Test that profiles are bounded in time, and that a single one runs at a time."""
+        response: Response = await client.get(
+            "/debug/profile", params={"seconds": 3600}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        async with profiler_lock:
+            response = await client.get("/debug/profile", params={"seconds": 0.1})
+        assert response.status_code == status.HTTP_409_CONFLICT
+        print("Test passed successfully!")
+
+    async def test_disabled(self, client: AsyncClient, as_superuser: None) -> None:
+        """Test that the profiler is hidden unless enabled."""
+        response: Response = await client.get("/debug/profile", params={"seconds": 0.1})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        print("Test passed successfully!")
+
+    async def test_unauthenticated(
+        self, client: AsyncClient, profiler_enabled: None
+    ) -> None:
+        """Test that the profiler is restricted to superusers."""
+        for method, path in (
+            ("GET", "/debug/profile"),
+            ("GET", "/debug/slow-callbacks"),
+            ("PUT", "/debug/slow-callbacks"),
+        ):
+            response: Response = await client.request(method, path)
+            assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestSlowCallbacks:
+    """Test class for the tracing of the slow callbacks, /debug/slow-callbacks"""
+
+    async def test_switch_tracing(
+        self, client: AsyncClient, as_superuser: None
+    ) -> None:
+        """Test that the tracing is started, read and stopped through the endpoint."""
+        try:
+            response: Response = await client.put(
+                "/debug/slow-callbacks", json={"threshold_seconds": 0.2}
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["threshold_seconds"] == 0.2
+
+            response = await client.get("/debug/slow-callbacks")
+            assert response.json()["threshold_seconds"] == 0.2
+            assert response.json()["stalls"] == slow_callback_monitor.stalls
+
+            response = await client.put("/debug/slow-callbacks", json={})
+            assert response.json()["threshold_seconds"] is None
+
+            response = await client.put(
+                "/debug/slow-callbacks", json={"threshold_seconds": 0}
+            )
+            assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        finally:
+            await slow_callback_monitor.stop()
+        print("Test passed successfully!")
@@ -0,0 +1,132 @@
+"""Testing the stack sampler and the monitor of the slow callbacks of the event loop"""
+
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from src.profiling.monitor import SlowCallbackMonitor
+from src.profiling.sampler import SPEEDSCOPE_SCHEMA, StackSampler, profile
+
+
+def spin_until(stop: threading.Event) -> None:
+    """Keep a thread busy until stopped, to be found on its stack"""
+    while not stop.is_set():
+        sum(range(100))
+
+
+def block_the_loop(seconds: float) -> None:
+    """Block the calling thread, to be found on the stack of a blocked event loop"""
+    time.sleep(seconds)
+
+
+class TestStackSampler:
+    """Test class for the sampling of the stacks and their rendering"""
+
+    def test_collapsed(self) -> None:
+        """Test that the stacks of the other threads are sampled, rooted at their thread name."""
+        stop = threading.Event()
+        thread = threading.Thread(target=spin_until, args=(stop,), name="spinner")
+        thread.start()
+        sampler = StackSampler(0.001)
+        try:
+            for _ in range(5):
+                sampler.sample()
+        finally:
+            stop.set()
+            thread.join()
+
+        lines = sampler.collapsed().splitlines()
+        spinner = [line for line in lines if line.startswith("spinner;")]
+        assert spinner and all("spin_until (" in line for line in spinner)
+        assert sum(int(line.rsplit(" ", 1)[1]) for line in spinner) == 5
+        # The sampling thread does not sample itself
+        assert not any("test_collapsed" in line for line in lines)
+        print("Test passed successfully!")
+
+    @pytest.mark.asyncio
+    async def test_speedscope(self) -> None:
+        """Test that a profile of the event loop renders as a speedscope file, a profile per thread."""
+
+        async def busy() -> None:
+            deadline = time.perf_counter() + 0.1
+            while time.perf_counter() < deadline:
+                block_the_loop(0.005)
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(busy())
+        sampler = await profile(0.1, 0.005)
+        await task
+
+        document = sampler.speedscope("test")
+        assert document["$schema"] == SPEEDSCOPE_SCHEMA
+        frames = document["shared"]["frames"]
+        main = document["profiles"][document["activeProfileIndex"]]
+        assert main["name"] == threading.main_thread().name
+        assert len(main["samples"]) == len(main["weights"]) > 0
+        assert all(0 <= index < len(frames) for s in main["samples"] for index in s)
+        names = {frames[s[-1]]["name"] for s in main["samples"]}
+        assert "block_the_loop" in names
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestSlowCallbackMonitor:
+    """Test class for the tracing of the callbacks blocking the event loop"""
+
+    async def test_logs_blocking_callback(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test that a callback blocking the loop is logged once, with the stack it was blocked in."""
+        monitor = SlowCallbackMonitor()
+        await monitor.start(0.05)
+        try:
+            assert asyncio.get_running_loop().slow_callback_duration == 0.05
+            with caplog.at_level(logging.WARNING, logger="src.profiling.monitor"):
+                await asyncio.sleep(0.1)
+                block_the_loop(0.3)
+                await asyncio.sleep(0.1)
+        finally:
+            await monitor.stop()
+
+        assert monitor.stalls == 1
+        assert monitor.threshold_seconds is None
+        [record] = caplog.records
+        assert "Event loop blocked for" in record.getMessage()
+        assert "in block_the_loop" in record.getMessage()
+        print("Test passed successfully!")
+
+    async def test_quiet_loop(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that a loop which is never blocked is not logged, and that the threshold can change."""
+        monitor = SlowCallbackMonitor()
+        await monitor.start(1.0)
+        await monitor.start(0.25)
+        try:
+            assert monitor.threshold_seconds == 0.25
+            with caplog.at_level(logging.WARNING, logger="src.profiling.monitor"):
+                for _ in range(20):
+                    await asyncio.sleep(0.01)
+        finally:
+            await monitor.stop()
+            await monitor.stop()
+
+        assert monitor.stalls == 0
+        assert not caplog.records
+        print("Test passed successfully!")
+
+    async def test_restart_with_pending_ping(self) -> None:
+        """Test that the monitor restarts and stops at once while a ping is waiting for the loop to answer it."""
+        monitor = SlowCallbackMonitor()
+        await monitor.start(2.0)
+        # Blocked past the first ping, sent a quarter of the threshold in, which stays unanswered
+        block_the_loop(0.7)
+        watchdog = monitor._thread
+        start = time.perf_counter()
+        await monitor.start(2.0)
+        await monitor.stop()
+        assert time.perf_counter() - start < 0.5
+        assert watchdog is not None and not watchdog.is_alive()
+        assert monitor.stalls == 0
+        print("Test passed successfully!")
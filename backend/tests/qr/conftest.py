@@ -0,0 +1,92 @@
+"""QR domain level fixtures used throughout QR code generation unit & integration tests"""
+
+from collections.abc import AsyncGenerator
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import User
+from src.auth.router import current_active_user
+from src.main import app as test_app
+from src.qr.cache import RedirectCache, RenderCache
+from src.qr.config import (
+    QR_REDIRECT_CACHE_TTL_SECONDS,
+    QR_REDIRECT_NOT_FOUND_TTL_SECONDS,
+    QR_RENDER_CACHE_MAX_BYTES,
+)
+from src.qr.dependencies import get_redirect_cache, get_render_cache
+from src.qr.executor import RenderService
+
+
+@pytest.fixture(scope="function")
+def base_render_params():
+    """
+    Provides a base valid set of render query parameters for usage across different tests
+    """
+    return {
+        "data": "https://qrafty.app",
+        "error_correction": "M",
+        "box_size": 4,
+        "border": 4,
+    }
+
+
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def batch_render_service() -> AsyncGenerator[RenderService, None]:
+    """
+    Fixture which starts a render service with a single process, stopping it after the test
+    """
+    service = RenderService(max_workers=1, max_queue=0)
+    service.start()
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture(scope="function")
+def render_cache(client: AsyncClient) -> RenderCache:
+    """
+    Provides a fresh render cache to the application for the duration of a test, isolating the
+    cache counters and entries of each test
+    """
+    cache = RenderCache(QR_RENDER_CACHE_MAX_BYTES)
+    test_app.dependency_overrides[get_render_cache] = lambda: cache
+    return cache
+
+
+@pytest.fixture(scope="function")
+def redirect_cache(client: AsyncClient) -> RedirectCache:
+    """
+    Provides a fresh redirect cache to the application for the duration of a test
+    """
+    cache = RedirectCache(
+        100, QR_REDIRECT_CACHE_TTL_SECONDS, QR_REDIRECT_NOT_FOUND_TTL_SECONDS
+    )
+    test_app.dependency_overrides[get_redirect_cache] = lambda: cache
+    return cache
+
+
+async def create_user(session: AsyncSession, username: str) -> User:
+    """Insert a user in the test database"""
+    user = User(
+        email=f"{username}@example.com",
+        username=username,
+        name="Owner",
+        hashed_password="unused",
+    )
+    session.add(user)
+    await session.flush()
+    return user
+
+
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def owner(
+    client: AsyncClient, async_db_session: AsyncSession
+) -> AsyncGenerator[User, None]:
+    """
+    Provides a user stored in the test database, every request of the test being authenticated as this user
+    """
+    user = await create_user(async_db_session, "owner")
+    test_app.dependency_overrides[current_active_user] = lambda: user
+    yield user
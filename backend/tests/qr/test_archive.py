@@ -0,0 +1,64 @@
+"""Testing the streaming ZIP archive writer"""
+
+import io
+import zipfile
+
+from pytest import MonkeyPatch  # imported for type hinting
+
+from src.qr import archive
+from src.qr.archive import StreamingZipWriter
+
+
+def write_archive(entries: dict[str, tuple[bytes, bool]]) -> bytes:
+    """Build an archive from entry names mapped to their content and compression flag"""
+    writer = StreamingZipWriter()
+    parts = [writer.add(name, *entry) for name, entry in entries.items()]
+    return b"".join(parts) + writer.close()
+
+
+class TestStreamingZipWriter:
+    """Test class for the streaming ZIP writer, reading its archives back with the zipfile module"""
+
+    def test_stored_and_deflated_entries(self) -> None:
+        """Test that stored and deflated entries are read back intact."""
+        entries = {
+            "000001.png": (b"\x89PNG" + bytes(range(256)), False),
+            "000002.svg": (b"<svg>" + b"<path/>" * 100 + b"</svg>", True),
+            "dossier/é.txt": (b"", False),
+        }
+        data = write_archive(entries)
+
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.testzip() is None
+            assert zf.namelist() == list(entries)
+            for name, (content, compress) in entries.items():
+                assert zf.read(name) == content
+                assert zf.getinfo(name).compress_type == (
+                    zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+                )
+        print("Test passed successfully!")
+
+    def test_deflated_entry_is_smaller(self) -> None:
+        """Test that compressed entries are actually deflated."""
+        content = b"<path/>" * 1000
+        writer = StreamingZipWriter()
+        assert len(writer.add("a.svg", content, compress=True)) < len(content) // 10
+        assert writer.entries == 1
+
+    def test_empty_archive(self) -> None:
+        """Test that an archive without entries is valid."""
+        with zipfile.ZipFile(io.BytesIO(write_archive({}))) as zf:
+            assert zf.namelist() == []
+
+    def test_zip64(self, monkeypatch: MonkeyPatch) -> None:
+        """Test that ZIP64 records are written once offsets exceed the limit."""
+        monkeypatch.setattr(archive, "ZIP64_LIMIT", 64)
+        entries = {f"{i:06d}.png": (bytes([i]) * 50, False) for i in range(4)}
+        data = write_archive(entries)
+
+        assert b"PK\x06\x06" in data  # ZIP64 end of central directory record
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            assert zf.testzip() is None
+            for name, (content, _) in entries.items():
+                assert zf.read(name) == content
+        print("Test passed successfully!")
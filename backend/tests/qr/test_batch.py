@@ -0,0 +1,155 @@
+"""Testing the parsing of batch rows and the streaming of batch archives"""
+
+import asyncio
+import io
+import zipfile
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from src.qr.batch import iter_batch_rows, render_chunks, stream_batch_archive
+from src.qr.executor import RenderService
+from src.qr.schemas import ImageFormat, QRRenderParams
+from src.uploads import UploadFormat
+
+
+class TestBatchParsing:
+    """Test class for the parsing and validation of batch rows"""
+
+    def test_ndjson_rows(self) -> None:
+        """Test that NDJSON rows are numbered, skipping blank lines, and invalid rows are reported."""
+        body = b'{"data": "a"}\n\n{"data": "b", "format": "svg"}\n[1]\n{oops\n{"box_size": 4}\n'
+        rows = list(iter_batch_rows(io.BytesIO(body), UploadFormat.NDJSON))
+
+        assert rows[0] == (1, QRRenderParams(data="a"))
+        assert rows[1] == (2, QRRenderParams(data="b", format=ImageFormat.SVG))
+        assert rows[2] == (3, "Row must be a JSON object")
+        assert rows[3] == (4, "Invalid JSON")
+        assert rows[4][0] == 5 and rows[4][1].startswith("data: Field required")
+        print("Test passed successfully!")
+
+    def test_csv_rows(self) -> None:
+        """Test that CSV rows are read by header, empty cells falling back to the defaults."""
+        body = b'data,box_size,format\r\n"multi\nline",,svg\r\nb,5,\r\nc,-1,png\r\n'
+        rows = list(iter_batch_rows(io.BytesIO(body), UploadFormat.CSV))
+
+        assert rows[0] == (
+            1,
+            QRRenderParams(data="multi\nline", format=ImageFormat.SVG),
+        )
+        assert rows[1] == (2, QRRenderParams(data="b", box_size=5))
+        assert rows[2][0] == 3 and rows[2][1].startswith("box_size:")
+        print("Test passed successfully!")
+
+    def test_uploaded_logo_rows(self) -> None:
+        """Test that rows referencing an uploaded logo are reported, the logos being kept in the asset store."""
+        body = b'{"data": "a", "error_correction": "H", "logo_key": "%s.png"}\n' % (
+            b"0" * 64
+        )
+        rows = list(iter_batch_rows(io.BytesIO(body), UploadFormat.NDJSON))
+        assert rows == [(1, "Uploaded logos are only available in single renders")]
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestStreamBatchArchive:
+    """Test class for the streaming of batch archives"""
+
+    async def test_archive(self, batch_render_service: RenderService) -> None:
+        """Test that rendered rows and errors end up in the archive, across several chunks."""
+        rows = [(i, QRRenderParams(data=f"row {i}", box_size=1)) for i in range(1, 6)]
+        rows.append((6, "Invalid JSON"))
+        rows.append((7, QRRenderParams(data="x" * 100, version=1)))
+        rows.append((8, QRRenderParams(data="svg", format=ImageFormat.SVG)))
+
+        parts = [
+            part
+            async for part in stream_batch_archive(
+                iter(rows), batch_render_service, chunk_size=2
+            )
+        ]
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as zf:
+            assert zf.testzip() is None
+            names = sorted(zf.namelist())
+            assert names == [
+                "000001.png",
+                "000002.png",
+                "000003.png",
+                "000004.png",
+                "000005.png",
+                "000008.svg",
+                "errors.csv",
+            ]
+            assert zf.read("000001.png").startswith(b"\x89PNG")
+            assert zf.read("errors.csv").decode().splitlines() == [
+                "row,error",
+                "6,Invalid JSON",
+                "7,Data is too large for the requested QR code version",
+            ]
+        print("Test passed successfully!")
+
+    async def test_max_rows(self, batch_render_service: RenderService) -> None:
+        """Test that the rows beyond the limit are ignored and reported."""
+        rows = ((i, QRRenderParams(data=f"row {i}")) for i in range(1, 10))
+
+        parts = [
+            part
+            async for part in stream_batch_archive(
+                rows, batch_render_service, max_rows=2
+            )
+        ]
+
+        with zipfile.ZipFile(io.BytesIO(b"".join(parts))) as zf:
+            assert sorted(zf.namelist()) == ["000001.png", "000002.png", "errors.csv"]
+            assert '3,"Batch is limited to 2 rows' in zf.read("errors.csv").decode()
+        print("Test passed successfully!")
+
+    async def test_pending_chunks_cancelled_on_close(
+        self, batch_render_service: RenderService
+    ) -> None:
+        """Test that closing the stream early drops the chunks that were not rendered yet."""
+        rows = ((i, QRRenderParams(data=f"row {i}")) for i in range(1, 100))
+        stream = stream_batch_archive(rows, batch_render_service, chunk_size=1)
+
+        assert await anext(stream)
+        await stream.aclose()
+        print("Test passed successfully!")
+
+
+class FirstChunkLastService:
+    """Stand-in for the render service running the jobs in the event loop, the first chunk finishing last"""
+
+    max_workers = 3
+
+    async def run(self, func: Callable, chunk: list, wait: bool = False) -> Any:
+        await asyncio.sleep(0.05 if chunk[0][0] == 1 else 0)
+        return func(chunk)
+
+
+@pytest.mark.asyncio
+class TestRenderChunks:
+    """Test class for the rendering of batch rows in chunks"""
+
+    @pytest.mark.parametrize("ordered", [False, True])
+    async def test_order(self, ordered: bool) -> None:
+        """Test that chunks are yielded as they finish, or in the order of the rows when asked to."""
+        rows = [(i, QRRenderParams(data=f"row {i}")) for i in range(1, 9)]
+        errors: list[tuple[int, str]] = []
+        chunks = [
+            [row_number for row_number, _ in chunk]
+            async for chunk in render_chunks(
+                iter(rows),
+                FirstChunkLastService(),
+                list,
+                errors,
+                chunk_size=2,
+                ordered=ordered,
+            )
+        ]
+
+        assert sorted(chunks) == [[1, 2], [3, 4], [5, 6], [7, 8]]
+        assert (chunks[0] == [1, 2]) is ordered
+        assert errors == []
+        print("Test passed successfully!")
@@ -0,0 +1,189 @@
+"""Testing the content-addressed render cache and the redirect cache"""
+
+import hashlib
+import uuid
+
+import pytest
+
+from src.qr.cache import (
+    REDIRECT_NOT_FOUND,
+    RedirectCache,
+    RedirectTarget,
+    RenderCache,
+    etag_matches,
+    make_etag,
+    render_cache_key,
+)
+from src.qr.schemas import QRRenderParams
+from src.qr.service import RenderedQR
+
+
+def make_render(size: int) -> RenderedQR:
+    """Build a fake render of the given size in bytes"""
+    return RenderedQR(content=b"x" * size, media_type="image/png")
+
+
+FOUND = RedirectTarget(uuid.uuid4(), "https://qrafty.app")
+TARGETS = {
+    short_id: RedirectTarget(uuid.uuid4(), f"https://{short_id}.example")
+    for short_id in "abc"
+}
+
+
+class TestRenderCacheKey:
+    """Test class for the canonical cache keys"""
+
+    def test_equivalent_params_share_key(self) -> None:
+        """Test that the key does not depend on the casing of the colors."""
+        lower = QRRenderParams(data="QRafty", fill_color="#abcdef")
+        upper = QRRenderParams(data="QRafty", fill_color="#ABCDEF")
+        assert render_cache_key(lower) == render_cache_key(upper)
+
+    @pytest.mark.parametrize(
+        "changes",
+        [
+            {"data": "QRafty!"},
+            {"error_correction": "H"},
+            {"version": 5},
+            {"fill_color": "#111111"},
+            {"back_color": "#EEEEEE"},
+            {"format": "svg"},
+            {"box_size": 3},
+            {"border": 1},
+            {"module_shape": "dot"},
+            {"eye_shape": "rounded"},
+            {"eye_color": "#FF0000"},
+            {"gradient": "radial", "gradient_color": "#0000FF"},
+            {"error_correction": "H", "logo": "bG9nbw=="},
+            {"error_correction": "H", "logo_key": "0" * 64 + ".png"},
+        ],
+    )
+    def test_every_param_is_part_of_the_key(self, changes: dict) -> None:
+        """Test that changing any render parameter changes the key."""
+        base = QRRenderParams(data="QRafty")
+        changed = QRRenderParams.model_validate(
+            {**base.model_dump(exclude={"logo"}), **changes}
+        )
+        assert render_cache_key(base) != render_cache_key(changed)
+
+    def test_uploaded_logo_shares_key(self) -> None:
+        """Test that a logo referenced by its key renders under the key of the same logo sent along."""
+        sent = QRRenderParams(data="QRafty", error_correction="H", logo="bG9nbw==")
+        digest = hashlib.sha256(b"logo").hexdigest()
+        uploaded = QRRenderParams(
+            data="QRafty", error_correction="H", logo_key=f"{digest}.png"
+        )
+        assert render_cache_key(sent) == render_cache_key(uploaded)
+
+
+class TestEtagMatches:
+    """Test class for the If-None-Match evaluation"""
+
+    @pytest.mark.parametrize(
+        "if_none_match, expected",
+        [
+            (None, False),
+            ("", False),
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"other", "abc"', True),
+            ('"other"', False),
+            ("*", True),
+        ],
+    )
+    def test_etag_matches(self, if_none_match: str | None, expected: bool) -> None:
+        """Test the weak comparison of the If-None-Match candidates."""
+        assert etag_matches(if_none_match, make_etag("abc")) is expected
+
+
+class TestRenderCache:
+    """Test class for the LRU + byte budget eviction policy"""
+
+    def test_hit_and_miss_counters(self) -> None:
+        """Test that lookups are counted as hits and misses."""
+        cache = RenderCache(max_bytes=100)
+        assert cache.get("a") is None
+        cache.set("a", make_render(10))
+        assert cache.get("a") == make_render(10)
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.entries, stats.size_bytes) == (
+            1,
+            1,
+            1,
+            10,
+        )
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the least recently used entries are evicted to fit the byte budget."""
+        cache = RenderCache(max_bytes=100)
+        cache.set("a", make_render(40))
+        cache.set("b", make_render(40))
+        cache.get("a")  # "b" becomes the least recently used entry
+        cache.set("c", make_render(40))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats().evictions == 1
+        assert cache.stats().size_bytes == 80
+
+    def test_replacing_entry_updates_size(self) -> None:
+        """Test that setting an existing key replaces it without leaking its size."""
+        cache = RenderCache(max_bytes=100)
+        cache.set("a", make_render(60))
+        cache.set("a", make_render(30))
+        assert cache.stats().size_bytes == 30
+        assert cache.stats().evictions == 0
+
+    def test_oversized_render_is_not_cached(self) -> None:
+        """Test that a render larger than the budget does not flush the cache."""
+        cache = RenderCache(max_bytes=100)
+        cache.set("a", make_render(50))
+        cache.set("b", make_render(101))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats().evictions == 0
+
+
+class TestRedirectCache:
+    """Test class for the cache of the redirect targets"""
+
+    def test_expiration(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that targets expire after their TTL and unknown short ids after the shorter one."""
+        now = 1000.0
+        monkeypatch.setattr("src.qr.cache.time.monotonic", lambda: now)
+        cache = RedirectCache(max_entries=10, ttl_seconds=60, not_found_ttl_seconds=10)
+        cache.set("found", FOUND)
+        cache.set("missing", None)
+
+        assert cache.get("found") == FOUND
+        assert cache.get("missing") == REDIRECT_NOT_FOUND
+        assert cache.get("unknown") is None
+
+        now += 30
+        assert cache.get("found") == FOUND
+        assert cache.get("missing") is None
+        now += 30
+        assert cache.get("found") is None
+        assert len(cache) == 0
+        print("Test passed successfully!")
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the least recently used short id is evicted once the cache is full."""
+        cache = RedirectCache(max_entries=2, ttl_seconds=60, not_found_ttl_seconds=10)
+        cache.set("a", TARGETS["a"])
+        cache.set("b", TARGETS["b"])
+        cache.get("a")
+        cache.set("c", TARGETS["c"])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == TARGETS["a"]
+        assert cache.get("c") == TARGETS["c"]
+
+        cache.invalidate("a")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
+        print("Test passed successfully!")
@@ -0,0 +1,242 @@
+"""Testing the dynamic QR code endpoints and the redirects of their short URLs"""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.models import User
+from src.qr.cache import REDIRECT_NOT_FOUND, RedirectCache
+from src.qr.codes import (
+    ListCursor,
+    create_qr_code,
+    decode_cursor,
+    encode_cursor,
+    generate_short_id,
+)
+from src.qr.config import QR_CODES_MAX_PAGE_SIZE, QR_SHORT_ID_LENGTH
+from src.qr.schemas import QRCodeCreate
+from tests.qr.conftest import create_user
+
+
+@pytest.mark.asyncio
+class TestCodes:
+    """Test class for the management of the dynamic codes, /qr/codes"""
+
+    async def test_create_and_read(self, client: AsyncClient, owner: User) -> None:
+        """Test that a code is created with a short id and read back by its owner."""
+        response: Response = await client.post(
+            "/qr/codes", json={"target_url": "https://qrafty.app/menu", "name": "Menu"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        created = response.json()
+        assert len(created["short_id"]) == QR_SHORT_ID_LENGTH
+        assert created["target_url"] == "https://qrafty.app/menu"
+        assert created["is_active"] is True
+
+        response = await client.get(f"/qr/codes/{created['id']}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == created
+        print("Test passed successfully!")
+
+    async def test_invalid_target(self, client: AsyncClient, owner: User) -> None:
+        """Test that only http and https targets are accepted."""
+        response: Response = await client.post(
+            "/qr/codes", json={"target_url": "javascript:alert(1)"}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        print("Test passed successfully!")
+
+    async def test_other_users_code(
+        self, client: AsyncClient, owner: User, async_db_session: AsyncSession
+    ) -> None:
+        """Test that the codes of other users are not found."""
+        other = await create_user(async_db_session, "other")
+        qr_code = await create_qr_code(
+            async_db_session,
+            other.id,
+            QRCodeCreate(target_url="https://qrafty.app"),  # type: ignore
+        )
+
+        for method in ("GET", "PATCH", "DELETE"):
+            response: Response = await client.request(
+                method, f"/qr/codes/{qr_code.id}", json={}
+            )
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+        print("Test passed successfully!")
+
+    async def test_list_pages(
+        self, client: AsyncClient, owner: User, async_db_session: AsyncSession
+    ) -> None:
+        """Test that the codes of the user are listed newest first, page after page, without the other users' codes."""
+        other = await create_user(async_db_session, "other")
+        await create_qr_code(
+            async_db_session,
+            other.id,
+            QRCodeCreate(target_url="https://qrafty.app"),  # type: ignore
+        )
+        # Codes created in the same transaction share their creation time, and are ordered by id
+        created = [
+            (
+                await client.post(
+                    "/qr/codes", json={"target_url": f"https://qrafty.app/{index}"}
+                )
+            ).json()
+            for index in range(5)
+        ]
+        expected = sorted(
+            created, key=lambda code: (code["created_at"], code["id"]), reverse=True
+        )
+
+        listed, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+            response: Response = await client.get("/qr/codes", params=params)
+            assert response.status_code == status.HTTP_200_OK
+            page = response.json()
+            pages += 1
+            listed.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert [code["id"] for code in listed] == [code["id"] for code in expected]
+        assert "updated_at" not in listed[0]
+        assert listed[0]["short_id"] == expected[0]["short_id"]
+        print("Test passed successfully!")
+
+    async def test_list_invalid_parameters(
+        self, client: AsyncClient, owner: User
+    ) -> None:
+        """Test that malformed cursors and oversized pages are rejected, and that cursors round trip."""
+        for cursor in ("not-a-cursor", "AAAA", "é"):
+            response: Response = await client.get(
+                "/qr/codes", params={"cursor": cursor}
+            )
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = await client.get(
+            "/qr/codes", params={"limit": QR_CODES_MAX_PAGE_SIZE + 1}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+        response = await client.get("/qr/codes")
+        assert response.json() == {"items": [], "next_cursor": None}
+
+        cursor = ListCursor(
+            datetime(2026, 10, 18, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            uuid.uuid4(),
+        )
+        assert decode_cursor(encode_cursor(cursor)) == cursor
+        print("Test passed successfully!")
+
+    async def test_short_id_collision(
+        self,
+        owner: User,
+        async_db_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that a new short id is drawn on a collision, giving up after a few attempts."""
+        short_ids = iter(
+            ["collide", "collide", "fresh", "collide", "collide", "collide"]
+        )
+        monkeypatch.setattr("src.qr.codes.generate_short_id", lambda: next(short_ids))
+        qr_code_create = QRCodeCreate(target_url="https://qrafty.app")  # type: ignore
+
+        await create_qr_code(async_db_session, owner.id, qr_code_create)
+        qr_code = await create_qr_code(async_db_session, owner.id, qr_code_create)
+        assert qr_code.short_id == "fresh"
+
+        with pytest.raises(RuntimeError):
+            await create_qr_code(async_db_session, owner.id, qr_code_create)
+        print("Test passed successfully!")
+
+    async def test_requires_user(self, client: AsyncClient) -> None:
+        """Test that the codes are restricted to authenticated users."""
+        response: Response = await client.post(
+            "/qr/codes", json={"target_url": "https://qrafty.app"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestRedirect:
+    """Test class for the redirect endpoint, /r/{short_id}"""
+
+    async def test_redirect_is_cached(
+        self,
+        client: AsyncClient,
+        owner: User,
+        redirect_cache: RedirectCache,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that a scan redirects to the target, the following scans being served from the cache."""
+        created = (
+            await client.post("/qr/codes", json={"target_url": "https://qrafty.app/a"})
+        ).json()
+
+        response: Response = await client.get(f"/r/{created['short_id']}")
+        assert response.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+        assert response.headers["location"] == "https://qrafty.app/a"
+        assert response.headers["cache-control"] == "no-store"
+
+        async def no_database(*args, **kwargs):
+            raise AssertionError("The database should not be queried")
+
+        monkeypatch.setattr("src.qr.router.get_redirect_target", no_database)
+        response = await client.get(f"/r/{created['short_id']}")
+        assert response.headers["location"] == "https://qrafty.app/a"
+        print("Test passed successfully!")
+
+    async def test_update_invalidates(
+        self, client: AsyncClient, owner: User, redirect_cache: RedirectCache
+    ) -> None:
+        """Test that updates and deletions apply to the next scan."""
+        created = (
+            await client.post("/qr/codes", json={"target_url": "https://qrafty.app/a"})
+        ).json()
+        short_url = f"/r/{created['short_id']}"
+        await client.get(short_url)
+
+        response: Response = await client.patch(
+            f"/qr/codes/{created['id']}", json={"target_url": "https://qrafty.app/b"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["target_url"] == "https://qrafty.app/b"
+        assert response.json()["name"] is None
+        response = await client.get(short_url)
+        assert response.headers["location"] == "https://qrafty.app/b"
+
+        await client.patch(f"/qr/codes/{created['id']}", json={"is_active": False})
+        assert (await client.get(short_url)).status_code == status.HTTP_404_NOT_FOUND
+        await client.patch(f"/qr/codes/{created['id']}", json={"is_active": True})
+        assert (
+            await client.get(short_url)
+        ).status_code == status.HTTP_307_TEMPORARY_REDIRECT
+
+        response = await client.delete(f"/qr/codes/{created['id']}")
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert (await client.get(short_url)).status_code == status.HTTP_404_NOT_FOUND
+        assert (
+            await client.get(f"/qr/codes/{created['id']}")
+        ).status_code == status.HTTP_404_NOT_FOUND
+        print("Test passed successfully!")
+
+    async def test_unknown_short_id(
+        self, client: AsyncClient, redirect_cache: RedirectCache
+    ) -> None:
+        """Test that unknown short ids are cached as not found, malformed ones are not cached at all."""
+        short_id = generate_short_id()
+        response: Response = await client.get(f"/r/{short_id}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert redirect_cache.get(short_id) == REDIRECT_NOT_FOUND
+
+        response = await client.get("/r/not-a-short-id")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert len(redirect_cache) == 1
+        print("Test passed successfully!")
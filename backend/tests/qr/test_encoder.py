@@ -0,0 +1,162 @@
+"""Testing the encode stage of the QR codes"""
+
+import random
+import string
+
+import numpy as np
+import pytest
+import qrcode
+from qrcode import util
+
+from src.qr.encoder import (
+    ERROR_CORRECTION_LEVELS,
+    create_codewords,
+    encode,
+    mask_penalties,
+    segment_bits,
+)
+from src.qr.schemas import ErrorCorrectionLevel
+
+# Payloads using every segment mode, alone and mixed
+PAYLOADS = [
+    "a",
+    "0123456789012",
+    "HTTPS://QRAFTY.APP/R/ABC123",
+    "https://qrafty.app/r/00001234?utm_source=flyer&utm_campaign=2024",
+    "Crème brûlée à 4,50 € 🍮",
+    "x" * 1000,
+]
+
+
+def library_qr(
+    data: str, error_correction: ErrorCorrectionLevel, version: int | None = None
+) -> qrcode.QRCode:
+    """Build a QR code with the qrcode library, without quiet zone"""
+    qr = qrcode.QRCode(
+        version=version,
+        error_correction=ERROR_CORRECTION_LEVELS[error_correction],
+        border=0,
+    )
+    qr.add_data(data)
+    qr.make(fit=version is None)
+    return qr
+
+
+class TestEncode:
+    """Test class for the encoding of the payloads into module matrices"""
+
+    @pytest.mark.parametrize("data", PAYLOADS)
+    @pytest.mark.parametrize("error_correction", list(ErrorCorrectionLevel))
+    def test_matches_qrcode_library(
+        self, data: str, error_correction: ErrorCorrectionLevel
+    ) -> None:
+        """Test that the version, the mask and the matrix are those chosen by the qrcode library."""
+        qr = library_qr(data, error_correction)
+        encoded = encode(data, error_correction)
+        assert encoded.version == qr.version
+        assert np.array_equal(encoded.matrix(), np.array(qr.modules, dtype=bool))
+        # Scoring the masks again overwrites the modules of the library
+        assert encoded.mask == qr.best_mask_pattern()
+
+    @pytest.mark.parametrize("version", [1, 6, 7, 14, 27, 40])
+    def test_requested_versions(self, version: int) -> None:
+        """Test the versions on both sides of the version information and of the block group changes."""
+        for error_correction in ErrorCorrectionLevel:
+            qr = library_qr("QRafty", error_correction, version)
+            matrix = encode("QRafty", error_correction, version).matrix()
+            assert np.array_equal(matrix, np.array(qr.modules, dtype=bool))
+
+    def test_random_payloads(self) -> None:
+        """Test random payloads of random lengths against the qrcode library."""
+        generator = random.Random(23)
+        for _ in range(20):
+            alphabet = generator.choice(
+                [string.digits, string.ascii_uppercase + " $%*+-./:", string.printable]
+            )
+            data = "".join(
+                generator.choice(alphabet) for _ in range(generator.randint(1, 600))
+            )
+            error_correction = generator.choice(list(ErrorCorrectionLevel))
+            qr = library_qr(data, error_correction)
+            assert np.array_equal(
+                encode(data, error_correction).matrix(),
+                np.array(qr.modules, dtype=bool),
+            )
+
+    def test_matrix_border(self) -> None:
+        """Test that the quiet zone is added around the unpacked matrix."""
+        encoded = encode("QRafty")
+        matrix = encoded.matrix(border=3)
+        assert matrix.shape == (encoded.size + 6,) * 2
+        assert not matrix[:3].any() and not matrix[:, -3:].any()
+        assert np.array_equal(matrix[3:-3, 3:-3], encoded.matrix())
+
+    def test_matrix_is_bit_packed(self) -> None:
+        """Test that the matrix is kept with 8 modules per byte."""
+        encoded = encode("QRafty", version=40)
+        assert len(encoded.packed) == 177 * 23
+
+    def test_data_overflow(self) -> None:
+        """Test that data not fitting in the requested version raises the error of the qrcode library."""
+        with pytest.raises(qrcode.exceptions.DataOverflowError):
+            encode("x" * 100, ErrorCorrectionLevel.H, 1)
+
+    def test_memoized(self) -> None:
+        """Test that a payload is encoded once, and that the cache is bounded."""
+        encode.cache_clear()
+        first = encode("QRafty", ErrorCorrectionLevel.Q)
+        assert encode("QRafty", ErrorCorrectionLevel.Q) is first
+        assert encode("QRafty", ErrorCorrectionLevel.H) is not first
+
+        info = encode.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+        assert info.maxsize is not None
+
+
+class TestStages:
+    """Test class for the stages of the encoding against the qrcode library"""
+
+    @pytest.mark.parametrize("data", PAYLOADS)
+    def test_segment_bits(self, data: str) -> None:
+        """Test that the segments are written as the qrcode library writes them."""
+        qr = library_qr(data, ErrorCorrectionLevel.L)
+        buffer = util.BitBuffer()
+        for segment in qr.data_list:
+            buffer.put(segment.mode, 4)
+            buffer.put(len(segment), util.length_in_bits(segment.mode, qr.version))
+            segment.write(buffer)
+
+        expected = np.unpackbits(
+            np.array(buffer.buffer, dtype=np.uint8), count=len(buffer)
+        )
+        assert np.array_equal(segment_bits(qr.data_list, qr.version), expected)
+
+    @pytest.mark.parametrize("data", PAYLOADS)
+    @pytest.mark.parametrize("error_correction", list(ErrorCorrectionLevel))
+    def test_codewords(self, data: str, error_correction: ErrorCorrectionLevel) -> None:
+        """Test the padding, the error correction and the interleaving of the codewords."""
+        qr = library_qr(data, error_correction)
+        level = ERROR_CORRECTION_LEVELS[error_correction]
+        assert create_codewords(
+            qr.data_list, qr.version, level
+        ).tolist() == util.create_data(qr.version, level, qr.data_list)
+
+    @pytest.mark.parametrize("version", [1, 10, 40])
+    def test_mask_penalties(self, version: int) -> None:
+        """Test that the penalties of the 8 masks are those computed by the qrcode library."""
+        qr = qrcode.QRCode(version=version)
+        qr.add_data("QRafty")
+        candidates = []
+        for mask in range(8):
+            qr.makeImpl(True, mask)
+            candidates.append(qr.modules)
+        candidates = np.array(candidates, dtype=bool)
+
+        expected = [util.lost_point(modules.tolist()) for modules in candidates]
+        assert mask_penalties(candidates).tolist() == expected
+
+    def test_mask_penalties_random(self) -> None:
+        """Test every penalty rule on random matrices, which have far more runs and patterns."""
+        candidates = np.random.default_rng(23).random((8, 21, 21)) < 0.5
+        expected = [util.lost_point(modules.tolist()) for modules in candidates]
+        assert mask_penalties(candidates).tolist() == expected
@@ -0,0 +1,215 @@
+"""Testing the vectorized QR code rendering engine"""
+
+import re
+import struct
+import zlib
+
+import numpy as np
+import pytest
+import qrcode
+from qrcode.exceptions import DataOverflowError
+
+from src.qr.engine import (
+    build_matrix,
+    horizontal_runs,
+    iter_svg,
+    pdf_operators,
+    render_png,
+    render_svg,
+    trace_outlines,
+)
+from src.qr.schemas import ErrorCorrectionLevel
+
+
+def decode_png(content: bytes) -> tuple[np.ndarray, bytes]:
+    """
+    Minimal decoder for the 1-bit palette PNGs produced by the engine
+
+    Args:
+        content (bytes): The encoded PNG image
+
+    Returns:
+        tuple[np.ndarray, bytes]: The boolean pixel matrix (True for palette index 1) and the raw palette
+    """
+    assert content[:8] == b"\x89PNG\r\n\x1a\n"
+    offset, chunks = 8, {}
+    while offset < len(content):
+        (length,) = struct.unpack(">I", content[offset : offset + 4])
+        chunk_type = content[offset + 4 : offset + 8]
+        payload = content[offset + 8 : offset + 8 + length]
+        (crc,) = struct.unpack(
+            ">I", content[offset + 8 + length : offset + 12 + length]
+        )
+        assert crc == zlib.crc32(payload, zlib.crc32(chunk_type))
+        chunks[chunk_type] = payload
+        offset += 12 + length
+
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (bit_depth, color_type) == (1, 3)
+
+    rows = np.frombuffer(zlib.decompress(chunks[b"IDAT"]), dtype=np.uint8).reshape(
+        height, -1
+    )
+    assert not rows[:, 0].any()  # every scanline uses filter type 0
+    pixels = np.unpackbits(rows[:, 1:], axis=1)[:, :width].astype(bool)
+    return pixels, chunks[b"PLTE"]
+
+
+def fill_loops(loops: list[list[tuple[int, int]]], size: int) -> np.ndarray:
+    """
+    Fill closed rectilinear loops with the nonzero rule, the winding number of every module being the sum
+    of the vertical edges on its left, counted positive upwards
+
+    Args:
+        loops (list[list[tuple[int, int]]]): Corners of every loop
+        size (int): Side of the matrix, in modules
+
+    Returns:
+        np.ndarray: The boolean matrix of the filled modules
+    """
+    winding = np.zeros((size, size + 1), dtype=int)
+    for corners in loops:
+        for (x0, y0), (x1, y1) in zip(corners, corners[1:] + corners[:1]):
+            assert x0 == x1 or y0 == y1
+            if x0 == x1:
+                winding[min(y0, y1) : max(y0, y1), x0] += 1 if y1 < y0 else -1
+    return np.cumsum(winding, axis=1)[:, :size] != 0
+
+
+def parse_svg_path(path: str) -> list[list[tuple[int, int]]]:
+    """Read the corners of the sub-paths of SVG path data made of M, h, v and z commands"""
+    loops = []
+    for subpath in path.split("z")[:-1]:
+        x, y, commands = re.fullmatch(r"M(\d+) (\d+)(.*)", subpath).groups()
+        corners = [(int(x), int(y))]
+        for command, length in re.findall(r"([hv])(-?\d+)", commands):
+            x, y = corners[-1]
+            if command == "h":
+                corners.append((x + int(length), y))
+            else:
+                corners.append((x, y + int(length)))
+        loops.append(corners)
+    return loops
+
+
+def parse_pdf_path(operators: str) -> list[list[tuple[int, int]]]:
+    """Read the corners of the sub-paths of a PDF path made of m, l and h operators"""
+    loops = []
+    for x, y, operator in re.findall(r"(\d+) (\d+) ([ml]) ", operators):
+        if operator == "m":
+            loops.append([])
+        loops[-1].append((int(x), int(y)))
+    return loops
+
+
+class TestBuildMatrix:
+    """Test class for building the module matrix"""
+
+    @pytest.mark.parametrize("version", [1, 7, 25, 40])
+    def test_matches_qrcode_library(self, version: int) -> None:
+        """Test that the matrix is identical to the one produced by the qrcode library, quiet zone included."""
+        qr = qrcode.QRCode(version=version, border=4)
+        qr.add_data("QRafty")
+        qr.make(fit=False)
+
+        matrix = build_matrix("QRafty", version=version, border=4)
+        assert matrix.dtype == bool
+        assert matrix.shape == (17 + 4 * version + 8,) * 2
+        assert np.array_equal(matrix, np.array(qr.get_matrix(), dtype=bool))
+
+    def test_smallest_version_is_used(self) -> None:
+        """Test that the smallest fitting version is selected when none is given."""
+        assert build_matrix("a", border=0).shape == (21, 21)
+
+    def test_data_overflow(self) -> None:
+        """Test that data not fitting in the requested version raises an error."""
+        with pytest.raises(DataOverflowError):
+            build_matrix("x" * 100, ErrorCorrectionLevel.H, version=1)
+
+
+class TestRenderers:
+    """Test class for the PNG and SVG rasterizers"""
+
+    @pytest.mark.parametrize("box_size", [1, 3, 10])
+    def test_png_pixels_match_matrix(self, box_size: int) -> None:
+        """Test that every module is rasterized as a box_size x box_size block."""
+        matrix = build_matrix("https://qrafty.app", version=3)
+        pixels, palette = decode_png(render_png(matrix, box_size, "#102030", "#FAFBFC"))
+
+        assert pixels.shape == (matrix.shape[0] * box_size,) * 2
+        assert np.array_equal(pixels, np.kron(matrix, np.ones((box_size,) * 2, bool)))
+        assert palette == bytes([0xFA, 0xFB, 0xFC, 0x10, 0x20, 0x30])
+
+    def test_horizontal_runs(self) -> None:
+        """Test that runs are detected at the edges and in the middle of rows."""
+        matrix = np.array(
+            [[1, 1, 0, 1], [0, 0, 0, 0], [0, 1, 1, 1]],
+            dtype=bool,
+        )
+        rows, starts, lengths = horizontal_runs(matrix)
+        assert rows.tolist() == [0, 0, 2]
+        assert starts.tolist() == [0, 3, 1]
+        assert lengths.tolist() == [2, 1, 3]
+
+    def test_svg_covers_all_dark_modules(self) -> None:
+        """Test that the SVG path draws exactly the dark modules of the matrix."""
+        matrix = build_matrix("https://qrafty.app", border=2)
+        svg = render_svg(matrix, 8, "#000000", "#FFFFFF").decode()
+
+        size = matrix.shape[0]
+        assert f'width="{size * 8}"' in svg
+        assert f'viewBox="0 0 {size} {size}"' in svg
+
+        path = svg.split(' d="')[1].split('"')[0]
+        assert np.array_equal(fill_loops(parse_svg_path(path), size), matrix)
+
+    def test_svg_is_written_in_pieces(self) -> None:
+        """Test that the pieces of the SVG document make up the whole document."""
+        matrix = build_matrix("https://qrafty.app", version=10)
+        pieces = list(iter_svg(matrix, 8, chunk_size=1024))
+        assert len(pieces) > 2
+        assert b"".join(pieces) == render_svg(matrix, 8)
+
+    def test_pdf_covers_all_dark_modules(self) -> None:
+        """Test that the PDF path draws exactly the dark modules of the matrix, over the background."""
+        matrix = build_matrix("https://qrafty.app", border=2)
+        operators = pdf_operators(matrix, "#FF0000", "#FFFFFF").decode()
+
+        size = matrix.shape[0]
+        assert operators.startswith(f"1 1 1 rg 0 0 {size} {size} re f 1 0 0 rg ")
+        assert operators.endswith("h f\n")
+        assert np.array_equal(fill_loops(parse_pdf_path(operators), size), matrix)
+
+
+class TestTraceOutlines:
+    """Test class for the tracing of the outlines of the dark modules"""
+
+    def test_regions_are_merged(self) -> None:
+        """Test that a region is drawn as one loop of its corners, and its hole as another one."""
+        matrix = np.ones((3, 3), dtype=bool)
+        matrix[1, 1] = False
+        x, y, starts = trace_outlines(matrix)
+        assert starts.tolist() == [0, 4, 8]
+        loops = [
+            list(zip(x[start:end].tolist(), y[start:end].tolist()))
+            for start, end in zip(starts, starts[1:])
+        ]
+        # Clockwise around the region, counterclockwise around the hole, y pointing down
+        assert loops == [
+            [(0, 0), (3, 0), (3, 3), (0, 3)],
+            [(2, 1), (1, 1), (1, 2), (2, 2)],
+        ]
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_random_matrices(self, seed: int) -> None:
+        """Test that the outlines of any matrix, with regions touching by a corner, fill its dark modules."""
+        matrix = np.random.default_rng(seed).random((16, 16)) < 0.5
+        x, y, starts = trace_outlines(matrix)
+        loops = [
+            list(zip(x[start:end].tolist(), y[start:end].tolist()))
+            for start, end in zip(starts, starts[1:])
+        ]
+        # Horizontal and vertical segments alternate, each loop starting with a horizontal one
+        assert all(len(corners) % 2 == 0 for corners in loops)
+        assert all(corners[0][1] == corners[1][1] for corners in loops)
+        assert np.array_equal(fill_loops(loops, 16), matrix)
@@ -0,0 +1,101 @@
+"""Testing the process pool backed render service"""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncGenerator
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import pytest_asyncio
+
+from src.qr.executor import RenderPoolSaturatedError, RenderService
+from src.qr.schemas import ImageFormat, QRRenderParams
+
+
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def single_worker_service() -> AsyncGenerator[RenderService, None]:
+    """
+    Fixture which starts a render service with a single process and no queue, stopping it after the test
+    """
+    service = RenderService(max_workers=1, max_queue=0)
+    service.start()
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+class TestRenderService:
+    """Test class for the render service, testing the dispatching and the back-pressure"""
+
+    async def test_render(self, single_worker_service: RenderService) -> None:
+        """Test that renders run in the pool and return the encoded image."""
+        rendered = await single_worker_service.render(
+            QRRenderParams(data="QRafty", format=ImageFormat.SVG)
+        )
+        assert rendered.media_type == "image/svg+xml"
+        assert rendered.content.startswith(b"<?xml")
+        assert single_worker_service.in_flight == 0
+
+    async def test_exceptions_are_propagated(
+        self, single_worker_service: RenderService
+    ) -> None:
+        """Test that an exception raised in a worker is raised to the caller and releases its slot."""
+        with pytest.raises(ValueError):
+            await single_worker_service.run(int, "not a number")
+        assert single_worker_service.in_flight == 0
+
+    async def test_saturated(self, single_worker_service: RenderService) -> None:
+        """Test that jobs are rejected once the pool holds as many jobs as it can queue."""
+        slow_job = asyncio.create_task(single_worker_service.run(time.sleep, 0.5))
+        await asyncio.sleep(0)  # let the slow job be submitted
+        assert single_worker_service.in_flight == 1
+
+        with pytest.raises(RenderPoolSaturatedError):
+            await single_worker_service.run(pow, 2, 3)
+
+        await slow_job
+        assert await single_worker_service.run(pow, 2, 3) == 8
+
+    async def test_wait_for_free_slot(
+        self, single_worker_service: RenderService
+    ) -> None:
+        """Test that waiting jobs are submitted once a slot is released instead of being rejected."""
+        slow_job = asyncio.create_task(single_worker_service.run(time.sleep, 0.3))
+        await asyncio.sleep(0)
+
+        assert await single_worker_service.run(pow, 2, 3, wait=True) == 8
+        assert slow_job.done()
+        assert single_worker_service.in_flight == 0
+
+    async def test_slot_held_until_job_completes(
+        self, single_worker_service: RenderService
+    ) -> None:
+        """Test that a job whose caller went away keeps its slot until it finishes."""
+        slow_job = asyncio.create_task(single_worker_service.run(time.sleep, 0.5))
+        await asyncio.sleep(0.1)
+        slow_job.cancel()
+        await asyncio.sleep(0)
+        assert single_worker_service.in_flight == 1
+
+        await asyncio.sleep(1)
+        assert single_worker_service.in_flight == 0
+
+    async def test_broken_pool_is_replaced(
+        self, single_worker_service: RenderService
+    ) -> None:
+        """Test that the pool is replaced after a worker died abruptly."""
+        with pytest.raises(BrokenProcessPool):
+            await single_worker_service.run(os._exit, 1)
+        assert await single_worker_service.run(pow, 2, 3) == 8
+
+    async def test_not_started(self) -> None:
+        """Test that using a service which is not started raises an error."""
+        with pytest.raises(RuntimeError):
+            await RenderService(max_workers=1).run(pow, 2, 3)
+
+    async def test_default_workers(self) -> None:
+        """Test that the pool defaults to one process per CPU."""
+        service = RenderService(max_queue=4)
+        assert service.max_workers >= 1
+        assert service.capacity == service.max_workers + 4
@@ -0,0 +1,119 @@
+"""Testing the streaming PDF writer and the PDF sheets"""
+
+import re
+import zlib
+
+import pytest
+
+from src.qr.executor import RenderService
+from src.qr.pdf import StreamingPDFWriter, pdf_string
+from src.qr.schemas import PageSize, QRRenderParams
+from src.qr.sheets import PAGE_SIZES, SHEET_MARGIN, SheetLayout, stream_pdf_sheet
+
+
+def read_pdf(document: bytes) -> list[bytes]:
+    """
+    Check the structure of a PDF document written by the writer: every entry of the cross-reference
+    table points to its object, and the page tree lists the pages in order
+
+    Args:
+        document (bytes): The PDF document
+
+    Returns:
+        list[bytes]: The decompressed content stream of every page
+    """
+    assert document.startswith(b"%PDF-1.4\n") and document.endswith(b"%%EOF\n")
+    xref = int(re.search(rb"startxref\n(\d+)\n", document)[1])
+    assert document[xref:].startswith(b"xref\n0 ")
+
+    size = int(re.search(rb"/Size (\d+)", document)[1])
+    entries = document[xref:].split(b"\n", 3)[3][: 20 * (size - 1)]
+    objects = {}
+    for number in range(1, size):
+        offset = int(entries[20 * (number - 1) : 20 * (number - 1) + 10])
+        assert document[offset:].startswith(b"%d 0 obj\n" % number)
+        objects[number] = document[offset : document.index(b"endobj", offset)]
+
+    (kids,) = re.search(rb"/Kids \[([^\]]*)\]", objects[2]).groups()
+    contents = []
+    for page in re.findall(rb"(\d+) 0 R", kids):
+        content = int(re.search(rb"/Contents (\d+) 0 R", objects[int(page)])[1])
+        stream = objects[content].split(b"stream\n", 1)[1].rsplit(b"\nendstream", 1)[0]
+        contents.append(zlib.decompress(stream))
+    return contents
+
+
+class TestStreamingPDFWriter:
+    """Test class for the streaming PDF writer"""
+
+    def test_pages(self) -> None:
+        """Test that the pages are written in order, with valid offsets in the cross-reference table."""
+        writer = StreamingPDFWriter()
+        parts = [writer.start()]
+        parts.extend(writer.add_page(100, 200, b"page %d" % i) for i in range(3))
+        assert writer.pages == 3
+        parts.append(writer.close())
+
+        document = b"".join(parts)
+        assert read_pdf(document) == [b"page 0", b"page 1", b"page 2"]
+        assert b"/MediaBox [0 0 100.00 200.00]" in document
+
+    def test_pdf_string(self) -> None:
+        """Test that strings are escaped and characters outside of Latin-1 replaced."""
+        assert pdf_string("a (b) \\ é €\n") == b"(a \\(b\\) \\\\ \xe9 ? )"
+
+
+class TestSheetLayout:
+    """Test class for the layout of the sheets"""
+
+    @pytest.mark.parametrize("page_size", list(PageSize))
+    @pytest.mark.parametrize("columns", [1, 3, 8])
+    def test_grid_fits_the_page(self, page_size: PageSize, columns: int) -> None:
+        """Test that every cell of the grid lies within the margins of the page."""
+        layout = SheetLayout.of(page_size, columns)
+        assert (layout.width, layout.height) == PAGE_SIZES[page_size]
+
+        left, top = layout.cell(0)
+        assert (left, top) == (SHEET_MARGIN, layout.height - SHEET_MARGIN)
+        right, bottom = layout.cell(layout.per_page - 1)
+        assert right + layout.side == pytest.approx(layout.width - SHEET_MARGIN)
+        assert bottom - layout.side > SHEET_MARGIN
+
+
+@pytest.mark.asyncio
+class TestStreamPDFSheet:
+    """Test class for the streaming of PDF sheets"""
+
+    async def test_sheet(self, batch_render_service: RenderService) -> None:
+        """Test that the codes are laid out in the order of the rows, page after page, then the errors."""
+        layout = SheetLayout.of(PageSize.A4, 8)
+        rows = [
+            (i, QRRenderParams(data=f"row {i}")) for i in range(1, layout.per_page + 3)
+        ]
+        rows.insert(4, (100, "Invalid JSON"))
+        rows.append((200, QRRenderParams(data="x" * 100, version=1)))
+
+        parts = [
+            part
+            async for part in stream_pdf_sheet(
+                iter(rows), batch_render_service, layout, chunk_size=5
+            )
+        ]
+        assert len(parts) == 5  # start, two pages of codes, errors, close
+
+        codes, rest, errors = read_pdf(b"".join(parts))
+        captions = re.findall(rb"\(Row (\d+)\) Tj", codes + rest)
+        assert [int(row) for row in captions] == list(range(1, layout.per_page + 3))
+        assert codes.count(b" re f ") == layout.per_page
+        assert b"(Row 100: Invalid JSON)" in errors
+        assert b"(Row 200: Data is too large" in errors
+
+    async def test_empty_sheet(self, batch_render_service: RenderService) -> None:
+        """Test that a sheet without any row still has a blank page."""
+        parts = [
+            part
+            async for part in stream_pdf_sheet(
+                iter([]), batch_render_service, SheetLayout.of(PageSize.LETTER)
+            )
+        ]
+        assert read_pdf(b"".join(parts)) == [b""]
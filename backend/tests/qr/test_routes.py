@@ -0,0 +1,576 @@
+"""Testing QR code generation endpoints"""
+
+import base64
+import hashlib
+import io
+import zipfile
+
+import pytest
+
+from pytest import MonkeyPatch  # imported for type hinting
+from typing import Dict
+
+from fastapi import status
+from httpx import AsyncClient, Response
+from PIL import Image
+
+from src.assets.stores import FilesystemAssetStore
+from src.qr.cache import RenderCache
+from src.qr.dependencies import render_service
+from src.qr.executor import RenderPoolSaturatedError
+from src.qr.schemas import QRRenderParams
+
+
+@pytest.mark.asyncio
+class TestRender:
+    """Test class for the render endpoint, /qr/render,
+    testing various scenarios and edge cases.
+    """
+
+    async def test_render_png(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint with the default PNG output."""
+        print("Testing the render endpoint with a PNG output")
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "image/png"
+        assert response.content.startswith(b"\x89PNG\r\n\x1a\n")
+        print("Test passed successfully!")
+
+    async def test_render_svg(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint with an SVG output."""
+        print("Testing the render endpoint with an SVG output")
+        base_render_params["format"] = "svg"
+        base_render_params["fill_color"] = "#123456"
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "image/svg+xml"
+        assert b'fill="#123456"' in response.content
+        print("Test passed successfully!")
+
+    async def test_render_pdf(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint with a PDF output, a module measuring box_size points."""
+        print("Testing the render endpoint with a PDF output")
+        base_render_params["format"] = "pdf"
+        base_render_params["version"] = "2"
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF-")
+        # 25 modules and a quiet zone of 4 on each side, 4 points each
+        assert b"/MediaBox [0 0 132.00 132.00]" in response.content
+        print("Test passed successfully!")
+
+    async def test_render_styled_pdf(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test that styled renders are refused in PDF."""
+        print("Testing the render endpoint with a styled PDF output")
+        base_render_params["format"] = "pdf"
+        base_render_params["module_shape"] = "dot"
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert "only available in PNG and SVG" in response.json()["detail"][0]["msg"]
+        print("Test passed successfully!")
+
+    async def test_render_missing_data(self, client: AsyncClient) -> None:
+        """Test the render endpoint when the data is missing."""
+        print("Testing the render endpoint with missing data")
+        response: Response = await client.get("/qr/render")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"][0]["msg"] == "Field required"
+        print("Test passed successfully!")
+
+    async def test_render_invalid_color(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint when a color is not a hex color."""
+        print("Testing the render endpoint with an invalid color")
+        base_render_params["fill_color"] = "red"
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"][0]["loc"] == ["fill_color"]
+        print("Test passed successfully!")
+
+    async def test_render_invalid_version(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint when the version is out of range."""
+        print("Testing the render endpoint with an invalid version")
+        base_render_params["version"] = "41"
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"][0]["loc"] == ["version"]
+        print("Test passed successfully!")
+
+    async def test_render_data_overflow(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint when the data does not fit in the requested version."""
+        print("Testing the render endpoint with data too large for the version")
+        base_render_params["data"] = "x" * 100
+        base_render_params["version"] = "1"
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert (
+            response.json()["detail"]
+            == "Data is too large for the requested QR code version"
+        )
+        print("Test passed successfully!")
+
+    async def test_render_pool_saturated(
+        self,
+        client: AsyncClient,
+        render_cache: RenderCache,
+        base_render_params: Dict[str, str],
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        """Test the render endpoint when the render pool cannot take more jobs."""
+        print("Testing the render endpoint with a saturated render pool")
+
+        async def saturated_render(params: QRRenderParams) -> None:
+            raise RenderPoolSaturatedError()
+
+        monkeypatch.setattr(render_service, "render", saturated_render)
+
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"] == "1"
+        assert (
+            response.json()["detail"]
+            == "Too many renders in progress, please retry later"
+        )
+        print("Test passed successfully!")
+
+    async def test_render_styled(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint with a style given in the query string."""
+        print("Testing the render endpoint with a styled render")
+        base_render_params["module_shape"] = "rounded"
+        base_render_params["eye_shape"] = "circle"
+        base_render_params["gradient"] = "radial"
+        base_render_params["gradient_color"] = "#0000FF"
+        response: Response = await client.get("/qr/render", params=base_render_params)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "image/png"
+        # Styled renders are RGB images: color type 2 in the IHDR chunk
+        assert response.content[25] == 2
+        print("Test passed successfully!")
+
+    async def test_render_with_logo(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint with a logo sent in a JSON body."""
+        print("Testing the render endpoint with a logo")
+        buffer = io.BytesIO()
+        Image.new("RGB", (16, 16), "red").save(buffer, "PNG")
+        logo = base64.b64encode(buffer.getvalue()).decode()
+        body = {**base_render_params, "error_correction": "H", "logo": logo}
+
+        response: Response = await client.post("/qr/render", json=body)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "image/png"
+
+        body["format"] = "svg"
+        response = await client.post("/qr/render", json=body)
+        assert response.status_code == status.HTTP_200_OK
+        assert f"data:image/png;base64,{logo}".encode() in response.content
+        print("Test passed successfully!")
+
+    async def test_render_unreadable_logo(
+        self, client: AsyncClient, base_render_params: Dict[str, str]
+    ) -> None:
+        """Test the render endpoint with a logo which is not an image."""
+        print("Testing the render endpoint with an unreadable logo")
+        body = {
+            **base_render_params,
+            "error_correction": "Q",
+            "logo": base64.b64encode(b"not an image").decode(),
+        }
+        response: Response = await client.post("/qr/render", json=body)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == (
+            "The logo is not a readable PNG, JPEG or WebP image"
+        )
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestRenderCaching:
+    """Test class for the caching and conditional requests of the render endpoint, /qr/render"""
+
+    async def test_render_cache_hit(
+        self,
+        client: AsyncClient,
+        render_cache: RenderCache,
+        base_render_params: Dict[str, str],
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        """Test that a repeated render is answered from the cache without rendering."""
+        print("Testing the render endpoint with a repeated render")
+        first: Response = await client.get("/qr/render", params=base_render_params)
+        assert first.headers["x-cache"] == "MISS"
+
+        async def fail_render(params: QRRenderParams) -> None:
+            raise AssertionError("Cache hits should not render")
+
+        monkeypatch.setattr(render_service, "render", fail_render)
+
+        second: Response = await client.get("/qr/render", params=base_render_params)
+        assert second.status_code == status.HTTP_200_OK
+        assert second.headers["x-cache"] == "HIT"
+        assert second.content == first.content
+        assert second.headers["etag"] == first.headers["etag"]
+        assert render_cache.stats().hits == 1
+        assert render_cache.stats().misses == 1
+        print("Test passed successfully!")
+
+    async def test_render_not_modified(
+        self,
+        client: AsyncClient,
+        render_cache: RenderCache,
+        base_render_params: Dict[str, str],
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        """Test that a matching If-None-Match is answered with a 304, without rendering."""
+        print("Testing the render endpoint with a matching If-None-Match")
+        etag = (await client.get("/qr/render", params=base_render_params)).headers[
+            "etag"
+        ]
+
+        async def fail_render(params: QRRenderParams) -> None:
+            raise AssertionError("Conditional requests should not render")
+
+        monkeypatch.setattr(render_service, "render", fail_render)
+
+        response: Response = await client.get(
+            "/qr/render", params=base_render_params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.headers["etag"] == etag
+        assert response.content == b""
+        assert render_cache.stats().hits == 0
+        print("Test passed successfully!")
+
+    async def test_render_etag_changes_with_params(
+        self,
+        client: AsyncClient,
+        render_cache: RenderCache,
+        base_render_params: Dict[str, str],
+    ) -> None:
+        """Test that a stale If-None-Match gets the new render."""
+        print("Testing the render endpoint with a stale If-None-Match")
+        etag = (await client.get("/qr/render", params=base_render_params)).headers[
+            "etag"
+        ]
+        base_render_params["format"] = "svg"
+        response: Response = await client.get(
+            "/qr/render", params=base_render_params, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["etag"] != etag
+        print("Test passed successfully!")
+
+    async def test_cache_stats_superuser(
+        self,
+        client: AsyncClient,
+        render_cache: RenderCache,
+        as_superuser: None,
+        base_render_params: Dict[str, str],
+    ) -> None:
+        """Test that superusers can read the cache counters."""
+        print("Testing the cache stats endpoint as a superuser")
+        await client.get("/qr/render", params=base_render_params)
+        await client.get("/qr/render", params=base_render_params)
+
+        response: Response = await client.get("/qr/cache/stats")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["hits"] == 1
+        assert response.json()["misses"] == 1
+        assert response.json()["entries"] == 1
+        print("Test passed successfully!")
+
+    async def test_cache_stats_unauthenticated(self, client: AsyncClient) -> None:
+        """Test that the cache counters are not exposed to anonymous users."""
+        print("Testing the cache stats endpoint without authentication")
+        response: Response = await client.get("/qr/cache/stats")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestBatch:
+    """Test class for the batch endpoint, /qr/batch, testing the supported formats and the rejections"""
+
+    async def test_batch_ndjson(
+        self, client: AsyncClient, as_active_user: None
+    ) -> None:
+        """Test a batch of NDJSON rows, returned as a ZIP archive listing the invalid rows."""
+        print("Testing the batch endpoint with NDJSON rows")
+        body = '{"data": "a"}\n{"data": "b", "format": "svg"}\n{"data": "c", "box_size": 0}\n'
+        response: Response = await client.post(
+            "/qr/batch",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/zip"
+        assert "qr-batch.zip" in response.headers["content-disposition"]
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            assert sorted(zf.namelist()) == ["000001.png", "000002.svg", "errors.csv"]
+            assert zf.read("errors.csv").decode().startswith("row,error\r\n3,box_size:")
+        print("Test passed successfully!")
+
+    async def test_batch_csv(self, client: AsyncClient, as_active_user: None) -> None:
+        """Test a batch of CSV rows."""
+        print("Testing the batch endpoint with CSV rows")
+        response: Response = await client.post(
+            "/qr/batch",
+            content="data,error_correction\r\na,H\r\nb,\r\n",
+            headers={"Content-Type": "text/csv; charset=utf-8"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            assert sorted(zf.namelist()) == ["000001.png", "000002.png"]
+        print("Test passed successfully!")
+
+    async def test_batch_unsupported_media_type(
+        self, client: AsyncClient, as_active_user: None
+    ) -> None:
+        """Test that bodies which are neither NDJSON nor CSV are rejected."""
+        response: Response = await client.post("/qr/batch", json=[{"data": "a"}])
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        print("Test passed successfully!")
+
+    async def test_batch_too_large(
+        self, client: AsyncClient, as_active_user: None, monkeypatch: MonkeyPatch
+    ) -> None:
+        """Test that bodies larger than the limit are rejected."""
+        monkeypatch.setattr("src.qr.router.QR_BATCH_MAX_BODY_BYTES", 16)
+        response: Response = await client.post(
+            "/qr/batch",
+            content='{"data": "a"}\n{"data": "b"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        print("Test passed successfully!")
+
+    async def test_sheet(self, client: AsyncClient, as_active_user: None) -> None:
+        """Test a PDF sheet of CSV rows, laid out on Letter pages."""
+        print("Testing the sheet endpoint with CSV rows")
+        response: Response = await client.post(
+            "/qr/sheet",
+            params={"page_size": "letter", "columns": 2},
+            content="data,version\r\na,\r\nb,0\r\nc,\r\n",
+            headers={"Content-Type": "text/csv"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/pdf"
+        assert "qr-sheet.pdf" in response.headers["content-disposition"]
+        assert response.content.startswith(b"%PDF-")
+        # A page of codes and a page listing the invalid row
+        assert b"/Count 2" in response.content
+        assert response.content.count(b"/MediaBox [0 0 612.00 792.00]") == 2
+        print("Test passed successfully!")
+
+    async def test_sheet_invalid_columns(
+        self, client: AsyncClient, as_active_user: None
+    ) -> None:
+        """Test that a sheet with too many columns is rejected."""
+        response: Response = await client.post(
+            "/qr/sheet",
+            params={"columns": 100},
+            content='{"data": "a"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert response.json()["detail"][0]["loc"] == ["query", "columns"]
+        print("Test passed successfully!")
+
+    async def test_batch_unauthenticated(self, client: AsyncClient) -> None:
+        """Test that batches are restricted to authenticated users."""
+        response: Response = await client.post(
+            "/qr/batch",
+            content='{"data": "a"}\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        print("Test passed successfully!")
+
+
+def make_logo() -> bytes:
+    """Encode a small PNG logo"""
+    buffer = io.BytesIO()
+    Image.new("RGB", (16, 16), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.asyncio
+class TestAssets:
+    """Test class for the renders stored as assets, /qr/assets, and the logo uploads, /qr/logos"""
+
+    async def test_store_render(
+        self,
+        client: AsyncClient,
+        as_active_user: None,
+        render_cache: RenderCache,
+        asset_store: FilesystemAssetStore,
+        base_render_params: Dict[str, str],
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        """Test that a render is stored once, then found again from its parameters without rendering."""
+        print("Testing the render asset endpoint")
+        response: Response = await client.post("/qr/assets", json=base_render_params)
+        assert response.status_code == status.HTTP_201_CREATED
+        asset = response.json()
+        content = (await client.get(asset["url"])).content
+        assert content.startswith(b"\x89PNG\r\n\x1a\n")
+        assert asset["key"] == f"{hashlib.sha256(content).hexdigest()}.png"
+        assert asset["url"] == f"/assets/{asset['key']}"
+        assert asset["media_type"] == "image/png"
+        assert asset["size"] == len(content)
+        # Rendered through the render cache, the GET endpoint answers from it
+        rendered = await client.get("/qr/render", params=base_render_params)
+        assert rendered.headers["x-cache"] == "HIT"
+        assert rendered.content == content
+
+        async def fail_render(params: QRRenderParams) -> None:
+            raise AssertionError("Stored renders should not render")
+
+        monkeypatch.setattr(render_service, "render", fail_render)
+        stats = render_cache.stats()
+        response = await client.post("/qr/assets", json=base_render_params)
+        assert response.json() == asset
+        assert render_cache.stats() == stats
+        print("Test passed successfully!")
+
+    async def test_store_render_unauthenticated(self, client: AsyncClient) -> None:
+        """Test that stored renders and logo uploads are restricted to authenticated users."""
+        response: Response = await client.post("/qr/assets", json={"data": "a"})
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        response = await client.post(
+            "/qr/logos", content=make_logo(), headers={"Content-Type": "image/png"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        print("Test passed successfully!")
+
+    async def test_upload_logo(
+        self,
+        client: AsyncClient,
+        as_active_user: None,
+        render_cache: RenderCache,
+        asset_store: FilesystemAssetStore,
+        base_render_params: Dict[str, str],
+    ) -> None:
+        """Test that an uploaded logo is drawn by its key, as the same logo sent along."""
+        print("Testing the logo upload endpoint")
+        logo = make_logo()
+
+        async def body():
+            for start in range(0, len(logo), 7):
+                yield logo[start : start + 7]
+
+        response: Response = await client.post(
+            "/qr/logos", content=body(), headers={"Content-Type": "image/png"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        key = response.json()["key"]
+        assert key == f"{hashlib.sha256(logo).hexdigest()}.png"
+        assert await asset_store.read(key) == logo
+
+        params = {**base_render_params, "error_correction": "H", "format": "svg"}
+        uploaded = await client.get("/qr/render", params={**params, "logo_key": key})
+        assert uploaded.status_code == status.HTTP_200_OK
+        encoded = base64.b64encode(logo).decode()
+        assert f"data:image/png;base64,{encoded}".encode() in uploaded.content
+
+        sent = await client.post("/qr/render", json={**params, "logo": encoded})
+        assert sent.headers["x-cache"] == "HIT"
+        assert sent.headers["etag"] == uploaded.headers["etag"]
+        print("Test passed successfully!")
+
+    async def test_unknown_logo_key(
+        self,
+        client: AsyncClient,
+        render_cache: RenderCache,
+        asset_store: FilesystemAssetStore,
+        base_render_params: Dict[str, str],
+    ) -> None:
+        """Test that renders of a logo which was not uploaded are rejected."""
+        params = {
+            **base_render_params,
+            "error_correction": "Q",
+            "logo_key": "0" * 64 + ".png",
+        }
+        response: Response = await client.get("/qr/render", params=params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"] == "No logo was uploaded with this key"
+        print("Test passed successfully!")
+
+    @pytest.mark.parametrize(
+        "content_type, content",
+        [
+            ("image/gif", b"GIF89a" + bytes(16)),
+            ("image/png", b"\xff\xd8\xff" + bytes(16)),
+            ("image/webp", b"RIFF\0\0\0\0WEBM" + bytes(16)),
+            ("image/jpeg", b"\xff\xd8"),
+        ],
+    )
+    async def test_upload_logo_unsupported(
+        self,
+        client: AsyncClient,
+        as_active_user: None,
+        asset_store: FilesystemAssetStore,
+        content_type: str,
+        content: bytes,
+    ) -> None:
+        """Test that uploads which are not images of their media type are rejected, and not stored."""
+        response: Response = await client.post(
+            "/qr/logos", content=content, headers={"Content-Type": content_type}
+        )
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+        assert not (asset_store.root / "objects").exists()
+        print("Test passed successfully!")
+
+    async def test_upload_webp_logo(
+        self,
+        client: AsyncClient,
+        as_active_user: None,
+        asset_store: FilesystemAssetStore,
+    ) -> None:
+        """Test that WebP logos are recognized around the size in their header."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (16, 16), "red").save(buffer, "WEBP")
+        response: Response = await client.post(
+            "/qr/logos",
+            content=buffer.getvalue(),
+            headers={"Content-Type": "image/webp; charset=binary"},
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["key"].endswith(".webp")
+        print("Test passed successfully!")
+
+    async def test_upload_logo_too_large(
+        self,
+        client: AsyncClient,
+        as_active_user: None,
+        asset_store: FilesystemAssetStore,
+        monkeypatch: MonkeyPatch,
+    ) -> None:
+        """Test that logos larger than the limit are rejected, and not stored."""
+        monkeypatch.setattr("src.qr.router.QR_LOGO_UPLOAD_MAX_BYTES", 32)
+        response: Response = await client.post(
+            "/qr/logos", content=make_logo(), headers={"Content-Type": "image/png"}
+        )
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert not (asset_store.root / "objects").exists()
+        assert list((asset_store.root / "tmp").iterdir()) == []
+        print("Test passed successfully!")
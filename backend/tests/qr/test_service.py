@@ -0,0 +1,83 @@
+"""Testing the QR code generation business logic"""
+
+import pytest
+
+from src.qr.schemas import ImageFormat, QRRenderParams
+from src.qr.service import (
+    DATA_OVERFLOW_MESSAGE,
+    RenderedQR,
+    VectorQR,
+    render_batch,
+    render_qr,
+    render_sheet_batch,
+)
+
+
+class TestRenderQR:
+    """Test class for the render orchestration"""
+
+    @pytest.mark.parametrize(
+        "format, media_type, signature",
+        [
+            (ImageFormat.PNG, "image/png", b"\x89PNG"),
+            (ImageFormat.SVG, "image/svg+xml", b"<?xml"),
+            (ImageFormat.PDF, "application/pdf", b"%PDF-"),
+        ],
+    )
+    def test_render_qr(
+        self, format: ImageFormat, media_type: str, signature: bytes
+    ) -> None:
+        """Test that the requested format is rendered with its media type."""
+        rendered = render_qr(QRRenderParams(data="QRafty", format=format))
+        assert rendered.media_type == media_type
+        assert rendered.content.startswith(signature)
+
+    @pytest.mark.parametrize("format", [ImageFormat.PNG, ImageFormat.SVG])
+    def test_render_styled(self, format: ImageFormat) -> None:
+        """Test that styled parameters go through the style pipeline."""
+        plain = render_qr(QRRenderParams(data="QRafty", format=format))
+        styled = render_qr(
+            QRRenderParams(data="QRafty", format=format, module_shape="dot")
+        )
+        assert styled.media_type == plain.media_type
+        assert styled.content != plain.content
+
+
+class TestRenderBatch:
+    """Test class for the rendering of batch chunks"""
+
+    def test_render_batch(self) -> None:
+        """Test that every row is rendered, rows overflowing their version being reported."""
+        results = render_batch(
+            [
+                (1, QRRenderParams(data="QRafty")),
+                (2, QRRenderParams(data="x" * 100, version=1)),
+                (
+                    3,
+                    QRRenderParams(
+                        data="QRafty", error_correction="Q", logo="bG9nbw=="
+                    ),
+                ),
+            ]
+        )
+        assert results[0][0] == 1 and isinstance(results[0][1], RenderedQR)
+        assert results[1] == (2, DATA_OVERFLOW_MESSAGE)
+        assert results[2] == (3, "The logo is not a readable PNG, JPEG or WebP image")
+
+
+class TestRenderSheetBatch:
+    """Test class for the drawing of PDF sheet chunks"""
+
+    def test_render_sheet_batch(self) -> None:
+        """Test that every row is drawn, rows overflowing their version or styled being reported."""
+        results = render_sheet_batch(
+            [
+                (1, QRRenderParams(data="QRafty", border=2)),
+                (2, QRRenderParams(data="x" * 100, version=1)),
+                (3, QRRenderParams(data="QRafty", module_shape="dot")),
+            ]
+        )
+        assert results[0] == (1, VectorQR(25, results[0][1].operators))
+        assert results[0][1].operators.startswith(b"1 1 1 rg 0 0 25 25 re f ")
+        assert results[1] == (2, DATA_OVERFLOW_MESSAGE)
+        assert results[2] == (3, "Styled renders are not available in PDF sheets")
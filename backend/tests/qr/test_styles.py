@@ -0,0 +1,306 @@
+"""Testing the styled QR code rendering"""
+
+import base64
+import io
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+from PIL import Image
+from pydantic import ValidationError
+
+from src.qr.engine import build_matrix, render_png
+from src.qr.schemas import (
+    EyeShape,
+    GradientKind,
+    ImageFormat,
+    ModuleShape,
+    QRRenderParams,
+)
+from src.qr.service import StyleError
+from src.qr.styles import (
+    DOWN,
+    LEFT,
+    RIGHT,
+    UP,
+    RoundedRect,
+    compile_canvas,
+    compile_png_style,
+    compile_svg_style,
+    eye_origins,
+    logo_area,
+    neighbor_codes,
+    rasterize,
+    render_styled_png,
+    render_styled_svg,
+    shape_of_module,
+)
+
+SVG_NAMESPACE = {"svg": "http://www.w3.org/2000/svg"}
+
+
+def make_logo(color: tuple[int, int, int, int] = (255, 0, 0, 255)) -> bytes:
+    """
+    Encode a plain PNG logo
+
+    Args:
+        color (tuple[int, int, int, int], optional): RGBA color of the logo. Defaults to opaque red.
+
+    Returns:
+        bytes: The encoded logo
+    """
+    buffer = io.BytesIO()
+    Image.new("RGBA", (32, 32), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def render(params: QRRenderParams) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Build the module matrix of the parameters and render it through the PNG style pipeline
+
+    Args:
+        params (QRRenderParams): Render parameters
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The module matrix and the decoded RGB pixels
+    """
+    matrix = build_matrix(
+        params.data, params.error_correction, params.version, params.border
+    )
+    content = render_styled_png(matrix, params)
+    return matrix, np.asarray(Image.open(io.BytesIO(content)).convert("RGB"))
+
+
+class TestShapes:
+    """Test class for the shapes of the styles and their rasterization"""
+
+    def test_rounded_rect_path(self) -> None:
+        """Test that square corners are drawn as lines and rounded ones as arcs."""
+        assert RoundedRect(0, 0, 1, 1).path(2, 3) == "M2 3H3V4H2V3Z"
+        assert (
+            RoundedRect(0, 0, 1, 1, (0.5, 0, 0, 0)).path()
+            == "M0.5 0H1V1H0V0.5A0.5 0.5 0 0 1 0.5 0Z"
+        )
+
+    def test_rounded_corners_follow_neighbors(self) -> None:
+        """Test that only the corners away from the dark neighbors of a rounded module are rounded."""
+        (rect,) = shape_of_module(ModuleShape.ROUNDED, 0)
+        assert rect.radii == (0.5, 0.5, 0.5, 0.5)
+        (rect,) = shape_of_module(ModuleShape.ROUNDED, RIGHT)
+        assert rect.radii == (0.5, 0, 0, 0.5)
+        (rect,) = shape_of_module(ModuleShape.ROUNDED, UP | DOWN)
+        assert rect.radii == (0, 0, 0, 0)
+
+    def test_rasterize(self) -> None:
+        """Test that stamps cover the inside of the shapes, anti-aliased on their edges."""
+        square = rasterize(shape_of_module(ModuleShape.SQUARE, 0), 1, 8)
+        assert (square == 255).all()
+
+        dot = rasterize(shape_of_module(ModuleShape.DOT, 0), 1, 8)
+        assert dot[0, 0] == 0 and dot[4, 4] == 255
+        assert 0 < dot[1, 2] < 255
+
+        eye = rasterize((RoundedRect(0, 0, 3, 3), RoundedRect(1, 1, 2, 2)), 3, 2)
+        assert eye[2:4, 2:4].sum() == 0 and (eye[:2] == 255).all()
+
+    def test_neighbor_codes(self) -> None:
+        """Test that every module is coded with its dark neighbors."""
+        dark = np.array([[0, 1, 0], [1, 1, 1], [0, 1, 0]], dtype=bool)
+        codes = neighbor_codes(dark)
+        assert codes[1, 1] == UP | RIGHT | DOWN | LEFT
+        assert codes[0, 1] == DOWN
+        assert codes[0, 0] == RIGHT | DOWN
+
+    def test_styles_are_compiled_once(self) -> None:
+        """Test that compiled styles are reused across renders."""
+        assert compile_png_style(
+            ModuleShape.DOT, EyeShape.CIRCLE, 6
+        ) is compile_png_style(ModuleShape.DOT, EyeShape.CIRCLE, 6)
+        assert compile_svg_style(ModuleShape.DOT, EyeShape.CIRCLE) is compile_svg_style(
+            ModuleShape.DOT, EyeShape.CIRCLE
+        )
+
+    def test_logo_area(self) -> None:
+        """Test that the logo is centered and hides the modules it overlaps."""
+        area = logo_area(29, 4, 0.2)
+        assert area.start == pytest.approx(12.4)
+        assert area.side == pytest.approx(4.2)
+        assert area.hidden == slice(12, 17)
+
+
+class TestRenderStyledPNG:
+    """Test class for the PNG renders of the style pipeline"""
+
+    def test_square_style_matches_plain_render(self) -> None:
+        """Test that the square style draws the same pixels as the plain 1-bit rasterization."""
+        params = QRRenderParams(data="QRafty", box_size=3, eye_color="#000000")
+        matrix, pixels = render(params)
+
+        plain = Image.open(io.BytesIO(render_png(matrix, 3))).convert("RGB")
+        assert (pixels == np.asarray(plain)).all()
+
+    def test_eye_color(self) -> None:
+        """Test that the finder patterns are painted with the eye color."""
+        params = QRRenderParams(
+            data="QRafty", box_size=4, eye_shape=EyeShape.ROUNDED, eye_color="#FF0000"
+        )
+        matrix, pixels = render(params)
+
+        for row, column in eye_origins(matrix.shape[0], params.border):
+            # Middle of the center of the eye
+            assert tuple(pixels[(row + 3) * 4 + 2, (column + 3) * 4 + 2]) == (255, 0, 0)
+        assert set(map(tuple, pixels.reshape(-1, 3))) > {(255, 0, 0), (0, 0, 0)}
+
+    def test_gradient(self) -> None:
+        """Test that the gradient goes from the fill color to the gradient color across the code."""
+        params = QRRenderParams(
+            data="QRafty",
+            box_size=4,
+            gradient=GradientKind.DIAGONAL,
+            fill_color="#000000",
+            gradient_color="#0000FF",
+        )
+        matrix, pixels = render(params)
+        canvas = compile_canvas(
+            "#000000", GradientKind.DIAGONAL, "#0000FF", None, matrix.shape[0], 4, 4
+        )
+        start, end = 4 * 4, canvas.shape[0] - 4 * 4 - 1
+        assert tuple(canvas[start, start]) == (0, 0, 2)
+        assert tuple(canvas[end, end]) == (0, 0, 253)
+        # The top left corner of the code belongs to an eye, hence is dark
+        assert tuple(pixels[start, start]) == (0, 0, 2)
+
+    def test_logo(self) -> None:
+        """Test that the logo is drawn at the center over a clear area."""
+        params = QRRenderParams(
+            data="QRafty",
+            box_size=4,
+            error_correction="H",
+            module_shape=ModuleShape.DOT,
+            logo=base64.b64encode(make_logo()),
+        )
+        matrix, pixels = render(params)
+        center = pixels.shape[0] // 2
+        assert tuple(pixels[center, center]) == (255, 0, 0)
+
+    def test_too_large(self) -> None:
+        """Test that styled renders larger than the limit are refused."""
+        params = QRRenderParams(
+            data="QRafty", version=40, box_size=20, eye_color="#000000"
+        )
+        with pytest.raises(StyleError):
+            render(params)
+
+    def test_unreadable_logo(self) -> None:
+        """Test that a logo which is not an image is refused."""
+        params = QRRenderParams(
+            data="QRafty", error_correction="Q", logo=base64.b64encode(b"not an image")
+        )
+        with pytest.raises(StyleError, match="not a readable"):
+            render(params)
+
+
+class TestRenderStyledSVG:
+    """Test class for the SVG renders of the style pipeline"""
+
+    def render(self, params: QRRenderParams) -> ET.Element:
+        """Render the parameters and parse the document"""
+        matrix = build_matrix(
+            params.data, params.error_correction, params.version, params.border
+        )
+        return ET.fromstring(render_styled_svg(matrix, params))
+
+    def test_modules_reference_the_template(self) -> None:
+        """Test that the shaped modules reference the shapes defined once in the template."""
+        document = self.render(
+            QRRenderParams(
+                data="QRafty", module_shape=ModuleShape.ROUNDED, format=ImageFormat.SVG
+            )
+        )
+        defined = {
+            f"#{path.get('id')}"
+            for path in document.iterfind("svg:defs/svg:path", SVG_NAMESPACE)
+        }
+        uses = document.findall(".//svg:use", SVG_NAMESPACE)
+        assert "#eye" in defined and len(defined) <= 17
+        assert {use.get("href") for use in uses} <= defined
+        assert sum(use.get("href") == "#eye" for use in uses) == 3
+
+    def test_gradient_is_masked_by_the_modules(self) -> None:
+        """Test that the gradient fills a single rectangle masked by the modules."""
+        document = self.render(
+            QRRenderParams(
+                data="QRafty",
+                module_shape=ModuleShape.DOT,
+                gradient=GradientKind.RADIAL,
+                gradient_color="#0000FF",
+                format=ImageFormat.SVG,
+            )
+        )
+        assert document.find("svg:defs/svg:radialGradient", SVG_NAMESPACE) is not None
+        mask = document.find("svg:defs/svg:mask", SVG_NAMESPACE)
+        assert len(mask.findall(".//svg:use", SVG_NAMESPACE)) > 3
+        (painted,) = [
+            rect
+            for rect in document.iterfind("svg:rect", SVG_NAMESPACE)
+            if rect.get("mask")
+        ]
+        assert painted.get("fill") == "url(#gradient)"
+
+    def test_logo(self) -> None:
+        """Test that the logo is embedded as a data URI over the square modules."""
+        logo = make_logo()
+        document = self.render(
+            QRRenderParams(
+                data="QRafty",
+                error_correction="Q",
+                logo=base64.b64encode(logo),
+                format=ImageFormat.SVG,
+            )
+        )
+        image = document.find("svg:image", SVG_NAMESPACE)
+        assert (
+            image.get("href")
+            == "data:image/png;base64," + base64.b64encode(logo).decode()
+        )
+        assert (
+            document.find("svg:g/svg:path", SVG_NAMESPACE).get("shape-rendering")
+            == "crispEdges"
+        )
+
+
+class TestStyleParams:
+    """Test class for the validation of the style parameters"""
+
+    def test_plain_params_are_not_styled(self) -> None:
+        """Test that the default parameters keep the plain rasterization."""
+        assert not QRRenderParams(data="QRafty").styled
+        assert QRRenderParams(data="QRafty", module_shape="dot").styled
+
+    def test_gradient_requires_color(self) -> None:
+        """Test that a gradient without its end color is refused."""
+        with pytest.raises(ValidationError, match="gradient color"):
+            QRRenderParams(data="QRafty", gradient="radial")
+
+    def test_logo_requires_error_correction(self) -> None:
+        """Test that a logo is refused at the error correction levels L and M."""
+        with pytest.raises(ValidationError, match="level Q or H"):
+            QRRenderParams(data="QRafty", logo=base64.b64encode(make_logo()))
+
+    def test_logo_key(self) -> None:
+        """Test that an uploaded logo is styled like a logo sent along, and exclusive with it."""
+        key = "0" * 64 + ".png"
+        assert QRRenderParams(data="QRafty", error_correction="H", logo_key=key).styled
+        with pytest.raises(ValidationError, match="level Q or H"):
+            QRRenderParams(data="QRafty", logo_key=key)
+        with pytest.raises(ValidationError, match="mutually exclusive"):
+            QRRenderParams(
+                data="QRafty",
+                error_correction="H",
+                logo=base64.b64encode(make_logo()),
+                logo_key=key,
+            )
+        with pytest.raises(ValidationError, match="logo_key"):
+            QRRenderParams(
+                data="QRafty", error_correction="H", logo_key="0" * 64 + ".svg"
+            )
@@ -0,0 +1,51 @@
+"""Rate limiting level fixtures"""
+
+from typing import Any
+
+import pytest
+
+from src.ratelimit.backends import REDIS_ACQUIRE_SCRIPT
+
+
+class FakeClock:
+    """Clock advanced by hand"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class LocalRedis:
+    """
+    Stand-in for an asynchronous Redis client, running the acquire script of the rate limits in Python
+    against a dict, timed by a fake clock. Replies are bytes, as with a Redis client.
+    """
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.values: dict[str, tuple[float, float]] = {}
+        self.closed = False
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args: str) -> list[Any]:
+        assert script == REDIS_ACQUIRE_SCRIPT and numkeys == 1
+        key, interval, period = keys_and_args[0], *map(float, keys_and_args[1:])
+        now = self.clock()
+        value, expires_at = self.values.get(key, (now, now))
+        arrival = max(value if expires_at > now else now, now)
+        next_arrival = arrival + interval
+        allowed_at = next_arrival - period
+        if now < allowed_at:
+            return [0, repr(arrival - now).encode(), repr(allowed_at - now).encode()]
+        self.values[key] = (next_arrival, next_arrival)
+        return [1, repr(next_arrival - now).encode(), b"0"]
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture(scope="function")
+def clock() -> FakeClock:
+    """Fake clock of the backends"""
+    return FakeClock()
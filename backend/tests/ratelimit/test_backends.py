@@ -0,0 +1,92 @@
+"""Testing the token buckets of the rate limit backends"""
+
+import pytest
+
+from src.ratelimit.backends import (
+    LocalRateLimitBackend,
+    RateLimitBackend,
+    RedisRateLimitBackend,
+    create_rate_limit_backend,
+)
+from src.ratelimit.schemas import RateLimitRule
+from tests.ratelimit.conftest import FakeClock, LocalRedis
+
+RULE = RateLimitRule("test", limit=3, period_seconds=3)
+
+
+def make_backend(kind: str, clock: FakeClock) -> RateLimitBackend:
+    """Build a backend of the given kind, timed by the fake clock"""
+    if kind == "local":
+        return LocalRateLimitBackend(max_keys=100, clock=clock)
+    return RedisRateLimitBackend(LocalRedis(clock), prefix="ratelimit:")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["local", "redis"])
+class TestBackends:
+    """Test class for the token buckets, shared by the in-process and the Redis backends"""
+
+    async def test_burst_then_refill(self, kind: str, clock: FakeClock) -> None:
+        """Test that a burst of up to the limit is allowed, then a request per interval."""
+        backend = make_backend(kind, clock)
+
+        decisions = [await backend.acquire("client", RULE) for _ in range(4)]
+        assert [decision.allowed for decision in decisions] == [True] * 3 + [False]
+        assert [decision.remaining for decision in decisions] == [2, 1, 0, 0]
+        assert decisions[2].reset_seconds == pytest.approx(3)
+        assert decisions[3].retry_after_seconds == pytest.approx(1)
+
+        clock.now += 1
+        assert (await backend.acquire("client", RULE)).allowed
+        assert not (await backend.acquire("client", RULE)).allowed
+
+        clock.now += 10
+        decision = await backend.acquire("client", RULE)
+        assert decision.allowed and decision.remaining == 2
+        print("Test passed successfully!")
+
+    async def test_buckets_per_key(self, kind: str, clock: FakeClock) -> None:
+        """Test that every key has its own bucket."""
+        backend = make_backend(kind, clock)
+        for _ in range(3):
+            await backend.acquire("a", RULE)
+
+        assert not (await backend.acquire("a", RULE)).allowed
+        assert (await backend.acquire("b", RULE)).allowed
+        if isinstance(backend, RedisRateLimitBackend):
+            assert set(backend.client.values) == {"ratelimit:a", "ratelimit:b"}
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestLocalBackend:
+    """Test class for the in-process backend"""
+
+    async def test_eviction(self, clock: FakeClock) -> None:
+        """Test that full buckets are dropped, and the least recently used ones beyond max_keys."""
+        backend = LocalRateLimitBackend(max_keys=2, clock=clock)
+        await backend.acquire("a", RULE)
+        await backend.acquire("b", RULE)
+        await backend.acquire("a", RULE)
+        await backend.acquire("c", RULE)
+        assert len(backend) == 2
+        assert (await backend.acquire("a", RULE)).remaining == 0
+
+        clock.now += 10
+        await backend.acquire("d", RULE)
+        assert len(backend) == 1
+
+        backend.clear()
+        assert len(backend) == 0
+        print("Test passed successfully!")
+
+    async def test_create_backend(self, clock: FakeClock) -> None:
+        """Test that the in-process backend is used without a Redis URL, and that backends close."""
+        backend = create_rate_limit_backend(10, None, "ratelimit:")
+        assert isinstance(backend, LocalRateLimitBackend)
+        await backend.close()
+
+        redis = LocalRedis(clock)
+        await RedisRateLimitBackend(redis, "ratelimit:").close()
+        assert redis.closed
+        print("Test passed successfully!")
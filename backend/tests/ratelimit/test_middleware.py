@@ -0,0 +1,117 @@
+"""Testing the rate limit middleware on the routes of the application"""
+
+import uuid
+
+import pytest
+from fastapi import FastAPI, status
+from fastapi_users.jwt import generate_jwt
+from httpx import ASGITransport, AsyncClient, Response
+
+from src.auth.config import SECRET_KEY
+from src.auth.jwt import jwt_strategy
+from src.ratelimit.backends import LocalRateLimitBackend
+from src.ratelimit.config import RATE_LIMIT_RULES
+from src.ratelimit.middleware import RateLimitMiddleware, get_bearer_token
+from src.ratelimit.schemas import RateLimitRule
+
+LOGIN = ("POST", "/auth/login")
+RENDER = ("GET", "/qr/render")
+
+
+def make_token(user_id: uuid.UUID) -> str:
+    """Sign a bearer token for a user"""
+    return generate_jwt(
+        {"sub": str(user_id), "aud": jwt_strategy.token_audience}, SECRET_KEY, 60
+    )
+
+
+@pytest.mark.asyncio
+class TestRateLimitMiddleware:
+    """Test class for the rate limit middleware"""
+
+    async def test_login_limited_per_ip(
+        self, client: AsyncClient, app: FastAPI, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that logins over the limit are refused with a 429, other IPs keeping their own limit."""
+        monkeypatch.setitem(RATE_LIMIT_RULES, LOGIN, RateLimitRule("login", 2, 60))
+        credentials = {"username": "nobody@example.com", "password": "Wrong123!"}
+
+        for remaining in (1, 0):
+            response: Response = await client.post("/auth/login", data=credentials)
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+            assert response.headers["ratelimit-limit"] == "2"
+            assert response.headers["ratelimit-remaining"] == str(remaining)
+            assert response.headers["ratelimit-policy"] == "2;w=60"
+
+        response = await client.post("/auth/login", data=credentials)
+        assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert response.headers["retry-after"] == "30"
+        assert response.headers["ratelimit-remaining"] == "0"
+        assert response.headers["ratelimit-reset"] == "60"
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app, client=("10.0.0.2", 50000)),  # type: ignore
+            base_url="http://test",
+        ) as other_client:
+            response = await other_client.post("/auth/login", data=credentials)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        print("Test passed successfully!")
+
+    async def test_render_limited_per_user(
+        self, client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that authenticated renders are limited per user, anonymous ones per IP."""
+        monkeypatch.setitem(
+            RATE_LIMIT_RULES, RENDER, RateLimitRule("render", 1, 60, per_user=True)
+        )
+        tokens = [make_token(uuid.uuid4()), make_token(uuid.uuid4())]
+
+        for headers in [{}, *({"Authorization": f"Bearer {t}"} for t in tokens)]:
+            response: Response = await client.get(
+                "/qr/render", params={"data": "https://qrafty.app"}, headers=headers
+            )
+            assert response.status_code == status.HTTP_200_OK
+            response = await client.get(
+                "/qr/render", params={"data": "https://qrafty.app"}, headers=headers
+            )
+            assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        print("Test passed successfully!")
+
+    async def test_unlimited_routes(self, client: AsyncClient) -> None:
+        """Test that the routes without a rule are not limited, nor given RateLimit headers."""
+        response: Response = await client.get("/")
+        assert response.status_code == status.HTTP_200_OK
+        assert "ratelimit-limit" not in response.headers
+        print("Test passed successfully!")
+
+    async def test_client_key(self) -> None:
+        """Test that the bucket of a request is keyed by rule, and by user or IP."""
+        user_id = uuid.uuid4()
+        middleware = RateLimitMiddleware(
+            app=None,  # type: ignore
+            backend=LocalRateLimitBackend(10),
+            rules={},
+            read_user_id=lambda token: user_id if token == "valid" else None,
+        )
+        per_user = RateLimitRule("render", 1, 60, per_user=True)
+        per_ip = RateLimitRule("login", 1, 60)
+
+        def scope(authorization: bytes | None, client=("10.0.0.1", 1)) -> dict:
+            headers = [(b"authorization", authorization)] if authorization else []
+            return {"headers": headers, "client": client}
+
+        assert middleware.client_key(scope(b"Bearer valid"), per_user) == (
+            f"render:user:{user_id}"
+        )
+        assert middleware.client_key(scope(b"Bearer valid"), per_ip) == (
+            "login:ip:10.0.0.1"
+        )
+        assert middleware.client_key(scope(b"Bearer other"), per_user) == (
+            "render:ip:10.0.0.1"
+        )
+        assert middleware.client_key(scope(None, None), per_user) == (
+            "render:ip:unknown"
+        )
+        assert get_bearer_token(scope(b"Basic dXNlcjpwYXNz")) is None
+        assert get_bearer_token(scope(b"bearer valid")) == "valid"
+        print("Test passed successfully!")
@@ -0,0 +1,124 @@
+"""Testing the database connection pool instrumentation and warm up, and the COPY helper"""
+
+import uuid
+from collections.abc import AsyncGenerator
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from httpx import AsyncClient, Response
+from sqlalchemy import exc, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from src.auth.router import current_superuser
+from src.config import settings
+from src.analytics.models import ScanEvent
+from src.database import (
+    InstrumentedAsyncQueuePool,
+    copy_records,
+    get_pool_stats,
+    warm_up_pool,
+)
+
+
+@pytest_asyncio.fixture(scope="function")  # type: ignore
+async def small_pool_engine() -> AsyncGenerator[AsyncEngine, None]:
+    """
+    Fixture which creates an engine on the test database with an instrumented pool of two connections
+    and no overflow, disposing it after the test
+    """
+    engine = create_async_engine(
+        settings.TEST_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestConnectionPool:
+    """Test class for the instrumented connection pool and its warm up"""
+
+    async def test_pool_stats(self, small_pool_engine: AsyncEngine) -> None:
+        """Test that checkouts, acquisitions and timeouts are counted."""
+        async with small_pool_engine.connect(), small_pool_engine.connect():
+            stats = get_pool_stats(small_pool_engine)
+            assert stats.checked_out == 2 and stats.checked_in == 0
+
+            with pytest.raises(exc.TimeoutError):
+                await small_pool_engine.connect()
+
+        stats = get_pool_stats(small_pool_engine)
+        assert stats.size == 2 and stats.checked_in == 2 and stats.overflow == 0
+        assert stats.acquisitions == 3 and stats.timeouts == 1
+        assert stats.max_wait_seconds >= 0.1
+        assert stats.total_wait_seconds >= stats.max_wait_seconds
+        print("Test passed successfully!")
+
+    async def test_warm_up(self, small_pool_engine: AsyncEngine) -> None:
+        """Test that the warm up opens connections up to the size of the pool."""
+        await warm_up_pool(small_pool_engine, 5)
+
+        stats = get_pool_stats(small_pool_engine)
+        assert stats.checked_in == 2 and stats.checked_out == 0
+        print("Test passed successfully!")
+
+    async def test_warm_up_disabled(self, small_pool_engine: AsyncEngine) -> None:
+        """Test that no connection is opened when the warm up is disabled."""
+        await warm_up_pool(small_pool_engine, 0)
+        assert get_pool_stats(small_pool_engine).acquisitions == 0
+
+    async def test_warm_up_failure(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that a failed warm up is logged instead of preventing the startup."""
+        engine = create_async_engine(
+            "postgresql+asyncpg://postgres@/missing?host=/nonexistent",
+            poolclass=InstrumentedAsyncQueuePool,
+        )
+        await warm_up_pool(engine, 1)
+        assert "Could not warm up" in caplog.text
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestCopyRecords:
+    """Test class for the COPY helper"""
+
+    async def test_copy_within_transaction(self, async_db_engine: AsyncEngine) -> None:
+        """Test that a copy coming first in a session is rolled back with the session."""
+        qr_code_id = uuid.uuid4()
+        count = select(func.count()).where(ScanEvent.qr_code_id == qr_code_id)
+        async with AsyncSession(async_db_engine) as session:
+            await copy_records(
+                session,
+                "scan_event",
+                ["qr_code_id", "scanned_at"],
+                [(qr_code_id, datetime.now(timezone.utc))],
+            )
+            assert await session.scalar(count) == 1
+            await session.rollback()
+            assert await session.scalar(count) == 0
+        print("Test passed successfully!")
+
+
+@pytest.mark.asyncio
+class TestPoolStatsEndpoint:
+    """Test class for the connection pool stats endpoint, /db/pool"""
+
+    async def test_pool_stats_superuser(
+        self, client: AsyncClient, app: FastAPI
+    ) -> None:
+        """Test that superusers get a snapshot of the pool."""
+        app.dependency_overrides[current_superuser] = lambda: None
+        response: Response = await client.get("/db/pool")
+        assert response.status_code == 200
+        assert response.json()["size"] == settings.DB_POOL_SIZE
+        print("Test passed successfully!")
+
+    async def test_pool_stats_unauthenticated(self, client: AsyncClient) -> None:
+        """Test that the pool stats are restricted to superusers."""
+        response: Response = await client.get("/db/pool")
+        assert response.status_code == 401
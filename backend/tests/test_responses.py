@@ -0,0 +1,85 @@
+"""Testing the fast JSON responses against the serialization of FastAPI"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.analytics.schemas import Granularity, ScanCount, ScanSeries
+from src.auth.schemas import UserRead
+from src.qr.schemas import QRCodeListItem, QRCodePage
+from src.responses import FastJSONResponse, dump_json
+
+NOW = datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+
+async def fastapi_body(response_model: Any, content: Any) -> bytes:
+    """Body of the response FastAPI would send for content returned by a route with a response model"""
+    field = create_response_field("Response", response_model)
+    return JSONResponse(
+        await serialize_response(field=field, response_content=content)
+    ).body
+
+
+@pytest.mark.asyncio
+class TestFastJSONResponse:
+    """Test class for the encoding of the fast JSON responses"""
+
+    async def test_models(self) -> None:
+        """Test that models are encoded as FastAPI would encode them, URLs and UTC datetimes included."""
+        page = QRCodePage(
+            items=[
+                QRCodeListItem(
+                    id=uuid.uuid4(),
+                    short_id="abc",
+                    name="Menu",
+                    target_url="https://example.com/menu?table=1",
+                    is_active=True,
+                    created_at=NOW,
+                )
+            ],
+            next_cursor="cursor",
+        )
+        series = ScanSeries(
+            qr_code_id=uuid.uuid4(),
+            granularity=Granularity.HOUR,
+            start=NOW,
+            end=NOW + timedelta(hours=2),
+            total=3,
+            buckets=[ScanCount(bucket=NOW, scans=3)],
+        )
+        for response_model, content in ((QRCodePage, page), (ScanSeries, series)):
+            assert FastJSONResponse(content).body == await fastapi_body(
+                response_model, content
+            )
+        print("Test passed successfully!")
+
+    async def test_rows(self) -> None:
+        """Test that plain rows, and the models nested in them, are encoded as FastAPI would."""
+        user = UserRead(
+            id=uuid.uuid4(),
+            email="user@example.com",
+            is_active=True,
+            is_superuser=False,
+            is_verified=False,
+            name="User",
+            username="user",
+        )
+        rows = [
+            {"bucket": NOW, "scans": 1, "granularity": Granularity.DAY},
+            {"bucket": NOW.replace(microsecond=0), "scans": 2, "user": user},
+        ]
+        response = FastJSONResponse(rows)
+        assert response.headers["content-type"] == "application/json"
+        assert response.body == await fastapi_body(list[dict[str, Any]], rows)
+        print("Test passed successfully!")
+
+    async def test_unsupported(self) -> None:
+        """Test that values which have no JSON form are refused."""
+        with pytest.raises(TypeError):
+            dump_json({"value": object()})
+        print("Test passed successfully!")
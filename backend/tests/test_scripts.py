@@ -0,0 +1,94 @@
+"""Testing the command line scripts of scripts/backend against the test database"""
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+
+import pytest
+from sqlalchemy import NullPool, delete, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.auth.models import User
+from src.config import settings
+from src.database import Database
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2] / "scripts" / "backend"
+
+
+def load_script(
+    name: str, monkeypatch: pytest.MonkeyPatch, *args: str
+) -> tuple[ModuleType, Database]:
+    """
+    Import a script as a module, with its command line arguments and its database swapped for one on the
+    test database
+
+    Args:
+        name (str): File name of the script, without the extension
+        monkeypatch (pytest.MonkeyPatch): Undoes the swaps after the test
+        *args (str): Command line arguments of the script
+
+    Returns:
+        tuple[ModuleType, Database]: The script module and its database
+    """
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / f"{name}.py")
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    database = Database(
+        lambda: create_async_engine(settings.TEST_DATABASE_URL, poolclass=NullPool)
+    )
+    monkeypatch.setattr(module, "database", database)
+    monkeypatch.setattr(sys, "argv", [f"{name}.py", *args])
+    return module, database
+
+
+@pytest.mark.asyncio
+class TestScripts:
+    """Test class for the command line scripts, run through their main function"""
+
+    async def test_import_users(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        """Test that the import script imports the valid rows and writes the rejects."""
+        users_file = tmp_path / "users.csv"
+        users_file.write_text(
+            "email,password,name,username\n"
+            "script1@example.com,Password1!,Script 1,script1\n"
+            "script2@example.com,password,Script 2,script2\n"
+        )
+        rejects_file = tmp_path / "rejects.csv"
+        module, database = load_script(
+            "import_users",
+            monkeypatch,
+            str(users_file),
+            "--rejects",
+            str(rejects_file),
+            "--workers",
+            "1",
+        )
+
+        try:
+            await module.main()
+            assert rejects_file.read_text().splitlines()[0] == "row,error"
+            assert rejects_file.read_text().splitlines()[1].startswith("2,")
+            async with database.session() as session:
+                usernames = await session.scalars(
+                    select(User.username).where(User.email.like("script%"))
+                )
+                assert usernames.all() == ["script1"]
+        finally:
+            async with database.session() as session:
+                await session.execute(delete(User).where(User.email.like("script%")))
+                await session.commit()
+            await database.dispose()
+
+    async def test_maintain_partitions(
+        self, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+    ) -> None:
+        """Test that the maintenance script reports the partitions it maintained."""
+        module, _ = load_script("maintain_partitions", monkeypatch)
+
+        assert await module.main() == 0
+        assert "created: " in capsys.readouterr().out
@@ -0,0 +1,54 @@
+"""Testing what the entry points of the backend import, each in a fresh interpreter"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Modules each entry point has no use for: the web workers hand the renders over to the render processes
+# and load the database driver in the lifespan, the render processes serve no request
+FORBIDDEN_IMPORTS: dict[str, set[str]] = {
+    "import src.main": {"numpy", "qrcode", "PIL", "asyncpg"},
+    "import src.qr.service, src.qr.engine": {"fastapi", "sqlalchemy", "asyncpg"},
+    "import src.auth.models, src.qr.models, src.analytics.models": {"asyncpg"},
+}
+
+
+def imported_modules(code: str, env: dict[str, str] | None = None) -> set[str]:
+    """Run code in a fresh interpreter, returning the top level packages it imported"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{code}\nimport sys\nprint(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return {name.split(".")[0] for name in result.stdout.split()}
+
+
+class TestStartup:
+    """Test class for the imports of the entry points, kept out of the way of the startup"""
+
+    @pytest.mark.parametrize("code, forbidden", FORBIDDEN_IMPORTS.items())
+    def test_forbidden_imports(self, code: str, forbidden: set[str]) -> None:
+        """Test that no entry point imports the modules it has no use for."""
+        assert not imported_modules(code) & forbidden
+        print("Test passed successfully!")
+
+    def test_settings_deferred(self) -> None:
+        """Test that the settings are only read on first access, the models importing without them."""
+        env = {
+            name: value
+            for name, value in os.environ.items()
+            if name not in ("ENVIRONMENT", "TEST_DATABASE_URL")
+        }
+        imported_modules("import src.config, src.database, src.auth.models", env)
+
+        with pytest.raises(subprocess.CalledProcessError):
+            imported_modules("from src.config import settings", env)
+        print("Test passed successfully!")
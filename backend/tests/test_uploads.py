@@ -0,0 +1,57 @@
+"""Testing the format negotiation and the parsing of bulk uploads"""
+
+import io
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+
+from src.uploads import (
+    UploadFormat,
+    format_validation_error,
+    get_upload_format,
+    iter_records,
+)
+
+
+class TestUploads:
+    """Test class for the helpers shared by the bulk upload endpoints"""
+
+    def test_upload_format(self) -> None:
+        """Test that the upload format is determined from the media type, ignoring its parameters."""
+        assert get_upload_format("text/csv; charset=utf-8") is UploadFormat.CSV
+        assert get_upload_format("application/x-ndjson") is UploadFormat.NDJSON
+        with pytest.raises(HTTPException) as exc_info:
+            get_upload_format("application/json")
+        assert exc_info.value.status_code == 415
+        print("Test passed successfully!")
+
+    def test_records(self) -> None:
+        """Test that CSV records leave out empty cells and NDJSON records skip blank lines."""
+        csv_body = b"\xef\xbb\xbfa,b\r\n1,\r\n,2\r\n"
+        assert list(iter_records(io.BytesIO(csv_body), UploadFormat.CSV)) == [
+            {"a": "1"},
+            {"b": "2"},
+        ]
+
+        ndjson_body = b'{"a": 1}\n\n"a"\n'
+        assert list(iter_records(io.BytesIO(ndjson_body), UploadFormat.NDJSON)) == [
+            {"a": 1},
+            "Row must be a JSON object",
+        ]
+        print("Test passed successfully!")
+
+    def test_format_validation_error(self) -> None:
+        """Test that every error of a validation is reported with its location."""
+
+        class Model(BaseModel):
+            a: int
+            b: str
+
+        with pytest.raises(ValidationError) as exc_info:
+            Model.model_validate({"a": "x"})
+        assert format_validation_error(exc_info.value) == (
+            "a: Input should be a valid integer, unable to parse string as an integer; "
+            "b: Field required"
+        )
+        print("Test passed successfully!")
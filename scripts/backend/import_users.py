@@ -0,0 +1,90 @@
+"""
+Import users in bulk from a CSV or NDJSON file into the database configured by DEV_DATABASE_URL.
+
+Each row holds the fields of a registration: email, password, name and username. CSV files start with
+a header line naming the columns. Rows are imported in chunks, each chunk being committed on its own,
+and the rows which could not be imported are written as CSV (row,error) to stdout or to --rejects.
+
+Usage (from the backend directory, so that its .env file is picked up):
+    python ../scripts/backend/import_users.py users.csv
+    python ../scripts/backend/import_users.py users.jsonl --rejects rejects.csv --workers 8
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+
+from src.auth.bulk_import import import_users, iter_import_rows  # noqa: E402
+from src.auth.config import (  # noqa: E402
+    USER_IMPORT_CHUNK_SIZE,
+    USER_IMPORT_HASH_WORKERS,
+)
+from src.database import database  # noqa: E402
+from src.uploads import UploadFormat  # noqa: E402
+
+# Format of the input file by extension, when not given explicitly
+FORMATS_BY_SUFFIX: dict[str, UploadFormat] = {
+    ".csv": UploadFormat.CSV,
+    ".ndjson": UploadFormat.NDJSON,
+    ".jsonl": UploadFormat.NDJSON,
+}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("file", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument("--rejects", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=USER_IMPORT_HASH_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=USER_IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.format is not None:
+        upload_format = UploadFormat[args.format.upper()]
+    elif args.file.suffix.lower() in FORMATS_BY_SUFFIX:
+        upload_format = FORMATS_BY_SUFFIX[args.file.suffix.lower()]
+    else:
+        parser.error("cannot tell the format from the file extension, pass --format")
+
+    rejects_file = (
+        open(args.rejects, "w", newline="") if args.rejects is not None else sys.stdout
+    )
+    rejects = csv.writer(rejects_file)
+    rejects.writerow(("row", "error"))
+    rejected = 0
+
+    def on_reject(row_number: int, error: str) -> None:
+        nonlocal rejected
+        rejected += 1
+        rejects.writerow((row_number, error))
+
+    start = time.perf_counter()
+    try:
+        with open(args.file, "rb") as file:
+            async with database.session() as session:
+                imported = await import_users(
+                    iter_import_rows(file, upload_format),
+                    session,
+                    on_reject,
+                    max_workers=args.workers,
+                    chunk_size=args.chunk_size,
+                )
+    finally:
+        if rejects_file is not sys.stdout:
+            rejects_file.close()
+        await database.dispose()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Imported {imported} users, rejected {rejected} rows in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
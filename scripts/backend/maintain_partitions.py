@@ -0,0 +1,64 @@
+"""
+Maintain the monthly partitions of the scan events in the database configured by DEV_DATABASE_URL.
+
+Creates the partitions of the current month and of the following ones, then detaches or drops the
+partitions past the retention. The defaults come from the settings, as for the maintenance run by the
+application. Meant to be run from cron when the application is not, or to apply a different retention.
+
+Usage (from the backend directory, so that its .env file is picked up):
+    python ../scripts/backend/maintain_partitions.py
+    python ../scripts/backend/maintain_partitions.py --retention-months 6 --expired detach
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+
+from src.analytics.config import (  # noqa: E402
+    SCAN_EVENT_EXPIRED_PARTITIONS,
+    SCAN_EVENT_PARTITIONS_AHEAD,
+    SCAN_EVENT_RETENTION_MONTHS,
+)
+from src.analytics.partitions import maintain_scan_event_partitions  # noqa: E402
+from src.analytics.schemas import ExpiredPartitionAction  # noqa: E402
+from src.database import database  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--months-ahead", type=int, default=SCAN_EVENT_PARTITIONS_AHEAD)
+    parser.add_argument(
+        "--retention-months", type=int, default=SCAN_EVENT_RETENTION_MONTHS
+    )
+    parser.add_argument(
+        "--expired",
+        choices=[action.value for action in ExpiredPartitionAction],
+        default=SCAN_EVENT_EXPIRED_PARTITIONS.value,
+    )
+    args = parser.parse_args()
+
+    try:
+        async with database.session() as session:
+            maintenance = await maintain_scan_event_partitions(
+                session,
+                months_ahead=args.months_ahead,
+                retention_months=args.retention_months,
+                expired_action=ExpiredPartitionAction(args.expired),
+            )
+            await session.commit()
+    finally:
+        await database.dispose()
+
+    if maintenance is None:
+        print("Another maintenance is in progress, nothing done", file=sys.stderr)
+        return 1
+    for action, names in maintenance.model_dump().items():
+        print(f"{action}: {', '.join(names) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))